@@ -0,0 +1,470 @@
+#!/usr/bin/env python
+"""
+Benchmark of the request-to-query pipeline.
+
+Drives the filter backends (building the search body from synthetic query
+params) and the complete list requests (filter backends, search, pagination,
+serialization and rendering) of the example views. Searches are answered
+by a canned Elasticsearch connection (see ``CannedConnection``), thus the
+transport (request and response serialization) is measured as well, but no
+Elasticsearch server is required.
+
+Cases:
+
+- ``filtering_{1,10,50}``: ``FilteringFilterBackend`` with 1, 10 and 50
+  query params.
+- ``nested``, ``geo_distance``, ``search``, ``multi_match``, ``facets``,
+  ``ordering``: Other filter backends.
+- ``list_{10,100,1000}``: List requests with pages of 10, 100 and 1000 hits
+  (mostly serialization).
+- ``list_facets``: List request with filters and facets.
+- ``list_addresses``: List request with nested and geo-spatial filters.
+
+Results (best of ``repeat`` runs, microseconds per call) can be saved to a
+JSON file and compared with the previously saved ones, so that numbers are
+comparable across commits.
+
+Usage:
+
+    python benchmarks/pipeline.py [--number N] [--repeat N]
+                                  [--save FILE] [--compare FILE] [case ...]
+
+For example:
+
+    git checkout master
+    python benchmarks/pipeline.py --save /tmp/master.json
+    git checkout my-branch
+    python benchmarks/pipeline.py --compare /tmp/master.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import timeit
+import warnings
+from collections import OrderedDict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, os.path.join(ROOT, 'examples', 'simple'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings.testing')
+
+import django  # noqa
+
+django.setup()
+
+from elasticsearch.connection import Connection  # noqa
+from elasticsearch_dsl.connections import connections  # noqa
+
+from rest_framework.request import Request  # noqa
+from rest_framework.test import APIRequestFactory  # noqa
+
+from search_indexes.viewsets import (  # noqa
+    AddressDocumentViewSet,
+    BookDocumentViewSet,
+    BookMultiMatchSearchFilterBackendDocumentViewSet,
+)
+
+from django_elasticsearch_dsl_drf.filter_backends import (  # noqa
+    FacetedSearchFilterBackend,
+    FilteringFilterBackend,
+    GeoSpatialFilteringFilterBackend,
+    MultiMatchSearchFilterBackend,
+    NestedFilteringFilterBackend,
+    OrderingFilterBackend,
+    SearchFilterBackend,
+)
+
+__title__ = 'benchmarks.pipeline'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = (
+    'CannedConnection',
+    'get_cases',
+    'main',
+)
+
+FACTORY = APIRequestFactory()
+random.seed(1)
+
+
+class CannedConnection(Connection):
+    """Connection answering with canned responses.
+
+    Searches are answered with the ``search_response`` (set by the
+    benchmark cases), counts with its total number of hits.
+    """
+
+    search_response = None
+
+    def perform_request(self, method, url, params=None, body=None,
+                        timeout=None, ignore=(), headers=None):
+        path = url.split('?', 1)[0].rstrip('/')
+        total = self.search_response['hits']['total']['value']
+        if path == '':
+            response = {
+                'version': {'number': '7.17.0', 'build_flavor': 'default'},
+                'tagline': 'You Know, for Search',
+            }
+        elif path.endswith('/_count'):
+            response = {'count': total}
+        elif path.endswith('/_msearch'):
+            response = {
+                'responses': [
+                    self.search_response
+                    for _ in range(len(body.splitlines()) // 2)
+                ],
+            }
+        else:
+            response = self.search_response
+        return (
+            200,
+            {
+                'content-type': 'application/json',
+                'x-elastic-product': 'Elasticsearch',
+            },
+            json.dumps(response)
+        )
+
+
+def get_search_response(hits, aggregations=None):
+    """Get search response.
+
+    :param hits: List of ``_source`` of the hits.
+    :param aggregations: Aggregations.
+    :type hits: list
+    :type aggregations: dict
+    :return:
+    :rtype: dict
+    """
+    response = {
+        'took': 3,
+        'timed_out': False,
+        '_shards': {'total': 1, 'successful': 1, 'skipped': 0, 'failed': 0},
+        'hits': {
+            'total': {'value': 10000, 'relation': 'gte'},
+            'max_score': 1.5,
+            'hits': [
+                {
+                    '_index': 'book',
+                    '_type': '_doc',
+                    '_id': str(__source['id']),
+                    '_score': 1.5,
+                    '_source': __source,
+                }
+                for __source in hits
+            ],
+        },
+    }
+    if aggregations:
+        response['aggregations'] = aggregations
+    return response
+
+
+def get_book_source(uid):
+    """Get ``_source`` of a book hit (as ``BookDocument``).
+
+    :param uid:
+    :return:
+    """
+    return {
+        'id': uid,
+        'title': 'Book {}'.format(uid),
+        'description': 'Description ' * 50,
+        'summary': 'Summary ' * 20,
+        'authors': ['Author {}'.format(__i) for __i in range(uid % 4 + 1)],
+        'publisher': 'Publisher {}'.format(uid % 10),
+        'publication_date': '2019-01-{:02d}'.format(uid % 28 + 1),
+        'state': random.choice(['published', 'rejected', 'in_progress']),
+        'isbn': '978-3-16-148410-{}'.format(uid % 10),
+        'price': round(random.uniform(1, 100), 2),
+        'pages': random.randint(10, 200),
+        'stock_count': random.randint(0, 30),
+        'tags': ['tag{}'.format(__i) for __i in range(uid % 7 + 1)],
+        'created': '2019-01-01T10:00:00',
+        'null_field': None,
+    }
+
+
+def get_address_source(uid):
+    """Get ``_source`` of an address hit (as ``AddressDocument``).
+
+    :param uid:
+    :return:
+    """
+    location = {'lat': 48.8549, 'lon': 2.3000}
+    country = {'name': 'France', 'info': 'Info', 'location': location}
+    city = {
+        'name': 'Paris',
+        'info': 'Info',
+        'location': location,
+        'country': country,
+    }
+    return {
+        'id': uid,
+        'street': 'Street {}'.format(uid),
+        'house_number': str(uid),
+        'appendix': '',
+        'zip_code': '75001',
+        'city': city,
+        'country': dict(country, city={'name': city['name']}),
+        'continent': {
+            'id': 1,
+            'name': 'Europe',
+            'country': dict(country, city=dict(city, country=None)),
+        },
+        'location': location,
+    }
+
+
+def get_facets():
+    """Get facets (as of the faceted search filter backend).
+
+    :return:
+    """
+    return {
+        '_filter_{}'.format(__name): {
+            'doc_count': 1000,
+            __name: {
+                'doc_count_error_upper_bound': 0,
+                'sum_other_doc_count': 0,
+                'buckets': [
+                    {'key': '{} {}'.format(__name, __i), 'doc_count': 10}
+                    for __i in range(10)
+                ],
+            },
+        }
+        for __name in ('publisher', 'state', 'tags')
+    }
+
+
+class SyntheticFilteringBookDocumentViewSet(BookDocumentViewSet):
+    """Book document view with 50 synthetic filter fields."""
+
+    filter_backends = [FilteringFilterBackend]
+    filter_fields = {
+        'field_{}'.format(__i): 'field_{}.raw'.format(__i)
+        for __i in range(50)
+    }
+
+
+def get_filtering_params(count):
+    """Get filtering query params (mixed lookups).
+
+    :param count: Number of query params.
+    :type count: int
+    :return:
+    :rtype: dict
+    """
+    params = {}
+    for __i in range(count):
+        lookup = __i % 5
+        if lookup == 0:
+            params['field_{}'.format(__i)] = 'value {}'.format(__i)
+        elif lookup == 1:
+            params['field_{}__in'.format(__i)] = 'a__b__c'
+        elif lookup == 2:
+            params['field_{}__range'.format(__i)] = '{}__{}'.format(
+                __i,
+                __i * 2
+            )
+        elif lookup == 3:
+            params['field_{}__gte'.format(__i)] = str(__i)
+        else:
+            params['field_{}__wildcard'.format(__i)] = '*value*'
+    return params
+
+
+def backend_case(view_class, backend, params):
+    """Make a case applying the filter backend and building the body.
+
+    :param view_class: View class.
+    :param backend: Filter backend class.
+    :param params: Query params.
+    :type params: dict
+    :return:
+    """
+    def case():
+        view = view_class()
+        view.request = Request(FACTORY.get('/', params))
+        view.format_kwarg = None
+        return backend().filter_queryset(
+            view.request,
+            view.get_queryset(),
+            view
+        ).to_dict()
+    return case
+
+
+def list_case(view_class, params, search_response):
+    """Make a case making a complete list request.
+
+    :param view_class: View class.
+    :param params: Query params.
+    :param search_response: Canned search response.
+    :type params: dict
+    :type search_response: dict
+    :return:
+    """
+    view = view_class.as_view({'get': 'list'})
+
+    def case():
+        CannedConnection.search_response = search_response
+        response = view(FACTORY.get('/', params))
+        assert response.status_code == 200, response.data
+        return response.render()
+    return case
+
+
+def get_cases():
+    """Get the benchmark cases.
+
+    :return: Cases by name.
+    :rtype: collections.OrderedDict
+    """
+    cases = OrderedDict()
+    for count in (1, 10, 50):
+        cases['filtering_{}'.format(count)] = backend_case(
+            SyntheticFilteringBookDocumentViewSet,
+            FilteringFilterBackend,
+            get_filtering_params(count)
+        )
+    cases['nested'] = backend_case(
+        AddressDocumentViewSet,
+        NestedFilteringFilterBackend,
+        {'continent_country': 'Armenia',
+         'continent_country_city__in': 'Yerevan__Gyumri'}
+    )
+    cases['geo_distance'] = backend_case(
+        AddressDocumentViewSet,
+        GeoSpatialFilteringFilterBackend,
+        {'location__geo_distance': '1km__48.8549__2.3000'}
+    )
+    cases['search'] = backend_case(
+        BookDocumentViewSet,
+        SearchFilterBackend,
+        {'search': ['python', 'title:django']}
+    )
+    cases['multi_match'] = backend_case(
+        BookMultiMatchSearchFilterBackendDocumentViewSet,
+        MultiMatchSearchFilterBackend,
+        {'search_multi_match': ['python django', 'title:elasticsearch']}
+    )
+    cases['facets'] = backend_case(
+        BookDocumentViewSet,
+        FacetedSearchFilterBackend,
+        {'facet': ['state', 'tags']}
+    )
+    cases['ordering'] = backend_case(
+        BookDocumentViewSet,
+        OrderingFilterBackend,
+        {'ordering': ['-price', 'id']}
+    )
+    for page_size in (10, 100, 1000):
+        cases['list_{}'.format(page_size)] = list_case(
+            BookDocumentViewSet,
+            {'page_size': page_size},
+            get_search_response(
+                [get_book_source(__i) for __i in range(page_size)]
+            )
+        )
+    cases['list_facets'] = list_case(
+        BookDocumentViewSet,
+        {'state__in': 'published__in_progress', 'price__gte': '10',
+         'search': 'python', 'facet': ['state', 'tags'],
+         'ordering': '-price'},
+        get_search_response(
+            [get_book_source(__i) for __i in range(10)],
+            get_facets()
+        )
+    )
+    cases['list_addresses'] = list_case(
+        AddressDocumentViewSet,
+        {'continent_country': 'France',
+         'location__geo_distance': '10km__48.8549__2.3000',
+         'limit': 10},
+        get_search_response([get_address_source(__i) for __i in range(10)])
+    )
+    return cases
+
+
+def get_commit():
+    """Get the current git commit (if any).
+
+    :return:
+    :rtype: str
+    """
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=ROOT,
+            stderr=subprocess.STDOUT
+        ).decode('utf8').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    """Run the benchmark.
+
+    :param argv: Command line arguments.
+    :type argv: list
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline")
+    parser.add_argument('cases', nargs='*', help="Cases to run (all)")
+    parser.add_argument('--number', type=int, default=None,
+                        help="Calls per run (auto)")
+    parser.add_argument('--repeat', type=int, default=5,
+                        help="Number of runs")
+    parser.add_argument('--save', help="Save results to JSON file")
+    parser.add_argument('--compare', help="Compare with saved results")
+    args = parser.parse_args(argv)
+
+    connections.create_connection(connection_class=CannedConnection)
+    # Deprecation warnings of the (historical) search filter backend
+    warnings.simplefilter('ignore', UserWarning)
+
+    previous = {}
+    if args.compare:
+        with open(args.compare) as _file:
+            previous = json.load(_file)['results']
+
+    results = OrderedDict()
+    for name, case in get_cases().items():
+        if args.cases and name not in args.cases:
+            continue
+        case()  # Warm up
+        number = args.number
+        if number is None:
+            number, _ = timeit.Timer(case).autorange()
+        timings = timeit.repeat(case, number=number, repeat=args.repeat)
+        results[name] = min(timings) / number * 1000000
+        line = "{:<16} {:>12.1f} us".format(name, results[name])
+        if name in previous:
+            line += "  {:>12.1f} us  {:>6.2f}x".format(
+                previous[name],
+                previous[name] / results[name]
+            )
+        print(line)
+
+    if args.save:
+        with open(args.save, 'w') as _file:
+            json.dump(
+                {
+                    'commit': get_commit(),
+                    'python': platform.python_version(),
+                    'django': django.get_version(),
+                    'results': results,
+                },
+                _file,
+                indent=4
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+"""
+Microbenchmark of the rendering of search responses.
+
+Renders paginated responses of the ``examples/simple`` book and address
+document views (serialized pages of hits with facets) with the Django REST
+framework ``JSONRenderer`` and the
+``django_elasticsearch_dsl_drf.renderers.JSONRenderer`` (with the fast
+encoder, if installed, and with the standard library fallback).
+
+Usage:
+
+    python benchmarks/renderers.py [number] [page_size]
+
+No Elasticsearch server is required.
+"""
+
+import os
+import random
+import sys
+import timeit
+from collections import OrderedDict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, os.path.join(ROOT, 'examples', 'simple'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings.testing')
+
+import django  # noqa
+
+django.setup()
+
+from elasticsearch_dsl.response import Hit  # noqa
+from faker import Faker  # noqa
+from rest_framework.renderers import JSONRenderer as DRFJSONRenderer  # noqa
+
+from books.constants import BOOK_PUBLISHING_STATUS_CHOICES  # noqa
+from search_indexes.serializers import (  # noqa
+    AddressDocumentSerializer,
+    BookDocumentSimpleSerializer,
+)
+
+from django_elasticsearch_dsl_drf.renderers import (  # noqa
+    BACKENDS,
+    JSONRenderer,
+)
+
+__title__ = 'benchmarks.renderers'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = ('main',)
+
+FAKER = Faker()
+FAKER.seed_instance(1)
+random.seed(1)
+
+
+def get_book_source(uid):
+    """Get ``_source`` of a book hit (as ``BookDocument``).
+
+    :param uid:
+    :return:
+    """
+    return {
+        'id': uid,
+        'title': FAKER.text(max_nb_chars=100),
+        'description': FAKER.text(max_nb_chars=1000),
+        'summary': FAKER.text(),
+        'authors': [FAKER.name() for _ in range(random.randint(1, 4))],
+        'publisher': FAKER.company(),
+        'publication_date': FAKER.date(),
+        'state': random.choice(list(dict(BOOK_PUBLISHING_STATUS_CHOICES))),
+        'isbn': FAKER.isbn13(),
+        'price': float(FAKER.pydecimal(left_digits=2,
+                                       right_digits=2,
+                                       positive=True)),
+        'pages': random.randint(10, 200),
+        'stock_count': random.randint(0, 30),
+        'tags': [FAKER.word() for _ in range(random.randint(1, 7))],
+        'created': FAKER.iso8601(),
+        'null_field': None,
+    }
+
+
+def get_address_source(uid):
+    """Get ``_source`` of an address hit (as ``AddressDocument``).
+
+    :param uid:
+    :return:
+    """
+    location = {'lat': float(FAKER.latitude()),
+                'lon': float(FAKER.longitude())}
+    country = {
+        'name': FAKER.country(),
+        'info': FAKER.text(),
+        'location': location,
+    }
+    city = {
+        'name': FAKER.city(),
+        'info': FAKER.text(),
+        'location': location,
+        'country': country,
+    }
+    return {
+        'id': uid,
+        'street': FAKER.street_name(),
+        'house_number': FAKER.building_number(),
+        'appendix': FAKER.secondary_address(),
+        'zip_code': FAKER.postcode(),
+        'city': city,
+        'country': dict(country, city={'name': city['name']}),
+        'continent': {
+            'id': random.randint(1, 7),
+            'name': FAKER.word(),
+            'country': dict(country, city=dict(city, country=None)),
+        },
+        'location': location,
+    }
+
+
+def get_facets():
+    """Get facets (as of the faceted search filter backend).
+
+    :return:
+    """
+    return {
+        '_filter_{}'.format(__name): {
+            'doc_count': 1000,
+            __name: {
+                'doc_count_error_upper_bound': 0,
+                'sum_other_doc_count': 0,
+                'buckets': [
+                    {'key': FAKER.word(), 'doc_count': random.randint(1, 100)}
+                    for _ in range(10)
+                ],
+            },
+        }
+        for __name in ('publisher', 'state', 'tags')
+    }
+
+
+def get_response_data(serializer_class, get_source, page_size):
+    """Get (paginated) response data.
+
+    :param serializer_class:
+    :param get_source:
+    :param page_size:
+    :return:
+    """
+    hits = [
+        Hit({
+            '_id': str(__i),
+            '_score': 1.5,
+            '_source': get_source(__i),
+            'highlight': {'title': ['<em>Book</em> {}'.format(__i)]},
+        })
+        for __i in range(page_size)
+    ]
+    return OrderedDict([
+        ('count', 1000),
+        ('next', 'http://127.0.0.1:8000/search/books/?page=2'),
+        ('previous', None),
+        ('facets', get_facets()),
+        ('results', serializer_class(hits, many=True).data),
+    ])
+
+
+def main(number=200, page_size=100):
+    """Run the benchmark.
+
+    :param number: Number of responses rendered.
+    :param page_size: Number of hits per page.
+    :type number: int
+    :type page_size: int
+    """
+    fallback_renderer = JSONRenderer()
+    fallback_renderer.backends = ()
+    fast_backend = next(
+        (__name for __name, __module in BACKENDS.items() if __module),
+        None
+    )
+    for name, serializer_class, get_source in (
+        ('books', BookDocumentSimpleSerializer, get_book_source),
+        ('addresses', AddressDocumentSerializer, get_address_source),
+    ):
+        data = get_response_data(serializer_class, get_source, page_size)
+        for label, renderer in (
+            ('rest_framework', DRFJSONRenderer()),
+            ('json', fallback_renderer),
+            (fast_backend, JSONRenderer() if fast_backend else None),
+        ):
+            if renderer is None:
+                continue
+            timings = timeit.repeat(
+                lambda: renderer.render(data),
+                number=number,
+                repeat=5
+            )
+            print("{} ({}): {:.3f} ms per page of {} hits".format(
+                name,
+                label,
+                min(timings) / number * 1000,
+                page_size
+            ))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
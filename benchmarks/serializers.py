@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+"""
+Microbenchmark of the serialization of search hits.
+
+Compares serialization of pages of 10, 100 and 1000 hits with the
+``DocumentSerializer`` without field mapping cache (``uncached``), as is
+(``default``) and with the ``compiled`` Meta option.
+
+Usage:
+
+    python benchmarks/serializers.py [number] [page_size [page_size ...]]
+
+No Elasticsearch server is required.
+"""
+
+import os
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, os.path.join(ROOT, 'examples', 'simple'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings.testing')
+
+import django  # noqa
+
+django.setup()
+
+from elasticsearch_dsl.response import Hit  # noqa
+
+from search_indexes.documents import BookDocument  # noqa
+from search_indexes.serializers import BookDocumentSimpleSerializer  # noqa
+
+__title__ = 'benchmarks.serializers'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = ('main',)
+
+
+class UncachedBookDocumentSimpleSerializer(BookDocumentSimpleSerializer):
+    """``BookDocumentSimpleSerializer`` without field mapping cache."""
+
+    class Meta(object):
+        """Meta options."""
+
+        document = BookDocument
+        fields = BookDocumentSimpleSerializer.Meta.fields
+
+    def get_fields(self):
+        return self.build_field_mapping()
+
+
+class CompiledBookDocumentSimpleSerializer(BookDocumentSimpleSerializer):
+    """Compiled version of the ``BookDocumentSimpleSerializer``."""
+
+    class Meta(object):
+        """Meta options."""
+
+        document = BookDocument
+        compiled = True
+        fields = BookDocumentSimpleSerializer.Meta.fields
+
+
+def get_hits(page_size):
+    """Get a page of hits.
+
+    :param page_size:
+    :return:
+    """
+    return [
+        Hit({
+            '_id': str(__i),
+            '_score': 1.5,
+            '_source': {
+                'id': __i,
+                'title': 'Book {}'.format(__i),
+                'description': 'Description ' * 20,
+                'summary': 'Summary ' * 20,
+                'authors': ['Author 1', 'Author 2'],
+                'publisher': 'Self',
+                'publication_date': '2019-01-01',
+                'state': 'published',
+                'isbn': '978-3-16-148410-0',
+                'price': 10.5,
+                'pages': 200,
+                'stock_count': 5,
+                'tags': ['Python', 'Django'],
+                'created': '2019-01-01T10:00:00',
+                'null_field': None,
+            },
+            'highlight': {'title': ['<em>Book</em> {}'.format(__i)]},
+        })
+        for __i in range(page_size)
+    ]
+
+
+def main(number=20, *page_sizes):
+    """Run the benchmark.
+
+    :param number: Number of pages serialized.
+    :param page_sizes: Numbers of hits per page.
+    :type number: int
+    :type page_sizes: int
+    """
+    for page_size in page_sizes or (10, 100, 1000):
+        hits = get_hits(page_size)
+        for label, serializer_class in (
+            ('uncached', UncachedBookDocumentSimpleSerializer),
+            ('default', BookDocumentSimpleSerializer),
+            ('compiled', CompiledBookDocumentSimpleSerializer),
+        ):
+            timings = timeit.repeat(
+                lambda: serializer_class(hits, many=True).data,
+                number=number,
+                repeat=5
+            )
+            print("{}: {:.3f} ms per page of {} hits".format(
+                label,
+                min(timings) / number * 1000,
+                page_size
+            ))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
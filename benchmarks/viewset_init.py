@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+"""
+Microbenchmark of the per-request construction of the document views.
+
+Compares the construction of the view (which DRF does once per request)
+with the client, index, mapping and base search resolved on each
+instantiation (before) and resolved once per view class (after).
+
+Usage:
+
+    python benchmarks/viewset_init.py [number]
+
+No Elasticsearch server is required.
+"""
+
+import os
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, os.path.join(ROOT, 'examples', 'simple'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings.testing')
+
+import django  # noqa
+
+django.setup()
+
+from elasticsearch_dsl import Search  # noqa
+from elasticsearch_dsl.connections import connections  # noqa
+
+from rest_framework.viewsets import ReadOnlyModelViewSet  # noqa
+
+from search_indexes.viewsets import BookDocumentViewSet  # noqa
+
+__title__ = 'benchmarks.viewset_init'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = ('main',)
+
+
+class PerInstanceBookDocumentViewSet(BookDocumentViewSet):
+    """Resolves everything on each instantiation (previous behaviour)."""
+
+    def __init__(self, *args, **kwargs):
+        self.client = connections.get_connection(
+            self.document._get_using()
+        )
+        self.index = self.document._index._name
+        self.mapping = self.document._doc_type.mapping.properties.name
+        self.search = Search(
+            using=self.client,
+            index=self.index,
+            doc_type=self.document._doc_type.name
+        )
+        ReadOnlyModelViewSet.__init__(self, *args, **kwargs)
+
+
+def main(number=100000):
+    """Run the benchmark.
+
+    :param number: Number of instantiations.
+    :type number: int
+    """
+    for label, view_class in (('before', PerInstanceBookDocumentViewSet),
+                              ('after', BookDocumentViewSet)):
+        timings = timeit.repeat(
+            lambda: view_class().get_queryset(),
+            number=number,
+            repeat=5
+        )
+        print("{}: {:.2f} us per view + get_queryset".format(
+            label,
+            min(timings) / number * 1000000
+        ))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
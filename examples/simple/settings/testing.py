@@ -116,3 +116,12 @@ LOGGING = {
 PASSWORD_HASHERS = [
     'django.contrib.auth.hashers.MD5PasswordHasher',
 ]
+
+# Run the tests against the in-memory fake Elasticsearch (no cluster
+# needed), if ``DJANGO_ELASTICSEARCH_DSL_DRF_FAKE_ELASTICSEARCH`` is set.
+if os.environ.get('DJANGO_ELASTICSEARCH_DSL_DRF_FAKE_ELASTICSEARCH'):
+    from django_elasticsearch_dsl_drf.fake_elasticsearch import (
+        FakeConnection,
+    )
+
+    ELASTICSEARCH_DSL['default']['connection_class'] = FakeConnection
@@ -164,7 +164,13 @@ install_requires = [
     'djangorestframework',
 ]
 
-extras_require = []
+extras_require = {
+    # Asyncio views (``django_elasticsearch_dsl_drf.aio``)
+    'async': [
+        'Django>=3.1',
+        'elasticsearch[async]>=7.8',
+    ],
+}
 
 tests_require = [
     'factory_boy',
@@ -213,7 +219,8 @@ setup(
     packages=find_packages(where='./src'),
     license='GPL-2.0-only OR LGPL-2.1-or-later',
     python_requires=">=2.7",
-    install_requires=(install_requires + extras_require),
+    install_requires=install_requires,
+    extras_require=extras_require,
     tests_require=tests_require,
     include_package_data=True,
 )
@@ -0,0 +1,30 @@
+"""
+Asyncio views, using the async Elasticsearch client.
+
+Requires Python 3.7 and Django 3.1 or later (``async`` extra).
+"""
+
+from .pagination import AsyncLimitOffsetPagination, AsyncPageNumberPagination
+from .viewsets import (
+    AsyncBaseDocumentViewSet,
+    AsyncDocumentViewSet,
+    AsyncFunctionalSuggestMixin,
+    AsyncMoreLikeThisMixin,
+    AsyncResponseCacheMixin,
+    AsyncSuggestMixin,
+)
+
+__title__ = 'django_elasticsearch_dsl_drf.aio'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = (
+    'AsyncBaseDocumentViewSet',
+    'AsyncDocumentViewSet',
+    'AsyncFunctionalSuggestMixin',
+    'AsyncLimitOffsetPagination',
+    'AsyncMoreLikeThisMixin',
+    'AsyncPageNumberPagination',
+    'AsyncResponseCacheMixin',
+    'AsyncSuggestMixin',
+)
@@ -0,0 +1,135 @@
+"""
+Pagination for the asyncio views.
+"""
+
+from django.core import paginator as django_paginator
+
+from rest_framework.exceptions import NotFound
+
+import six
+
+from ..pagination import LimitOffsetPagination, PageNumberPagination
+from .utils import count_search, execute_search
+
+__title__ = 'django_elasticsearch_dsl_drf.aio.pagination'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = (
+    'AsyncLimitOffsetPagination',
+    'AsyncPageNumberPagination',
+)
+
+
+async def paginate_suggest(queryset, view):
+    """Execute the suggest queries of the queryset, if any.
+
+    :param queryset:
+    :param view:
+    :return: Tuple of (True, suggestions) for the suggest (or functional
+        suggest) queries, (False, None) otherwise.
+    :rtype: tuple
+    """
+    # Check if there are suggest queries in the queryset, results shall be
+    # returned back immediately.
+    if getattr(queryset, '_suggest', False):
+        resp = await execute_search(queryset, view.get_async_client())
+        return True, resp.to_dict().get('suggest')
+
+    # Check if we're using paginate queryset from `functional_suggest`
+    # backend.
+    if view.action == 'functional_suggest':
+        return True, queryset
+
+    return False, None
+
+
+class AsyncPageNumberPagination(PageNumberPagination):
+    """Page number pagination for the asyncio views.
+
+    Use ``apaginate_queryset`` instead of ``paginate_queryset``. The
+    ``orphans`` are not supported.
+    """
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Paginate a queryset.
+
+        :param queryset:
+        :param request:
+        :param view:
+        :return:
+        """
+        is_suggest, suggestions = await paginate_suggest(queryset, view)
+        if is_suggest:
+            return suggestions
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        queryset = self.apply_track_total_hits(queryset)
+        queryset = self.apply_raw_source(queryset)
+        paginator = self.django_paginator_class(queryset, page_size)
+        client = view.get_async_client()
+        page_number = request.query_params.get(self.page_query_param, 1)
+        if page_number in self.last_page_strings:
+            # Cache the ``count`` (``cached_property``)
+            paginator.__dict__['count'] = await count_search(
+                queryset,
+                client
+            )
+            page_number = paginator.num_pages
+
+        try:
+            number, bottom, top = paginator.get_page_bounds(page_number)
+            self.page = paginator.get_page_from_response(
+                number,
+                await execute_search(queryset[bottom:top], client)
+            )
+        except django_paginator.InvalidPage as exc:
+            msg = self.invalid_page_message.format(
+                page_number=page_number, message=six.text_type(exc)
+            )
+            raise NotFound(msg)
+
+        if paginator.num_pages > 1 and self.template is not None:
+            # The browsable API should display pagination controls.
+            self.display_page_controls = True
+
+        self.request = request
+        return list(self.page)
+
+
+class AsyncLimitOffsetPagination(LimitOffsetPagination):
+    """Limit/offset pagination for the asyncio views.
+
+    Use ``apaginate_queryset`` instead of ``paginate_queryset``.
+    """
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Paginate a queryset.
+
+        :param queryset:
+        :param request:
+        :param view:
+        :return:
+        """
+        is_suggest, suggestions = await paginate_suggest(queryset, view)
+        if is_suggest:
+            return suggestions
+
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+
+        self.offset = self.get_offset(request)
+        self.request = request
+
+        queryset = self.apply_track_total_hits(queryset)
+        queryset = self.apply_raw_source(queryset)
+        return self.paginate_response(
+            await execute_search(
+                queryset[self.offset:self.offset + self.limit],
+                view.get_async_client()
+            )
+        )
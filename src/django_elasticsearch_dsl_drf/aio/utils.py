@@ -0,0 +1,126 @@
+"""
+Utils for the asyncio views.
+"""
+
+import asyncio
+import weakref
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from ..compat import AsyncElasticsearch
+
+__title__ = 'django_elasticsearch_dsl_drf.aio.utils'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = (
+    'count_search',
+    'execute_search',
+    'get_async_client',
+    'get_async_client_options',
+)
+
+# Async clients, per event loop and connection alias
+_async_clients = weakref.WeakKeyDictionary()
+
+# Options of the ``ELASTICSEARCH_DSL`` setting, used only if async
+# (``perform_request`` is a coroutine function).
+CLASS_OPTIONS = (
+    'connection_class',
+    'transport_class',
+)
+
+
+def get_async_client_options(alias='default'):
+    """Get options of the async client for the connection alias given.
+
+    Options are taken from the ``ELASTICSEARCH_DSL`` setting. Sync
+    connection and transport classes (such as the
+    ``RequestsHttpConnection``) are left out, so that the defaults of the
+    ``AsyncElasticsearch`` are used instead.
+
+    :param alias: Connection alias.
+    :type alias: str
+    :return:
+    :rtype: dict
+    """
+    options = dict(settings.ELASTICSEARCH_DSL[alias])
+    for __option in CLASS_OPTIONS:
+        __class = options.get(__option)
+        if __class is not None and not asyncio.iscoroutinefunction(
+            getattr(__class, 'perform_request', None)
+        ):
+            options.pop(__option)
+    return options
+
+
+def get_async_client(alias='default'):
+    """Get the async Elasticsearch client for the connection alias given.
+
+    Client is made out of the ``ELASTICSEARCH_DSL`` setting, same as the
+    connections of the ``django_elasticsearch_dsl``. Clients are bound to
+    the event loop they have been made in, thus a client is made (once)
+    per event loop (normally, the one of the ASGI server) and dropped
+    together with the event loop.
+
+    :param alias: Connection alias.
+    :type alias: str
+    :return:
+    :rtype: elasticsearch.AsyncElasticsearch
+    """
+    loop = asyncio.get_event_loop()
+    clients = _async_clients.setdefault(loop, {})
+    try:
+        return clients[alias]
+    except KeyError:
+        pass
+
+    if AsyncElasticsearch is None:
+        raise ImproperlyConfigured(
+            "Async views require `elasticsearch[async]` (`elasticsearch` "
+            "7.8 or later with `aiohttp`)."
+        )
+    clients[alias] = AsyncElasticsearch(**get_async_client_options(alias))
+    return clients[alias]
+
+
+async def execute_search(search, client):
+    """Execute the search with the async client.
+
+    Counterpart of the ``elasticsearch_dsl.Search.execute``.
+
+    :param search: Search.
+    :param client: Async client.
+    :type search: elasticsearch_dsl.Search
+    :type client: elasticsearch.AsyncElasticsearch
+    :return: Search response (of the ``response_class`` of the search).
+    :rtype: elasticsearch_dsl.response.Response
+    """
+    raw = await client.search(
+        index=search._index,
+        body=search.to_dict(),
+        **search._params
+    )
+    return search._response_class(search, raw)
+
+
+async def count_search(search, client):
+    """Count hits of the search with the async client.
+
+    Counterpart of the ``elasticsearch_dsl.Search.count``.
+
+    :param search: Search.
+    :param client: Async client.
+    :type search: elasticsearch_dsl.Search
+    :type client: elasticsearch.AsyncElasticsearch
+    :return:
+    :rtype: int
+    """
+    body = search.to_dict(count=True)
+    raw = await client.count(
+        index=search._index,
+        body=body,
+        **search._params
+    )
+    return raw['count']
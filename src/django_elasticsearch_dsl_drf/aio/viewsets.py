@@ -0,0 +1,362 @@
+"""
+Asyncio views.
+"""
+
+import asyncio
+import functools
+
+from asgiref.sync import sync_to_async
+
+from django.core.exceptions import ImproperlyConfigured
+from django.http import Http404
+
+from nine.versions import DJANGO_GTE_3_1
+
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework import status
+
+from ..utils import DictionaryProxy
+from ..viewsets import (
+    BaseDocumentViewSet,
+    FunctionalSuggestMixin,
+    MoreLikeThisMixin,
+    ResponseCacheMixin,
+    SuggestMixin,
+)
+from .pagination import AsyncPageNumberPagination
+from .utils import execute_search, get_async_client
+
+__title__ = 'django_elasticsearch_dsl_drf.aio.viewsets'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = (
+    'AsyncBaseDocumentViewSet',
+    'AsyncDocumentViewSet',
+    'AsyncFunctionalSuggestMixin',
+    'AsyncMoreLikeThisMixin',
+    'AsyncResponseCacheMixin',
+    'AsyncSuggestMixin',
+)
+
+
+class AsyncSuggestMixin(SuggestMixin):
+    """Suggest mixin for the asyncio views."""
+
+    @action(detail=False)
+    async def suggest(self, request):
+        """Suggest functionality."""
+        queryset = self.filter_queryset(self.get_queryset())
+        is_suggest = getattr(queryset, '_suggest', False)
+        if not is_suggest:
+            return Response(
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        page = await self.apaginate_queryset(queryset)
+        return Response(page)
+
+
+class AsyncFunctionalSuggestMixin(FunctionalSuggestMixin):
+    """Functional suggest mixin for the asyncio views.
+
+    Functional suggester filter backend executes the search itself, which
+    is done in a thread, not to block the event loop.
+    """
+
+    @action(detail=False)
+    async def functional_suggest(self, request):
+        """Functional suggest functionality.
+
+        :param request:
+        :return:
+        """
+        if 'view' in request.parser_context:
+            view = request.parser_context['view']
+            filter_backend_names = [
+                __b.__name__
+                for __b
+                in view.filter_backends
+            ]
+            if 'FunctionalSuggesterFilterBackend' not in filter_backend_names:
+                raise ImproperlyConfigured(
+                    "To use functional suggester backend you shall add "
+                    "`FunctionalSuggesterFilterBackend` to the "
+                    "`filter_backends` of your ViewSet."
+                )
+
+        queryset = await sync_to_async(
+            self.filter_queryset,
+            thread_sensitive=False
+        )(self.get_queryset())
+        page = await self.apaginate_queryset(queryset)
+        return Response(page)
+
+
+class AsyncMoreLikeThisMixin(MoreLikeThisMixin):
+    """More-like-this mixin for the asyncio views."""
+
+    @action(detail=True)
+    async def more_like_this(self, request, pk=None, id=None):
+        """More-like-this functionality detail view.
+
+        :param request:
+        :return:
+        """
+        if 'view' in request.parser_context:
+            queryset = self.get_more_like_this_queryset(
+                request,
+                pk if pk else id
+            )
+
+            # Standard list-view implementation
+            page = await self.apaginate_queryset(queryset)
+            if page is not None:
+                serializer = self.get_serializer(page, many=True)
+                return self.get_paginated_response(serializer.data)
+
+            response = await self.aexecute(queryset)
+            serializer = self.get_serializer(list(response), many=True)
+            return Response(serializer.data)
+
+
+class AsyncResponseCacheMixin(ResponseCacheMixin):
+    """Response cache mixin for the asyncio views.
+
+    Same as the ``ResponseCacheMixin``, but awaits the coroutine function
+    handlers before caching their responses.
+
+    Shall be put before the ``AsyncBaseDocumentViewSet`` (or its
+    descendants).
+    """
+
+    def get_cached_handler(self, handler):
+        """Wrap the handler with the response cache.
+
+        :param handler: Action handler.
+        :return: Wrapped handler.
+        """
+        if not asyncio.iscoroutinefunction(handler):
+            return super(AsyncResponseCacheMixin, self).get_cached_handler(
+                handler
+            )
+
+        async def cached_handler(request, *args, **kwargs):
+            response_cache, key, response = self.get_cached_response(request)
+            if response is not None:
+                return response
+
+            response = await handler(request, *args, **kwargs)
+            self.cache_response(response_cache, key, response)
+            return response
+
+        return cached_handler
+
+
+class AsyncBaseDocumentViewSet(BaseDocumentViewSet):
+    """Base document ViewSet for the asyncio views.
+
+    Searches are executed with the async Elasticsearch client (see
+    ``get_async_client``). Filter backends, serializers and everything
+    else is the same as for the ``BaseDocumentViewSet``. Requires
+    Django 3.1 or later (served with ASGI).
+
+    Pagination classes shall implement ``apaginate_queryset`` (see
+    ``django_elasticsearch_dsl_drf.aio.pagination``).
+    """
+
+    pagination_class = AsyncPageNumberPagination
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        """Coroutine function view.
+
+        :param actions:
+        :param initkwargs:
+        :return:
+        """
+        if not DJANGO_GTE_3_1:
+            raise ImproperlyConfigured(
+                "Async views require Django 3.1 or later."
+            )
+
+        view = super(AsyncBaseDocumentViewSet, cls).as_view(
+            actions,
+            **initkwargs
+        )
+
+        async def async_view(request, *args, **kwargs):
+            return await view(request, *args, **kwargs)
+
+        return functools.wraps(view)(async_view)
+
+    async def dispatch(self, request, *args, **kwargs):
+        """Same as ``dispatch`` of the ``APIView``, but awaits the handler.
+
+        :param request:
+        :param args:
+        :param kwargs:
+        :return:
+        """
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers  # deprecate?
+
+        try:
+            self.initial(request, *args, **kwargs)
+
+            # Get the appropriate handler method
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(),
+                                  self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(
+            request,
+            response,
+            *args,
+            **kwargs
+        )
+        return self.response
+
+    def get_async_client(self):
+        """Get the async Elasticsearch client.
+
+        :return:
+        :rtype: elasticsearch.AsyncElasticsearch
+        """
+        return get_async_client(self.document._get_using())
+
+    async def aexecute(self, queryset):
+        """Execute the search.
+
+        :param queryset:
+        :return:
+        """
+        return await execute_search(queryset, self.get_async_client())
+
+    async def apaginate_queryset(self, queryset):
+        """Paginate the queryset.
+
+        :param queryset:
+        :return: Page or None if pagination is not configured.
+        """
+        if self.paginator is None:
+            return None
+        return await self.paginator.apaginate_queryset(
+            queryset,
+            self.request,
+            view=self
+        )
+
+    async def list(self, request, *args, **kwargs):
+        """List.
+
+        :param request:
+        :param args:
+        :param kwargs:
+        :return:
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        page = await self.apaginate_queryset(queryset)
+        pass_through = self.raw_source and self.serializer_class is None
+        if page is not None:
+            if pass_through:
+                return self.get_paginated_response(page)
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+
+        hits = list(await self.aexecute(queryset))
+        if pass_through:
+            return Response(hits)
+        serializer = self.get_serializer(hits, many=True)
+        return Response(serializer.data)
+
+    async def retrieve(self, request, *args, **kwargs):
+        """Retrieve.
+
+        :param request:
+        :param args:
+        :param kwargs:
+        :return:
+        """
+        instance = await self.aget_object()
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
+
+    async def aget_object(self):
+        """Get object.
+
+        :return:
+        """
+        queryset = self.get_queryset()
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        if lookup_url_kwarg not in self.kwargs:
+            raise AttributeError(
+                "Expected view %s to be called with a URL keyword argument "
+                "named '%s'. Fix your URL conf, or set the `.lookup_field` "
+                "attribute on the view correctly." % (
+                    self.__class__.__name__,
+                    lookup_url_kwarg
+                )
+            )
+
+        if lookup_url_kwarg == 'id':
+            get_kwargs = {}
+            if self.ignore:
+                get_kwargs.update({'ignore': self.ignore})
+            raw = await self.get_async_client().get(
+                index=self.index,
+                id=self.kwargs[lookup_url_kwarg],
+                **get_kwargs
+            )
+            obj = None
+            if raw.get('found'):
+                obj = self.document.from_es(raw)
+
+            # May raise a permission denied
+            self.check_object_permissions(self.request, obj)
+
+            if not obj and self.ignore:
+                raise Http404("No result matches the given query.")
+            return DictionaryProxy(obj.to_dict())
+
+        queryset = queryset.filter(
+            'term',
+            **{self.document_uid_field: self.kwargs[lookup_url_kwarg]}
+        )
+
+        hits = (await self.aexecute(queryset)).hits.hits
+        count = len(hits)
+
+        if count == 1:
+            obj = hits[0]['_source']
+
+            # May raise a permission denied
+            self.check_object_permissions(self.request, obj)
+            return DictionaryProxy(obj.to_dict())
+
+        elif count > 1:
+            raise Http404(
+                "Multiple results matches the given query. "
+                "Expected a single result."
+            )
+
+        raise Http404("No result matches the given query.")
+
+
+class AsyncDocumentViewSet(AsyncBaseDocumentViewSet,
+                           AsyncSuggestMixin,
+                           AsyncFunctionalSuggestMixin):
+    """DocumentViewSet with suggest and functional-suggest mix-ins."""
@@ -0,0 +1,254 @@
+"""
+Response and facet cache.
+"""
+
+import hashlib
+import json
+import time
+
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+
+__title__ = 'django_elasticsearch_dsl_drf.cache'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = (
+    'FacetCache',
+    'FacetCacheResponseClass',
+    'IndexGenerationDocumentMixin',
+    'ResponseCache',
+)
+
+
+class ResponseCache(object):
+    """Response cache.
+
+    Stores the response data in the Django cache. Keys are made of the
+    canonicalized key parts (search, page params, etc.) and the current
+    generation of the index. Once the index generation is bumped, all the
+    responses cached for the previous generation are no longer used and
+    eventually get evicted by the cache backend.
+
+    Eviction is up to the cache backend used. The ``LocMemCache`` evicts
+    the least recently used entries once ``MAX_ENTRIES`` is reached and the
+    expired ones (``timeout``). Note, that in multi-process deployments a
+    shared cache backend (Memcached, Redis) shall be used, since otherwise
+    generation bumps made in one process are not seen by others.
+
+    Example:
+
+        >>> from django_elasticsearch_dsl_drf.cache import ResponseCache
+        >>>
+        >>> class BookResponseCache(ResponseCache):
+        >>>
+        >>>     cache_alias = 'search'
+        >>>     timeout = 60
+    """
+
+    cache_alias = DEFAULT_CACHE_ALIAS
+    key_prefix = 'django_elasticsearch_dsl_drf'
+    key_namespace = 'response'
+    timeout = 300
+
+    @property
+    def cache(self):
+        """Django cache used.
+
+        :return:
+        :rtype: django.core.cache.backends.base.BaseCache
+        """
+        return caches[self.cache_alias]
+
+    def get_generation_key(self, index):
+        """Get the cache key of the index generation.
+
+        :param index: Index name.
+        :type index: str
+        :return:
+        :rtype: str
+        """
+        return '{}:generation:{}'.format(self.key_prefix, index)
+
+    def get_generation(self, index):
+        """Get current generation of the index.
+
+        If not yet known (or evicted), generation is initialised with the
+        current timestamp (in milliseconds), so that generations of the
+        evicted counters are never re-used.
+
+        :param index: Index name.
+        :type index: str
+        :return:
+        :rtype: int
+        """
+        key = self.get_generation_key(index)
+        generation = self.cache.get(key)
+        if generation is None:
+            self.cache.add(key, int(time.time() * 1000), None)
+            generation = self.cache.get(key)
+        return generation
+
+    def bump_generation(self, index):
+        """Bump generation of the index.
+
+        :param index: Index name.
+        :type index: str
+        :return: New generation.
+        :rtype: int
+        """
+        try:
+            return self.cache.incr(self.get_generation_key(index))
+        except ValueError:
+            return self.get_generation(index)
+
+    def make_key(self, index, parts):
+        """Make a cache key.
+
+        :param index: Index name.
+        :param parts: JSON serializable key parts.
+        :type index: str
+        :type parts: dict
+        :return:
+        :rtype: str
+        """
+        digest = hashlib.sha1(
+            json.dumps(
+                parts,
+                sort_keys=True,
+                separators=(',', ':'),
+                default=str
+            ).encode('utf8')
+        ).hexdigest()
+        return '{}:{}:{}:{}:{}'.format(
+            self.key_prefix,
+            self.key_namespace,
+            index,
+            self.get_generation(index),
+            digest
+        )
+
+    def get(self, key):
+        """Get cached response data.
+
+        :param key: Cache key.
+        :type key: str
+        :return: Response data (or response, if it has no data) or None
+            if not cached.
+        """
+        return self.cache.get(key)
+
+    def set(self, key, data):
+        """Cache response data.
+
+        :param key: Cache key.
+        :param data: Response data (or response, if it has no data).
+        :type key: str
+        """
+        self.cache.set(key, data, self.timeout)
+
+
+class FacetCache(ResponseCache):
+    """Facet cache.
+
+    Stores results of the global facets (see the
+    ``FacetedSearchFilterBackend``). Global facets ignore the query, thus
+    their results are the same for all searches against the index, until
+    the index is updated. Generations of the index are shared with the
+    ``ResponseCache`` (same ``cache_alias`` and ``key_prefix`` shall be
+    used).
+
+    Example:
+
+        >>> from django_elasticsearch_dsl_drf.cache import FacetCache
+        >>>
+        >>> class BookFacetCache(FacetCache):
+        >>>
+        >>>     cache_alias = 'search'
+        >>>     timeout = 3600
+    """
+
+    key_namespace = 'facet'
+    timeout = 3600
+
+
+class FacetCacheResponseClass(object):
+    """Response class, merging the cached aggregations into the response.
+
+    Aggregations not yet cached are cached once the search is executed.
+
+    :param response_class: Response class wrapped.
+    :param facet_cache: Facet cache.
+    :param cached: Cached aggregations (by name).
+    :param keys: Cache keys of the aggregations to be cached (by name).
+    :type response_class: elasticsearch_dsl.response.Response
+    :type facet_cache: django_elasticsearch_dsl_drf.cache.FacetCache
+    :type cached: dict
+    :type keys: dict
+    """
+
+    def __init__(self, response_class, facet_cache, cached, keys):
+        self.response_class = response_class
+        self.facet_cache = facet_cache
+        self.cached = cached
+        self.keys = keys
+
+    def __call__(self, search, response):
+        aggregations = response.get('aggregations') or {}
+        for name, key in self.keys.items():
+            if name in aggregations:
+                self.facet_cache.set(key, aggregations[name])
+
+        if self.cached:
+            aggregations.update(self.cached)
+            response['aggregations'] = aggregations
+
+        return self.response_class(search, response)
+
+
+class IndexGenerationDocumentMixin(object):
+    """Bump the index generation on each index update.
+
+    All updates of the index made with ``django_elasticsearch_dsl``
+    (``registry.update``, ``registry.delete``, ``search_index --populate``)
+    go through the ``update`` method of the document. Unless the update
+    already refreshed the index, the index is refreshed before the
+    generation is bumped, otherwise responses of the searches made in
+    between would be cached for the new generation, without the update.
+
+    The ``response_cache_class`` of the document is used by the views
+    (see ``ResponseCacheMixin``), unless set on the view itself.
+
+    Example:
+
+        >>> from django_elasticsearch_dsl import Document
+        >>> from django_elasticsearch_dsl_drf.cache import (
+        >>>     IndexGenerationDocumentMixin,
+        >>> )
+        >>>
+        >>> class BookDocument(IndexGenerationDocumentMixin, Document):
+        >>>
+        >>>     response_cache_class = BookResponseCache
+        >>>     # ...
+    """
+
+    response_cache_class = ResponseCache
+
+    def update(self, thing, refresh=None, *args, **kwargs):
+        """Update the index and bump its generation."""
+        try:
+            return super(IndexGenerationDocumentMixin, self).update(
+                thing,
+                refresh,
+                *args,
+                **kwargs
+            )
+        finally:
+            try:
+                if not (refresh is True or (
+                    refresh is None and self.django.auto_refresh
+                )):
+                    self._index.refresh(using=self._get_using())
+            finally:
+                self.response_cache_class().bump_generation(
+                    self._index._name
+                )
@@ -20,6 +20,25 @@ try:
 except ImportError:
     coreschema = None
 
+try:
+    from elasticsearch import AsyncElasticsearch
+except ImportError:
+    AsyncElasticsearch = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+    # The ``default`` argument of the ``ujson.dumps`` is supported
+    # as of ``ujson`` 5.0.
+    if int(getattr(ujson, '__version__', '0').split('.')[0]) < 5:
+        ujson = None
+except (ImportError, ValueError):
+    ujson = None
+
 # try:
 #     from rest_framework.pagination import _get_count
 # except ImportError:
@@ -30,9 +49,12 @@ __author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
 __copyright__ = '2017-2019 Artur Barseghyan'
 __license__ = 'GPL 2.0/LGPL 2.1'
 __all__ = (
+    'AsyncElasticsearch',
     'coreapi',
     'coreschema',
     # 'get_count',
+    'orjson',
+    'ujson',
     'KeywordField',
     'StringField',
 )
@@ -8,9 +8,22 @@ __author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
 __copyright__ = '2017-2019 Artur Barseghyan'
 __license__ = 'GPL 2.0/LGPL 2.1'
 __all__ = (
+    'AGGREGATION_AVG',
+    'AGGREGATION_BUCKET_SORT',
+    'AGGREGATION_CARDINALITY',
+    'AGGREGATION_COMPOSITE',
+    'AGGREGATION_DATE_HISTOGRAM',
+    'AGGREGATION_DERIVATIVE',
+    'AGGREGATION_HISTOGRAM',
+    'AGGREGATION_PERCENTILES',
+    'AGGREGATION_SUM',
+    'AGGREGATION_TERMS',
+    'ALL_BUCKET_AGGREGATIONS',
     'ALL_FUNCTIONAL_SUGGESTERS',
     'ALL_GEO_SPATIAL_LOOKUP_FILTERS_AND_QUERIES',
     'ALL_LOOKUP_FILTERS_AND_QUERIES',
+    'ALL_METRICS_AGGREGATIONS',
+    'ALL_PIPELINE_AGGREGATIONS',
     'ALL_SUGGESTERS',
     'DEFAULT_MATCHING_OPTION',
     'EXTENDED_NUMBER_LOOKUP_FILTERS',
@@ -419,6 +432,36 @@ FUNCTIONAL_SUGGESTER_COMPLETION_MATCH = 'completion_match'
 # http://127.0.0.1:8000/search/books/?title_suggest__completion_prefix=Lore
 FUNCTIONAL_SUGGESTER_COMPLETION_PREFIX = 'completion_prefix'
 
+# ****************************************************************************
+# ******************************* Aggregations *******************************
+# ****************************************************************************
+# https://www.elastic.co/guide/en/elasticsearch/reference/current/search-aggregations.html
+
+# Bucket aggregations
+# http://127.0.0.1:8000/search/books/?aggregate=states
+AGGREGATION_TERMS = 'terms'
+
+AGGREGATION_HISTOGRAM = 'histogram'
+
+AGGREGATION_DATE_HISTOGRAM = 'date_histogram'
+
+AGGREGATION_COMPOSITE = 'composite'
+
+# Metrics aggregations
+# http://127.0.0.1:8000/search/books/?aggregate=avg_price
+AGGREGATION_AVG = 'avg'
+
+AGGREGATION_SUM = 'sum'
+
+AGGREGATION_CARDINALITY = 'cardinality'
+
+AGGREGATION_PERCENTILES = 'percentiles'
+
+# Pipeline aggregations
+AGGREGATION_BUCKET_SORT = 'bucket_sort'
+
+AGGREGATION_DERIVATIVE = 'derivative'
+
 # ****************************************************************************
 # ******************************* Combinations *******************************
 # ****************************************************************************
@@ -469,6 +512,25 @@ ALL_GEO_SPATIAL_LOOKUP_FILTERS_AND_QUERIES = (
     LOOKUP_FILTER_GEO_POLYGON,
 )
 
+ALL_BUCKET_AGGREGATIONS = (
+    AGGREGATION_TERMS,
+    AGGREGATION_HISTOGRAM,
+    AGGREGATION_DATE_HISTOGRAM,
+    AGGREGATION_COMPOSITE,
+)
+
+ALL_METRICS_AGGREGATIONS = (
+    AGGREGATION_AVG,
+    AGGREGATION_SUM,
+    AGGREGATION_CARDINALITY,
+    AGGREGATION_PERCENTILES,
+)
+
+ALL_PIPELINE_AGGREGATIONS = (
+    AGGREGATION_BUCKET_SORT,
+    AGGREGATION_DERIVATIVE,
+)
+
 STRING_LOOKUP_FILTERS = [
     LOOKUP_FILTER_TERM,
     LOOKUP_FILTER_TERMS,
@@ -0,0 +1,25 @@
+"""
+In-memory fake of Elasticsearch.
+"""
+
+from .aggregations import aggregate
+from .connection import DEFAULT_STORE, FakeConnection, register_fake_connection
+from .query import FakeHit, match_query
+from .store import FakeDocumentStore, FakeIndex
+from .utils import FakeElasticsearchError
+
+__title__ = 'django_elasticsearch_dsl_drf.fake_elasticsearch'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = (
+    'aggregate',
+    'DEFAULT_STORE',
+    'FakeConnection',
+    'FakeDocumentStore',
+    'FakeElasticsearchError',
+    'FakeHit',
+    'FakeIndex',
+    'match_query',
+    'register_fake_connection',
+)
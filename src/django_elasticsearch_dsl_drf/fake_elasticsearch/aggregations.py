@@ -0,0 +1,507 @@
+"""
+Aggregations of the fake Elasticsearch.
+"""
+
+import datetime
+import math
+from collections import OrderedDict
+
+import six
+
+from .query import match_query
+from .utils import (
+    add_months,
+    DATE_TYPES,
+    FakeElasticsearchError,
+    floor_date,
+    from_epoch_millis,
+    parse_date,
+    to_epoch_millis,
+)
+
+__title__ = 'django_elasticsearch_dsl_drf.fake_elasticsearch.aggregations'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = (
+    'aggregate',
+    'AGGREGATIONS',
+)
+
+CALENDAR_INTERVALS = {
+    'minute': 'm',
+    '1m': 'm',
+    'hour': 'h',
+    '1h': 'h',
+    'day': 'd',
+    '1d': 'd',
+    'week': 'w',
+    '1w': 'w',
+    'month': 'M',
+    '1M': 'M',
+    'quarter': 'q',
+    '1q': 'q',
+    'year': 'y',
+    '1y': 'y',
+}
+
+FIXED_INTERVAL_UNITS = {
+    'ms': 1,
+    's': 1000,
+    'm': 60 * 1000,
+    'h': 60 * 60 * 1000,
+    'd': 24 * 60 * 60 * 1000,
+}
+
+DATE_FORMAT = '%Y-%m-%dT%H:%M:%S.000Z'
+
+
+def format_boolean_key(key):
+    """Format the key of a boolean field bucket.
+
+    :param key:
+    :return:
+    :rtype: str
+    """
+    return 'true' if key else 'false'
+
+
+def format_date_key(key):
+    """Format the key (epoch milliseconds) of a date field bucket.
+
+    :param key:
+    :return:
+    :rtype: str
+    """
+    return from_epoch_millis(key).strftime(DATE_FORMAT)
+
+
+# ``key_as_string`` formatters of the terms buckets, by field type
+KEY_FORMATTERS = dict(
+    [('boolean', format_boolean_key)]
+    + [(__type, format_date_key) for __type in DATE_TYPES]
+)
+
+
+def get_field_values(hits, field):
+    """Get (non-object) values of the field, per document.
+
+    :param hits:
+    :param field:
+    :return: List of (hit, values) tuples.
+    :rtype: list
+    """
+    return [
+        (__hit, [__value for __value in __hit.get_values(field)
+                 if not isinstance(__value, dict)])
+        for __hit in hits
+    ]
+
+
+def get_field_type(hits, field):
+    """Get type of the field (as mapped in the index of the first document).
+
+    :param hits:
+    :param field:
+    :return:
+    :rtype: str
+    """
+    for hit in hits:
+        return hit.get_field_type(field)
+    return None
+
+
+def get_sub_aggregations(body, hits, all_hits):
+    """Aggregate the sub-aggregations.
+
+    :param body: Aggregation body.
+    :param hits: Documents of the bucket.
+    :param all_hits: All documents (for global aggregations).
+    :return:
+    :rtype: dict
+    """
+    aggs = body.get('aggs') or body.get('aggregations')
+    if not aggs:
+        return {}
+    return aggregate(aggs, hits, all_hits)
+
+
+def make_buckets(body, keys, all_hits, key_as_string=None):
+    """Make buckets.
+
+    :param body: Aggregation body.
+    :param keys: Ordered dict of bucket keys and documents.
+    :param all_hits: All documents (for global aggregations).
+    :param key_as_string: Function formatting the key.
+    :return:
+    :rtype: list
+    """
+    buckets = []
+    for key, bucket_hits in keys.items():
+        bucket = OrderedDict([('key', key)])
+        if key_as_string is not None:
+            bucket['key_as_string'] = key_as_string(key)
+        bucket['doc_count'] = len(bucket_hits)
+        bucket.update(get_sub_aggregations(body, bucket_hits, all_hits))
+        buckets.append(bucket)
+    return buckets
+
+
+def terms(options, body, hits, all_hits):
+    field = options['field']
+    field_type = get_field_type(hits, field)
+    keys = OrderedDict()
+    for hit, values in get_field_values(hits, field):
+        if not values and 'missing' in options:
+            values = [options['missing']]
+        seen = set()
+        for value in values:
+            if isinstance(value, bool) or field_type == 'boolean':
+                key = 1 if six.text_type(value).lower() == 'true' else 0
+            elif field_type in DATE_TYPES:
+                key = to_epoch_millis(parse_date(value))
+            else:
+                key = value
+            if key in seen:
+                continue
+            seen.add(key)
+            keys.setdefault(key, []).append(hit)
+
+    min_doc_count = options.get('min_doc_count', 1)
+    items = [
+        (__key, __hits) for __key, __hits in keys.items()
+        if len(__hits) >= min_doc_count
+    ]
+    order = options.get('order', {'_count': 'desc'})
+    if isinstance(order, list):
+        order = order[0]
+    (order_by, direction), = order.items()
+    if order_by in ('_key', '_term'):
+        items.sort(key=lambda __item: __item[0],
+                   reverse=direction == 'desc')
+    else:
+        items.sort(key=lambda __item: __item[0])
+        items.sort(key=lambda __item: len(__item[1]),
+                   reverse=direction == 'desc')
+
+    size = options.get('size', 10)
+    return OrderedDict([
+        ('doc_count_error_upper_bound', 0),
+        ('sum_other_doc_count',
+         sum(len(__hits) for _, __hits in items[size:])),
+        ('buckets', make_buckets(body, OrderedDict(items[:size]), all_hits,
+                                 KEY_FORMATTERS.get(field_type))),
+    ])
+
+
+def get_date_interval(options):
+    """Get interval of the date histogram.
+
+    :param options:
+    :return: Tuple of (calendar unit, fixed interval in milliseconds), one
+        of them is None.
+    :rtype: tuple
+    """
+    interval = options.get('calendar_interval') \
+        or options.get('fixed_interval') \
+        or options.get('interval')
+    if interval in CALENDAR_INTERVALS:
+        return CALENDAR_INTERVALS[interval], None
+    for unit, millis in sorted(FIXED_INTERVAL_UNITS.items(),
+                               key=lambda __item: -len(__item[0])):
+        if interval.endswith(unit):
+            try:
+                return None, int(interval[:-len(unit)]) * millis
+            except ValueError:
+                pass
+    raise FakeElasticsearchError(
+        400,
+        'illegal_argument_exception',
+        "Interval [{}] is not supported".format(interval)
+    )
+
+
+def next_date(date, unit):
+    """Get start of the next calendar interval.
+
+    :param date:
+    :param unit:
+    :return:
+    :rtype: datetime.datetime
+    """
+    if unit == 'y':
+        return add_months(date, 12)
+    if unit == 'q':
+        return add_months(date, 3)
+    if unit == 'M':
+        return add_months(date, 1)
+    return date + {
+        'w': datetime.timedelta(weeks=1),
+        'd': datetime.timedelta(days=1),
+        'h': datetime.timedelta(hours=1),
+        'm': datetime.timedelta(minutes=1),
+    }[unit]
+
+
+def date_histogram(options, body, hits, all_hits):
+    field = options['field']
+    unit, fixed = get_date_interval(options)
+    keys = {}
+    for hit, values in get_field_values(hits, field):
+        seen = set()
+        for value in values:
+            date = parse_date(value)
+            if date is None:
+                continue
+            if unit is not None:
+                key = to_epoch_millis(floor_date(date, unit))
+            else:
+                millis = to_epoch_millis(date)
+                key = millis - millis % fixed
+            if key not in seen:
+                seen.add(key)
+                keys.setdefault(key, []).append(hit)
+
+    min_doc_count = options.get('min_doc_count', 0)
+    if keys and min_doc_count == 0:
+        # Empty buckets in between
+        key = min(keys)
+        last = max(keys)
+        while key < last:
+            keys.setdefault(key, [])
+            if unit is not None:
+                key = to_epoch_millis(next_date(from_epoch_millis(key), unit))
+            else:
+                key += fixed
+
+    items = sorted(
+        (__key, __hits) for __key, __hits in keys.items()
+        if len(__hits) >= min_doc_count
+    )
+    order = options.get('order') or {}
+    if isinstance(order, dict) and order.get('_key') == 'desc':
+        items.reverse()
+    return {
+        'buckets': make_buckets(
+            body,
+            OrderedDict(items),
+            all_hits,
+            format_date_key
+        ),
+    }
+
+
+def histogram(options, body, hits, all_hits):
+    field = options['field']
+    interval = float(options['interval'])
+    keys = {}
+    for hit, values in get_field_values(hits, field):
+        seen = set()
+        for value in values:
+            try:
+                key = math.floor(float(value) / interval) * interval
+            except (TypeError, ValueError):
+                continue
+            if key not in seen:
+                seen.add(key)
+                keys.setdefault(key, []).append(hit)
+
+    min_doc_count = options.get('min_doc_count', 0)
+    if keys and min_doc_count == 0:
+        key = min(keys)
+        while key < max(keys):
+            keys.setdefault(key, [])
+            key += interval
+
+    return {
+        'buckets': make_buckets(
+            body,
+            OrderedDict(sorted(
+                (__key, __hits) for __key, __hits in keys.items()
+                if len(__hits) >= min_doc_count
+            )),
+            all_hits
+        ),
+    }
+
+
+def range_(options, body, hits, all_hits):
+    field = options['field']
+    buckets = []
+    for item in options['ranges']:
+        bucket_hits = [
+            __hit for __hit, __values in get_field_values(hits, field)
+            if any(
+                (item.get('from') is None or float(__value) >= item['from'])
+                and (item.get('to') is None or float(__value) < item['to'])
+                for __value in __values
+            )
+        ]
+        key = item.get('key') or '{}-{}'.format(
+            '*' if item.get('from') is None else float(item['from']),
+            '*' if item.get('to') is None else float(item['to'])
+        )
+        bucket = OrderedDict([('key', key)])
+        for bound in ('from', 'to'):
+            if item.get(bound) is not None:
+                bucket[bound] = float(item[bound])
+        bucket['doc_count'] = len(bucket_hits)
+        bucket.update(get_sub_aggregations(body, bucket_hits, all_hits))
+        buckets.append(bucket)
+    return {'buckets': buckets}
+
+
+def filter_(options, body, hits, all_hits):
+    bucket_hits = [
+        __hit for __hit in hits if match_query(options, __hit) is not None
+    ]
+    result = OrderedDict([('doc_count', len(bucket_hits))])
+    result.update(get_sub_aggregations(body, bucket_hits, all_hits))
+    return result
+
+
+def filters(options, body, hits, all_hits):
+    buckets = OrderedDict()
+    for name, query in options['filters'].items():
+        buckets[name] = filter_(query, body, hits, all_hits)
+    return {'buckets': buckets}
+
+
+def global_(options, body, hits, all_hits):
+    result = OrderedDict([('doc_count', len(all_hits))])
+    result.update(get_sub_aggregations(body, all_hits, all_hits))
+    return result
+
+
+def nested(options, body, hits, all_hits):
+    nested_hits = []
+    for hit in hits:
+        nested_hits.extend(hit.get_nested(options['path']))
+    result = OrderedDict([('doc_count', len(nested_hits))])
+    result.update(get_sub_aggregations(body, nested_hits, all_hits))
+    return result
+
+
+def get_numbers(options, hits):
+    """Get numeric values of the field.
+
+    :param options:
+    :param hits:
+    :return:
+    :rtype: list
+    """
+    numbers = []
+    field_type = get_field_type(hits, options['field'])
+    for _, values in get_field_values(hits, options['field']):
+        for value in values:
+            if field_type in DATE_TYPES:
+                date = parse_date(value)
+                if date is not None:
+                    numbers.append(float(to_epoch_millis(date)))
+                continue
+            try:
+                numbers.append(float(value))
+            except (TypeError, ValueError):
+                pass
+    return numbers
+
+
+def avg(options, body, hits, all_hits):
+    numbers = get_numbers(options, hits)
+    return {'value': sum(numbers) / len(numbers) if numbers else None}
+
+
+def sum_(options, body, hits, all_hits):
+    return {'value': sum(get_numbers(options, hits))}
+
+
+def min_(options, body, hits, all_hits):
+    numbers = get_numbers(options, hits)
+    return {'value': min(numbers) if numbers else None}
+
+
+def max_(options, body, hits, all_hits):
+    numbers = get_numbers(options, hits)
+    return {'value': max(numbers) if numbers else None}
+
+
+def stats(options, body, hits, all_hits):
+    numbers = get_numbers(options, hits)
+    return {
+        'count': len(numbers),
+        'min': min(numbers) if numbers else None,
+        'max': max(numbers) if numbers else None,
+        'avg': sum(numbers) / len(numbers) if numbers else None,
+        'sum': sum(numbers),
+    }
+
+
+def value_count(options, body, hits, all_hits):
+    return {
+        'value': sum(
+            len(__values)
+            for _, __values in get_field_values(hits, options['field'])
+        ),
+    }
+
+
+def cardinality(options, body, hits, all_hits):
+    return {
+        'value': len(set(
+            six.text_type(__value)
+            for _, __values in get_field_values(hits, options['field'])
+            for __value in __values
+        )),
+    }
+
+
+AGGREGATIONS = {
+    'avg': avg,
+    'cardinality': cardinality,
+    'date_histogram': date_histogram,
+    'filter': filter_,
+    'filters': filters,
+    'global': global_,
+    'histogram': histogram,
+    'max': max_,
+    'min': min_,
+    'nested': nested,
+    'range': range_,
+    'stats': stats,
+    'sum': sum_,
+    'terms': terms,
+    'value_count': value_count,
+}
+
+
+def aggregate(aggs, hits, all_hits):
+    """Aggregate the documents.
+
+    :param aggs: Aggregations (as of the search body).
+    :param hits: Documents matched.
+    :param all_hits: All documents of the indices searched (for global
+        aggregations).
+    :type aggs: dict
+    :type hits: list
+    :type all_hits: list
+    :return: Aggregation results.
+    :rtype: dict
+    """
+    results = OrderedDict()
+    for name, body in aggs.items():
+        for agg_type, options in body.items():
+            if agg_type in ('aggs', 'aggregations', 'meta'):
+                continue
+            try:
+                func = AGGREGATIONS[agg_type]
+            except KeyError:
+                raise FakeElasticsearchError(
+                    400,
+                    'parsing_exception',
+                    "Aggregation [{}] is not supported".format(agg_type)
+                )
+            results[name] = func(options, body, hits, all_hits)
+            if 'meta' in body:
+                results[name]['meta'] = body['meta']
+            break
+    return results
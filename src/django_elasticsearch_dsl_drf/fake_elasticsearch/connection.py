@@ -0,0 +1,462 @@
+"""
+Connection of the fake Elasticsearch.
+"""
+
+import fnmatch
+import json
+import time
+from collections import OrderedDict
+
+import six
+from six.moves.urllib.parse import parse_qsl, unquote
+
+from elasticsearch.connection import Connection
+from elasticsearch_dsl.connections import connections
+
+from .store import FakeDocumentStore
+from .utils import FakeElasticsearchError
+
+__title__ = 'django_elasticsearch_dsl_drf.fake_elasticsearch.connection'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = (
+    'DEFAULT_STORE',
+    'FakeConnection',
+    'register_fake_connection',
+)
+
+DEFAULT_STORE = FakeDocumentStore()
+
+VERSION = '7.17.0'
+
+HEADERS = {
+    'content-type': 'application/json; charset=UTF-8',
+    'x-elastic-product': 'Elasticsearch',
+}
+
+# Index level endpoints, not taking any body
+NOOP_ENDPOINTS = (
+    '_cache',
+    '_flush',
+    '_forcemerge',
+    '_refresh',
+)
+
+
+def decode_body(body):
+    """Decode the (serialized) request body.
+
+    :param body:
+    :type body: str|bytes|dict
+    :return:
+    :rtype: dict
+    """
+    if body is None or isinstance(body, (dict, list)):
+        return body
+    if isinstance(body, six.binary_type):
+        body = body.decode('utf8')
+    if not body.strip():
+        return None
+    return json.loads(body)
+
+
+def decode_lines(body):
+    """Decode the (serialized) newline delimited JSON request body.
+
+    :param body:
+    :type body: str|bytes|list
+    :return:
+    :rtype: list
+    """
+    if body is None:
+        return []
+    if isinstance(body, (list, tuple)):
+        return [
+            decode_body(__line) if not isinstance(__line, dict) else __line
+            for __line in body
+        ]
+    if isinstance(body, six.binary_type):
+        body = body.decode('utf8')
+    return [
+        json.loads(__line)
+        for __line in body.splitlines()
+        if __line.strip()
+    ]
+
+
+def get_bulk_actions(lines):
+    """Get the bulk actions.
+
+    :param lines: Decoded lines of the bulk body.
+    :type lines: list
+    :return: List of (action, source) tuples.
+    :rtype: list
+    """
+    actions = []
+    lines = iter(lines)
+    for action in lines:
+        if 'delete' in action:
+            actions.append((action, None))
+        else:
+            actions.append((action, next(lines)))
+    return actions
+
+
+def get_searches(lines):
+    """Get the searches of the multi search.
+
+    :param lines: Decoded lines of the multi search body.
+    :type lines: list
+    :return: List of (header, body) tuples.
+    :rtype: list
+    """
+    return list(zip(lines[::2], lines[1::2]))
+
+
+def apply_filter_path(response, filter_path):
+    """Reduce the response to the paths listed in ``filter_path``.
+
+    Dotted paths and ``*`` wildcards are supported, exclusions (``-``) are
+    not.
+
+    :param response:
+    :param filter_path: Comma separated paths.
+    :type response: dict
+    :type filter_path: str
+    :return:
+    :rtype: dict
+    """
+    paths = [
+        __path.strip().split('.')
+        for __path in filter_path.split(',')
+        if __path.strip() and not __path.strip().startswith('-')
+    ]
+    if not paths:
+        return response
+
+    def _filter(value, paths):
+        if isinstance(value, list):
+            items = [_filter(__item, paths) for __item in value]
+            return [__item for __item in items if __item is not None]
+        if not isinstance(value, dict):
+            return value
+        filtered = OrderedDict()
+        for key, item in value.items():
+            matched = [
+                __path[1:] for __path in paths
+                if __path[0] == key or fnmatch.fnmatchcase(key, __path[0])
+            ]
+            if not matched:
+                continue
+            if any(not __path for __path in matched):
+                filtered[key] = item
+                continue
+            item = _filter(item, matched)
+            if item or item == 0:
+                filtered[key] = item
+        return filtered or None
+
+    return _filter(response, paths) or {}
+
+
+def get_query_body(body, params):
+    """Get the search body, taking the ``q`` parameter into account.
+
+    :param body:
+    :param params:
+    :return:
+    :rtype: dict
+    """
+    body = dict(body or {})
+    if params.get('q') and 'query' not in body:
+        body['query'] = {'query_string': {'query': params['q']}}
+    return body
+
+
+class FakeConnection(Connection):
+    """Connection answering the requests from an in-memory document store.
+
+    Implements the (subset of the) APIs used by this package and
+    ``django_elasticsearch_dsl``: index management, document CRUD, ``bulk``,
+    ``search``, ``count``, ``msearch``, ``scroll`` and ``suggest``. See
+    ``django_elasticsearch_dsl_drf.fake_elasticsearch.query`` and
+    ``django_elasticsearch_dsl_drf.fake_elasticsearch.aggregations`` for
+    the supported query DSL.
+
+    Example:
+
+        >>> ELASTICSEARCH_DSL = {
+        >>>     'default': {
+        >>>         'hosts': 'localhost:9200',
+        >>>         'connection_class': FakeConnection,
+        >>>     },
+        >>> }
+
+    :param store: Document store. If not given, ``DEFAULT_STORE`` is used.
+    :type store: django_elasticsearch_dsl_drf.fake_elasticsearch.store.\
+        FakeDocumentStore
+    """
+
+    def __init__(self, store=None, **kwargs):
+        self.store = store if store is not None else DEFAULT_STORE
+        super(FakeConnection, self).__init__(**kwargs)
+
+    def perform_request(self, method, url, params=None, body=None,
+                        timeout=None, ignore=(), headers=None):
+        """Perform the request.
+
+        :return: Tuple of (status, headers, raw data).
+        :rtype: tuple
+        """
+        start = time.time()
+        path, _, query_string = url.partition('?')
+        params = dict(parse_qsl(query_string), **(params or {}))
+        if isinstance(ignore, int):
+            ignore = (ignore,)
+        parts = [unquote(__part) for __part in path.split('/') if __part]
+        try:
+            status, response = self.dispatch(method, parts, params, body)
+        except FakeElasticsearchError as err:
+            status, response = err.status, err.to_dict()
+        except (ValueError, KeyError, TypeError, StopIteration) as err:
+            status, response = 400, FakeElasticsearchError(
+                400,
+                'parse_exception',
+                six.text_type(err)
+            ).to_dict()
+
+        if params.get('filter_path') and isinstance(response, dict):
+            response = apply_filter_path(response, params['filter_path'])
+        raw_data = json.dumps(response, default=str) \
+            if response is not None else ''
+        duration = time.time() - start
+        if not (200 <= status < 300) and status not in ignore:
+            self.log_request_fail(method, url, path, body, duration, status,
+                                  raw_data)
+            self._raise_error(status, raw_data)
+        self.log_request_success(method, url, path, body, status, raw_data,
+                                 duration)
+        return status, dict(HEADERS), raw_data
+
+    def get_info(self):
+        """Get cluster info.
+
+        :return:
+        :rtype: dict
+        """
+        return {
+            'name': 'fake',
+            'cluster_name': 'fake',
+            'cluster_uuid': 'fake',
+            'version': {
+                'number': VERSION,
+                'build_flavor': 'default',
+                'lucene_version': '8.11.1',
+            },
+            'tagline': 'You Know, for Search',
+        }
+
+    def dispatch(self, method, parts, params, body):
+        """Dispatch the request to the document store.
+
+        :param method: HTTP method.
+        :param parts: Path parts.
+        :param params: Query params.
+        :param body: Request body.
+        :return: Tuple of (status, response).
+        :rtype: tuple
+        """
+        store = self.store
+
+        if not parts:
+            return 200, self.get_info() if method != 'HEAD' else None
+
+        if parts[0].startswith('_') and parts[0] != '_all':
+            return self.dispatch_root(method, parts, params, body)
+
+        index, endpoint = parts[0], parts[1:]
+
+        if not endpoint:
+            if method == 'PUT':
+                return 200, store.create_index(index, decode_body(body))
+            if method == 'DELETE':
+                return 200, store.delete_index(index)
+            if method == 'HEAD':
+                store.resolve_indices(index)
+                return 200, None
+            mappings = store.get_mapping(index)
+            settings = store.get_settings(index)
+            return 200, {
+                __name: dict(aliases={}, **dict(
+                    mappings[__name], **settings[__name]
+                ))
+                for __name in mappings
+            }
+
+        name = endpoint[0]
+
+        if name == '_search':
+            return 200, store.search(
+                index,
+                get_query_body(decode_body(body), params),
+                params
+            )
+        if name == '_count':
+            return 200, store.count(
+                index,
+                get_query_body(decode_body(body), params),
+                params
+            )
+        if name == '_msearch':
+            return 200, store.msearch(index,
+                                      get_searches(decode_lines(body)))
+        if name == '_bulk':
+            return 200, store.bulk(index, get_bulk_actions(decode_lines(body)))
+        if name == '_mget':
+            return 200, store.mget(index, decode_body(body))
+        if name == '_pit':
+            return 200, store.open_point_in_time(index)
+        if name in NOOP_ENDPOINTS:
+            store.resolve_indices(index)
+            return 200, {'_shards': {'total': 1, 'successful': 1,
+                                     'failed': 0}}
+        if name == '_mapping':
+            if method in ('PUT', 'POST'):
+                return 200, store.put_mapping(index, decode_body(body))
+            return 200, store.get_mapping(index)
+        if name == '_settings':
+            return 200, store.get_settings(index)
+        if name in ('_alias', '_aliases'):
+            return 200, store.get_alias(index)
+
+        # Document APIs
+        if name == '_doc' and len(endpoint) == 1:
+            return store.index_document(index, None, decode_body(body))
+        if name in ('_doc', '_create', '_update', '_source') \
+                and len(endpoint) == 2:
+            action, uid = name, endpoint[1]
+        elif len(endpoint) in (2, 3) and not name.startswith('_'):
+            # Typed (ES 6) document API
+            uid = endpoint[1]
+            action = endpoint[2] if len(endpoint) == 3 else '_doc'
+        else:
+            raise FakeElasticsearchError(
+                400,
+                'illegal_argument_exception',
+                "Unsupported endpoint [{} /{}]".format(method,
+                                                       '/'.join(parts))
+            )
+        return self.dispatch_document(method, index, action, uid, params,
+                                      body)
+
+    def dispatch_document(self, method, index, action, uid, params, body):
+        """Dispatch the document API request.
+
+        :return: Tuple of (status, response).
+        :rtype: tuple
+        """
+        store = self.store
+        if action == '_update':
+            return store.update_document(index, uid, decode_body(body))
+        if action == '_create':
+            return store.index_document(index, uid, decode_body(body),
+                                        'create')
+        if action == '_source':
+            status, response = store.get_document(index, uid)
+            return status, response.get('_source')
+        if method in ('PUT', 'POST'):
+            return store.index_document(index, uid, decode_body(body),
+                                        params.get('op_type', 'index'))
+        if method == 'DELETE':
+            return store.delete_document(index, uid)
+        status, response = store.get_document(index, uid)
+        return status, response if method != 'HEAD' else None
+
+    def dispatch_root(self, method, parts, params, body):
+        """Dispatch the request to the cluster level endpoint.
+
+        :return: Tuple of (status, response).
+        :rtype: tuple
+        """
+        store = self.store
+        name = parts[0]
+
+        if name == '_search' and parts[1:2] == ['scroll']:
+            body = decode_body(body) or {}
+            scroll_id = parts[2] if len(parts) > 2 else body.get(
+                'scroll_id',
+                params.get('scroll_id')
+            )
+            if method == 'DELETE':
+                if not isinstance(scroll_id, list):
+                    scroll_id = [scroll_id] if scroll_id else ['_all']
+                return 200, store.clear_scroll(scroll_id)
+            return 200, store.scroll(scroll_id)
+        if name == '_search':
+            return 200, store.search(
+                None,
+                get_query_body(decode_body(body), params),
+                params
+            )
+        if name == '_count':
+            return 200, store.count(
+                None,
+                get_query_body(decode_body(body), params),
+                params
+            )
+        if name == '_msearch':
+            return 200, store.msearch(None, get_searches(decode_lines(body)))
+        if name == '_bulk':
+            return 200, store.bulk(None, get_bulk_actions(decode_lines(body)))
+        if name == '_mget':
+            return 200, store.mget(None, decode_body(body))
+        if name == '_pit' and method == 'DELETE':
+            return 200, store.close_point_in_time(decode_body(body)['id'])
+        if name in NOOP_ENDPOINTS:
+            return 200, {'_shards': {'total': 1, 'successful': 1,
+                                     'failed': 0}}
+        if name == '_mapping':
+            return 200, store.get_mapping()
+        if name == '_settings':
+            return 200, store.get_settings()
+        if name in ('_alias', '_aliases'):
+            return 200, store.get_alias()
+        if name == '_cluster':
+            return 200, {
+                'cluster_name': 'fake',
+                'status': 'green',
+                'timed_out': False,
+                'number_of_nodes': 1,
+            }
+        raise FakeElasticsearchError(
+            400,
+            'illegal_argument_exception',
+            "Unsupported endpoint [{} /{}]".format(method, '/'.join(parts))
+        )
+
+
+def register_fake_connection(alias='default', store=None, **kwargs):
+    """Register the fake connection with ``elasticsearch_dsl.connections``.
+
+    Search templates cached by the views (which hold the connection) are
+    cleared as well.
+
+    :param alias: Connection alias.
+    :param store: Document store. If not given, ``DEFAULT_STORE`` is used.
+    :type alias: str
+    :type store: django_elasticsearch_dsl_drf.fake_elasticsearch.store.\
+        FakeDocumentStore
+    :return: Elasticsearch client.
+    :rtype: elasticsearch.Elasticsearch
+    """
+    from ..viewsets import BaseDocumentViewSet
+
+    client = connections.create_connection(
+        alias=alias,
+        connection_class=FakeConnection,
+        store=store,
+        **kwargs
+    )
+    BaseDocumentViewSet._search_templates.clear()
+    return client
@@ -0,0 +1,1050 @@
+"""
+Query DSL of the fake Elasticsearch.
+
+Queries are evaluated against each document. Scoring is rough: full text
+queries are scored with BM25 (over the statistics of the index the document
+belongs to), each other matched (query context) clause adds its boost to
+the score.
+"""
+
+import fnmatch
+import math
+import re
+from collections import Counter
+
+import six
+
+from .utils import (
+    analyze,
+    DATE_TYPES,
+    FakeElasticsearchError,
+    get_geo_distance,
+    get_values,
+    NUMERIC_TYPES,
+    parse_date,
+    parse_distance,
+    parse_geo_point,
+    TEXT_TYPES,
+    to_epoch_millis,
+    to_sortable,
+)
+
+__title__ = 'django_elasticsearch_dsl_drf.fake_elasticsearch.query'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = (
+    'FakeHit',
+    'match_query',
+    'QUERIES',
+)
+
+_QUERY_STRING_CLAUSE_RE = re.compile(
+    r'([+-]?)(?:\(([^()]*)\)|(?:([\w.]+):)?(?:"([^"]*)"|([^\s|()"]+)))',
+    re.UNICODE
+)
+
+# BM25 parameters (Elasticsearch defaults)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+class FakeHit(object):
+    """Document evaluated.
+
+    :param index: Index of the document.
+    :param uid: Document ID.
+    :param source: Document source.
+    :type index: django_elasticsearch_dsl_drf.fake_elasticsearch.store.\
+        FakeIndex
+    :type uid: str
+    :type source: dict
+    """
+
+    __slots__ = ('index', 'id', 'source', 'score', 'sort')
+
+    def __init__(self, index, uid, source):
+        self.index = index
+        self.id = uid
+        self.source = source
+        self.score = None
+        self.sort = None
+
+    def get_values(self, path):
+        """Get values of the field.
+
+        :param path: Dotted field path.
+        :type path: str
+        :return:
+        :rtype: list
+        """
+        return get_values(self.source, path)
+
+    def get_field_type(self, path):
+        """Get type of the field (as mapped).
+
+        :param path: Dotted field path.
+        :type path: str
+        :return:
+        :rtype: str
+        """
+        return self.index.get_field_type(path)
+
+    def get_nested(self, path):
+        """Get nested objects of the path, each as a document of its own.
+
+        Nested objects are placed under the same path, so that (full)
+        field paths resolve.
+
+        :param path: Dotted path of the nested field.
+        :type path: str
+        :return:
+        :rtype: list
+        """
+        hits = []
+        for value in self.get_values(path):
+            if not isinstance(value, dict):
+                continue
+            for part in reversed(path.split('.')):
+                value = {part: value}
+            hits.append(FakeHit(self.index, self.id, value))
+        return hits
+
+
+def get_boost(options):
+    """Get boost of the query.
+
+    :param options:
+    :type options: dict
+    :return:
+    :rtype: float
+    """
+    if isinstance(options, dict):
+        return float(options.get('boost', 1.0))
+    return 1.0
+
+
+def get_field_and_options(body, value_key='value'):
+    """Split the ``{field: options}`` query body.
+
+    :param body: Query body.
+    :param value_key: Key of the value, if options are given as a dict.
+    :type body: dict
+    :type value_key: str
+    :return: Tuple of (field, value, options).
+    :rtype: tuple
+    """
+    options = {}
+    field = None
+    value = None
+    for key, item in body.items():
+        if key in ('boost', '_name', 'case_insensitive', 'rewrite'):
+            options[key] = item
+            continue
+        field = key
+        if isinstance(item, dict):
+            options.update(item)
+            value = item.get(value_key)
+        else:
+            value = item
+    return field, value, options
+
+
+def get_tokens(hit, field):
+    """Get tokens of the (analyzed) field values.
+
+    :param hit:
+    :param field:
+    :return:
+    :rtype: set
+    """
+    tokens = set()
+    for value in hit.get_values(field):
+        if not isinstance(value, dict):
+            tokens.update(analyze(value))
+    return tokens
+
+
+def is_text(hit, field):
+    """Check if the field is analyzed.
+
+    Not mapped fields are analyzed if their values are strings containing
+    more than one token.
+
+    :param hit:
+    :param field:
+    :return:
+    :rtype: bool
+    """
+    field_type = hit.get_field_type(field)
+    if field_type is not None:
+        return field_type in TEXT_TYPES
+    return any(
+        isinstance(__value, six.string_types) and len(analyze(__value)) > 1
+        for __value in hit.get_values(field)
+    )
+
+
+def values_equal(value, other, field_type):
+    """Check if the field value equals the query value.
+
+    :param value: Field value.
+    :param other: Query value.
+    :param field_type: Field type.
+    :return:
+    :rtype: bool
+    """
+    if isinstance(value, dict):
+        return False
+    if field_type is None:
+        if isinstance(value, bool) or isinstance(other, bool):
+            return to_sortable(value, 'boolean') \
+                == to_sortable(other, 'boolean')
+        if isinstance(value, (int, float)):
+            return to_sortable(value, 'double') \
+                == to_sortable(other, 'double')
+        return six.text_type(value) == six.text_type(other)
+    if field_type in DATE_TYPES or field_type in NUMERIC_TYPES \
+            or field_type == 'boolean':
+        return to_sortable(value, field_type) \
+            == to_sortable(other, field_type)
+    return six.text_type(value) == six.text_type(other)
+
+
+def term_matches(hit, field, value):
+    """Check if the field contains the term.
+
+    :param hit:
+    :param field:
+    :param value:
+    :return:
+    :rtype: bool
+    """
+    if isinstance(value, bool):
+        value = 'true' if value else 'false'
+    if is_text(hit, field):
+        return six.text_type(value) in get_tokens(hit, field)
+    field_type = hit.get_field_type(field)
+    return any(
+        values_equal(__value, value, field_type)
+        for __value in hit.get_values(field)
+    )
+
+
+def match_all(body, hit):
+    return get_boost(body)
+
+
+def match_none(body, hit):
+    return None
+
+
+def term(body, hit):
+    field, value, options = get_field_and_options(body)
+    if term_matches(hit, field, value):
+        return get_boost(options)
+    return None
+
+
+def terms(body, hit):
+    boost = get_boost(body)
+    for field, values in body.items():
+        if field == 'boost':
+            continue
+        if isinstance(values, dict):
+            raise FakeElasticsearchError(
+                400,
+                'parsing_exception',
+                "Terms lookup is not supported"
+            )
+        if any(term_matches(hit, field, __value) for __value in values):
+            return boost
+    return None
+
+
+def get_range_pair(field_type, value, bound):
+    """Get comparable (field value, bound) pair.
+
+    :param field_type: Field type (if mapped).
+    :param value: Field value.
+    :param bound: Range bound.
+    :type field_type: str
+    :return: Tuple or None if not comparable.
+    :rtype: tuple
+    """
+    if isinstance(value, dict):
+        return None
+
+    if field_type in DATE_TYPES or (
+        field_type is None
+        and isinstance(value, six.string_types)
+        and not _is_number(value)
+    ):
+        value_date = parse_date(value)
+        bound_date = parse_date(bound)
+        if value_date is not None and bound_date is not None:
+            return to_epoch_millis(value_date), to_epoch_millis(bound_date)
+        if field_type in DATE_TYPES:
+            return None
+
+    if field_type in NUMERIC_TYPES or (
+        field_type is None and isinstance(value, (int, float))
+    ):
+        if _is_number(value) and _is_number(bound):
+            return float(value), float(bound)
+        return None
+
+    return six.text_type(value), six.text_type(bound)
+
+
+def _is_number(value):
+    """Check if the value is a number (or a string of a number).
+
+    :param value:
+    :return:
+    :rtype: bool
+    """
+    if isinstance(value, bool):
+        return False
+    try:
+        float(value)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def range_(body, hit):
+    field, _, options = get_field_and_options(body)
+    bounds = {}
+    for key in ('gt', 'gte', 'lt', 'lte'):
+        if options.get(key) is not None:
+            bounds[key] = options[key]
+    if options.get('from') is not None:
+        bounds['gte' if options.get('include_lower', True) else 'gt'] = \
+            options['from']
+    if options.get('to') is not None:
+        bounds['lte' if options.get('include_upper', True) else 'lt'] = \
+            options['to']
+
+    field_type = hit.get_field_type(field)
+    for value in hit.get_values(field):
+        for key, bound in bounds.items():
+            pair = get_range_pair(field_type, value, bound)
+            if pair is None:
+                break
+            value_key, bound_key = pair
+            if key == 'gt' and not value_key > bound_key \
+                    or key == 'gte' and not value_key >= bound_key \
+                    or key == 'lt' and not value_key < bound_key \
+                    or key == 'lte' and not value_key <= bound_key:
+                break
+        else:
+            return get_boost(options)
+    return None
+
+
+def _match_patterns(hit, field, options, func):
+    """Match values (or tokens) of the field with the function.
+
+    :param hit:
+    :param field:
+    :param options:
+    :param func: Function accepting the value and returning bool.
+    :return:
+    :rtype: bool
+    """
+    if is_text(hit, field):
+        return any(func(__token) for __token in get_tokens(hit, field))
+    case_insensitive = options.get('case_insensitive', False)
+    for value in hit.get_values(field):
+        if isinstance(value, dict):
+            continue
+        value = six.text_type(value)
+        if case_insensitive:
+            value = value.lower()
+        if func(value):
+            return True
+    return False
+
+
+def prefix(body, hit):
+    field, value, options = get_field_and_options(body)
+    value = six.text_type(value)
+    if options.get('case_insensitive') or is_text(hit, field):
+        value = value.lower()
+    if _match_patterns(hit, field, options,
+                       lambda __value: __value.startswith(value)):
+        return get_boost(options)
+    return None
+
+
+def wildcard(body, hit):
+    field, value, options = get_field_and_options(body)
+    if value is None:
+        value = options.get('wildcard')
+    value = six.text_type(value)
+    if options.get('case_insensitive') or is_text(hit, field):
+        value = value.lower()
+    pattern = re.compile(
+        fnmatch.translate(value.replace('[', '[[]')),
+        re.DOTALL
+    )
+    if _match_patterns(hit, field, options,
+                       lambda __value: pattern.match(__value) is not None):
+        return get_boost(options)
+    return None
+
+
+def regexp(body, hit):
+    field, value, options = get_field_and_options(body)
+    pattern = re.compile('(?:{})$'.format(value), re.DOTALL)
+    if _match_patterns(hit, field, options,
+                       lambda __value: pattern.match(__value) is not None):
+        return get_boost(options)
+    return None
+
+
+def exists(body, hit):
+    if hit.get_values(body['field']):
+        return get_boost(body)
+    return None
+
+
+def ids(body, hit):
+    if hit.id in [six.text_type(__value) for __value in body['values']]:
+        return get_boost(body)
+    return None
+
+
+def get_clauses(body, occurrence):
+    """Get clauses of the bool query.
+
+    :param body:
+    :param occurrence:
+    :return:
+    :rtype: list
+    """
+    clauses = body.get(occurrence) or []
+    if isinstance(clauses, dict):
+        return [clauses]
+    return clauses
+
+
+def get_minimum_should_match(value, count):
+    """Get minimum number of should clauses to match.
+
+    :param value: Integer, negative integer or percentage.
+    :param count: Number of should clauses.
+    :type count: int
+    :return:
+    :rtype: int
+    """
+    value = six.text_type(value).strip()
+    if value.endswith('%'):
+        number = int(count * abs(int(value[:-1])) / 100.0)
+        return count - number if value.startswith('-') else number
+    number = int(value)
+    return count + number if number < 0 else number
+
+
+def bool_(body, hit):
+    score = 0.0
+    for clause in get_clauses(body, 'must'):
+        clause_score = match_query(clause, hit)
+        if clause_score is None:
+            return None
+        score += clause_score
+    for clause in get_clauses(body, 'filter'):
+        if match_query(clause, hit) is None:
+            return None
+    for clause in get_clauses(body, 'must_not'):
+        if match_query(clause, hit) is not None:
+            return None
+
+    should = get_clauses(body, 'should')
+    if should:
+        if 'minimum_should_match' in body:
+            minimum = get_minimum_should_match(body['minimum_should_match'],
+                                               len(should))
+        elif get_clauses(body, 'must') or get_clauses(body, 'filter'):
+            minimum = 0
+        else:
+            minimum = 1
+        matched = 0
+        for clause in should:
+            clause_score = match_query(clause, hit)
+            if clause_score is not None:
+                matched += 1
+                score += clause_score
+        if matched < minimum:
+            return None
+    return score * get_boost(body)
+
+
+def nested(body, hit):
+    scores = [
+        __score for __score in (
+            match_query(body.get('query', {}), __hit)
+            for __hit in hit.get_nested(body['path'])
+        )
+        if __score is not None
+    ]
+    if not scores:
+        return None
+    score_mode = body.get('score_mode', 'avg')
+    if score_mode == 'sum':
+        score = sum(scores)
+    elif score_mode == 'max':
+        score = max(scores)
+    elif score_mode == 'min':
+        score = min(scores)
+    elif score_mode == 'none':
+        score = 0.0
+    else:
+        score = sum(scores) / len(scores)
+    return score * get_boost(body)
+
+
+def constant_score(body, hit):
+    if match_query(body['filter'], hit) is None:
+        return None
+    return get_boost(body)
+
+
+def dis_max(body, hit):
+    scores = [
+        __score for __score in (
+            match_query(__query, hit) for __query in body.get('queries', [])
+        )
+        if __score is not None
+    ]
+    if not scores:
+        return None
+    return max(scores) * get_boost(body)
+
+
+def function_score(body, hit):
+    score = match_query(body.get('query', {}), hit)
+    if score is None:
+        return None
+    return score * get_boost(body)
+
+
+def boosting(body, hit):
+    score = match_query(body['positive'], hit)
+    if score is None:
+        return None
+    if match_query(body['negative'], hit) is not None:
+        score *= float(body.get('negative_boost', 1.0))
+    return score
+
+
+def get_field_tokens(hit, field):
+    """Get tokens of the (analyzed) field values, with their frequencies.
+
+    :param hit:
+    :param field:
+    :return:
+    :rtype: collections.Counter
+    """
+    return Counter(
+        __token
+        for __value in hit.get_values(field)
+        if not isinstance(__value, dict)
+        for __token in analyze(__value)
+    )
+
+
+def score_terms(hit, field, tokens, field_tokens):
+    """Score the matched terms with BM25.
+
+    :param hit:
+    :param field:
+    :param tokens: Matched tokens.
+    :param field_tokens: Tokens of the field (see ``get_field_tokens``).
+    :type field_tokens: collections.Counter
+    :return:
+    :rtype: float
+    """
+    doc_count, average_length, doc_freqs = hit.index.get_term_stats(field)
+    length = sum(field_tokens.values())
+    norm = BM25_K1 * (
+        1 - BM25_B + BM25_B * length / (average_length or 1.0)
+    )
+    score = 0.0
+    for token in tokens:
+        doc_freq = doc_freqs.get(token, 1)
+        idf = math.log(
+            1 + (max(doc_count, doc_freq) - doc_freq + 0.5) / (doc_freq + 0.5)
+        )
+        freq = field_tokens[token]
+        score += idf * freq * (BM25_K1 + 1) / (freq + norm)
+    return score
+
+
+def match_text(hit, field, text, operator='or', boost=1.0,
+               minimum_should_match=None):
+    """Match the (analyzed) text.
+
+    :param hit:
+    :param field:
+    :param text:
+    :param operator:
+    :param boost:
+    :param minimum_should_match:
+    :return: Score or None.
+    :rtype: float
+    """
+    if not is_text(hit, field):
+        if term_matches(hit, field, text):
+            return boost
+        return None
+
+    stop_words = hit.index.get_stop_words(field)
+    tokens = [
+        __token for __token in analyze(text) if __token not in stop_words
+    ]
+    if not tokens:
+        return None
+    field_tokens = get_field_tokens(hit, field)
+    matched = [__token for __token in tokens if __token in field_tokens]
+    if operator.lower() == 'and':
+        minimum = len(tokens)
+    elif minimum_should_match is not None:
+        minimum = get_minimum_should_match(minimum_should_match, len(tokens))
+    else:
+        minimum = 1
+    if not matched or len(matched) < minimum:
+        return None
+    return boost * score_terms(hit, field, matched, field_tokens)
+
+
+def match_phrase_text(hit, field, text, boost=1.0, last_prefix=False):
+    """Match the (analyzed) phrase.
+
+    Stop words (if removed by the analyzer of the field) match any token.
+
+    :param hit:
+    :param field:
+    :param text:
+    :param boost:
+    :param last_prefix: If True, last token is matched as a prefix.
+    :return: Score or None.
+    :rtype: float
+    """
+    stop_words = hit.index.get_stop_words(field)
+    tokens = [
+        None if __token in stop_words else __token
+        for __token in analyze(text)
+    ]
+    while tokens and tokens[0] is None:
+        tokens.pop(0)
+    while tokens and tokens[-1] is None:
+        tokens.pop()
+    if not tokens:
+        return None
+    terms = [__token for __token in tokens if __token is not None]
+    for value in hit.get_values(field):
+        if isinstance(value, dict):
+            continue
+        value_tokens = analyze(value)
+        for position in range(len(value_tokens) - len(tokens) + 1):
+            candidate = value_tokens[position:position + len(tokens)]
+            if all(
+                __token is None or __token == __candidate
+                for __token, __candidate in zip(tokens[:-1], candidate)
+            ) and (
+                tokens[-1] == candidate[-1]
+                or (last_prefix and candidate[-1].startswith(tokens[-1]))
+            ):
+                return boost * score_terms(hit, field, terms,
+                                           get_field_tokens(hit, field))
+    return None
+
+
+def match(body, hit):
+    field, text, options = get_field_and_options(body, 'query')
+    return match_text(
+        hit,
+        field,
+        text,
+        options.get('operator', 'or'),
+        get_boost(options),
+        options.get('minimum_should_match')
+    )
+
+
+def match_phrase(body, hit):
+    field, text, options = get_field_and_options(body, 'query')
+    return match_phrase_text(hit, field, text, get_boost(options))
+
+
+def match_phrase_prefix(body, hit):
+    field, text, options = get_field_and_options(body, 'query')
+    return match_phrase_text(hit, field, text, get_boost(options), True)
+
+
+def get_text_paths(source, prefix=''):
+    """Get paths of all the string fields of the source.
+
+    :param source:
+    :param prefix:
+    :return:
+    :rtype: list
+    """
+    paths = []
+    for key, value in source.items():
+        path = prefix + key
+        values = value if isinstance(value, list) else [value]
+        for item in values:
+            if isinstance(item, dict):
+                paths.extend(get_text_paths(item, path + '.'))
+            elif isinstance(item, six.string_types) and path not in paths:
+                paths.append(path)
+    return paths
+
+
+def get_fields(hit, fields):
+    """Expand the fields (wildcards, boosts) of the full text query.
+
+    :param hit:
+    :param fields: Fields, like ``['title^2', 'description', 'tags.*']``.
+    :return: List of (field, boost) tuples.
+    :rtype: list
+    """
+    expanded = []
+    for field in fields or ['*']:
+        boost = 1.0
+        if '^' in field:
+            field, boost = field.split('^', 1)
+            boost = float(boost)
+        if '*' in field:
+            expanded.extend(
+                (__path, boost)
+                for __path in get_text_paths(hit.source)
+                if fnmatch.fnmatchcase(__path, field)
+            )
+        else:
+            expanded.append((field, boost))
+    return expanded
+
+
+def multi_match(body, hit):
+    query_type = body.get('type', 'best_fields')
+    operator = body.get('operator', 'or')
+    scores = []
+    for field, boost in get_fields(hit, body.get('fields')):
+        if query_type == 'phrase':
+            score = match_phrase_text(hit, field, body['query'], boost)
+        elif query_type == 'phrase_prefix':
+            score = match_phrase_text(hit, field, body['query'], boost, True)
+        else:
+            score = match_text(hit, field, body['query'], operator, boost,
+                               body.get('minimum_should_match'))
+        if score is not None:
+            scores.append(score)
+    if not scores:
+        return None
+    if query_type in ('most_fields', 'cross_fields'):
+        return sum(scores) * get_boost(body)
+    return max(scores) * get_boost(body)
+
+
+def query_string(body, hit):
+    """Approximation of the ``query_string`` and ``simple_query_string``
+    queries.
+
+    Supported are terms, ``"quoted phrases"``, ``field:`` prefixes, ``+``
+    (must), ``-`` (must not) and ``NOT`` operators and (not nested)
+    groups. Other clauses are combined with the ``default_operator``
+    (clauses of the groups containing ``|`` are combined with ``or``).
+    Fuzziness, wildcards and ranges are ignored.
+    """
+    fields = body.get('fields') or [body.get('default_field', '*')]
+    operator = body.get('default_operator', 'or').lower()
+    must, must_not, should = [], [], []
+    negate = False
+    for sign, group, field, phrase, text in _QUERY_STRING_CLAUSE_RE.findall(
+        body['query']
+    ):
+        if group:
+            group = dict(
+                body,
+                query=group,
+                default_operator='or' if '|' in group else operator,
+                boost=1.0
+            )
+        elif not phrase and text in ('AND', 'OR', '&&', '||'):
+            continue
+        if not phrase and text == 'NOT':
+            negate = True
+            continue
+        if sign == '-' or negate:
+            clauses = must_not
+        elif sign == '+' or operator == 'and':
+            clauses = must
+        else:
+            clauses = should
+        negate = False
+        clauses.append(
+            ([(field, 1.0)] if field else get_fields(hit, fields),
+             group or phrase or text,
+             bool(phrase))
+        )
+
+    def _score(clause):
+        _fields, text, is_phrase = clause
+        if isinstance(text, dict):
+            return query_string(text, hit)
+        if not is_phrase and not any(
+            __token not in hit.index.get_stop_words(__field)
+            for __field, _ in _fields
+            for __token in analyze(text)
+        ):
+            # Only stop words, the clause is dropped
+            return 0.0
+        scores = [
+            __score for __score in (
+                match_phrase_text(hit, __field, text, __boost)
+                if is_phrase
+                else match_text(hit, __field, text, boost=__boost)
+                for __field, __boost in _fields
+            )
+            if __score is not None
+        ]
+        return max(scores) if scores else None
+
+    score = 0.0
+    for clause in must_not:
+        if _score(clause):
+            return None
+    for clause in must:
+        clause_score = _score(clause)
+        if clause_score is None:
+            return None
+        score += clause_score
+    should_scores = [
+        __score for __score in (_score(__clause) for __clause in should)
+        if __score is not None
+    ]
+    if should and not must and not should_scores:
+        return None
+    score += sum(should_scores)
+    return (score or 1.0) * get_boost(body)
+
+
+def get_like_terms(body, hit):
+    """Select the terms of the liked documents (``more_like_this``).
+
+    Liked documents (``_id``) are looked up in the index of the document
+    evaluated.
+
+    :param body:
+    :param hit:
+    :return: Tuple of (IDs of the liked documents, list of selected
+        (field, term) tuples).
+    :rtype: tuple
+    """
+    like = body.get('like', [])
+    if not isinstance(like, list):
+        like = [like]
+    liked_ids = set()
+    sources = []
+    texts = []
+    for item in like:
+        if isinstance(item, six.string_types):
+            texts.append(item)
+        elif 'doc' in item:
+            sources.append(item['doc'])
+        elif item.get('_index', hit.index.name) == hit.index.name:
+            uid = six.text_type(item['_id'])
+            liked_ids.add(uid)
+            if uid in hit.index.documents:
+                sources.append(hit.index.documents[uid])
+
+    fields = body.get('fields') or sorted(set(
+        __path for __source in sources for __path in get_text_paths(__source)
+    ))
+    min_term_freq = int(body.get('min_term_freq', 2))
+    min_doc_freq = int(body.get('min_doc_freq', 5))
+    max_doc_freq = int(body.get('max_doc_freq', 0))
+    candidates = []
+    for field in fields:
+        stop_words = hit.index.get_stop_words(field)
+        frequencies = Counter(
+            __token
+            for __value in [
+                __value for __source in sources
+                for __value in get_values(__source, field)
+            ] + texts
+            if not isinstance(__value, dict)
+            for __token in analyze(__value)
+            if __token not in stop_words
+        )
+        doc_count, _, doc_freqs = hit.index.get_term_stats(field)
+        for token, frequency in frequencies.items():
+            doc_freq = doc_freqs.get(token, 0)
+            if frequency < min_term_freq or doc_freq < min_doc_freq \
+                    or (max_doc_freq and doc_freq > max_doc_freq):
+                continue
+            idf = math.log(
+                1 + (doc_count - doc_freq + 0.5) / (doc_freq + 0.5)
+            )
+            candidates.append((frequency * idf, field, token))
+    candidates.sort(key=lambda __item: -__item[0])
+    terms = [
+        (__field, __token) for _, __field, __token
+        in candidates[:int(body.get('max_query_terms', 25))]
+    ]
+    return liked_ids, terms
+
+
+def more_like_this(body, hit):
+    """Approximation of the ``more_like_this`` query.
+
+    Terms of the liked documents are selected by their frequencies and
+    inverse document frequencies (limited by ``max_query_terms``,
+    ``min_term_freq``, ``min_doc_freq`` and ``max_doc_freq``), documents
+    having ``minimum_should_match`` of the terms are matched.
+    """
+    liked_ids, terms = get_like_terms(body, hit)
+    if not terms or (hit.id in liked_ids and not body.get('include')):
+        return None
+    score = 0.0
+    matched = 0
+    for field in set(__field for __field, _ in terms):
+        field_tokens = get_field_tokens(hit, field)
+        tokens = [
+            __token for __field, __token in terms
+            if __field == field and __token in field_tokens
+        ]
+        if tokens:
+            matched += len(tokens)
+            score += score_terms(hit, field, tokens, field_tokens)
+    minimum = get_minimum_should_match(
+        body.get('minimum_should_match', '30%'),
+        len(terms)
+    )
+    if not matched or matched < minimum:
+        return None
+    return score * get_boost(body)
+
+
+def geo_distance(body, hit):
+    distance = parse_distance(body['distance'])
+    for field, point in body.items():
+        if field in ('distance', 'distance_type', 'validation_method',
+                     'boost', '_name', 'ignore_unmapped'):
+            continue
+        origin = parse_geo_point(point)
+        for value in hit.get_values(field):
+            location = parse_geo_point(value)
+            if location is not None \
+                    and get_geo_distance(origin, location) <= distance:
+                return get_boost(body)
+    return None
+
+
+def geo_bounding_box(body, hit):
+    for field, box in body.items():
+        if field in ('validation_method', 'type', 'boost', '_name',
+                     'ignore_unmapped'):
+            continue
+        top, left = parse_geo_point(box['top_left'])
+        bottom, right = parse_geo_point(box['bottom_right'])
+        for value in hit.get_values(field):
+            location = parse_geo_point(value)
+            if location is None:
+                continue
+            lat, lon = location
+            if left <= right:
+                in_lon = left <= lon <= right
+            else:
+                in_lon = lon >= left or lon <= right
+            if bottom <= lat <= top and in_lon:
+                return get_boost(body)
+    return None
+
+
+def geo_polygon(body, hit):
+    for field, polygon in body.items():
+        if field in ('validation_method', 'boost', '_name',
+                     'ignore_unmapped'):
+            continue
+        points = [parse_geo_point(__point) for __point in polygon['points']]
+        for value in hit.get_values(field):
+            location = parse_geo_point(value)
+            if location is not None and _in_polygon(location, points):
+                return get_boost(body)
+    return None
+
+
+def _in_polygon(location, points):
+    """Check if the location is within the polygon (ray casting).
+
+    :param location: Tuple of (lat, lon).
+    :param points: List of (lat, lon) tuples.
+    :return:
+    :rtype: bool
+    """
+    lat, lon = location
+    inside = False
+    for (lat1, lon1), (lat2, lon2) in zip(points, points[-1:] + points[:-1]):
+        if (lon1 > lon) != (lon2 > lon) \
+                and lat < (lat2 - lat1) * (lon - lon1) / (lon2 - lon1) + lat1:
+            inside = not inside
+    return inside
+
+
+QUERIES = {
+    'bool': bool_,
+    'boosting': boosting,
+    'constant_score': constant_score,
+    'dis_max': dis_max,
+    'exists': exists,
+    'function_score': function_score,
+    'geo_bounding_box': geo_bounding_box,
+    'geo_distance': geo_distance,
+    'geo_polygon': geo_polygon,
+    'ids': ids,
+    'match': match,
+    'match_all': match_all,
+    'match_none': match_none,
+    'match_phrase': match_phrase,
+    'match_phrase_prefix': match_phrase_prefix,
+    'more_like_this': more_like_this,
+    'multi_match': multi_match,
+    'nested': nested,
+    'prefix': prefix,
+    'query_string': query_string,
+    'range': range_,
+    'regexp': regexp,
+    'simple_query_string': query_string,
+    'term': term,
+    'terms': terms,
+    'wildcard': wildcard,
+}
+
+
+def match_query(query, hit):
+    """Match the query against the document.
+
+    :param query: Query (as of the query DSL).
+    :param hit: Document.
+    :type query: dict
+    :type hit: django_elasticsearch_dsl_drf.fake_elasticsearch.query.FakeHit
+    :return: Score or None if not matched.
+    :rtype: float
+    """
+    if not query:
+        return 1.0
+    for name, body in query.items():
+        try:
+            func = QUERIES[name]
+        except KeyError:
+            raise FakeElasticsearchError(
+                400,
+                'parsing_exception',
+                "Query [{}] is not supported".format(name)
+            )
+        return func(body, hit)
@@ -0,0 +1,1380 @@
+"""
+In-memory document store of the fake Elasticsearch.
+"""
+
+import copy
+import fnmatch
+import functools
+import re
+import threading
+import uuid
+from collections import OrderedDict
+
+import six
+
+from .aggregations import aggregate
+from .query import FakeHit, get_text_paths, match_query
+from .utils import (
+    analyze,
+    DATE_TYPES,
+    FakeElasticsearchError,
+    get_field_type,
+    get_geo_distance,
+    get_values,
+    parse_distance,
+    get_field_mapping,
+    parse_geo_point,
+    STOP_WORDS,
+    STOP_WORDS_ANALYZERS,
+    to_sortable,
+)
+
+__title__ = 'django_elasticsearch_dsl_drf.fake_elasticsearch.store'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = (
+    'FakeDocumentStore',
+    'FakeIndex',
+)
+
+INTEGER_TYPES = ('byte', 'integer', 'long', 'short', 'unsigned_long')
+
+# Queries, taking the (field) value as a short form
+TERM_QUERIES = (
+    'match',
+    'match_phrase',
+    'match_phrase_prefix',
+    'prefix',
+    'term',
+    'wildcard',
+)
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Approximate sizes (in meters) of the geohash cells, by geohash length
+GEOHASH_CELL_SIZES = (
+    5000000, 1250000, 156000, 39100, 4890, 1220, 153, 38.2, 4.77, 1.19,
+    0.149, 0.0372,
+)
+
+SHARDS = OrderedDict([
+    ('total', 1),
+    ('successful', 1),
+    ('skipped', 0),
+    ('failed', 0),
+])
+
+
+def get_shards():
+    """Get shards info of the responses.
+
+    :return:
+    :rtype: dict
+    """
+    return dict(SHARDS)
+
+
+def merge(target, source):
+    """Merge the source into the target (objects are merged recursively).
+
+    :param target:
+    :param source:
+    :type target: dict
+    :type source: dict
+    :return: Target.
+    :rtype: dict
+    """
+    for key, value in source.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            merge(target[key], value)
+        else:
+            target[key] = copy.deepcopy(value)
+    return target
+
+
+def filter_source(source, includes, excludes, prefix=''):
+    """Filter the ``_source`` of the hit.
+
+    :param source:
+    :param includes: Patterns of the fields to include.
+    :param excludes: Patterns of the fields to exclude.
+    :param prefix: Path of the source (if nested).
+    :type source: dict
+    :type includes: list
+    :type excludes: list
+    :type prefix: str
+    :return:
+    :rtype: dict
+    """
+    filtered = OrderedDict()
+    for key, value in source.items():
+        path = prefix + key
+        if any(fnmatch.fnmatchcase(path, __pattern)
+               for __pattern in excludes):
+            continue
+        included = not includes or any(
+            fnmatch.fnmatchcase(path, __pattern) for __pattern in includes
+        )
+        if isinstance(value, dict) and not included:
+            # Some of the sub-fields may be included
+            value = filter_source(value, includes, excludes, path + '.')
+            if value:
+                filtered[key] = value
+        elif isinstance(value, dict):
+            filtered[key] = filter_source(value, [], excludes, path + '.')
+        elif included:
+            filtered[key] = value
+    return filtered
+
+
+def get_query_terms(query, parent=None):
+    """Get terms (analyzed) of the query, used for highlighting.
+
+    :param query: Query (as of the query DSL).
+    :param parent: Parent key.
+    :type query: dict
+    :type parent: str
+    :return:
+    :rtype: set
+    """
+    terms = set()
+    if isinstance(query, dict):
+        for key, value in query.items():
+            if isinstance(value, six.string_types):
+                if key in ('query', 'value') or parent in TERM_QUERIES:
+                    terms.update(analyze(value))
+            elif isinstance(value, list) and parent == 'terms':
+                for item in value:
+                    terms.update(analyze(item))
+            else:
+                terms.update(get_query_terms(value, key))
+    elif isinstance(query, list):
+        for item in query:
+            terms.update(get_query_terms(item, parent))
+    return terms
+
+
+def highlight_value(value, terms, stop_words, pre_tag, post_tag):
+    """Highlight the terms in the value.
+
+    :return: Highlighted value or None if none of the terms found.
+    :rtype: str
+    """
+    matched = []
+
+    def _replace(match):
+        token = match.group(0)
+        if token.lower() in terms and token.lower() not in stop_words:
+            matched.append(token)
+            return pre_tag + token + post_tag
+        return token
+
+    value = TOKEN_RE.sub(_replace, six.text_type(value))
+    return value if matched else None
+
+
+def get_highlight(hit, options, terms):
+    """Get highlight of the hit.
+
+    Fields are highlighted as a whole (no fragmenting), at most
+    ``number_of_fragments`` values per field.
+
+    :param hit: Document.
+    :param options: Highlight options.
+    :param terms: Terms to highlight.
+    :type options: dict
+    :type terms: set
+    :return:
+    :rtype: dict
+    """
+    highlight = OrderedDict()
+    for field, field_options in options.get('fields', {}).items():
+        field_options = dict(options, **(field_options or {}))
+        pre_tag = field_options.get('pre_tags', ['<em>'])[0]
+        post_tag = field_options.get('post_tags', ['</em>'])[0]
+        number_of_fragments = int(field_options.get('number_of_fragments',
+                                                    5))
+        if '*' in field:
+            paths = [
+                __path for __path in get_text_paths(hit.source)
+                if fnmatch.fnmatchcase(__path, field)
+            ]
+        else:
+            paths = [field]
+        for path in paths:
+            stop_words = hit.index.get_stop_words(path)
+            fragments = [
+                __fragment for __fragment in (
+                    highlight_value(__value, terms, stop_words, pre_tag,
+                                    post_tag)
+                    for __value in hit.get_values(path)
+                    if not isinstance(__value, dict)
+                )
+                if __fragment is not None
+            ]
+            if fragments:
+                highlight[path] = fragments[:number_of_fragments or None]
+    return highlight
+
+
+class FakeIndex(object):
+    """Index of the fake Elasticsearch.
+
+    :param name: Index name.
+    :param settings: Index settings.
+    :param mappings: Index mappings.
+    :type name: str
+    :type settings: dict
+    :type mappings: dict
+    """
+
+    def __init__(self, name, settings=None, mappings=None):
+        self.name = name
+        self.settings = settings or {}
+        self.properties = {}
+        self.documents = OrderedDict()
+        self.versions = {}
+        self._field_types = {}
+        self._stop_words = {}
+        self._term_stats = {}
+        if mappings:
+            self.put_mapping(mappings)
+
+    def put_mapping(self, mappings):
+        """Update the mappings.
+
+        Both typeless (``{'properties': ...}``) and typed (
+        ``{'doc': {'properties': ...}}``) mappings are accepted.
+
+        :param mappings:
+        :type mappings: dict
+        """
+        if 'properties' not in mappings and len(mappings) == 1:
+            mapping = list(mappings.values())[0]
+            if isinstance(mapping, dict) and 'properties' in mapping:
+                mappings = mapping
+        merge(self.properties, mappings.get('properties', {}))
+        self._field_types = {}
+        self._stop_words = {}
+
+    def get_mappings(self):
+        """Get the mappings.
+
+        :return:
+        :rtype: dict
+        """
+        return {'properties': self.properties}
+
+    def set_document(self, uid, source):
+        """Set (index or replace) the document.
+
+        :param uid: Document ID.
+        :param source: Document source.
+        :type uid: str
+        :type source: dict
+        """
+        self.documents[uid] = source
+        self.versions[uid] = self.versions.get(uid, 0) + 1
+        self._term_stats = {}
+
+    def delete_document(self, uid):
+        """Delete the document.
+
+        :param uid: Document ID.
+        :type uid: str
+        :return: Deleted document source or None if not found.
+        :rtype: dict
+        """
+        self._term_stats = {}
+        return self.documents.pop(uid, None)
+
+    def get_term_stats(self, path):
+        """Get term statistics of the (analyzed) field, used for scoring.
+
+        Statistics are computed on demand and kept until the documents
+        change.
+
+        :param path: Dotted field path.
+        :type path: str
+        :return: Tuple of (number of documents having the field, average
+            field length, document frequencies of the terms).
+        :rtype: tuple
+        """
+        try:
+            return self._term_stats[path]
+        except KeyError:
+            pass
+        doc_count = 0
+        length = 0
+        doc_freqs = {}
+        for source in self.documents.values():
+            tokens = [
+                __token
+                for __value in get_values(source, path)
+                if not isinstance(__value, dict)
+                for __token in analyze(__value)
+            ]
+            if not tokens:
+                continue
+            doc_count += 1
+            length += len(tokens)
+            for token in set(tokens):
+                doc_freqs[token] = doc_freqs.get(token, 0) + 1
+        stats = (doc_count, length / float(doc_count or 1), doc_freqs)
+        self._term_stats[path] = stats
+        return stats
+
+    def get_stop_words(self, path):
+        """Get stop words removed by the analyzer of the field.
+
+        Only the ``english`` and ``stop`` analyzers and the custom analyzers
+        having the ``stop`` token filter are taken into account.
+
+        :param path: Dotted field path.
+        :type path: str
+        :return:
+        :rtype: frozenset
+        """
+        try:
+            return self._stop_words[path]
+        except KeyError:
+            pass
+        mapping = get_field_mapping(self.properties, path) or {}
+        name = mapping.get('search_analyzer', mapping.get('analyzer'))
+        analysis = self.settings.get(
+            'analysis',
+            self.settings.get('index', {}).get('analysis', {})
+        )
+        filters = analysis.get('analyzer', {}).get(name, {}).get('filter', [])
+        if name in STOP_WORDS_ANALYZERS or 'stop' in filters or any(
+            analysis.get('filter', {}).get(__filter, {}).get('type') == 'stop'
+            for __filter in filters
+            if isinstance(__filter, six.string_types)
+        ):
+            stop_words = STOP_WORDS
+        else:
+            stop_words = frozenset()
+        self._stop_words[path] = stop_words
+        return stop_words
+
+    def get_field_type(self, path):
+        """Get the field type (as mapped).
+
+        :param path: Dotted field path.
+        :type path: str
+        :return:
+        :rtype: str
+        """
+        try:
+            return self._field_types[path]
+        except KeyError:
+            field_type = get_field_type(self.properties, path)
+            self._field_types[path] = field_type
+            return field_type
+
+
+class FakeDocumentStore(object):
+    """In-memory document store, answering the (subset of) Elasticsearch
+    APIs.
+
+    Example:
+
+        >>> store = FakeDocumentStore()
+        >>> store.index_document('book', '1', {'title': 'Python'})
+        >>> store.search('book', {'query': {'match': {'title': 'python'}}})
+    """
+
+    default_size = 10
+    default_track_total_hits = 10000
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.indices = OrderedDict()
+        self.scrolls = {}
+        self.point_in_times = {}
+
+    # *************************************************************
+    # ************************ Indices ****************************
+    # *************************************************************
+
+    def clear(self):
+        """Remove all the indices (and documents)."""
+        with self.lock:
+            self.indices.clear()
+            self.scrolls.clear()
+            self.point_in_times.clear()
+
+    def resolve_indices(self, index=None, ignore_unavailable=False):
+        """Resolve the indices by comma separated names (or wildcards).
+
+        :param index: Comma separated names (or list of names), wildcards or
+            ``_all``.
+        :param ignore_unavailable: If True, missing indices are ignored.
+        :type index: str|list
+        :type ignore_unavailable: bool
+        :return:
+        :rtype: list
+        """
+        if isinstance(index, (list, tuple)):
+            index = ','.join(index)
+        if not index or index in ('_all', '*'):
+            return list(self.indices.values())
+        indices = []
+        for name in index.split(','):
+            if '*' in name or '?' in name:
+                indices.extend(
+                    __index for __name, __index in self.indices.items()
+                    if fnmatch.fnmatchcase(__name, name)
+                    and __index not in indices
+                )
+            elif name in self.indices:
+                if self.indices[name] not in indices:
+                    indices.append(self.indices[name])
+            elif not ignore_unavailable:
+                raise FakeElasticsearchError(
+                    404,
+                    'index_not_found_exception',
+                    "no such index [{}]".format(name)
+                )
+        return indices
+
+    def get_index(self, name, create=False):
+        """Get the index.
+
+        :param name: Index name.
+        :param create: If True, missing index is created.
+        :type name: str
+        :type create: bool
+        :return:
+        :rtype: django_elasticsearch_dsl_drf.fake_elasticsearch.store.\
+            FakeIndex
+        """
+        if name not in self.indices:
+            if not create:
+                raise FakeElasticsearchError(
+                    404,
+                    'index_not_found_exception',
+                    "no such index [{}]".format(name)
+                )
+            self.indices[name] = FakeIndex(name)
+        return self.indices[name]
+
+    def create_index(self, name, body=None):
+        """Create the index.
+
+        :param name: Index name.
+        :param body: Settings and mappings.
+        :type name: str
+        :type body: dict
+        :return:
+        :rtype: dict
+        """
+        body = body or {}
+        with self.lock:
+            if name in self.indices:
+                raise FakeElasticsearchError(
+                    400,
+                    'resource_already_exists_exception',
+                    "index [{}] already exists".format(name)
+                )
+            self.indices[name] = FakeIndex(
+                name,
+                body.get('settings'),
+                body.get('mappings')
+            )
+        return {
+            'acknowledged': True,
+            'shards_acknowledged': True,
+            'index': name,
+        }
+
+    def delete_index(self, index):
+        """Delete the indices.
+
+        :param index: Comma separated names or wildcards.
+        :type index: str
+        :return:
+        :rtype: dict
+        """
+        with self.lock:
+            for _index in self.resolve_indices(index):
+                del self.indices[_index.name]
+        return {'acknowledged': True}
+
+    def put_mapping(self, index, body):
+        """Update mappings of the indices.
+
+        :param index:
+        :param body:
+        :return:
+        :rtype: dict
+        """
+        with self.lock:
+            for _index in self.resolve_indices(index):
+                _index.put_mapping(body)
+        return {'acknowledged': True}
+
+    def get_mapping(self, index=None):
+        """Get mappings of the indices.
+
+        :param index:
+        :return:
+        :rtype: dict
+        """
+        return {
+            __index.name: {'mappings': __index.get_mappings()}
+            for __index in self.resolve_indices(index)
+        }
+
+    def get_settings(self, index=None):
+        """Get settings of the indices.
+
+        :param index:
+        :return:
+        :rtype: dict
+        """
+        return {
+            __index.name: {'settings': {'index': __index.settings}}
+            for __index in self.resolve_indices(index)
+        }
+
+    def get_alias(self, index=None):
+        """Get aliases of the indices (there are no aliases).
+
+        :param index:
+        :return:
+        :rtype: dict
+        """
+        return {
+            __index.name: {'aliases': {}}
+            for __index in self.resolve_indices(index)
+        }
+
+    # *************************************************************
+    # *********************** Documents ***************************
+    # *************************************************************
+
+    def get_document_response(self, index, uid, result, status=200):
+        """Get response of the document operation.
+
+        :return: Tuple of (status, response).
+        :rtype: tuple
+        """
+        return status, OrderedDict([
+            ('_index', index.name),
+            ('_type', '_doc'),
+            ('_id', uid),
+            ('_version', index.versions.get(uid, 1)),
+            ('result', result),
+            ('_shards', {'total': 1, 'successful': 1, 'failed': 0}),
+            ('_seq_no', 0),
+            ('_primary_term', 1),
+        ])
+
+    def index_document(self, index, uid, source, op_type='index'):
+        """Index the document.
+
+        :param index: Index name (created if missing).
+        :param uid: Document ID (generated if None).
+        :param source: Document source.
+        :param op_type: ``index`` or ``create``.
+        :return: Tuple of (status, response).
+        :rtype: tuple
+        """
+        with self.lock:
+            _index = self.get_index(index, create=True)
+            if uid is None:
+                uid = uuid.uuid4().hex
+            uid = six.text_type(uid)
+            exists = uid in _index.documents
+            if exists and op_type == 'create':
+                raise FakeElasticsearchError(
+                    409,
+                    'version_conflict_engine_exception',
+                    "[{}]: version conflict, document already "
+                    "exists".format(uid)
+                )
+            _index.set_document(uid, copy.deepcopy(source))
+            if exists:
+                return self.get_document_response(_index, uid, 'updated')
+            return self.get_document_response(_index, uid, 'created', 201)
+
+    def update_document(self, index, uid, body):
+        """Update the (partial) document.
+
+        :param index: Index name.
+        :param uid: Document ID.
+        :param body: Update body (``doc``, ``upsert``, ``doc_as_upsert``).
+        :return: Tuple of (status, response).
+        :rtype: tuple
+        """
+        if 'script' in body:
+            raise FakeElasticsearchError(
+                400,
+                'illegal_argument_exception',
+                "Scripted updates are not supported"
+            )
+        with self.lock:
+            _index = self.get_index(index, create=True)
+            uid = six.text_type(uid)
+            if uid not in _index.documents:
+                if body.get('doc_as_upsert'):
+                    return self.index_document(index, uid, body['doc'])
+                if 'upsert' in body:
+                    return self.index_document(index, uid, body['upsert'])
+                raise FakeElasticsearchError(
+                    404,
+                    'document_missing_exception',
+                    "[{}]: document missing".format(uid)
+                )
+            _index.set_document(
+                uid,
+                merge(_index.documents[uid], body.get('doc', {}))
+            )
+            return self.get_document_response(_index, uid, 'updated')
+
+    def delete_document(self, index, uid):
+        """Delete the document.
+
+        :param index: Index name.
+        :param uid: Document ID.
+        :return: Tuple of (status, response).
+        :rtype: tuple
+        """
+        with self.lock:
+            _index = self.get_index(index)
+            uid = six.text_type(uid)
+            if _index.delete_document(uid) is None:
+                return self.get_document_response(_index, uid, 'not_found',
+                                                  404)
+            return self.get_document_response(_index, uid, 'deleted')
+
+    def get_document(self, index, uid):
+        """Get the document.
+
+        :param index: Index name.
+        :param uid: Document ID.
+        :return: Tuple of (status, response).
+        :rtype: tuple
+        """
+        _index = self.get_index(index)
+        uid = six.text_type(uid)
+        response = OrderedDict([
+            ('_index', _index.name),
+            ('_type', '_doc'),
+            ('_id', uid),
+        ])
+        if uid not in _index.documents:
+            response['found'] = False
+            return 404, response
+        response.update([
+            ('_version', _index.versions.get(uid, 1)),
+            ('_seq_no', 0),
+            ('_primary_term', 1),
+            ('found', True),
+            ('_source', copy.deepcopy(_index.documents[uid])),
+        ])
+        return 200, response
+
+    def mget(self, index, body):
+        """Get multiple documents.
+
+        :param index: Default index name.
+        :param body: ``docs`` or ``ids``.
+        :return:
+        :rtype: dict
+        """
+        docs = body.get('docs') or [
+            {'_id': __uid} for __uid in body.get('ids', [])
+        ]
+        results = []
+        for doc in docs:
+            try:
+                _, response = self.get_document(doc.get('_index', index),
+                                                doc['_id'])
+            except FakeElasticsearchError as err:
+                response = {
+                    '_index': doc.get('_index', index),
+                    '_type': '_doc',
+                    '_id': doc['_id'],
+                    'error': err.to_dict()['error'],
+                }
+            results.append(response)
+        return {'docs': results}
+
+    def bulk(self, index, actions):
+        """Perform bulk actions.
+
+        :param index: Default index name.
+        :param actions: List of (action, source) tuples.
+        :return:
+        :rtype: dict
+        """
+        items = []
+        errors = False
+        for action, source in actions:
+            (op_type, meta), = action.items()
+            _index = meta.get('_index', index)
+            uid = meta.get('_id')
+            try:
+                if op_type in ('index', 'create'):
+                    status, response = self.index_document(_index, uid,
+                                                           source, op_type)
+                elif op_type == 'update':
+                    status, response = self.update_document(_index, uid,
+                                                            source)
+                elif op_type == 'delete':
+                    status, response = self.delete_document(_index, uid)
+                else:
+                    raise FakeElasticsearchError(
+                        400,
+                        'illegal_argument_exception',
+                        "Unknown bulk action [{}]".format(op_type)
+                    )
+                response['status'] = status
+            except FakeElasticsearchError as err:
+                errors = True
+                response = {
+                    '_index': _index,
+                    '_type': '_doc',
+                    '_id': uid,
+                    'status': err.status,
+                    'error': err.to_dict()['error'],
+                }
+            items.append({op_type: response})
+        return {'took': 1, 'errors': errors, 'items': items}
+
+    # *************************************************************
+    # ************************ Searches ***************************
+    # *************************************************************
+
+    def get_hits(self, index, body, ignore_unavailable=False):
+        """Get all the documents of the searched indices.
+
+        :param index: Index names.
+        :param body: Search body.
+        :param ignore_unavailable:
+        :return:
+        :rtype: list
+        """
+        if body.get('pit'):
+            try:
+                index = self.point_in_times[body['pit']['id']]
+            except KeyError:
+                raise FakeElasticsearchError(
+                    404,
+                    'search_context_missing_exception',
+                    "No search context found for id [{}]".format(
+                        body['pit']['id']
+                    )
+                )
+        return [
+            FakeHit(__index, __uid, __source)
+            for __index in self.resolve_indices(index, ignore_unavailable)
+            for __uid, __source in __index.documents.items()
+        ]
+
+    def count(self, index, body=None, params=None):
+        """Count the documents matching the query.
+
+        :param index:
+        :param body:
+        :param params:
+        :return:
+        :rtype: dict
+        """
+        body = body or {}
+        params = params or {}
+        with self.lock:
+            hits = self.get_hits(
+                index,
+                body,
+                params.get('ignore_unavailable') == 'true'
+            )
+            query = body.get('query')
+            count = len([
+                __hit for __hit in hits
+                if not query or match_query(query, __hit) is not None
+            ])
+        return {'count': count, '_shards': get_shards()}
+
+    def get_sort(self, body, params):
+        """Get the sort options.
+
+        :param body:
+        :param params:
+        :return: List of (field, order, options) tuples.
+        :rtype: list
+        """
+        sort = body.get('sort')
+        if sort is None and params.get('sort'):
+            sort = params['sort'].split(',')
+        if not sort:
+            return []
+        if not isinstance(sort, list):
+            sort = [sort]
+        result = []
+        for item in sort:
+            if isinstance(item, six.string_types):
+                field, _, order = item.partition(':')
+                options = {}
+            else:
+                (field, options), = item.items()
+                if isinstance(options, six.string_types):
+                    order, options = options, {}
+                else:
+                    order = options.get('order')
+            if not order:
+                order = 'desc' if field == '_score' else 'asc'
+            result.append((field, order.lower(), options))
+        return result
+
+    def get_sort_value(self, hit, position, field, order, options):
+        """Get sort value of the hit.
+
+        :return:
+        """
+        if field == '_score':
+            return hit.score
+        if field == '_doc':
+            return position
+        if field == '_id':
+            return hit.id
+        if field == '_geo_distance':
+            point = None
+            location_field = None
+            for key, value in options.items():
+                if key not in ('order', 'unit', 'mode', 'distance_type',
+                               'ignore_unmapped', 'validation_method',
+                               'nested'):
+                    location_field, point = key, value
+            origin = parse_geo_point(point)
+            distances = [
+                get_geo_distance(origin, __location)
+                for __location in (
+                    parse_geo_point(__value)
+                    for __value in hit.get_values(location_field)
+                )
+                if __location is not None
+            ]
+            if not distances:
+                return None
+            unit = parse_distance('1' + options.get('unit', 'm'))
+            return (max(distances) if order == 'desc'
+                    else min(distances)) / unit
+
+        field_type = hit.get_field_type(field)
+        values = [
+            __value for __value in (
+                to_sortable(__item, field_type)
+                for __item in hit.get_values(field)
+                if not isinstance(__item, dict)
+            )
+            if __value is not None
+        ]
+        if not values:
+            return None
+        mode = options.get('mode', 'max' if order == 'desc' else 'min')
+        try:
+            if mode == 'max':
+                value = max(values)
+            elif mode in ('sum', 'avg', 'median'):
+                value = sum(values)
+                if mode != 'sum':
+                    value = value / float(len(values))
+            else:
+                value = min(values)
+        except TypeError:
+            value = values[0]
+        if field_type in INTEGER_TYPES or field_type in DATE_TYPES:
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                pass
+        return value
+
+    def compare_sort_values(self, sort, values, other):
+        """Compare sort values of the hits.
+
+        Missing values are sorted last (or first, if ``missing`` is set to
+        ``_first``).
+
+        :return:
+        :rtype: int
+        """
+        for (_, order, options), value, other_value in zip(sort, values,
+                                                           other):
+            if value == other_value:
+                continue
+            missing_first = options.get('missing') == '_first'
+            if value is None:
+                return -1 if missing_first else 1
+            if other_value is None:
+                return 1 if missing_first else -1
+            try:
+                result = -1 if value < other_value else 1
+            except TypeError:
+                result = -1 if six.text_type(value) < six.text_type(
+                    other_value
+                ) else 1
+            return -result if order == 'desc' else result
+        return 0
+
+    def make_hit(self, hit, sort, source_filter, highlight=None):
+        """Make the hit (as of the search response).
+
+        :param hit: Document.
+        :param sort: Sort options.
+        :param source_filter: ``_source`` filtering options.
+        :param highlight: Tuple of (highlight options, terms), if any.
+
+        :return:
+        :rtype: dict
+        """
+        response = OrderedDict([
+            ('_index', hit.index.name),
+            ('_type', '_doc'),
+            ('_id', hit.id),
+            ('_score', hit.score),
+        ])
+        if source_filter is not False:
+            includes, excludes = source_filter
+            source = copy.deepcopy(hit.source)
+            if includes or excludes:
+                source = filter_source(source, includes, excludes)
+            response['_source'] = source
+        if highlight:
+            fields = get_highlight(hit, *highlight)
+            if fields:
+                response['highlight'] = fields
+        if sort:
+            response['sort'] = hit.sort
+        return response
+
+    def get_source_filter(self, body, params):
+        """Get ``_source`` filtering options.
+
+        :return: False (no source) or tuple of (includes, excludes).
+        """
+        source = body.get('_source', params.get('_source', True))
+        if source in (False, 'false'):
+            return False
+        if source in (True, 'true', None):
+            return [], []
+        if isinstance(source, six.string_types):
+            return source.split(','), []
+        if isinstance(source, list):
+            return source, []
+        includes = source.get('includes', source.get('include', []))
+        excludes = source.get('excludes', source.get('exclude', []))
+        if isinstance(includes, six.string_types):
+            includes = [includes]
+        if isinstance(excludes, six.string_types):
+            excludes = [excludes]
+        return includes, excludes
+
+    def get_total(self, body, params, count):
+        """Get total number of hits.
+
+        :return: Total (as of the search response) or None if not tracked.
+        :rtype: dict
+        """
+        track_total_hits = body.get(
+            'track_total_hits',
+            params.get('track_total_hits', self.default_track_total_hits)
+        )
+        if track_total_hits in (False, 'false'):
+            return None
+        if track_total_hits in (True, 'true'):
+            return {'value': count, 'relation': 'eq'}
+        track_total_hits = int(track_total_hits)
+        if count > track_total_hits:
+            return {'value': track_total_hits, 'relation': 'gte'}
+        return {'value': count, 'relation': 'eq'}
+
+    def search(self, index, body=None, params=None):
+        """Search.
+
+        :param index: Index names (comma separated, wildcards).
+        :param body: Search body.
+        :param params: Query params.
+        :type index: str
+        :type body: dict
+        :type params: dict
+        :return:
+        :rtype: dict
+        """
+        body = body or {}
+        params = params or {}
+        with self.lock:
+            all_hits = self.get_hits(
+                index,
+                body,
+                params.get('ignore_unavailable') == 'true'
+            )
+            query = body.get('query')
+            hits = []
+            for hit in all_hits:
+                hit.score = match_query(query, hit) if query else 1.0
+                if hit.score is not None:
+                    hits.append(hit)
+            if body.get('min_score') is not None:
+                hits = [
+                    __hit for __hit in hits
+                    if __hit.score >= float(body['min_score'])
+                ]
+
+            response = OrderedDict([
+                ('took', 1),
+                ('timed_out', False),
+                ('_shards', get_shards()),
+            ])
+            aggs = body.get('aggs') or body.get('aggregations')
+            aggregations = aggregate(aggs, hits, all_hits) if aggs else None
+
+            if body.get('post_filter'):
+                hits = [
+                    __hit for __hit in hits
+                    if match_query(body['post_filter'], __hit) is not None
+                ]
+
+            sort = self.get_sort(body, params)
+            if sort:
+                for position, hit in enumerate(hits):
+                    hit.sort = [
+                        self.get_sort_value(hit, position, *__options)
+                        for __options in sort
+                    ]
+                hits.sort(key=functools.cmp_to_key(
+                    lambda __hit, __other: self.compare_sort_values(
+                        sort,
+                        __hit.sort,
+                        __other.sort
+                    )
+                ))
+                if not body.get('track_scores') \
+                        and not any(__item[0] == '_score' for __item in sort):
+                    for hit in hits:
+                        hit.score = None
+            else:
+                hits.sort(key=lambda __hit: -__hit.score)
+
+            total = self.get_total(body, params, len(hits))
+
+            if body.get('search_after') is not None:
+                search_after = body['search_after']
+                hits = [
+                    __hit for __hit in hits
+                    if self.compare_sort_values(sort, __hit.sort,
+                                                search_after) > 0
+                ]
+
+            start = int(body.get('from', params.get('from', 0)))
+            size = int(body.get('size', params.get('size',
+                                                   self.default_size)))
+            scores = [__hit.score for __hit in hits
+                      if __hit.score is not None]
+            source_filter = self.get_source_filter(body, params)
+            highlight = None
+            if body.get('highlight'):
+                highlight = (
+                    body['highlight'],
+                    get_query_terms(
+                        body['highlight'].get('highlight_query', query)
+                    )
+                )
+            page = [
+                self.make_hit(__hit, sort, source_filter, highlight)
+                for __hit in hits[start:start + size]
+            ]
+
+            response['hits'] = OrderedDict()
+            if total is not None:
+                response['hits']['total'] = total
+            response['hits']['max_score'] = max(scores) if scores else None
+            response['hits']['hits'] = page
+
+            if params.get('scroll'):
+                scroll_id = uuid.uuid4().hex
+                self.scrolls[scroll_id] = {
+                    'hits': [
+                        self.make_hit(__hit, sort, source_filter)
+                        for __hit in hits[start + size:]
+                    ],
+                    'size': size,
+                    'total': total,
+                }
+                response['_scroll_id'] = scroll_id
+            if body.get('pit'):
+                response['pit_id'] = body['pit']['id']
+            if aggregations is not None:
+                response['aggregations'] = aggregations
+            if body.get('suggest'):
+                response['suggest'] = self.suggest(all_hits, body['suggest'])
+        return response
+
+    def scroll(self, scroll_id):
+        """Get next page of the scroll.
+
+        :param scroll_id:
+        :return:
+        :rtype: dict
+        """
+        with self.lock:
+            try:
+                scroll = self.scrolls[scroll_id]
+            except KeyError:
+                raise FakeElasticsearchError(
+                    404,
+                    'search_context_missing_exception',
+                    "No search context found for id [{}]".format(scroll_id)
+                )
+            page = scroll['hits'][:scroll['size']]
+            scroll['hits'] = scroll['hits'][scroll['size']:]
+        hits = OrderedDict()
+        if scroll['total'] is not None:
+            hits['total'] = scroll['total']
+        hits['max_score'] = None
+        hits['hits'] = page
+        return OrderedDict([
+            ('_scroll_id', scroll_id),
+            ('took', 1),
+            ('timed_out', False),
+            ('_shards', get_shards()),
+            ('hits', hits),
+        ])
+
+    def clear_scroll(self, scroll_ids):
+        """Clear the scrolls.
+
+        :param scroll_ids: Scroll IDs, ``_all`` to clear all.
+        :type scroll_ids: list
+        :return:
+        :rtype: dict
+        """
+        with self.lock:
+            if '_all' in scroll_ids:
+                scroll_ids = list(self.scrolls)
+            removed = [
+                __scroll_id for __scroll_id in scroll_ids
+                if self.scrolls.pop(__scroll_id, None) is not None
+            ]
+        return {'succeeded': True, 'num_freed': len(removed)}
+
+    def open_point_in_time(self, index):
+        """Open point in time.
+
+        Documents are not snapshotted, point in time just refers to the
+        indices.
+
+        :param index:
+        :return:
+        :rtype: dict
+        """
+        self.resolve_indices(index)
+        pit_id = uuid.uuid4().hex
+        self.point_in_times[pit_id] = index
+        return {'id': pit_id}
+
+    def close_point_in_time(self, pit_id):
+        """Close point in time.
+
+        :param pit_id:
+        :return:
+        :rtype: dict
+        """
+        removed = self.point_in_times.pop(pit_id, None) is not None
+        return {'succeeded': True, 'num_freed': 1 if removed else 0}
+
+    def msearch(self, index, searches):
+        """Execute multiple searches.
+
+        :param index: Default index names.
+        :param searches: List of (header, body) tuples.
+        :return:
+        :rtype: dict
+        """
+        responses = []
+        for header, body in searches:
+            try:
+                response = self.search(
+                    header.get('index', index),
+                    body,
+                    {
+                        __key: six.text_type(__value).lower()
+                        if isinstance(__value, bool) else __value
+                        for __key, __value in header.items()
+                    }
+                )
+                response['status'] = 200
+            except FakeElasticsearchError as err:
+                response = err.to_dict()
+            responses.append(response)
+        return {'took': 1, 'responses': responses}
+
+    # *************************************************************
+    # *********************** Suggesters **************************
+    # *************************************************************
+
+    def suggest(self, hits, suggest):
+        """Suggest.
+
+        Completion suggesters return the (distinct) field values starting
+        with the prefix (case insensitive). Term and phrase suggesters
+        return no options.
+
+        :param hits: All documents of the indices searched.
+        :param suggest: Suggest body.
+        :return:
+        :rtype: dict
+        """
+        global_text = suggest.get('text')
+        results = OrderedDict()
+        for name, options in suggest.items():
+            if name == 'text':
+                continue
+            text = options.get('prefix', options.get('text', global_text))
+            if 'completion' in options:
+                results[name] = [
+                    self.suggest_completion(hits, text,
+                                            options['completion'])
+                ]
+            elif 'term' in options or 'phrase' in options:
+                results[name] = [
+                    {
+                        'text': __token,
+                        'offset': 0,
+                        'length': len(__token),
+                        'options': [],
+                    }
+                    for __token in (text or '').split()
+                ]
+            else:
+                raise FakeElasticsearchError(
+                    400,
+                    'illegal_argument_exception',
+                    "Suggester of [{}] is not supported".format(name)
+                )
+        return results
+
+    def get_context_boost(self, hit, value, field, contexts):
+        """Match the suggestion against the contexts of the completion query.
+
+        Category contexts are matched exactly (or as prefixes), geo contexts
+        by distance (``precision`` given as distance or as geohash length).
+
+        :param hit: Document.
+        :param value: Suggestion (field value).
+        :param field: Completion field.
+        :param contexts: Contexts of the query.
+        :return: Boost or None if not matched.
+        :rtype: float
+        """
+        mapping = get_field_mapping(hit.index.properties, field) or {}
+        definitions = {
+            __context['name']: __context
+            for __context in mapping.get('contexts', [])
+        }
+        boosts = []
+        for name, queries in contexts.items():
+            definition = definitions.get(name, {})
+            if isinstance(value, dict) and name in value.get('contexts', {}):
+                values = value['contexts'][name]
+                if not isinstance(values, list):
+                    values = [values]
+            elif definition.get('path'):
+                values = hit.get_values(definition['path'])
+            else:
+                values = []
+            if not isinstance(queries, list):
+                queries = [queries]
+            for query in queries:
+                if not isinstance(query, dict) or (
+                    'context' not in query and definition.get('type') != 'geo'
+                ):
+                    query = {'context': query}
+                context = query.get('context', query)
+                if definition.get('type') == 'geo':
+                    origin = parse_geo_point(context)
+                    precision = query.get('precision',
+                                          definition.get('precision', 6))
+                    try:
+                        radius = GEOHASH_CELL_SIZES[int(precision) - 1]
+                    except (TypeError, ValueError, IndexError):
+                        radius = parse_distance(precision)
+                    matched = any(
+                        __point is not None
+                        and get_geo_distance(origin, __point) <= radius
+                        for __point in (
+                            parse_geo_point(__value) for __value in values
+                        )
+                    )
+                else:
+                    context = six.text_type(context)
+                    matched = any(
+                        six.text_type(__value) == context or (
+                            query.get('prefix')
+                            and six.text_type(__value).startswith(context)
+                        )
+                        for __value in values
+                    )
+                if matched:
+                    boosts.append(float(query.get('boost', 1.0)))
+        return max(boosts) if boosts else None
+
+    def suggest_completion(self, hits, text, options):
+        """Completion suggest.
+
+        :param hits:
+        :param text:
+        :param options:
+        :return:
+        :rtype: dict
+        """
+        prefix = (text or '').lower()
+        size = options.get('size', 5)
+        skip_duplicates = options.get('skip_duplicates', False)
+        suggestions = []
+        seen = set()
+        contexts = options.get('contexts')
+        for hit in hits:
+            for value in hit.get_values(options['field']):
+                weight = 1.0
+                if contexts:
+                    boost = self.get_context_boost(hit, value,
+                                                   options['field'], contexts)
+                    if boost is None:
+                        continue
+                    weight = boost
+                if isinstance(value, dict):
+                    weight *= float(value.get('weight', 1.0))
+                    inputs = value.get('input', [])
+                    if not isinstance(inputs, list):
+                        inputs = [inputs]
+                else:
+                    inputs = [value]
+                for item in inputs:
+                    item = six.text_type(item)
+                    if not item.lower().startswith(prefix):
+                        continue
+                    if skip_duplicates and item in seen:
+                        continue
+                    seen.add(item)
+                    suggestions.append(OrderedDict([
+                        ('text', item),
+                        ('_index', hit.index.name),
+                        ('_type', '_doc'),
+                        ('_id', hit.id),
+                        ('_score', weight),
+                        ('_source', copy.deepcopy(hit.source)),
+                    ]))
+                    break
+        suggestions.sort(key=lambda __item: (-__item['_score'],
+                                             __item['text']))
+        return {
+            'text': text,
+            'offset': 0,
+            'length': len(text or ''),
+            'options': suggestions[:size],
+        }
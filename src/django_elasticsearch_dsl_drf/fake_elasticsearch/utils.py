@@ -0,0 +1,445 @@
+"""
+Helpers of the fake Elasticsearch: field values, types, dates and geo points.
+"""
+
+import calendar
+import datetime
+import math
+import re
+
+import six
+
+__title__ = 'django_elasticsearch_dsl_drf.fake_elasticsearch.utils'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = (
+    'analyze',
+    'DATE_TYPES',
+    'FakeElasticsearchError',
+    'from_epoch_millis',
+    'get_field_mapping',
+    'get_field_type',
+    'get_geo_distance',
+    'get_values',
+    'NUMERIC_TYPES',
+    'parse_date',
+    'parse_distance',
+    'parse_geo_point',
+    'STOP_WORDS',
+    'STOP_WORDS_ANALYZERS',
+    'to_epoch_millis',
+    'TEXT_TYPES',
+    'to_sortable',
+)
+
+NUMERIC_TYPES = (
+    'byte',
+    'double',
+    'float',
+    'half_float',
+    'integer',
+    'long',
+    'scaled_float',
+    'short',
+    'unsigned_long',
+)
+DATE_TYPES = ('date', 'date_nanos')
+TEXT_TYPES = ('text', 'completion', 'search_as_you_type')
+
+# English stop words (as of the ``stop`` token filter)
+STOP_WORDS = frozenset((
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'but', 'by', 'for', 'if',
+    'in', 'into', 'is', 'it', 'no', 'not', 'of', 'on', 'or', 'such', 'that',
+    'the', 'their', 'then', 'there', 'these', 'they', 'this', 'to', 'was',
+    'will', 'with',
+))
+# Built-in analyzers removing the stop words
+STOP_WORDS_ANALYZERS = ('english', 'stop')
+
+EPOCH = datetime.datetime(1970, 1, 1)
+
+DATE_FORMATS = (
+    '%Y-%m-%dT%H:%M:%S.%f',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%dT%H:%M',
+    '%Y-%m-%d %H:%M:%S.%f',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d',
+    '%Y-%m',
+    '%Y',
+)
+
+DATE_MATH_UNITS = {
+    's': datetime.timedelta(seconds=1),
+    'm': datetime.timedelta(minutes=1),
+    'h': datetime.timedelta(hours=1),
+    'H': datetime.timedelta(hours=1),
+    'd': datetime.timedelta(days=1),
+    'w': datetime.timedelta(weeks=1),
+    'M': datetime.timedelta(days=30),
+    'y': datetime.timedelta(days=365),
+}
+
+# In meters
+DISTANCE_UNITS = (
+    ('nmi', 1852.0),
+    ('NM', 1852.0),
+    ('km', 1000.0),
+    ('mi', 1609.344),
+    ('yd', 0.9144),
+    ('ft', 0.3048),
+    ('cm', 0.01),
+    ('mm', 0.001),
+    ('in', 0.0254),
+    ('m', 1.0),
+)
+
+EARTH_RADIUS = 6371008.7714
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+_TIMEZONE_RE = re.compile(r'(Z|[+-]\d\d:?\d\d)$')
+_DATE_MATH_RE = re.compile(r'([+-])(\d+)([smhHdwMy])|/([smhHdwMy])')
+
+
+class FakeElasticsearchError(Exception):
+    """Error, reported as an Elasticsearch error response.
+
+    :param status: HTTP status code.
+    :param error_type: Elasticsearch error type.
+    :param reason: Reason.
+    :type status: int
+    :type error_type: str
+    :type reason: str
+    """
+
+    def __init__(self, status, error_type, reason):
+        super(FakeElasticsearchError, self).__init__(reason)
+        self.status = status
+        self.error_type = error_type
+        self.reason = reason
+
+    def to_dict(self):
+        """Error response body.
+
+        :return:
+        :rtype: dict
+        """
+        return {
+            'error': {
+                'root_cause': [
+                    {'type': self.error_type, 'reason': self.reason},
+                ],
+                'type': self.error_type,
+                'reason': self.reason,
+            },
+            'status': self.status,
+        }
+
+
+def analyze(value):
+    """Analyze the text (as the ``standard`` analyzer roughly does).
+
+    :param value:
+    :return: Lower-cased tokens.
+    :rtype: list
+    """
+    if isinstance(value, bool):
+        value = 'true' if value else 'false'
+    return _TOKEN_RE.findall(six.text_type(value).lower())
+
+
+def get_values(source, path):
+    """Get values of the (dotted) field path.
+
+    Lists are flattened. Paths of multi-fields (``title.raw``) resolve to
+    the value of the parent field.
+
+    :param source: Document source.
+    :param path: Dotted field path.
+    :type source: dict
+    :type path: str
+    :return:
+    :rtype: list
+    """
+    values = [source]
+    for part in path.split('.'):
+        next_values = []
+        for value in values:
+            if isinstance(value, dict):
+                if part in value:
+                    next_values.append(value[part])
+            else:
+                next_values.append(value)
+        values = []
+        for value in next_values:
+            if isinstance(value, (list, tuple)):
+                values.extend(value)
+            else:
+                values.append(value)
+    return [__value for __value in values if __value is not None]
+
+
+def get_field_mapping(properties, path):
+    """Get mapping of the (dotted) field path.
+
+    :param properties: Properties of the index mapping.
+    :param path: Dotted field path.
+    :type properties: dict
+    :type path: str
+    :return: Field mapping or None if not mapped.
+    :rtype: dict
+    """
+    field = None
+    for part in path.split('.'):
+        if field is not None and part in field.get('fields', {}):
+            field = field['fields'][part]
+            continue
+        _properties = properties if field is None \
+            else field.get('properties')
+        if not _properties or part not in _properties:
+            return None
+        field = _properties[part]
+    return field
+
+
+def get_field_type(properties, path):
+    """Get type of the (dotted) field path.
+
+    :param properties: Properties of the index mapping.
+    :param path: Dotted field path.
+    :type properties: dict
+    :type path: str
+    :return: Field type or None if not mapped.
+    :rtype: str
+    """
+    field = get_field_mapping(properties or {}, path)
+    if field is None:
+        return None
+    return field.get('type', 'object' if 'properties' in field else None)
+
+
+def parse_date(value):
+    """Parse the date (ISO 8601 strings, epoch milliseconds, date math).
+
+    :param value:
+    :return: Naive UTC datetime or None if not a date.
+    :rtype: datetime.datetime
+    """
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is not None:
+            value = value.replace(tzinfo=None) - value.utcoffset()
+        return value
+    if isinstance(value, datetime.date):
+        return datetime.datetime(value.year, value.month, value.day)
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return from_epoch_millis(value)
+    if not isinstance(value, six.string_types):
+        return None
+
+    value = value.strip()
+    if value.startswith('now'):
+        return apply_date_math(datetime.datetime.utcnow(), value[3:])
+    if '||' in value:
+        value, math_expression = value.split('||', 1)
+        date = parse_date(value)
+        return apply_date_math(date, math_expression) if date else None
+
+    offset = datetime.timedelta()
+    match = _TIMEZONE_RE.search(value)
+    if match and len(value) > 10:
+        value = value[:match.start()]
+        timezone = match.group(1).replace(':', '')
+        if timezone != 'Z':
+            offset = datetime.timedelta(
+                hours=int(timezone[1:3]),
+                minutes=int(timezone[3:5])
+            )
+            if timezone[0] == '-':
+                offset = -offset
+
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(value, date_format) - offset
+        except ValueError:
+            pass
+
+    try:
+        return from_epoch_millis(float(value))
+    except ValueError:
+        return None
+
+
+def apply_date_math(date, expression):
+    """Apply date math expression (``+1d``, ``-1M/d``, etc.).
+
+    :param date:
+    :param expression:
+    :type date: datetime.datetime
+    :type expression: str
+    :return:
+    :rtype: datetime.datetime
+    """
+    for sign, amount, unit, rounding in _DATE_MATH_RE.findall(expression):
+        if rounding:
+            date = floor_date(date, rounding)
+        elif unit == 'M':
+            date = add_months(date, int(amount) * (1 if sign == '+' else -1))
+        elif unit == 'y':
+            date = add_months(date,
+                              int(amount) * (12 if sign == '+' else -12))
+        elif sign == '+':
+            date += DATE_MATH_UNITS[unit] * int(amount)
+        else:
+            date -= DATE_MATH_UNITS[unit] * int(amount)
+    return date
+
+
+def add_months(date, months):
+    """Add months to the date.
+
+    :param date:
+    :param months:
+    :type date: datetime.datetime
+    :type months: int
+    :return:
+    :rtype: datetime.datetime
+    """
+    month = date.month - 1 + months
+    year = date.year + month // 12
+    month = month % 12 + 1
+    day = min(date.day, calendar.monthrange(year, month)[1])
+    return date.replace(year=year, month=month, day=day)
+
+
+def floor_date(date, unit):
+    """Round the date down to the unit.
+
+    :param date:
+    :param unit: One of ``y``, ``q``, ``M``, ``w``, ``d``, ``h``, ``m``,
+        ``s``.
+    :type date: datetime.datetime
+    :type unit: str
+    :return:
+    :rtype: datetime.datetime
+    """
+    if unit == 'y':
+        return datetime.datetime(date.year, 1, 1)
+    if unit == 'q':
+        return datetime.datetime(date.year, (date.month - 1) // 3 * 3 + 1, 1)
+    if unit == 'M':
+        return datetime.datetime(date.year, date.month, 1)
+    if unit == 'w':
+        day = datetime.datetime(date.year, date.month, date.day)
+        return day - datetime.timedelta(days=day.weekday())
+    if unit == 'd':
+        return datetime.datetime(date.year, date.month, date.day)
+    if unit in ('h', 'H'):
+        return date.replace(minute=0, second=0, microsecond=0)
+    if unit == 'm':
+        return date.replace(second=0, microsecond=0)
+    return date.replace(microsecond=0)
+
+
+def to_epoch_millis(date):
+    """Convert the (naive UTC) datetime to epoch milliseconds.
+
+    :param date:
+    :type date: datetime.datetime
+    :return:
+    :rtype: int
+    """
+    return int(round((date - EPOCH).total_seconds() * 1000))
+
+
+def from_epoch_millis(value):
+    """Convert epoch milliseconds to (naive UTC) datetime.
+
+    :param value:
+    :type value: int
+    :return:
+    :rtype: datetime.datetime
+    """
+    return EPOCH + datetime.timedelta(milliseconds=value)
+
+
+def to_sortable(value, field_type=None):
+    """Convert the field value to a comparable one.
+
+    Dates are converted to epoch milliseconds, numbers to floats, booleans
+    to 1 and 0 and anything else to text.
+
+    :param value: Field value.
+    :param field_type: Field type (if mapped).
+    :type field_type: str
+    :return:
+    """
+    if isinstance(value, bool):
+        return 1 if value else 0
+    if field_type in DATE_TYPES:
+        date = parse_date(value)
+        return to_epoch_millis(date) if date is not None else None
+    if field_type in NUMERIC_TYPES or isinstance(value, (int, float)):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+    if field_type == 'boolean':
+        return 1 if six.text_type(value).lower() == 'true' else 0
+    return six.text_type(value)
+
+
+def parse_geo_point(value):
+    """Parse the geo point.
+
+    :param value: Dict (``lat``, ``lon``), string (``lat,lon``) or list
+        (``[lon, lat]``).
+    :return: Tuple of (lat, lon) or None.
+    :rtype: tuple
+    """
+    try:
+        if isinstance(value, dict):
+            return float(value['lat']), float(value['lon'])
+        if isinstance(value, six.string_types):
+            lat, lon = value.split(',')
+            return float(lat), float(lon)
+        if isinstance(value, (list, tuple)) and len(value) == 2:
+            return float(value[1]), float(value[0])
+    except (KeyError, TypeError, ValueError):
+        pass
+    return None
+
+
+def parse_distance(value):
+    """Parse the distance (``1km``, ``500m``, etc.).
+
+    :param value:
+    :return: Distance in meters.
+    :rtype: float
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    value = value.strip()
+    for unit, meters in DISTANCE_UNITS:
+        if value.endswith(unit):
+            return float(value[:-len(unit)]) * meters
+    return float(value)
+
+
+def get_geo_distance(point, other):
+    """Get (arc) distance between the geo points.
+
+    :param point: Tuple of (lat, lon).
+    :param other: Tuple of (lat, lon).
+    :type point: tuple
+    :type other: tuple
+    :return: Distance in meters.
+    :rtype: float
+    """
+    lat1, lon1 = map(math.radians, point)
+    lat2, lon2 = map(math.radians, other)
+    value = math.sin((lat2 - lat1) / 2) ** 2 \
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(value)))
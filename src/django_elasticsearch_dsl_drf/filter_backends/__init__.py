@@ -2,6 +2,11 @@
 All filter backends.
 """
 
+from .aggregations import (
+    BucketAggregationsFilterBackend,
+    MetricsAggregationsFilterBackend,
+    PipelineAggregationsFilterBackend,
+)
 from .faceted_search import FacetedSearchFilterBackend
 from .filtering import (
     FilteringFilterBackend,
@@ -1,17 +1,19 @@
-# """
-# Aggregations filtering backends.
-# """
-#
-# from .bucket_aggregations import *
-# from .metrics_aggregations import *
-# from .pipeline_aggregations import *
-#
-# __title__ = 'django_elasticsearch_dsl_drf.filter_backends.suggester'
-# __author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
-# __copyright__ = '2017-2019 Artur Barseghyan'
-# __license__ = 'GPL 2.0/LGPL 2.1'
-# __all__ = (
-#     'BucketAggregationsFilterBackend',
-#     'MetricsAggregationsFilterBackend',
-#     'PipelineAggregationsFilterBackend',
-# )
+"""
+Aggregations filtering backends.
+"""
+
+from .base import BaseAggregationsFilterBackend
+from .bucket_aggregations import BucketAggregationsFilterBackend
+from .metrics_aggregations import MetricsAggregationsFilterBackend
+from .pipeline_aggregations import PipelineAggregationsFilterBackend
+
+__title__ = 'django_elasticsearch_dsl_drf.filter_backends.aggregations'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = (
+    'BaseAggregationsFilterBackend',
+    'BucketAggregationsFilterBackend',
+    'MetricsAggregationsFilterBackend',
+    'PipelineAggregationsFilterBackend',
+)
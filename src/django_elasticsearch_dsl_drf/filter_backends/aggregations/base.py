@@ -0,0 +1,169 @@
+"""
+Base aggregations filter backend.
+"""
+
+import copy
+
+from django.core.exceptions import ImproperlyConfigured
+
+from elasticsearch_dsl import A
+
+from rest_framework.filters import BaseFilterBackend
+
+from six import string_types
+
+__title__ = 'django_elasticsearch_dsl_drf.filter_backends.aggregations.base'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = ('BaseAggregationsFilterBackend',)
+
+
+class BaseAggregationsFilterBackend(BaseFilterBackend):
+    """Base aggregations filter backend.
+
+    Aggregations are defined in the view attribute named as given in
+    the ``aggregations_attribute``:
+
+        >>> {
+        >>>     'avg_price': {
+        >>>         'field': 'price',
+        >>>         'agg': 'avg',
+        >>>         'options': {},
+        >>>         'bucket': 'per_year',
+        >>>         'enabled': False,
+        >>>     },
+        >>> }
+
+    Top level aggregations are disabled by default and enabled either in
+    the aggregation options (``enabled`` set to True) or via query params
+    (``?aggregate=avg_price``). Aggregations given a ``bucket`` (name of a
+    bucket aggregation, dotted path for the nested ones) are added to that
+    bucket aggregation whenever it's present in the search.
+    """
+
+    aggregate_param = 'aggregate'
+    # Name of the view attribute holding the aggregations.
+    aggregations_attribute = None
+    # Aggregation types accepted.
+    aggregation_types = ()
+    # Aggregation type used when not specified.
+    default_aggregation_type = None
+
+    @classmethod
+    def prepare_aggregations(cls, view):
+        """Prepare aggregations.
+
+        :param view:
+        :type view: rest_framework.viewsets.ReadOnlyModelViewSet
+        :return: Aggregations options.
+        :rtype: dict
+        """
+        aggregations = copy.deepcopy(
+            getattr(view, cls.aggregations_attribute, None) or {}
+        )
+
+        for name, options in aggregations.items():
+            if options is None or isinstance(options, string_types):
+                aggregations[name] = {'field': options or name}
+
+            aggregations[name].setdefault('agg', cls.default_aggregation_type)
+            aggregations[name].setdefault('options', {})
+            aggregations[name].setdefault('bucket', None)
+            aggregations[name].setdefault('enabled', False)
+
+            if aggregations[name]['agg'] not in cls.aggregation_types:
+                raise ImproperlyConfigured(
+                    "Aggregation `{}` of the `{}` is of unsupported type "
+                    "`{}`. Supported types are: {}.".format(
+                        name,
+                        cls.aggregations_attribute,
+                        aggregations[name]['agg'],
+                        ', '.join(cls.aggregation_types)
+                    )
+                )
+
+        return aggregations
+
+    def get_aggregate_query_params(self, request):
+        """Get aggregate query params.
+
+        :param request: Django REST framework request.
+        :type request: rest_framework.request.Request
+        :return: List of names of the aggregations requested.
+        :rtype: list
+        """
+        return request.query_params.getlist(self.aggregate_param, [])
+
+    @classmethod
+    def get_aggregation(cls, name, options):
+        """Get aggregation.
+
+        :param name: Name of the aggregation.
+        :param options: Prepared options of the aggregation.
+        :type name: str
+        :type options: dict
+        :return: Aggregation.
+        :rtype: elasticsearch_dsl.aggs.Agg
+        """
+        params = dict(options['options'])
+        if options.get('field'):
+            params['field'] = options['field']
+        return A(options['agg'], **params)
+
+    @classmethod
+    def get_bucket(cls, queryset, path):
+        """Get bucket aggregation of the queryset by its (dotted) path.
+
+        :param queryset:
+        :param path: Name of the bucket aggregation, names of the nested
+            bucket aggregations are separated by dots.
+        :type queryset: elasticsearch_dsl.search.Search
+        :type path: str
+        :return: Bucket aggregation or None if not present.
+        :rtype: elasticsearch_dsl.aggs.Bucket
+        """
+        bucket = queryset.aggs
+        for name in path.split('.'):
+            if name not in bucket:
+                return None
+            bucket = bucket[name]
+        return bucket
+
+    def aggregate(self, request, queryset, view):
+        """Aggregate.
+
+        :param request:
+        :param queryset:
+        :param view:
+        :return:
+        """
+        aggregate_query_params = self.get_aggregate_query_params(request)
+        aggregations = self.prepare_aggregations(view)
+        for __name, __options in aggregations.items():
+            if __options['bucket']:
+                parent = self.get_bucket(queryset, __options['bucket'])
+                if parent is None:
+                    continue
+            elif __options['enabled'] or __name in aggregate_query_params:
+                parent = queryset.aggs
+            else:
+                continue
+
+            parent[__name] = self.get_aggregation(__name, __options)
+
+        return queryset
+
+    def filter_queryset(self, request, queryset, view):
+        """Filter the queryset.
+
+        :param request: Django REST framework request.
+        :param queryset: Base queryset.
+        :param view: View.
+        :type request: rest_framework.request.Request
+        :type queryset: elasticsearch_dsl.search.Search
+        :type view: rest_framework.viewsets.ReadOnlyModelViewSet
+        :return: Updated queryset.
+        :rtype: elasticsearch_dsl.search.Search
+        """
+        return self.aggregate(request, queryset, view)
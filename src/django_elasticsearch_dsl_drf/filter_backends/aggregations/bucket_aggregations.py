@@ -0,0 +1,73 @@
+"""
+Bucket aggregations filter backend.
+"""
+
+from ...constants import AGGREGATION_TERMS, ALL_BUCKET_AGGREGATIONS
+from .base import BaseAggregationsFilterBackend
+
+__title__ = 'django_elasticsearch_dsl_drf.filter_backends.aggregations.' \
+            'bucket_aggregations'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = ('BucketAggregationsFilterBackend',)
+
+
+class BucketAggregationsFilterBackend(BaseAggregationsFilterBackend):
+    """Bucket aggregations filter backend.
+
+    Example:
+
+        >>> from django_elasticsearch_dsl_drf.filter_backends import (
+        >>>     BucketAggregationsFilterBackend
+        >>> )
+        >>> from django_elasticsearch_dsl_drf.viewsets import (
+        >>>     BaseDocumentViewSet,
+        >>> )
+        >>>
+        >>> # Local article document definition
+        >>> from .documents import ArticleDocument
+        >>>
+        >>> # Local article document serializer
+        >>> from .serializers import ArticleDocumentSerializer
+        >>>
+        >>> class ArticleDocumentView(BaseDocumentViewSet):
+        >>>
+        >>>     document = ArticleDocument
+        >>>     serializer_class = ArticleDocumentSerializer
+        >>>     filter_backends = [BucketAggregationsFilterBackend,]
+        >>>     bucket_aggregations = {
+        >>>         'states': 'state.raw',  # Uses `terms` by default
+        >>>         'per_month': {
+        >>>             'field': 'date_published',
+        >>>             'agg': 'date_histogram',
+        >>>             'options': {
+        >>>                 'calendar_interval': 'month',
+        >>>             },
+        >>>             'enabled': True,
+        >>>         },
+        >>>         'states_per_month': {
+        >>>             'field': 'state.raw',
+        >>>             'bucket': 'per_month',
+        >>>         },
+        >>>         'by_publisher_and_state': {
+        >>>             'agg': 'composite',
+        >>>             'options': {
+        >>>                 'sources': [
+        >>>                     {'publisher': {
+        >>>                         'terms': {'field': 'publisher.raw'}}},
+        >>>                     {'state': {'terms': {'field': 'state.raw'}}},
+        >>>                 ],
+        >>>                 'size': 100,
+        >>>             },
+        >>>         },
+        >>>     }
+
+    Supported types are ``terms``, ``histogram``, ``date_histogram`` and
+    ``composite``. Aggregation results are returned in the ``facets`` of
+    the response.
+    """
+
+    aggregations_attribute = 'bucket_aggregations'
+    aggregation_types = ALL_BUCKET_AGGREGATIONS
+    default_aggregation_type = AGGREGATION_TERMS
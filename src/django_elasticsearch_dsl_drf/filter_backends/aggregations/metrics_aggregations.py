@@ -0,0 +1,73 @@
+"""
+Metrics aggregations filter backend.
+"""
+
+from ...constants import ALL_METRICS_AGGREGATIONS
+from .base import BaseAggregationsFilterBackend
+
+__title__ = 'django_elasticsearch_dsl_drf.filter_backends.aggregations.' \
+            'metrics_aggregations'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = ('MetricsAggregationsFilterBackend',)
+
+
+class MetricsAggregationsFilterBackend(BaseAggregationsFilterBackend):
+    """Metrics aggregations filter backend.
+
+    Shall be placed after the ``BucketAggregationsFilterBackend`` in the
+    filter backends of the view, if metrics are computed per bucket.
+
+    Example:
+
+        >>> from django_elasticsearch_dsl_drf.filter_backends import (
+        >>>     BucketAggregationsFilterBackend,
+        >>>     MetricsAggregationsFilterBackend,
+        >>> )
+        >>> from django_elasticsearch_dsl_drf.viewsets import (
+        >>>     BaseDocumentViewSet,
+        >>> )
+        >>>
+        >>> # Local book document definition
+        >>> from .documents import BookDocument
+        >>>
+        >>> # Local book document serializer
+        >>> from .serializers import BookDocumentSerializer
+        >>>
+        >>> class BookDocumentView(BaseDocumentViewSet):
+        >>>
+        >>>     document = BookDocument
+        >>>     serializer_class = BookDocumentSerializer
+        >>>     filter_backends = [
+        >>>         BucketAggregationsFilterBackend,
+        >>>         MetricsAggregationsFilterBackend,
+        >>>     ]
+        >>>     bucket_aggregations = {
+        >>>         'states': 'state.raw',
+        >>>     }
+        >>>     metrics_aggregations = {
+        >>>         'avg_price': {
+        >>>             'field': 'price',
+        >>>             'agg': 'avg',
+        >>>         },
+        >>>         'avg_price_per_state': {
+        >>>             'field': 'price',
+        >>>             'agg': 'avg',
+        >>>             'bucket': 'states',
+        >>>         },
+        >>>         'price_percentiles': {
+        >>>             'field': 'price',
+        >>>             'agg': 'percentiles',
+        >>>             'options': {
+        >>>                 'percents': [50, 95, 99],
+        >>>             },
+        >>>         },
+        >>>     }
+
+    Supported types are ``avg``, ``sum``, ``cardinality`` and
+    ``percentiles``. Aggregation type is required.
+    """
+
+    aggregations_attribute = 'metrics_aggregations'
+    aggregation_types = ALL_METRICS_AGGREGATIONS
@@ -0,0 +1,91 @@
+"""
+Pipeline aggregations filter backend.
+"""
+
+from ...constants import ALL_PIPELINE_AGGREGATIONS
+from .base import BaseAggregationsFilterBackend
+
+__title__ = 'django_elasticsearch_dsl_drf.filter_backends.aggregations.' \
+            'pipeline_aggregations'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = ('PipelineAggregationsFilterBackend',)
+
+
+class PipelineAggregationsFilterBackend(BaseAggregationsFilterBackend):
+    """Pipeline aggregations filter backend.
+
+    Pipeline aggregations work on the outputs of other aggregations, thus
+    shall be placed after the ``BucketAggregationsFilterBackend`` and
+    ``MetricsAggregationsFilterBackend`` in the filter backends of the
+    view. Both supported types (``bucket_sort`` and ``derivative``) are
+    parent pipeline aggregations, so ``bucket`` shall be given.
+
+    Example:
+
+        >>> class BookDocumentView(BaseDocumentViewSet):
+        >>>
+        >>>     document = BookDocument
+        >>>     serializer_class = BookDocumentSerializer
+        >>>     filter_backends = [
+        >>>         BucketAggregationsFilterBackend,
+        >>>         MetricsAggregationsFilterBackend,
+        >>>         PipelineAggregationsFilterBackend,
+        >>>     ]
+        >>>     bucket_aggregations = {
+        >>>         'per_year': {
+        >>>             'field': 'publication_date',
+        >>>             'agg': 'date_histogram',
+        >>>             'options': {
+        >>>                 'calendar_interval': 'year',
+        >>>             },
+        >>>         },
+        >>>     }
+        >>>     metrics_aggregations = {
+        >>>         'total_pages': {
+        >>>             'field': 'pages',
+        >>>             'agg': 'sum',
+        >>>             'bucket': 'per_year',
+        >>>         },
+        >>>     }
+        >>>     pipeline_aggregations = {
+        >>>         'total_pages_derivative': {
+        >>>             'agg': 'derivative',
+        >>>             'bucket': 'per_year',
+        >>>             'options': {
+        >>>                 'buckets_path': 'total_pages',
+        >>>             },
+        >>>         },
+        >>>         'top_years': {
+        >>>             'agg': 'bucket_sort',
+        >>>             'bucket': 'per_year',
+        >>>             'options': {
+        >>>                 'sort': [{'total_pages': {'order': 'desc'}}],
+        >>>                 'size': 3,
+        >>>             },
+        >>>         },
+        >>>     }
+    """
+
+    aggregations_attribute = 'pipeline_aggregations'
+    aggregation_types = ALL_PIPELINE_AGGREGATIONS
+
+    @classmethod
+    def prepare_aggregations(cls, view):
+        """Prepare aggregations.
+
+        Pipeline aggregations have no ``field``.
+
+        :param view:
+        :type view: rest_framework.viewsets.ReadOnlyModelViewSet
+        :return: Aggregations options.
+        :rtype: dict
+        """
+        aggregations = super(
+            PipelineAggregationsFilterBackend,
+            cls
+        ).prepare_aggregations(view)
+        for options in aggregations.values():
+            options.pop('field', None)
+        return aggregations
@@ -3,12 +3,15 @@ Faceted search backend.
 """
 import copy
 from elasticsearch_dsl import TermsFacet
-from elasticsearch_dsl.query import Q
+from elasticsearch_dsl.query import Bool, Q
 
 from rest_framework.filters import BaseFilterBackend
 
 from six import string_types, iteritems
 
+from ..cache import FacetCacheResponseClass
+from .filtering.post_filter import PostFilterFilteringFilterBackend
+
 __title__ = 'django_elasticsearch_dsl_drf.faceted_search'
 __author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
 __copyright__ = '2017-2019 Artur Barseghyan'
@@ -66,9 +69,25 @@ class FacetedSearchFilterBackend(BaseFilterBackend):
     facets are disabled and enabled only explicitly either in the filter
     options (`enabled` set to True) or via query params
     `?facet=state&facet=date_published`.
+
+    If ``disjunctive`` is set to True, facets are disjunctive
+    (multi-select): if the ``PostFilterFilteringFilterBackend`` is used as
+    well, each (non-global) facet is filtered by the post filters of all
+    other fields, but not by the post filters of its own field. Thus, counts
+    of the other values of the selected facets are kept, all in the same
+    search request.
+
+    Global facets ignore the query, thus their results are the same for
+    all searches against the index. If ``facet_cache_class`` (see
+    ``django_elasticsearch_dsl_drf.cache.FacetCache``) is set on the view,
+    results of the global facets are cached per index generation and are
+    not requested from Elasticsearch while cached.
     """
 
     faceted_search_param = 'facet'
+    # If set to True, facets are filtered by the post filters of the other
+    # fields (multi-select).
+    disjunctive = False
 
     @classmethod
     def prepare_faceted_search_fields(cls, view):
@@ -178,11 +197,41 @@ class FacetedSearchFilterBackend(BaseFilterBackend):
                                 **faceted_search_fields[__field]['options']
                             ),
                             'global': faceted_search_fields[__field]['global'],
+                            'field': faceted_search_fields[__field]['field'],
                         }
                     }
                 )
         return __facets
 
+    def get_post_filter_clauses(self, request, view):
+        """Get post filter clauses, grouped by the (Elasticsearch) field.
+
+        :param request:
+        :param view:
+        :return: Post filter clauses (list of queries) by field name.
+        :rtype: dict
+        """
+        if not self.disjunctive:
+            return {}
+
+        for backend in getattr(view, 'filter_backends', []):
+            if isinstance(backend, type) \
+                    and issubclass(backend, PostFilterFilteringFilterBackend):
+                return backend().get_post_filter_clauses(request, view)
+        return {}
+
+    def get_facet_cache(self, view):
+        """Get facet cache of the view.
+
+        :param view:
+        :return: Facet cache or None if not configured.
+        :rtype: django_elasticsearch_dsl_drf.cache.FacetCache
+        """
+        facet_cache_class = getattr(view, 'facet_cache_class', None)
+        if facet_cache_class is None:
+            return None
+        return facet_cache_class()
+
     def aggregate(self, request, queryset, view):
         """Aggregate.
 
@@ -192,27 +241,60 @@ class FacetedSearchFilterBackend(BaseFilterBackend):
         :return:
         """
         __facets = self.construct_facets(request, view)
+        __post_filter_clauses = self.get_post_filter_clauses(request, view)
+        __facet_cache = self.get_facet_cache(view)
+        __cached = {}
+        __keys = {}
         for __field, __facet in iteritems(__facets):
             agg = __facet['facet'].get_aggregation()
-            agg_filter = Q('match_all')
-
-            # TODO: Implement
-            # for __filter_field, __filter in iteritems(self._filters):
-            #     if __field == __filter_field:
-            #         continue
-            #     agg_filter &= __filter
 
             if __facet['global']:
+                __name = '_filter_' + __field
+                if __facet_cache is not None:
+                    __key = __facet_cache.make_key(
+                        view.index,
+                        {'name': __name, 'aggregation': agg.to_dict()}
+                    )
+                    __data = __facet_cache.get(__key)
+                    if __data is not None:
+                        __cached[__name] = __data
+                        continue
+                    __keys[__name] = __key
+
                 queryset.aggs.bucket(
-                    '_filter_' + __field,
+                    __name,
                     'global'
                 ).bucket(__field, agg)
+                continue
+
+            # Filter the facet by the post filters of all other fields
+            agg_filters = [
+                __clause
+                for __filter_field, __clauses
+                in iteritems(__post_filter_clauses)
+                if __filter_field != __facet['field']
+                for __clause in __clauses
+            ]
+            if agg_filters:
+                agg_filter = Bool(filter=agg_filters)
             else:
-                queryset.aggs.bucket(
-                    '_filter_' + __field,
-                    'filter',
-                    filter=agg_filter
-                ).bucket(__field, agg)
+                agg_filter = Q('match_all')
+
+            queryset.aggs.bucket(
+                '_filter_' + __field,
+                'filter',
+                filter=agg_filter
+            ).bucket(__field, agg)
+
+        if __cached or __keys:
+            queryset = queryset.response_class(
+                FacetCacheResponseClass(
+                    queryset._response_class,
+                    __facet_cache,
+                    __cached,
+                    __keys
+                )
+            )
 
         return queryset
 
@@ -2,6 +2,7 @@
 Common filtering backend.
 """
 
+import copy
 import operator
 
 from elasticsearch_dsl.query import Q
@@ -17,6 +18,7 @@ from ...constants import (
     ALL_LOOKUP_FILTERS_AND_QUERIES,
     LOOKUP_FILTER_PREFIX,
     LOOKUP_FILTER_RANGE,
+    LOOKUP_FILTER_TERM,
     LOOKUP_FILTER_TERMS,
     LOOKUP_FILTER_EXISTS,
     LOOKUP_FILTER_WILDCARD,
@@ -30,11 +32,13 @@ from ...constants import (
     LOOKUP_QUERY_ENDSWITH,
     LOOKUP_QUERY_ISNULL,
     LOOKUP_QUERY_EXCLUDE,
+    SEPARATOR_LOOKUP_FILTER,
 )
 from ..mixins import FilterBackendMixin
 
 from ...compat import coreapi
 from ...compat import coreschema
+from ...utils import ClauseCollector
 
 
 __title__ = 'django_elasticsearch_dsl_drf.filter_backends.filtering.common'
@@ -88,16 +92,96 @@ class FilteringFilterBackend(BaseFilterBackend, FilterBackendMixin):
         >>> }
     """
 
+    # Lookup dispatch table. Maps lookup names to the names of the methods
+    # applying them. Lookups not listed here are handled by the
+    # ``default_lookup_handler``. Use ``register_lookup_handler`` to add
+    # custom lookups.
+    lookup_handlers = {
+        LOOKUP_FILTER_TERM: 'apply_filter_term',
+        LOOKUP_FILTER_TERMS: 'apply_filter_terms',
+        LOOKUP_FILTER_PREFIX: 'apply_filter_prefix',
+        LOOKUP_QUERY_STARTSWITH: 'apply_filter_prefix',
+        LOOKUP_FILTER_RANGE: 'apply_filter_range',
+        LOOKUP_FILTER_EXISTS: 'apply_query_exists',
+        LOOKUP_FILTER_WILDCARD: 'apply_query_wildcard',
+        LOOKUP_QUERY_CONTAINS: 'apply_query_contains',
+        LOOKUP_QUERY_IN: 'apply_query_in',
+        LOOKUP_QUERY_GT: 'apply_query_gt',
+        LOOKUP_QUERY_GTE: 'apply_query_gte',
+        LOOKUP_QUERY_LT: 'apply_query_lt',
+        LOOKUP_QUERY_LTE: 'apply_query_lte',
+        LOOKUP_QUERY_ENDSWITH: 'apply_query_endswith',
+        LOOKUP_QUERY_ISNULL: 'apply_query_isnull',
+        LOOKUP_QUERY_EXCLUDE: 'apply_query_exclude',
+    }
+
+    # `term` filter lookup. This is default if no `default_lookup`
+    # option has been given or explicit lookup provided.
+    default_lookup_handler = 'apply_filter_term'
+
+    # Compiled filter plans, keyed by (filter backend class, view class).
+    _filter_plans = {}
+
+    @classmethod
+    def register_lookup_handler(cls, lookup, handler):
+        """Register lookup handler.
+
+        The handler is registered for the given class (and its descendants)
+        only, leaving the dispatch table of the parent classes intact.
+
+        Example:
+
+            >>> class RegexpFilteringFilterBackend(FilteringFilterBackend):
+            >>>
+            >>>     @classmethod
+            >>>     def apply_filter_regexp(cls, queryset, options, value):
+            >>>         return cls.apply_filter(
+            >>>             queryset=queryset,
+            >>>             options=options,
+            >>>             args=['regexp'],
+            >>>             kwargs={options['field']: value}
+            >>>         )
+            >>>
+            >>> RegexpFilteringFilterBackend.register_lookup_handler(
+            >>>     LOOKUP_FILTER_REGEXP,
+            >>>     'apply_filter_regexp'
+            >>> )
+
+        :param lookup: Lookup name.
+        :param handler: Name of the method handling the lookup.
+        :type lookup: str
+        :type handler: str
+        """
+        if 'lookup_handlers' not in cls.__dict__:
+            cls.lookup_handlers = dict(cls.lookup_handlers)
+        cls.lookup_handlers[lookup] = handler
+
+    def get_lookup_handler(self, lookup):
+        """Get lookup handler.
+
+        :param lookup: Lookup name.
+        :type lookup: str
+        :return: Method applying the lookup.
+        :rtype: callable
+        """
+        return getattr(
+            self,
+            self.lookup_handlers.get(lookup, self.default_lookup_handler)
+        )
+
     @classmethod
     def prepare_filter_fields(cls, view):
         """Prepare filter fields.
 
+        The ``filter_fields`` of the view are not modified. A normalised
+        copy is returned instead.
+
         :param view:
         :type view: rest_framework.viewsets.ReadOnlyModelViewSet
         :return: Filtering options.
         :rtype: dict
         """
-        filter_fields = view.filter_fields
+        filter_fields = copy.deepcopy(view.filter_fields)
 
         for field, options in filter_fields.items():
             if options is None or isinstance(options, string_types):
@@ -114,6 +198,106 @@ class FilteringFilterBackend(BaseFilterBackend, FilterBackendMixin):
 
         return filter_fields
 
+    @classmethod
+    def get_filter_plan_entry(cls, view, field_name, field_options, lookup):
+        """Get a single filter plan entry.
+
+        :param view:
+        :param field_name: Name of the field as given in the filter fields.
+        :param field_options: Prepared options of the field.
+        :param lookup: Lookup to apply (None if not specified).
+        :type view: rest_framework.viewsets.ReadOnlyModelViewSet
+        :type field_name: str
+        :type field_options: dict
+        :type lookup: str
+        :return: Filter options (without values) for a single query param.
+        :rtype: dict
+        """
+        return {
+            'lookup': lookup,
+            'field': field_options.get('field', field_name),
+            'type': view.mapping,
+        }
+
+    @classmethod
+    def compile_filter_plan(cls, view):
+        """Compile filter plan.
+
+        Turns the prepared filter fields into a lookup table of all
+        accepted query param names. Having the following filter fields:
+
+            >>> {
+            >>>     'id': {
+            >>>         'field': 'id',
+            >>>         'lookups': [
+            >>>             LOOKUP_FILTER_TERMS,
+            >>>             LOOKUP_QUERY_GTE,
+            >>>         ],
+            >>>     },
+            >>> }
+
+        The following structure is produced:
+
+            >>> {
+            >>>     'id': {'lookup': None, 'field': 'id', 'type': 'doc'},
+            >>>     'id__terms': {'lookup': 'terms', 'field': 'id', ...},
+            >>>     'id__gte': {'lookup': 'gte', 'field': 'id', ...},
+            >>> }
+
+        :param view:
+        :type view: rest_framework.viewsets.ReadOnlyModelViewSet
+        :return: Filter plan.
+        :rtype: dict
+        """
+        filter_plan = {}
+        filter_fields = cls.prepare_filter_fields(view)
+        for field_name, field_options in filter_fields.items():
+            # If we have default lookup given use it as a default and
+            # do not require further suffix specification.
+            default_lookup = field_options.get('default_lookup')
+            if default_lookup is not None:
+                default_lookup = str(default_lookup)
+
+            filter_plan[field_name] = cls.get_filter_plan_entry(
+                view,
+                field_name,
+                field_options,
+                default_lookup
+            )
+
+            for lookup in field_options['lookups']:
+                query_param = SEPARATOR_LOOKUP_FILTER.join(
+                    (field_name, lookup)
+                )
+                filter_plan[query_param] = cls.get_filter_plan_entry(
+                    view,
+                    field_name,
+                    field_options,
+                    lookup
+                )
+
+        return filter_plan
+
+    @classmethod
+    def get_filter_plan(cls, view):
+        """Get filter plan.
+
+        The filter plan is compiled once per view class and shared between
+        requests afterwards. It shall be treated as read-only.
+
+        :param view:
+        :type view: rest_framework.viewsets.ReadOnlyModelViewSet
+        :return: Filter plan.
+        :rtype: dict
+        """
+        key = (cls, view.__class__)
+        try:
+            return cls._filter_plans[key]
+        except KeyError:
+            filter_plan = cls.compile_filter_plan(view)
+            cls._filter_plans[key] = filter_plan
+            return filter_plan
+
     @classmethod
     def get_range_params(cls, value):
         """Get params for `range` query.
@@ -686,60 +870,35 @@ class FilteringFilterBackend(BaseFilterBackend, FilterBackendMixin):
         :return: Request query params to filter on.
         :rtype: dict
         """
-        query_params = request.query_params.copy()
+        query_params = request.query_params
 
         filter_query_params = {}
-        filter_fields = self.prepare_filter_fields(view)
+        filter_plan = self.get_filter_plan(view)
         for query_param in query_params:
-            query_param_list = self.split_lookup_filter(
-                query_param,
-                maxsplit=1
-            )
-            field_name = query_param_list[0]
-
-            if field_name in filter_fields:
-                lookup_param = None
-                if len(query_param_list) > 1:
-                    lookup_param = query_param_list[1]
-
-                valid_lookups = filter_fields[field_name]['lookups']
-
-                # If we have default lookup given use it as a default and
-                # do not require further suffix specification.
-                default_lookup = None
-                if 'default_lookup' in filter_fields[field_name]:
-                    default_lookup = \
-                        filter_fields[field_name]['default_lookup']
-
-                if lookup_param is None or lookup_param in valid_lookups:
-
-                    # If we have default lookup given use it as a default
-                    # and do not require further suffix specification.
-                    if lookup_param is None and default_lookup is not None:
-                        lookup_param = str(default_lookup)
-
-                    values = [
-                        __value.strip()
-                        for __value
-                        in query_params.getlist(query_param)
-                        if __value.strip() != ''
-                    ]
-
-                    if values:
-                        filter_query_params[query_param] = {
-                            'lookup': lookup_param,
-                            'values': values,
-                            'field': filter_fields[field_name].get(
-                                'field',
-                                field_name
-                            ),
-                            'type': view.mapping
-                        }
+            options = filter_plan.get(query_param)
+            if options is None:
+                continue
+
+            values = [
+                __value.strip()
+                for __value
+                in query_params.getlist(query_param)
+                if __value.strip() != ''
+            ]
+
+            if values:
+                filter_query_params[query_param] = dict(
+                    options,
+                    values=values
+                )
         return filter_query_params
 
     def filter_queryset(self, request, queryset, view):
         """Filter the queryset.
 
+        Clauses of all query params are collected first and applied to
+        the queryset at once.
+
         :param request: Django REST framework request.
         :param queryset: Base queryset.
         :param view: View.
@@ -749,114 +908,38 @@ class FilteringFilterBackend(BaseFilterBackend, FilterBackendMixin):
         :return: Updated queryset.
         :rtype: elasticsearch_dsl.search.Search
         """
+        clauses = ClauseCollector(queryset)
         filter_query_params = self.get_filter_query_params(request, view)
         for options in filter_query_params.values():
-            # When no specific lookup given, in case of multiple values
-            # we apply `terms` filter by default and proceed to the next
-            # query param.
-            if isinstance(options['values'], (list, tuple)) \
-                    and options['lookup'] is None:
-                queryset = self.apply_filter_terms(queryset,
-                                                   options,
-                                                   options['values'])
-                continue
+            clauses = self.collect_clauses(clauses, options)
 
-            # For all other cases, when we don't have multiple values,
-            # we follow the normal flow.
-            for value in options['values']:
-                # `terms` filter lookup
-                if options['lookup'] == LOOKUP_FILTER_TERMS:
-                    queryset = self.apply_filter_terms(queryset,
-                                                       options,
-                                                       value)
-
-                # `prefix` filter lookup
-                elif options['lookup'] in (LOOKUP_FILTER_PREFIX,
-                                           LOOKUP_QUERY_STARTSWITH):
-                    queryset = self.apply_filter_prefix(queryset,
-                                                        options,
-                                                        value)
-
-                # `range` filter lookup
-                elif options['lookup'] == LOOKUP_FILTER_RANGE:
-                    queryset = self.apply_filter_range(queryset,
-                                                       options,
-                                                       value)
-
-                # `exists` filter lookup
-                elif options['lookup'] == LOOKUP_FILTER_EXISTS:
-                    queryset = self.apply_query_exists(queryset,
-                                                       options,
-                                                       value)
-
-                # `wildcard` filter lookup
-                elif options['lookup'] == LOOKUP_FILTER_WILDCARD:
-                    queryset = self.apply_query_wildcard(queryset,
-                                                         options,
-                                                         value)
-
-                # `contains` filter lookup
-                elif options['lookup'] == LOOKUP_QUERY_CONTAINS:
-                    queryset = self.apply_query_contains(queryset,
-                                                         options,
-                                                         value)
-
-                # `in` functional query lookup
-                elif options['lookup'] == LOOKUP_QUERY_IN:
-                    queryset = self.apply_query_in(queryset,
-                                                   options,
-                                                   value)
-
-                # `gt` functional query lookup
-                elif options['lookup'] == LOOKUP_QUERY_GT:
-                    queryset = self.apply_query_gt(queryset,
-                                                   options,
-                                                   value)
-
-                # `gte` functional query lookup
-                elif options['lookup'] == LOOKUP_QUERY_GTE:
-                    queryset = self.apply_query_gte(queryset,
-                                                    options,
-                                                    value)
-
-                # `lt` functional query lookup
-                elif options['lookup'] == LOOKUP_QUERY_LT:
-                    queryset = self.apply_query_lt(queryset,
-                                                   options,
-                                                   value)
-
-                # `lte` functional query lookup
-                elif options['lookup'] == LOOKUP_QUERY_LTE:
-                    queryset = self.apply_query_lte(queryset,
-                                                    options,
-                                                    value)
-
-                # `endswith` filter lookup
-                elif options['lookup'] == LOOKUP_QUERY_ENDSWITH:
-                    queryset = self.apply_query_endswith(queryset,
-                                                         options,
-                                                         value)
-
-                # `isnull` functional query lookup
-                elif options['lookup'] == LOOKUP_QUERY_ISNULL:
-                    queryset = self.apply_query_isnull(queryset,
-                                                       options,
-                                                       value)
-
-                # `exclude` functional query lookup
-                elif options['lookup'] == LOOKUP_QUERY_EXCLUDE:
-                    queryset = self.apply_query_exclude(queryset,
-                                                        options,
-                                                        value)
-
-                # `term` filter lookup. This is default if no `default_lookup`
-                # option has been given or explicit lookup provided.
-                else:
-                    queryset = self.apply_filter_term(queryset,
-                                                      options,
-                                                      value)
+        return clauses.build()
 
-        return queryset
+    def collect_clauses(self, clauses, options):
+        """Collect clauses of a single query param.
+
+        :param clauses: Clause collector.
+        :param options: Filter options (with values) of the query param.
+        :type clauses: django_elasticsearch_dsl_drf.utils.ClauseCollector
+        :type options: dict
+        :return: Updated clause collector.
+        :rtype: django_elasticsearch_dsl_drf.utils.ClauseCollector
+        """
+        # When no specific lookup given, in case of multiple values
+        # we apply `terms` filter by default and proceed to the next
+        # query param.
+        if isinstance(options['values'], (list, tuple)) \
+                and options['lookup'] is None:
+            return self.apply_filter_terms(clauses,
+                                           options,
+                                           options['values'])
+
+        # For all other cases, when we don't have multiple values,
+        # we follow the normal flow.
+        handler = self.get_lookup_handler(options['lookup'])
+        for value in options['values']:
+            clauses = handler(clauses, options, value)
+        return clauses
 
     def get_coreschema_field(self, field):
         if isinstance(field, fields.IntegerField):
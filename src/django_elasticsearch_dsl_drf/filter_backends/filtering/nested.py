@@ -2,6 +2,8 @@
 Nested filtering backend.
 """
 
+import copy
+
 from elasticsearch_dsl.query import Q
 from django.core.exceptions import ImproperlyConfigured
 from django_elasticsearch_dsl import fields
@@ -86,7 +88,7 @@ class NestedFilteringFilterBackend(FilteringFilterBackend):
                 "".format(view.__class__.__name__, cls.__name__)
             )
 
-        filter_fields = view.nested_filter_fields
+        filter_fields = copy.deepcopy(view.nested_filter_fields)
 
         for field, options in filter_fields.items():
             if options is None or isinstance(options, string_types):
@@ -103,7 +105,8 @@ class NestedFilteringFilterBackend(FilteringFilterBackend):
 
         return filter_fields
 
-    def get_filter_field_nested_path(self, filter_fields, field_name):
+    @classmethod
+    def get_filter_field_nested_path(cls, filter_fields, field_name):
         """Get filter field path to be used in nested query.
 
         :param filter_fields:
@@ -114,58 +117,30 @@ class NestedFilteringFilterBackend(FilteringFilterBackend):
             return filter_fields[field_name]['path']
         return field_name
 
-    def get_filter_query_params(self, request, view):
-        """Get query params to be filtered on.
+    @classmethod
+    def get_filter_plan_entry(cls, view, field_name, field_options, lookup):
+        """Get a single filter plan entry.
 
-        :param request: Django REST framework request.
-        :param view: View.
-        :type request: rest_framework.request.Request
+        :param view:
+        :param field_name: Name of the field as given in the filter fields.
+        :param field_options: Prepared options of the field.
+        :param lookup: Lookup to apply (None if not specified).
         :type view: rest_framework.viewsets.ReadOnlyModelViewSet
-        :return: Request query params to filter on.
+        :type field_name: str
+        :type field_options: dict
+        :type lookup: str
+        :return: Filter options (without values) for a single query param.
         :rtype: dict
         """
-        query_params = request.query_params.copy()
-
-        filter_query_params = {}
-        filter_fields = self.prepare_filter_fields(view)
-        for query_param in query_params:
-            query_param_list = self.split_lookup_filter(
-                query_param,
-                maxsplit=1
-            )
-            field_name = query_param_list[0]
-
-            if field_name in filter_fields:
-                lookup_param = None
-                if len(query_param_list) > 1:
-                    lookup_param = query_param_list[1]
-
-                valid_lookups = filter_fields[field_name]['lookups']
-                nested_path = self.get_filter_field_nested_path(
-                    filter_fields,
-                    field_name
-                )
-
-                if lookup_param is None or lookup_param in valid_lookups:
-                    values = [
-                        __value.strip()
-                        for __value
-                        in query_params.getlist(query_param)
-                        if __value.strip() != ''
-                    ]
-
-                    if values:
-                        filter_query_params[query_param] = {
-                            'lookup': lookup_param,
-                            'values': values,
-                            'field': filter_fields[field_name].get(
-                                'field',
-                                field_name
-                            ),
-                            'type': view.mapping,
-                            'path': nested_path,
-                        }
-        return filter_query_params
+        entry = super(
+            NestedFilteringFilterBackend,
+            cls
+        ).get_filter_plan_entry(view, field_name, field_options, lookup)
+        entry['path'] = cls.get_filter_field_nested_path(
+            {field_name: field_options},
+            field_name
+        )
+        return entry
 
     @classmethod
     def apply_filter(cls, queryset, options=None, args=None, kwargs=None):
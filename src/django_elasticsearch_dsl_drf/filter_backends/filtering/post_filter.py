@@ -2,13 +2,19 @@
 The ``post_filter`` filtering backend.
 """
 
+import copy
+from collections import OrderedDict
+
 from django_elasticsearch_dsl import fields
 
+from elasticsearch_dsl import Search
+
 from six import string_types
 
 from ...compat import coreapi
 from ...compat import coreschema
 from ...constants import ALL_LOOKUP_FILTERS_AND_QUERIES
+from ...utils import ClauseCollector
 
 from .common import FilteringFilterBackend
 
@@ -72,7 +78,7 @@ class PostFilterFilteringFilterBackend(FilteringFilterBackend):
         :return: Filtering options.
         :rtype: dict
         """
-        filter_fields = view.post_filter_fields
+        filter_fields = copy.deepcopy(view.post_filter_fields)
 
         for field, options in filter_fields.items():
             if options is None or isinstance(options, string_types):
@@ -121,6 +127,32 @@ class PostFilterFilteringFilterBackend(FilteringFilterBackend):
             kwargs = {}
         return queryset.post_filter(*args, **kwargs)
 
+    def get_post_filter_clauses(self, request, view):
+        """Get post filter clauses, grouped by the (Elasticsearch) field.
+
+        Used by the ``FacetedSearchFilterBackend`` to filter each facet by
+        the post filters of all other fields.
+
+        :param request: Django REST framework request.
+        :param view: View.
+        :type request: rest_framework.request.Request
+        :type view: rest_framework.viewsets.ReadOnlyModelViewSet
+        :return: Post filter clauses (list of queries) by field name.
+        :rtype: collections.OrderedDict
+        """
+        post_filter_clauses = OrderedDict()
+        filter_query_params = self.get_filter_query_params(request, view)
+        for options in filter_query_params.values():
+            search = self.collect_clauses(
+                ClauseCollector(Search()),
+                options
+            ).build()
+            if search.post_filter._proxied is not None:
+                post_filter_clauses.setdefault(options['field'], []).append(
+                    search.post_filter._proxied
+                )
+        return post_filter_clauses
+
     def get_coreschema_field(self, field):
         if isinstance(field, fields.IntegerField):
             field_cls = coreschema.Number
@@ -0,0 +1,493 @@
+"""
+Instrumentation of the search requests.
+"""
+
+import atexit
+import hashlib
+import json
+import logging
+import threading
+import timeit
+from collections import OrderedDict
+
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+
+__title__ = 'django_elasticsearch_dsl_drf.instrumentation'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = (
+    'FilterBackendProfiler',
+    'get_query_fingerprint',
+    'MetricsResponseClass',
+    'normalize_query',
+    'SearchMetrics',
+    'STRUCTURAL_KEYS',
+)
+
+LOGGER = logging.getLogger(__name__)
+
+# Values of these keys describe the shape of the query (fields, types,
+# options), thus are kept in the normalized query.
+STRUCTURAL_KEYS = (
+    'calendar_interval',
+    'default_operator',
+    'field',
+    'fields',
+    'fixed_interval',
+    'interval',
+    'mode',
+    'operator',
+    'order',
+    'path',
+    'type',
+)
+
+PLACEHOLDER = '?'
+
+
+def normalize_query(query):
+    """Normalize the query (search body), stripping the literal values.
+
+    Literal values (search terms, filter values, sizes, offsets, etc.) are
+    replaced with placeholders, lists of literal values are collapsed into
+    a single placeholder. Values of the ``STRUCTURAL_KEYS`` are kept.
+
+        >>> normalize_query({
+        >>>     'query': {'terms': {'state.raw': ['published', 'rejected']}},
+        >>>     'from': 20,
+        >>>     'size': 10,
+        >>> })
+        {'query': {'terms': {'state.raw': ['?']}}, 'from': '?', 'size': '?'}
+
+    :param query: Search body.
+    :type query: dict
+    :return: Normalized query.
+    :rtype: dict
+    """
+    if isinstance(query, dict):
+        return {
+            __key: (
+                __value
+                if __key in STRUCTURAL_KEYS
+                and not isinstance(__value, dict)
+                else normalize_query(__value)
+            )
+            for __key, __value in query.items()
+        }
+
+    if isinstance(query, (list, tuple)):
+        items = [normalize_query(__item) for __item in query]
+        if items and all(__item == PLACEHOLDER for __item in items):
+            return [PLACEHOLDER]
+        return items
+
+    return PLACEHOLDER
+
+
+def get_query_fingerprint(query):
+    """Get fingerprint of the query (search body).
+
+    Queries of the same shape (differing in literal values only) have the
+    same fingerprint.
+
+    :param query: Search body.
+    :type query: dict
+    :return: Fingerprint (hex digest).
+    :rtype: str
+    """
+    return hashlib.sha1(
+        json.dumps(
+            normalize_query(query),
+            sort_keys=True,
+            separators=(',', ':'),
+            default=str
+        ).encode('utf8')
+    ).hexdigest()
+
+
+class SearchMetrics(object):
+    """Metrics of a search request.
+
+    All times are in milliseconds, None if not measured.
+
+    - ``fingerprint``: Query fingerprint (see ``get_query_fingerprint``).
+    - ``query``: Normalized query (see ``normalize_query``).
+    - ``took``: Time Elasticsearch took to execute the search, as reported
+      by Elasticsearch.
+    - ``search_time``: Time spent executing the search (transport time,
+      including the ``took``).
+    - ``filter_time``: Time spent in the filter backends.
+    - ``serialization_time``: Time spent serializing the hits.
+    - ``hits``: Total number of hits.
+    """
+
+    def __init__(self):
+        self.search = None
+        self.fingerprint = None
+        self.query = None
+        self.took = None
+        self.search_time = None
+        self.filter_time = None
+        self.serialization_time = None
+        self.hits = None
+
+    def set_search(self, search):
+        """Set the search the metrics are recorded for.
+
+        :param search:
+        :type search: elasticsearch_dsl.search.Search
+        """
+        self.search = search
+        self.fingerprint = None
+        self.query = None
+
+    def finalize(self):
+        """Compute the fingerprint and normalized query of the search."""
+        if self.search is not None and self.fingerprint is None:
+            body = self.search.to_dict()
+            self.query = normalize_query(body)
+            self.fingerprint = get_query_fingerprint(body)
+
+    def set_response(self, response):
+        """Record the metrics of the (raw) search response.
+
+        :param response: Raw search response.
+        :type response: dict
+        """
+        self.took = response.get('took')
+        total = response.get('hits', {}).get('total')
+        if isinstance(total, dict):
+            total = total.get('value')
+        self.hits = total
+
+    def to_dict(self):
+        """Metrics as a dictionary.
+
+        :return:
+        :rtype: dict
+        """
+        self.finalize()
+        return {
+            'fingerprint': self.fingerprint,
+            'query': self.query,
+            'took': self.took,
+            'search_time': self.search_time,
+            'filter_time': self.filter_time,
+            'serialization_time': self.serialization_time,
+            'hits': self.hits,
+        }
+
+    def get_server_timing(self):
+        """Get value of the ``Server-Timing`` header.
+
+        :return:
+        :rtype: str
+        """
+        return ', '.join(
+            '{};dur={:.3f}'.format(__name, __value)
+            for __name, __value in (
+                ('filter', self.filter_time),
+                ('search', self.search_time),
+                ('es', self.took),
+                ('serialize', self.serialization_time),
+            )
+            if __value is not None
+        )
+
+
+class MetricsResponseClass(object):
+    """Response class, recording the metrics of the search response.
+
+    :param response_class: Response class wrapped.
+    :param metrics: Search metrics.
+    :type response_class: elasticsearch_dsl.response.Response
+    :type metrics: django_elasticsearch_dsl_drf.instrumentation.SearchMetrics
+    """
+
+    def __init__(self, response_class, metrics):
+        self.response_class = response_class
+        self.metrics = metrics
+
+    def __call__(self, search, response):
+        self.metrics.set_response(response)
+        return self.response_class(search, response)
+
+
+def get_class_label(cls):
+    """Get label (dotted path) of the class.
+
+    :param cls:
+    :return:
+    :rtype: str
+    """
+    return '{}.{}'.format(cls.__module__, cls.__name__)
+
+
+class FilterBackendProfiler(object):
+    """Filter backend profiler.
+
+    Records time spent in ``filter_queryset`` of each filter backend, per
+    view. Counters (number of calls, total time and a histogram) are
+    accumulated in-process and flushed to the Django cache at most once per
+    ``flush_interval`` seconds, so that they are aggregated over all the
+    processes and can be dumped with the
+    ``elasticsearch_filter_backends_profile`` management command. Counters
+    still in-process are flushed at exit of the process (unless it's
+    killed). Note, that a shared cache backend (Memcached, Redis) shall be
+    used in multi-process deployments.
+
+    Example:
+
+        >>> from django_elasticsearch_dsl_drf.instrumentation import (
+        >>>     FilterBackendProfiler,
+        >>> )
+        >>>
+        >>> class BookDocumentViewSet(DocumentViewSet):
+        >>>
+        >>>     filter_backend_profiler_class = FilterBackendProfiler
+        >>>     # ...
+    """
+
+    cache_alias = DEFAULT_CACHE_ALIAS
+    key_prefix = 'django_elasticsearch_dsl_drf'
+    key_namespace = 'profile'
+    # Upper bounds (in milliseconds) of the histogram buckets. Last bucket
+    # (``inf``) holds the rest.
+    buckets = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50)
+    flush_interval = 10
+
+    # In-process counters, shared by all instances of the profiler class
+    _counters = None
+    _last_flush = None
+    _lock = threading.Lock()
+    # Profiler classes, the counters of which are flushed at exit
+    _flushed_at_exit = set()
+
+    @property
+    def cache(self):
+        """Django cache used.
+
+        :return:
+        :rtype: django.core.cache.backends.base.BaseCache
+        """
+        return caches[self.cache_alias]
+
+    def get_bucket_labels(self):
+        """Get labels of the histogram buckets.
+
+        :return:
+        :rtype: list
+        """
+        return ['{:g}'.format(__bucket) for __bucket in self.buckets] \
+            + ['inf']
+
+    def get_bucket_label(self, duration):
+        """Get label of the histogram bucket the duration falls into.
+
+        :param duration: Duration in milliseconds.
+        :type duration: float
+        :return:
+        :rtype: str
+        """
+        for bucket in self.buckets:
+            if duration <= bucket:
+                return '{:g}'.format(bucket)
+        return 'inf'
+
+    def get_key(self, *parts):
+        """Get cache key.
+
+        :return:
+        :rtype: str
+        """
+        return ':'.join((self.key_prefix, self.key_namespace) + parts)
+
+    def time(self, view, backend, func, *args, **kwargs):
+        """Call the function, recording its duration.
+
+        :param view: View class.
+        :param backend: Filter backend class.
+        :param func: Function to call.
+        :return: Return value of the function.
+        """
+        start = timeit.default_timer()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self.record(
+                view,
+                backend,
+                (timeit.default_timer() - start) * 1000
+            )
+
+    def record(self, view, backend, duration):
+        """Record duration of the filter backend call.
+
+        :param view: View class.
+        :param backend: Filter backend class.
+        :param duration: Duration in milliseconds.
+        :type duration: float
+        """
+        cls = self.__class__
+        key = (get_class_label(view), get_class_label(backend))
+        bucket = self.get_bucket_label(duration)
+        now = timeit.default_timer()
+        with cls._lock:
+            if cls._counters is None:
+                cls._counters = {}
+                cls._last_flush = now
+                if cls not in FilterBackendProfiler._flushed_at_exit:
+                    FilterBackendProfiler._flushed_at_exit.add(cls)
+                    atexit.register(self.flush_pending)
+            counters = cls._counters.setdefault(key, {})
+            counters['count'] = counters.get('count', 0) + 1
+            counters['total'] = counters.get('total', 0.0) + duration
+            counters[bucket] = counters.get(bucket, 0) + 1
+            if now - cls._last_flush < self.flush_interval:
+                return
+            pending, cls._counters = cls._counters, {}
+            cls._last_flush = now
+        self.flush(pending)
+
+    def flush_pending(self):
+        """Flush the in-process counters to the cache."""
+        cls = self.__class__
+        with cls._lock:
+            pending, cls._counters = cls._counters, None
+        if not pending:
+            return
+        try:
+            self.flush(pending)
+        except Exception as err:
+            LOGGER.warning("Filter backend counters not flushed: %s", err)
+
+    def incr(self, key, delta):
+        """Increment the cache counter, initialising it if missing.
+
+        :param key: Cache key.
+        :param delta: Value to add.
+        :type key: str
+        :type delta: int
+        :return: New value.
+        :rtype: int
+        """
+        try:
+            return self.cache.incr(key, delta)
+        except ValueError:
+            if self.cache.add(key, delta, None):
+                return delta
+            return self.cache.incr(key, delta)
+
+    def register(self, view, backend):
+        """Add the (view, backend) pair to the registry (if not yet there).
+
+        Registry is a list of slots (``registry:1``, ``registry:2``, ...),
+        each holding a pair, and the number of the slots
+        (``registry:size``). Pairs are marked as registered with
+        ``cache.add`` and slots are numbered with ``cache.incr``, both
+        atomic, so that concurrent processes do not overwrite each other.
+
+        :param view: View label.
+        :param backend: Filter backend label.
+        :type view: str
+        :type backend: str
+        """
+        if not self.cache.add(self.get_key('registered', view, backend),
+                              True,
+                              None):
+            return
+        slot = self.incr(self.get_key('registry', 'size'), 1)
+        self.cache.set(
+            self.get_key('registry', str(slot)),
+            [view, backend],
+            None
+        )
+
+    def get_registry(self):
+        """Get the registered (view, backend) pairs.
+
+        :return: List of (view, backend) tuples.
+        :rtype: list
+        """
+        size = self.cache.get(self.get_key('registry', 'size')) or 0
+        keys = [
+            self.get_key('registry', str(__slot))
+            for __slot in range(1, size + 1)
+        ]
+        values = self.cache.get_many(keys)
+        # Pairs are registered again if their markers are evicted
+        return list(OrderedDict.fromkeys(
+            tuple(values[__key]) for __key in keys if __key in values
+        ))
+
+    def flush(self, pending):
+        """Flush the counters to the cache.
+
+        Total time is stored in microseconds, since cache counters are
+        integers.
+
+        :param pending: Counters per (view, backend) pair.
+        :type pending: dict
+        """
+        for (view, backend), counters in pending.items():
+            self.register(view, backend)
+            for name, value in counters.items():
+                if name == 'total':
+                    value = int(round(value * 1000))
+                self.incr(self.get_key(view, backend, name), value)
+
+    def get_stats(self):
+        """Get the aggregated counters (as flushed to the cache).
+
+        :return: List of dicts with ``view``, ``backend``, ``count``,
+            ``total`` (milliseconds), ``mean`` (milliseconds) and
+            ``histogram`` (counts per bucket) keys, slowest (by total time)
+            first.
+        :rtype: list
+        """
+        labels = self.get_bucket_labels()
+        stats = []
+        for view, backend in self.get_registry():
+            names = ['count', 'total'] + labels
+            values = self.cache.get_many(
+                [self.get_key(view, backend, __name) for __name in names]
+            )
+            counters = {
+                __name: values.get(self.get_key(view, backend, __name), 0)
+                for __name in names
+            }
+            if not counters['count']:
+                continue
+            total = counters['total'] / 1000.0
+            stats.append({
+                'view': view,
+                'backend': backend,
+                'count': counters['count'],
+                'total': total,
+                'mean': total / counters['count'],
+                'histogram': OrderedDict(
+                    (__label, counters[__label]) for __label in labels
+                ),
+            })
+        return sorted(stats, key=lambda __item: -__item['total'])
+
+    def reset(self):
+        """Reset the counters (both in-process and in the cache)."""
+        cls = self.__class__
+        with cls._lock:
+            cls._counters = None
+        size_key = self.get_key('registry', 'size')
+        keys = [size_key]
+        size = self.cache.get(size_key) or 0
+        keys.extend(
+            self.get_key('registry', str(__slot))
+            for __slot in range(1, size + 1)
+        )
+        for view, backend in self.get_registry():
+            keys.append(self.get_key('registered', view, backend))
+            keys.extend(
+                self.get_key(view, backend, __name)
+                for __name in ['count', 'total'] + self.get_bucket_labels()
+            )
+        self.cache.delete_many(keys)
@@ -0,0 +1,86 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+from ...instrumentation import FilterBackendProfiler
+
+
+class Command(BaseCommand):
+    help = 'Dump time spent in filter backends (per view). Counters are ' \
+           'flushed by each process periodically and at exit; ' \
+           'counters of killed processes are lost.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--profiler',
+            action='store',
+            dest='profiler',
+            default=None,
+            help='Dotted path to the profiler class (if customised)',
+        )
+        parser.add_argument(
+            '--view',
+            action='store',
+            dest='view',
+            default=None,
+            help='Dump only views containing the given string',
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            dest='json',
+            default=False,
+            help='Dump as JSON',
+        )
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            dest='reset',
+            default=False,
+            help='Reset the counters (after dumping)',
+        )
+
+    def handle(self, *args, **options):
+        profiler_class = FilterBackendProfiler
+        if options.get('profiler'):
+            profiler_class = import_string(options['profiler'])
+        profiler = profiler_class()
+
+        stats = profiler.get_stats()
+        if options.get('view'):
+            stats = [
+                __item for __item in stats if options['view'] in __item['view']
+            ]
+
+        if options.get('json'):
+            self.stdout.write(json.dumps(stats, indent=4))
+        elif not stats:
+            self.stdout.write("No filter backend timings recorded")
+        else:
+            labels = profiler.get_bucket_labels()
+            headers = ['<={}ms'.format(__label) for __label in labels[:-1]]
+            headers.append('>{}ms'.format(labels[-2]))
+            stats = sorted(
+                stats,
+                key=lambda __item: (__item['view'], -__item['total'])
+            )
+            view = None
+            for item in stats:
+                if item['view'] != view:
+                    view = item['view']
+                    self.stdout.write(view)
+                self.stdout.write(
+                    "    {backend}: count={count} total={total:.3f}ms "
+                    "mean={mean:.3f}ms".format(**item)
+                )
+                self.stdout.write(
+                    "        " + " ".join(
+                        "{}:{}".format(__header, item['histogram'][__label])
+                        for __header, __label in zip(headers, labels)
+                        if item['histogram'][__label]
+                    )
+                )
+
+        if options.get('reset'):
+            profiler.reset()
@@ -5,19 +5,27 @@ Pagination.
 
 from __future__ import unicode_literals
 
+import base64
+import json
 from collections import OrderedDict
 
 from django.core import paginator as django_paginator
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.translation import gettext_lazy as _
 
+from elasticsearch_dsl.connections import get_connection
 from elasticsearch_dsl.utils import AttrDict
 
 from rest_framework import pagination
 from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
 
 import six
 
 # from .compat import get_count
+from .utils import RawResponse, set_base_response_class
 from .versions import ELASTICSEARCH_GTE_6_0
 
 __title__ = 'django_elasticsearch_dsl_drf.pagination'
@@ -29,6 +37,8 @@ __all__ = (
     'Page',
     'PageNumberPagination',
     'Paginator',
+    'SearchAfterPagination',
+    'SearchResponseMixin',
 )
 
 
@@ -39,26 +49,165 @@ class Page(django_paginator.Page):
         self.facets = facets
         if isinstance(object_list.hits.total, AttrDict):
             self.count = object_list.hits.total.value
+            self.count_relation = object_list.hits.total.relation
         else:
             self.count = object_list.hits.total
+            self.count_relation = 'eq'
         super(Page, self).__init__(object_list, number, paginator)
 
+    def has_next(self):
+        """Has next page.
 
-class Paginator(django_paginator.Paginator):
+        If the ``count`` is a lower bound (``gte``), full pages always have
+        the next page.
+
+        :return:
+        :rtype: bool
+        """
+        if self.count_relation == 'gte' \
+                and len(self.object_list) == self.paginator.per_page:
+            return True
+        return super(Page, self).has_next()
+
+    def next_page_number(self):
+        """Next page number.
+
+        :return:
+        :rtype: int
+        """
+        if self.count_relation == 'gte' and self.has_next():
+            return self.number + 1
+        return super(Page, self).next_page_number()
+
+
+class SearchResponseMixin(object):
+    """Shared handling of the search and the search response.
+
+    Used by both the paginator and the pagination classes.
+    """
+
+    # Set to True to count all hits, or to an integer to count hits up to
+    # that number only (faster). Elasticsearch defaults to 10 000. If set,
+    # ``count_relation`` (``eq`` or ``gte``) is added to the response.
+    track_total_hits = None
+    # If set to True, ``_source`` of the hits is returned as is (see
+    # ``django_elasticsearch_dsl_drf.utils.RawResponse``).
+    raw_source = False
+
+    def apply_track_total_hits(self, queryset):
+        """Apply ``track_total_hits`` to the queryset.
+
+        :param queryset:
+        :return:
+        """
+        if self.track_total_hits is None:
+            return queryset
+        return queryset.extra(track_total_hits=self.track_total_hits)
+
+    def apply_raw_source(self, queryset):
+        """Apply ``raw_source`` to the queryset.
+
+        :param queryset:
+        :return:
+        """
+        if not self.raw_source:
+            return queryset
+        return set_base_response_class(queryset, RawResponse)
+
+    def get_count(self, es_response):
+        if isinstance(es_response.hits.total, AttrDict):
+            return es_response.hits.total.value
+        return es_response.hits.total
+
+    def get_count_relation(self, es_response):
+        """Get count relation.
+
+        Either ``eq`` (count is exact) or ``gte`` (count is a lower bound,
+        see ``track_total_hits``).
+
+        :param es_response:
+        :return:
+        :rtype: str
+        """
+        if isinstance(es_response.hits.total, AttrDict):
+            return es_response.hits.total.relation
+        return 'eq'
+
+
+class Paginator(SearchResponseMixin, django_paginator.Paginator):
     """Paginator for Elasticsearch."""
 
+    def validate_number_type(self, number):
+        """Validate the type of the given 1-based page number.
+
+        Unlike ``validate_number``, does not check whether the page is in
+        range (which requires the ``count``).
+
+        :param number:
+        :return:
+        """
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise django_paginator.PageNotAnInteger(
+                _('That page number is not an integer')
+            )
+        if number < 1:
+            raise django_paginator.EmptyPage(
+                _('That page number is less than 1')
+            )
+        return number
+
     def page(self, number):
         """Returns a Page object for the given 1-based page number.
 
+        The ``count`` is taken from the search response, so that a single
+        request is made to Elasticsearch. If ``orphans`` are used, the
+        ``count`` is needed before the search and is requested separately.
+
         :param number:
         :return:
         """
-        number = self.validate_number(number)
+        number, bottom, top = self.get_page_bounds(number)
+        object_list = self.object_list[bottom:top].execute()
+        return self.get_page_from_response(number, object_list)
+
+    def get_page_bounds(self, number):
+        """Validate the given 1-based page number and get bounds of the page.
+
+        :param number:
+        :return: Tuple of (number, bottom, top).
+        :rtype: tuple
+        """
+        if self.orphans:
+            number = self.validate_number(number)
+        else:
+            number = self.validate_number_type(number)
         bottom = (number - 1) * self.per_page
         top = bottom + self.per_page
-        if top + self.orphans >= self.count:
+        if self.orphans and top + self.orphans >= self.count:
             top = self.count
-        object_list = self.object_list[bottom:top].execute()
+        return number, bottom, top
+
+    def get_page_from_response(self, number, object_list):
+        """Get the Page object out of the search response.
+
+        :param number: Validated 1-based page number.
+        :param object_list: Search response.
+        :return:
+        """
+        if 'count' not in self.__dict__:
+            # Cache the ``count`` (``cached_property``) and check if the
+            # page is in range.
+            self.__dict__['count'] = self.get_count(object_list)
+            # If the ``count`` is a lower bound (``gte``), pages past the
+            # ``count`` may still contain hits.
+            if not (object_list.hits
+                    and self.get_count_relation(object_list) == 'gte'):
+                self.validate_number(number)
+
         __facets = getattr(object_list, 'aggregations', None)
         return self._get_page(object_list, number, self, facets=__facets)
 
@@ -73,7 +222,8 @@ class Paginator(django_paginator.Paginator):
         return Page(*args, **kwargs)
 
 
-class PageNumberPagination(pagination.PageNumberPagination):
+class PageNumberPagination(SearchResponseMixin,
+                           pagination.PageNumberPagination):
     """Page number pagination.
 
     A simple page number based style that supports page numbers as
@@ -97,6 +247,7 @@ class PageNumberPagination(pagination.PageNumberPagination):
         # self.page = None
         # self.request = None
         self.count = None
+        self.count_relation = None
         super(PageNumberPagination, self).__init__(*args, **kwargs)
 
     def get_facets(self, page=None):
@@ -147,6 +298,8 @@ class PageNumberPagination(pagination.PageNumberPagination):
         if not page_size:
             return None
 
+        queryset = self.apply_track_total_hits(queryset)
+        queryset = self.apply_raw_source(queryset)
         paginator = self.django_paginator_class(queryset, page_size)
         page_number = request.query_params.get(self.page_query_param, 1)
         if page_number in self.last_page_strings:
@@ -185,6 +338,8 @@ class PageNumberPagination(pagination.PageNumberPagination):
             ('next', self.get_next_link()),
             ('previous', self.get_previous_link()),
         ]
+        if self.track_total_hits is not None:
+            __data.insert(1, ('count_relation', self.page.count_relation))
         __facets = self.get_facets()
         if __facets is not None:
             __data.append(
@@ -203,13 +358,9 @@ class PageNumberPagination(pagination.PageNumberPagination):
         """
         return Response(OrderedDict(self.get_paginated_response_context(data)))
 
-    def get_count(self, es_response):
-        if isinstance(es_response.hits.total, AttrDict):
-            return es_response.hits.total.value
-        return es_response.hits.total
 
-
-class LimitOffsetPagination(pagination.LimitOffsetPagination):
+class LimitOffsetPagination(SearchResponseMixin,
+                            pagination.LimitOffsetPagination):
     """A limit/offset pagination.
 
     Example:
@@ -226,6 +377,8 @@ class LimitOffsetPagination(pagination.LimitOffsetPagination):
         """
         self.facets = None
         self.count = None
+        self.count_relation = None
+        self.has_next = False
         # self.limit = None
         # self.offset = None
         # self.request = None
@@ -266,18 +419,51 @@ class LimitOffsetPagination(pagination.LimitOffsetPagination):
         self.offset = self.get_offset(request)
         self.request = request
 
+        queryset = self.apply_track_total_hits(queryset)
+        queryset = self.apply_raw_source(queryset)
         resp = queryset[self.offset:self.offset + self.limit].execute()
+        return self.paginate_response(resp)
+
+    def paginate_response(self, resp):
+        """Paginate the search response.
+
+        :param resp: Search response (``limit`` hits at ``offset``).
+        :return:
+        """
         self.facets = getattr(resp, 'aggregations', None)
 
         self.count = self.get_count(resp)
+        self.count_relation = self.get_count_relation(resp)
+        self.has_next = len(resp) == self.limit
 
         if self.count > self.limit and self.template is not None:
             self.display_page_controls = True
 
-        if self.count == 0 or self.offset > self.count:
+        if self.count == 0 or (self.offset > self.count
+                               and self.count_relation != 'gte'):
             return []
         return list(resp)
 
+    def get_next_link(self):
+        """Get next link.
+
+        If the ``count`` is a lower bound (``gte``), full pages always have
+        the next page.
+
+        :return:
+        """
+        if self.count_relation == 'gte' \
+                and self.has_next \
+                and self.offset + self.limit >= self.count:
+            url = self.request.build_absolute_uri()
+            url = replace_query_param(url, self.limit_query_param, self.limit)
+            return replace_query_param(
+                url,
+                self.offset_query_param,
+                self.offset + self.limit
+            )
+        return super(LimitOffsetPagination, self).get_next_link()
+
     def get_facets(self, facets=None):
         """Get facets.
 
@@ -304,6 +490,8 @@ class LimitOffsetPagination(pagination.LimitOffsetPagination):
             ('next', self.get_next_link()),
             ('previous', self.get_previous_link()),
         ]
+        if self.track_total_hits is not None:
+            __data.insert(1, ('count_relation', self.count_relation))
         __facets = self.get_facets()
         if __facets is not None:
             __data.append(
@@ -322,7 +510,278 @@ class LimitOffsetPagination(pagination.LimitOffsetPagination):
         """
         return Response(OrderedDict(self.get_paginated_response_context(data)))
 
-    def get_count(self, es_response):
-        if isinstance(es_response.hits.total, AttrDict):
-            return es_response.hits.total.value
-        return es_response.hits.total
+
+class SearchAfterPagination(SearchResponseMixin,
+                            pagination.BasePagination):
+    """Search after (cursor) pagination.
+
+    Instead of the ``from``/``size`` slicing, uses the sort values of the
+    last hit of the page (``search_after``) to fetch the next page. Thus,
+    deep pages are as fast as the first one and are not limited by the
+    ``index.max_result_window``. Results are paginated forward only.
+
+    Sort values are taken from the search (set by ordering filter
+    backends), falling back to the ``ordering`` and ``_score``. The
+    ``document_uid_field`` of the view is always added as a tiebreaker.
+
+    If ``use_point_in_time`` is set to True, a point-in-time is opened
+    on the first page and used for all subsequent pages, so that results
+    are consistent while paging through (Elasticsearch 7.10 or later).
+
+    Example:
+
+        http://api.example.org/accounts/?page_size=100
+        http://api.example.org/accounts/?cursor=eyJzZWFyY2hfYWZ0ZXIiOlsxMDBdfQ
+    """
+
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = None
+    max_page_size = None
+    ordering = None
+    use_point_in_time = False
+    point_in_time_keep_alive = '1m'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, *args, **kwargs):
+        """Constructor.
+
+        :param args:
+        :param kwargs:
+        """
+        self.facets = None
+        self.count = None
+        self.count_relation = None
+        self.next_cursor = None
+        self.base_url = None
+        super(SearchAfterPagination, self).__init__(*args, **kwargs)
+
+    def get_page_size(self, request):
+        """Get page size.
+
+        :param request:
+        :return:
+        """
+        if self.page_size_query_param:
+            try:
+                return pagination._positive_int(
+                    request.query_params[self.page_size_query_param],
+                    strict=True,
+                    cutoff=self.max_page_size
+                )
+            except (KeyError, ValueError):
+                pass
+
+        return self.page_size
+
+    def encode_cursor(self, cursor):
+        """Encode cursor.
+
+        :param cursor: Cursor data.
+        :type cursor: dict
+        :return:
+        :rtype: str
+        """
+        return base64.urlsafe_b64encode(
+            json.dumps(cursor, separators=(',', ':')).encode('utf8')
+        ).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, request):
+        """Decode cursor given in the request.
+
+        :param request:
+        :return: Cursor data or None if not given.
+        :rtype: dict
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            cursor = json.loads(
+                base64.urlsafe_b64decode(
+                    encoded + '=' * (-len(encoded) % 4)
+                ).decode('utf8')
+            )
+            assert isinstance(cursor, dict)
+            assert isinstance(cursor['search_after'], list)
+        except (AssertionError, KeyError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+        return cursor
+
+    def get_sort(self, queryset, view):
+        """Get sort, including the tiebreaker.
+
+        :param queryset:
+        :param view:
+        :return:
+        :rtype: list
+        """
+        sort = list(queryset._sort) or list(self.ordering or ['_score'])
+        tiebreaker = getattr(view, 'document_uid_field', 'id')
+        field_names = [
+            __field.lstrip('-')
+            if isinstance(__field, six.string_types)
+            else list(__field.keys())[0]
+            for __field
+            in sort
+        ]
+        if tiebreaker not in field_names:
+            sort.append(tiebreaker)
+        return sort
+
+    def open_point_in_time(self, queryset):
+        """Open point-in-time.
+
+        :param queryset:
+        :return: Point-in-time ID.
+        :rtype: str
+        """
+        client = get_connection(queryset._using)
+        if not hasattr(client, 'open_point_in_time'):
+            raise ImproperlyConfigured(
+                "Point-in-time requires `elasticsearch` 7.10 or later."
+            )
+        return client.open_point_in_time(
+            index=queryset._index,
+            keep_alive=self.point_in_time_keep_alive
+        )['id']
+
+    def close_point_in_time(self, queryset, pit_id):
+        """Close point-in-time.
+
+        :param queryset:
+        :param pit_id: Point-in-time ID.
+        """
+        get_connection(queryset._using).close_point_in_time(
+            body={'id': pit_id}
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Paginate a queryset.
+
+        :param queryset:
+        :param request:
+        :param view:
+        :return:
+        """
+        # Check if there are suggest queries in the queryset,
+        # ``execute_suggest`` method shall be called, instead of the
+        # ``execute`` method and results shall be returned back immediately.
+        is_suggest = getattr(queryset, '_suggest', False)
+        if is_suggest:
+            if ELASTICSEARCH_GTE_6_0:
+                return queryset.execute().to_dict().get('suggest')
+            return queryset.execute_suggest().to_dict()
+
+        # Check if we're using paginate queryset from `functional_suggest`
+        # backend.
+        if view.action == 'functional_suggest':
+            return queryset
+
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        cursor = self.decode_cursor(request) or {}
+
+        # One extra hit is fetched to find out if there is a next page
+        queryset = self.apply_track_total_hits(queryset)
+        queryset = self.apply_raw_source(queryset)
+        queryset = queryset.sort(*self.get_sort(queryset, view)).extra(
+            size=page_size + 1
+        )
+        if cursor.get('search_after'):
+            queryset = queryset.extra(search_after=cursor['search_after'])
+
+        pit_id = cursor.get('pit')
+        if self.use_point_in_time:
+            if not pit_id:
+                pit_id = self.open_point_in_time(queryset)
+            queryset = queryset.index().extra(
+                pit={
+                    'id': pit_id,
+                    'keep_alive': self.point_in_time_keep_alive,
+                }
+            )
+
+        resp = queryset.execute()
+        self.facets = getattr(resp, 'aggregations', None)
+        self.count = self.get_count(resp)
+        self.count_relation = self.get_count_relation(resp)
+
+        hits = list(resp)
+        if len(hits) > page_size:
+            hits = hits[:page_size]
+            next_cursor = {
+                'search_after': list(resp.hits.hits[page_size - 1]['sort'])
+            }
+            if pit_id:
+                # Point-in-time ID may change between requests
+                next_cursor['pit'] = getattr(resp, 'pit_id', pit_id)
+            self.next_cursor = self.encode_cursor(next_cursor)
+        elif pit_id:
+            self.close_point_in_time(queryset, pit_id)
+
+        return hits
+
+    def get_next_link(self):
+        """Get next link.
+
+        :return:
+        """
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(
+            self.base_url,
+            self.cursor_query_param,
+            self.next_cursor
+        )
+
+    def get_facets(self, facets=None):
+        """Get facets.
+
+        :param facets:
+        :return:
+        """
+        if facets is None:
+            facets = self.facets
+
+        if facets is None:
+            return None
+
+        if hasattr(facets, '_d_'):
+            return facets._d_
+
+    def get_paginated_response_context(self, data):
+        """Get paginated response data.
+
+        :param data:
+        :return:
+        """
+        __data = [
+            ('count', self.count),
+            ('next', self.get_next_link()),
+        ]
+        if self.track_total_hits is not None:
+            __data.insert(1, ('count_relation', self.count_relation))
+        __facets = self.get_facets()
+        if __facets is not None:
+            __data.append(
+                ('facets', __facets),
+            )
+        __data.append(
+            ('results', data),
+        )
+        return __data
+
+    def get_paginated_response(self, data):
+        """Get paginated response.
+
+        :param data:
+        :return:
+        """
+        return Response(OrderedDict(self.get_paginated_response_context(data)))
@@ -0,0 +1,134 @@
+"""
+Renderers.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+from elasticsearch_dsl.utils import AttrDict, AttrList
+
+from rest_framework import renderers
+from rest_framework.utils import encoders
+
+from .compat import orjson, ujson
+
+__title__ = 'django_elasticsearch_dsl_drf.renderers'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = (
+    'JSONEncoder',
+    'JSONRenderer',
+)
+
+BACKENDS = {
+    'orjson': orjson,
+    'ujson': ujson,
+}
+
+
+class JSONEncoder(encoders.JSONEncoder):
+    """JSON encoder, aware of the ``elasticsearch_dsl`` containers."""
+
+    def default(self, obj):
+        if isinstance(obj, AttrDict):
+            return obj.to_dict()
+        if isinstance(obj, AttrList):
+            return obj._l_
+        return super(JSONEncoder, self).default(obj)
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    """JSON renderer, tuned for search responses.
+
+    Uses `orjson <https://github.com/ijl/orjson>`_ or
+    `ujson <https://github.com/ultrajson/ultrajson>`_ 5.0 or later
+    (whichever is installed, in that order) for encoding, falling back to
+    the standard library ``json`` module. Output is the same as of the
+    ``rest_framework.renderers.JSONRenderer``.
+
+    The standard library ``json`` is always used for indented output
+    (browsable API) and if ``UNICODE_JSON`` or ``COMPACT_JSON`` settings
+    of the Django REST framework are set to False.
+
+    ``AttrDict`` and ``AttrList`` (``elasticsearch_dsl``) are handled in
+    all cases.
+    """
+
+    encoder_class = JSONEncoder
+    # Names of the encoding libraries to try, in the order given.
+    backends = ('orjson', 'ujson')
+
+    def get_dumps(self):
+        """Get the ``dumps`` function of the first available backend.
+
+        :return: Function, taking data and returning a bytestring, or None
+            if no backend is available.
+        """
+        for backend in self.backends:
+            if BACKENDS.get(backend) is not None:
+                return getattr(self, 'dumps_{}'.format(backend))
+        return None
+
+    def dumps_orjson(self, data):
+        """Encode with ``orjson``.
+
+        Dates and times are passed to the encoder, to keep the format of
+        the Django REST framework. Non-string keys (such as the numeric
+        keys of the facets) are converted to strings, as by the standard
+        library ``json``.
+
+        :param data:
+        :return:
+        :rtype: bytes
+        """
+        return orjson.dumps(
+            data,
+            default=self.encoder_class().default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        )
+
+    def dumps_ujson(self, data):
+        """Encode with ``ujson``.
+
+        :param data:
+        :return:
+        :rtype: bytes
+        """
+        return ujson.dumps(
+            data,
+            default=self.encoder_class().default,
+            ensure_ascii=False,
+            escape_forward_slashes=False
+        ).encode('utf8')
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Render `data` into JSON, returning a bytestring.
+
+        :param data:
+        :param accepted_media_type:
+        :param renderer_context:
+        :return:
+        :rtype: bytes
+        """
+        if data is None:
+            return b''
+
+        dumps = self.get_dumps()
+        if dumps is None \
+                or self.ensure_ascii \
+                or not self.compact \
+                or self.get_indent(accepted_media_type,
+                                   renderer_context or {}) is not None:
+            return super(JSONRenderer, self).render(
+                data,
+                accepted_media_type,
+                renderer_context
+            )
+
+        # We always fully escape \u2028 and \u2029 to ensure we output JSON
+        # that is a strict javascript subset (as the Django REST framework).
+        return dumps(data).replace(
+            b'\xe2\x80\xa8', b'\\u2028'
+        ).replace(
+            b'\xe2\x80\xa9', b'\\u2029'
+        )
@@ -12,8 +12,10 @@ from django.core.exceptions import ImproperlyConfigured
 
 from django_elasticsearch_dsl import fields, Document
 
+from elasticsearch_dsl.utils import AttrDict, ObjectBase
+
 from rest_framework import serializers
-from rest_framework.fields import empty
+from rest_framework.fields import empty, SkipField
 from rest_framework.utils.field_mapping import get_field_kwargs
 
 import six
@@ -58,6 +60,7 @@ class Meta(type):
     field_aliases = {}
     field_options = {}
     index_aliases = {}
+    compiled = False
 
     def __new__(mcs, name, bases, attrs):
         cls = super(Meta, mcs).__new__(mcs, str(name), bases, attrs)
@@ -101,13 +104,36 @@ class DocumentSerializerMeta(serializers.SerializerMetaclass):
         return cls
 
 
+# Kinds of the compiled fields
+COMPILED_FIELD_SOURCE = 'source'
+COMPILED_FIELD_METHOD = 'method'
+COMPILED_FIELD_DECLARED = 'declared'
+
+
 class DocumentSerializer(
     six.with_metaclass(DocumentSerializerMeta, serializers.Serializer)
 ):
-    """A dynamic DocumentSerializer class."""
+    """A dynamic DocumentSerializer class.
+
+    If ``compiled`` is set to True in the ``Meta``, representation of the
+    search hits is made with a list of fields compiled once per serializer
+    class. Values of the document fields are taken from the hit source
+    directly (without the attribute lookup) and converted with the
+    ``to_representation`` of their fields, ``SerializerMethodField``
+    methods are called directly, and the other explicitly declared fields
+    go through the Django REST framework fields as usual. Output is the
+    same as without the ``compiled`` option, as long as the ``get_fields``
+    method does not depend on the context (request).
+    """
 
     _abstract = True
 
+    # Field mappings, per serializer and document class
+    _field_mappings = {}
+
+    # Compiled fields, per serializer class
+    _compiled_fields = {}
+
     _field_mapping = {
         fields.BooleanField: BooleanField,
         fields.ByteField: CharField,  # TODO
@@ -186,7 +212,44 @@ class DocumentSerializer(
         return aliases.get(cls_name, cls_name.split('.')[-1])
 
     def get_fields(self):
-        """Get the required fields for serializing the result."""
+        """Get the required fields for serializing the result.
+
+        Field mapping is resolved once per serializer (and document) class
+        by ``build_field_mapping``. Each serializer instance gets (shallow)
+        copies of the document fields and deep copies of the declared
+        fields, as usual.
+        """
+        key = (self.__class__, self.Meta.document)
+        try:
+            field_names, document_fields = self._field_mappings[key]
+        except KeyError:
+            field_mapping = self.build_field_mapping()
+            field_names = tuple(field_mapping.keys())
+            document_fields = {
+                __name: copy.copy(__field)
+                for __name, __field in six.iteritems(field_mapping)
+                if __name not in self._declared_fields
+            }
+            self._field_mappings[key] = (field_names, document_fields)
+            return field_mapping
+
+        declared_fields = copy.deepcopy(self._declared_fields)
+        return OrderedDict(
+            (
+                __name,
+                declared_fields[__name]
+                if __name in declared_fields
+                else copy.copy(document_fields[__name])
+            )
+            for __name in field_names
+        )
+
+    def build_field_mapping(self):
+        """Build the field mapping.
+
+        :return:
+        :rtype: collections.OrderedDict
+        """
         __fields = self.Meta.fields
         exclude = self.Meta.exclude
         ignore_fields = self.Meta.ignore_fields
@@ -236,6 +299,91 @@ class DocumentSerializer(
         field_mapping = sort_by_list(field_mapping, __fields)
         return field_mapping
 
+    def get_compiled_fields(self):
+        """Get the compiled fields of the serializer class.
+
+        :return: Tuple of (field name, kind, method name) tuples.
+        :rtype: tuple
+        """
+        try:
+            return self._compiled_fields[self.__class__]
+        except KeyError:
+            pass
+
+        compiled_fields = []
+        for field_name, field in six.iteritems(self.get_fields()):
+            if field_name not in self._declared_fields:
+                compiled_fields.append(
+                    (field_name, COMPILED_FIELD_SOURCE, None)
+                )
+            elif field.write_only:
+                continue
+            elif isinstance(field, serializers.SerializerMethodField):
+                compiled_fields.append((
+                    field_name,
+                    COMPILED_FIELD_METHOD,
+                    field.method_name or 'get_{}'.format(field_name)
+                ))
+            else:
+                compiled_fields.append(
+                    (field_name, COMPILED_FIELD_DECLARED, None)
+                )
+
+        self._compiled_fields[self.__class__] = tuple(compiled_fields)
+        return self._compiled_fields[self.__class__]
+
+    def to_representation(self, instance):
+        """To representation.
+
+        :param instance: Search hit (or its source as a dict).
+        :return:
+        :rtype: collections.OrderedDict
+        """
+        if not self.Meta.compiled:
+            return super(DocumentSerializer, self).to_representation(instance)
+
+        # Documents (unlike the hits) hold deserialized values
+        if isinstance(instance, AttrDict) \
+                and not isinstance(instance, ObjectBase):
+            source = instance._d_
+        elif isinstance(instance, dict):
+            source = instance
+        else:
+            return super(DocumentSerializer, self).to_representation(instance)
+
+        ret = OrderedDict()
+        __fields = self.fields
+        for field_name, kind, method_name in self.get_compiled_fields():
+            if kind == COMPILED_FIELD_SOURCE:
+                if field_name not in source:
+                    # Let the Django REST framework field deal with it
+                    return super(DocumentSerializer, self).to_representation(
+                        instance
+                    )
+                value = source[field_name]
+                if value is None:
+                    ret[field_name] = None
+                else:
+                    ret[field_name] = __fields[field_name].to_representation(
+                        value
+                    )
+
+            elif kind == COMPILED_FIELD_METHOD:
+                ret[field_name] = getattr(self, method_name)(instance)
+
+            else:
+                field = __fields[field_name]
+                try:
+                    attribute = field.get_attribute(instance)
+                except SkipField:
+                    continue
+                if attribute is None:
+                    ret[field_name] = None
+                else:
+                    ret[field_name] = field.to_representation(attribute)
+
+        return ret
+
     def create(self, validated_data):
         """Create.
 
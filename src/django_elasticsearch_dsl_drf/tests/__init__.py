@@ -1,8 +1,23 @@
 """
 Tests.
 """
+import sys
+
+from nine.versions import DJANGO_GTE_3_1
+
+from .test_aggregations import TestAggregations
+from .test_export import TestExport
+from .test_facet_cache import TestFacetCache
+from .test_facet_values import TestFacetValues
 from .test_faceted_search import TestFacetedSearch
+from .test_faceted_search_disjunctive import TestDisjunctiveFacetedSearch
+from .test_facets_only import TestFacetsOnly
+from .test_fake_elasticsearch import TestFakeElasticsearch
+from .test_fan_out import TestFanOut
+from .test_filter_backend_profiler import TestFilterBackendProfiler
+from .test_filter_plan import TestFilterPlan
 from .test_filtering_common import TestFilteringCommon
+from .test_filtering_dispatch import TestFilteringDispatch
 from .test_filtering_geo_spatial import TestFilteringGeoSpatial
 from .test_filtering_global_aggregations import TestFilteringGlobalAggregations
 from .test_filtering_nested import TestFilteringNested
@@ -10,26 +25,55 @@ from .test_filtering_post_filter import TestFilteringPostFilter
 from .test_functional_suggesters import TestFunctionalSuggesters
 from .test_helpers import TestHelpers
 from .test_highlight import TestHighlight
+from .test_instrumentation import TestInstrumentation
 # from .test_more_like_this import TestMoreLikeThis
 from .test_ordering_common import TestOrdering
 from .test_ordering_geo_spatial import TestOrderingGeoSpatial
 from .test_pagination import TestPagination
+from .test_pagination_count import TestPaginationCount
+from .test_pagination_search_after import TestSearchAfterPagination
+from .test_passthrough import TestPassThrough
 from .test_pip_helpers import TestPipHelpers
+from .test_query_builder import TestQueryBuilder
+from .test_raw_source import TestRawSource
+from .test_renderers import TestRenderers
+from .test_response_cache import TestResponseCache
 from .test_search import TestSearch
 from .test_search_multi_match import TestMultiMatchSearch
 from .test_search_simple_query_string import TestSimpleQueryStringSearch
+from .test_search_template import TestSearchTemplate
 from .test_serializers import TestSerializers
+from .test_serializers_compiled import TestCompiledSerializers
+from .test_serializers_field_mapping import TestSerializerFieldMapping
 from .test_suggesters import TestSuggesters
 from .test_views import TestViews
 from .test_wrappers import TestWrappers
 
+# Asyncio views require Python 3.7 and Django 3.0 or later
+if sys.version_info >= (3, 7) and DJANGO_GTE_3_1:
+    from .test_aio import TestAsyncViews
+else:
+    TestAsyncViews = None
+
 __title__ = 'django_elasticsearch_dsl_drf.tests'
 __author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
 __copyright__ = '2017-2019 Artur Barseghyan'
 __license__ = 'GPL 2.0/LGPL 2.1'
 __all__ = (
+    'TestAggregations',
+    'TestAsyncViews',
+    'TestExport',
+    'TestFacetCache',
+    'TestFacetValues',
+    'TestFacetsOnly',
     'TestFacetedSearch',
+    'TestDisjunctiveFacetedSearch',
+    'TestFakeElasticsearch',
+    'TestFanOut',
+    'TestFilterBackendProfiler',
+    'TestFilterPlan',
     'TestFilteringCommon',
+    'TestFilteringDispatch',
     'TestFilteringGeoSpatial',
     'TestFilteringGlobalAggregations',
     'TestFilteringNested',
@@ -37,15 +81,26 @@ __all__ = (
     'TestFunctionalSuggesters',
     'TestHelpers',
     'TestHighlight',
+    'TestInstrumentation',
     # 'TestMoreLikeThis',
     'TestMultiMatchSearch',
     'TestSimpleQueryStringSearch',
     'TestOrdering',
     'TestOrderingGeoSpatial',
     'TestPagination',
+    'TestPaginationCount',
     'TestPipHelpers',
+    'TestQueryBuilder',
+    'TestRawSource',
+    'TestRenderers',
+    'TestResponseCache',
     'TestSearch',
+    'TestSearchTemplate',
+    'TestSearchAfterPagination',
+    'TestPassThrough',
     'TestSerializers',
+    'TestCompiledSerializers',
+    'TestSerializerFieldMapping',
     'TestSuggesters',
     'TestViews',
     'TestWrappers',
@@ -0,0 +1,17 @@
+"""
+Pytest configuration of the tests.
+"""
+import sys
+
+from nine.versions import DJANGO_GTE_3_1
+
+__title__ = 'django_elasticsearch_dsl_drf.tests.conftest'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+
+collect_ignore = []
+
+# Asyncio views require Python 3.7 and Django 3.1 or later
+if sys.version_info < (3, 7) or not DJANGO_GTE_3_1:
+    collect_ignore.append('test_aio.py')
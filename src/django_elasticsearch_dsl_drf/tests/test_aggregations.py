@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+Test aggregations filter backends.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import unittest
+
+from django.core.exceptions import ImproperlyConfigured
+
+from elasticsearch import Elasticsearch
+
+import mock
+import pytest
+
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from search_indexes.viewsets import BookDocumentViewSet
+
+from ..filter_backends import (
+    BucketAggregationsFilterBackend,
+    FilteringFilterBackend,
+    MetricsAggregationsFilterBackend,
+    PipelineAggregationsFilterBackend,
+)
+from ..viewsets import AggregateMixin
+
+__title__ = 'django_elasticsearch_dsl_drf.tests.test_aggregations'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = (
+    'TestAggregations',
+)
+
+
+class AggregationsBookDocumentViewSet(AggregateMixin, BookDocumentViewSet):
+    """Book document view with aggregations."""
+
+    filter_backends = [
+        FilteringFilterBackend,
+        BucketAggregationsFilterBackend,
+        MetricsAggregationsFilterBackend,
+        PipelineAggregationsFilterBackend,
+    ]
+    bucket_aggregations = {
+        'states': 'state.raw',
+        'per_year': {
+            'field': 'publication_date',
+            'agg': 'date_histogram',
+            'options': {
+                'calendar_interval': 'year',
+            },
+        },
+        'pages': {
+            'field': 'pages',
+            'agg': 'histogram',
+            'options': {
+                'interval': 100,
+            },
+        },
+        'states_per_year': {
+            'field': 'state.raw',
+            'bucket': 'per_year',
+        },
+    }
+    metrics_aggregations = {
+        'avg_price': {
+            'field': 'price',
+            'agg': 'avg',
+            'enabled': True,
+        },
+        'authors': {
+            'field': 'authors.raw',
+            'agg': 'cardinality',
+        },
+        'total_pages': {
+            'field': 'pages',
+            'agg': 'sum',
+            'bucket': 'per_year',
+        },
+    }
+    pipeline_aggregations = {
+        'total_pages_derivative': {
+            'agg': 'derivative',
+            'bucket': 'per_year',
+            'options': {
+                'buckets_path': 'total_pages',
+            },
+        },
+    }
+
+
+@pytest.mark.django_db
+class TestAggregations(unittest.TestCase):
+    """Test aggregations filter backends."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.factory = APIRequestFactory()
+
+    def _get_body(self, params, view_class=AggregationsBookDocumentViewSet):
+        view = view_class()
+        view.request = Request(self.factory.get('/', params))
+        queryset = view.search.query()
+        for backend in view.filter_backends:
+            queryset = backend().filter_queryset(
+                view.request,
+                queryset,
+                view
+            )
+        return queryset.to_dict()
+
+    def test_enabled(self):
+        """Only enabled aggregations are added by default."""
+        body = self._get_body({})
+        self.assertEqual(
+            body['aggs'],
+            {'avg_price': {'avg': {'field': 'price'}}}
+        )
+
+    def test_query_params(self):
+        """Aggregations are enabled via query params."""
+        body = self._get_body({'aggregate': ['states', 'authors']})
+        self.assertEqual(
+            body['aggs']['states'],
+            {'terms': {'field': 'state.raw'}}
+        )
+        self.assertEqual(
+            body['aggs']['authors'],
+            {'cardinality': {'field': 'authors.raw'}}
+        )
+        self.assertEqual(
+            sorted(body['aggs']),
+            ['authors', 'avg_price', 'states']
+        )
+
+    def test_nested(self):
+        """Aggregations are added to their bucket aggregations."""
+        body = self._get_body({'aggregate': 'per_year'})
+        self.assertEqual(
+            body['aggs']['per_year'],
+            {
+                'date_histogram': {
+                    'field': 'publication_date',
+                    'calendar_interval': 'year',
+                },
+                'aggs': {
+                    'states_per_year': {
+                        'terms': {'field': 'state.raw'},
+                    },
+                    'total_pages': {
+                        'sum': {'field': 'pages'},
+                    },
+                    'total_pages_derivative': {
+                        'derivative': {'buckets_path': 'total_pages'},
+                    },
+                },
+            }
+        )
+
+    def test_base_search_not_modified(self):
+        """Search of the view is not modified."""
+        self._get_body({'aggregate': 'per_year'})
+        self.assertEqual(
+            AggregationsBookDocumentViewSet().search.to_dict(),
+            {}
+        )
+
+    def test_unsupported_type(self):
+        """Unsupported aggregation types are reported."""
+        class View(AggregationsBookDocumentViewSet):
+            metrics_aggregations = {'tags': {'field': 'tags', 'agg': 'terms'}}
+
+        with self.assertRaises(ImproperlyConfigured):
+            self._get_body({}, view_class=View)
+
+    def test_aggregate_action(self):
+        """Aggregation-only requests."""
+        view = AggregationsBookDocumentViewSet.as_view({'get': 'aggregate'})
+        raw = {
+            'hits': {
+                'total': {'value': 12, 'relation': 'eq'},
+                'max_score': None,
+                'hits': [],
+            },
+            'aggregations': {
+                'avg_price': {'value': 25.5},
+                'states': {
+                    'doc_count_error_upper_bound': 0,
+                    'sum_other_doc_count': 0,
+                    'buckets': [{'key': 'published', 'doc_count': 12}],
+                },
+            },
+        }
+        with mock.patch.object(Elasticsearch, 'search',
+                               return_value=raw) as search:
+            response = view(
+                self.factory.get('/', {'aggregate': 'states',
+                                       'state': 'published'})
+            )
+        self.assertEqual(response.status_code, 200)
+        body = search.call_args[1].get('body', search.call_args[1])
+        self.assertEqual(body['size'], 0)
+        self.assertFalse(body['_source'])
+        self.assertNotIn('sort', body)
+        self.assertNotIn('highlight', body)
+        self.assertIn('query', body)
+        self.assertEqual(response.data['count'], 12)
+        self.assertEqual(response.data['aggregations'], raw['aggregations'])
+
+
+if __name__ == '__main__':
+    unittest.main()
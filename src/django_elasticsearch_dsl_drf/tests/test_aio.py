@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+Test asyncio views.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import asyncio
+import time
+import unittest
+
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.test import override_settings
+
+from elasticsearch import Urllib3HttpConnection
+
+import mock
+import pytest
+
+from rest_framework import serializers
+from rest_framework.test import APIRequestFactory
+
+from search_indexes.viewsets import BookDocumentViewSet
+
+from ..aio import (
+    AsyncDocumentViewSet,
+    AsyncLimitOffsetPagination,
+    AsyncMoreLikeThisMixin,
+    AsyncResponseCacheMixin,
+)
+from ..aio.utils import get_async_client, get_async_client_options
+from ..viewsets import ResponseCacheMixin
+
+__title__ = 'django_elasticsearch_dsl_drf.tests.test_aio'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = (
+    'TestAsyncViews',
+)
+
+
+class AsyncBookSerializer(serializers.Serializer):
+    """Book serializer."""
+
+    id = serializers.IntegerField(read_only=True)
+    title = serializers.CharField(read_only=True)
+
+
+class AsyncBookDocumentViewSet(AsyncDocumentViewSet,
+                               AsyncMoreLikeThisMixin,
+                               BookDocumentViewSet):
+    """Async version of the ``BookDocumentViewSet``."""
+
+    serializer_class = AsyncBookSerializer
+
+
+class LimitOffsetAsyncBookDocumentViewSet(AsyncBookDocumentViewSet):
+    """Async book document view with limit/offset pagination."""
+
+    pagination_class = AsyncLimitOffsetPagination
+
+
+class CachedAsyncBookDocumentViewSet(AsyncResponseCacheMixin,
+                                     AsyncBookDocumentViewSet):
+    """Cached async book document view."""
+
+
+class SyncCachedAsyncBookDocumentViewSet(ResponseCacheMixin,
+                                         AsyncBookDocumentViewSet):
+    """Async book document view with the (sync) response cache."""
+
+
+class AsyncConnection(object):
+    """Async connection."""
+
+    async def perform_request(self, *args, **kwargs):
+        """Perform request."""
+
+
+@pytest.mark.django_db
+class TestAsyncViews(unittest.TestCase):
+    """Test asyncio views."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.factory = APIRequestFactory()
+
+    def setUp(self):
+        cache.clear()
+        self.bodies = []
+        self.delay = 0
+        self.client = mock.Mock()
+        self.client.search = self._search
+        self.client.get = mock.AsyncMock(return_value={
+            '_index': 'test_book',
+            '_id': '1',
+            'found': True,
+            '_source': {'id': 1, 'title': 'Python'},
+        })
+
+    async def _search(self, index=None, body=None, **params):
+        """Fake ``AsyncElasticsearch.search``."""
+        self.bodies.append(body)
+        await asyncio.sleep(self.delay)
+        if 'suggest' in body:
+            return {
+                'hits': {'total': {'value': 0, 'relation': 'eq'}, 'hits': []},
+                'suggest': {'title_suggest': [{'text': 'py', 'options': []}]},
+            }
+        return {
+            'hits': {
+                'total': {'value': 25, 'relation': 'eq'},
+                'hits': [
+                    {
+                        '_id': str(__i),
+                        '_score': 1.0,
+                        '_source': {'id': __i, 'title': 'Book {}'.format(__i)},
+                    }
+                    for __i in range(body.get('from', 0),
+                                     body.get('from', 0) + 2)
+                ],
+            },
+        }
+
+    async def _view(self, view_class, actions, params=None, **kwargs):
+        view = view_class.as_view(actions)
+        self.assertTrue(asyncio.iscoroutinefunction(view))
+        with mock.patch.object(view_class, 'get_async_client',
+                               return_value=self.client):
+            return await view(self.factory.get('/', params or {}), **kwargs)
+
+    def _run(self, *args, **kwargs):
+        return asyncio.run(self._view(*args, **kwargs))
+
+    def test_list(self):
+        """Test list."""
+        response = self._run(
+            AsyncBookDocumentViewSet,
+            {'get': 'list'},
+            {'state': 'published'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 25)
+        self.assertEqual(
+            response.data['results'][0],
+            {'id': 0, 'title': 'Book 0'}
+        )
+        # Filter backends are applied
+        self.assertIn('filter', self.bodies[0]['query']['bool'])
+
+        response = self._run(
+            LimitOffsetAsyncBookDocumentViewSet,
+            {'get': 'list'},
+            {'limit': 2, 'offset': 4}
+        )
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertEqual((self.bodies[1]['from'], self.bodies[1]['size']),
+                         (4, 2))
+
+    def test_retrieve(self):
+        """Test retrieve."""
+        response = self._run(AsyncBookDocumentViewSet, {'get': 'retrieve'},
+                             id='1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['title'], 'Python')
+        self.client.get.assert_called_once_with(index='test_book', id='1')
+
+    def test_suggest(self):
+        """Test suggest."""
+        response = self._run(
+            AsyncBookDocumentViewSet,
+            {'get': 'suggest'},
+            {'title_suggest': 'py'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('title_suggest', response.data)
+
+    def test_more_like_this(self):
+        """Test more-like-this."""
+        response = self._run(
+            AsyncBookDocumentViewSet,
+            {'get': 'more_like_this'},
+            id='1'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('more_like_this', self.bodies[0]['query'])
+
+    def test_response_cache(self):
+        """Awaited responses are cached."""
+        for __i in range(2):
+            response = self._run(
+                CachedAsyncBookDocumentViewSet,
+                {'get': 'list'},
+                {'state': 'published'}
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data['count'], 25)
+        self.assertEqual(len(self.bodies), 1)
+
+        # Coroutine function handlers are rejected by the sync mixin
+        with self.assertRaises(ImproperlyConfigured):
+            self._run(SyncCachedAsyncBookDocumentViewSet, {'get': 'list'})
+
+    def test_concurrency(self):
+        """Slow searches are served concurrently."""
+        self.delay = 0.2
+
+        async def run_all():
+            return await asyncio.gather(*[
+                self._view(AsyncBookDocumentViewSet, {'get': 'list'})
+                for _ in range(10)
+            ])
+
+        start = time.time()
+        responses = asyncio.run(run_all())
+        self.assertLess(time.time() - start, 1.0)
+        self.assertEqual(
+            [__response.status_code for __response in responses],
+            [200] * 10
+        )
+
+    def test_async_client_per_loop(self):
+        """Async clients are made per event loop."""
+        async def get_clients():
+            return get_async_client(), get_async_client()
+
+        with mock.patch(
+            'django_elasticsearch_dsl_drf.aio.utils.AsyncElasticsearch',
+            side_effect=lambda **options: mock.Mock()
+        ):
+            first, same = asyncio.run(get_clients())
+            other, _ = asyncio.run(get_clients())
+        self.assertIs(first, same)
+        self.assertIsNot(first, other)
+
+    def test_async_client_options(self):
+        """Sync connection classes are left out of the client options."""
+        with override_settings(ELASTICSEARCH_DSL={
+            'default': {
+                'hosts': 'localhost:9200',
+                'connection_class': Urllib3HttpConnection,
+            },
+            'async': {
+                'hosts': 'localhost:9200',
+                'connection_class': AsyncConnection,
+            },
+        }):
+            self.assertEqual(get_async_client_options(),
+                             {'hosts': 'localhost:9200'})
+            self.assertEqual(
+                get_async_client_options('async'),
+                {
+                    'hosts': 'localhost:9200',
+                    'connection_class': AsyncConnection,
+                }
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+"""
+Test export.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import json
+import unittest
+
+from elasticsearch_dsl import Search
+
+import mock
+import pytest
+
+from rest_framework import serializers
+from rest_framework.test import APIRequestFactory
+
+from search_indexes.viewsets import BookDocumentViewSet
+
+from ..viewsets import ExportMixin
+
+__title__ = 'django_elasticsearch_dsl_drf.tests.test_export'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = (
+    'TestExport',
+)
+
+
+class ExportBookSerializer(serializers.Serializer):
+    """Export book serializer."""
+
+    id = serializers.IntegerField(read_only=True)
+    title = serializers.CharField(read_only=True)
+    tags = serializers.ListField(read_only=True)
+
+
+class ExportBookDocumentViewSet(ExportMixin, BookDocumentViewSet):
+    """Export book document view."""
+
+    serializer_class = ExportBookSerializer
+    export_chunk_size = 2
+
+
+class PointInTimeExportBookDocumentViewSet(ExportBookDocumentViewSet):
+    """Export book document view using point-in-time."""
+
+    export_use_point_in_time = True
+
+
+class RawPointInTimeExportBookDocumentViewSet(
+    PointInTimeExportBookDocumentViewSet
+):
+    """Export book document view using point-in-time, with raw hits."""
+
+    raw_source = True
+
+
+@pytest.mark.django_db
+class TestExport(unittest.TestCase):
+    """Test export."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.factory = APIRequestFactory()
+
+    def setUp(self):
+        self.searches = []
+        self.hits = [
+            {
+                '_id': str(__i),
+                '_source': {
+                    'id': __i,
+                    'title': 'Book, {}'.format(__i),
+                    'tags': ['Python', 'Django'],
+                },
+                'sort': [__i],
+            }
+            for __i in range(1, 6)
+        ]
+
+    def _scan(self):
+        """Fake ``Search.scan``."""
+        test = self
+
+        def scan(search):
+            test.searches.append(search)
+            for __hit in test.hits:
+                yield search._get_result(__hit)
+
+        return scan
+
+    def _export(self, view_class, params):
+        view = view_class.as_view({'get': 'export'})
+        with mock.patch.object(Search, 'scan', self._scan()):
+            response = view(self.factory.get('/', params))
+            content = b''.join(response.streaming_content)
+        return response, content.decode('utf8')
+
+    def test_export_ndjson(self):
+        """Test NDJSON export."""
+        response, content = self._export(
+            ExportBookDocumentViewSet,
+            {'state': 'published', 'facet': 'publisher'}
+        )
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = content.splitlines()
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(
+            json.loads(lines[0]),
+            {'id': 1, 'title': 'Book, 1', 'tags': ['Python', 'Django']}
+        )
+
+        # Filter backends are applied, aggregations are not
+        search = self.searches[0]
+        self.assertIn('filter', search.to_dict()['query']['bool'])
+        self.assertNotIn('aggs', search.to_dict())
+        self.assertEqual(search._params['size'], 2)
+
+    def test_export_csv(self):
+        """Test CSV export."""
+        response, content = self._export(
+            ExportBookDocumentViewSet,
+            {'export_format': 'csv'}
+        )
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        lines = content.splitlines()
+        self.assertEqual(len(lines), 6)
+        self.assertEqual(lines[0], 'id,title,tags')
+        self.assertEqual(lines[1], '1,"Book, 1","[""Python"", ""Django""]"')
+
+    def test_export_invalid_format(self):
+        """Test invalid format."""
+        view = ExportBookDocumentViewSet.as_view({'get': 'export'})
+        response = view(self.factory.get('/', {'export_format': 'xml'}))
+        self.assertEqual(response.status_code, 400)
+
+    def _export_point_in_time(self, view_class):
+        test = self
+
+        def execute(search, ignore_cache=False):
+            body = search.to_dict()
+            test.searches.append(body)
+            start = body.get('search_after', [0])[0]
+            return search._response_class(search, {
+                'hits': {
+                    'total': {'value': 5, 'relation': 'eq'},
+                    'hits': test.hits[start:start + body['size']],
+                },
+                'pit_id': 'pit-2',
+            })
+
+        client = mock.Mock()
+        client.open_point_in_time.return_value = {'id': 'pit-1'}
+        with mock.patch.object(Search, 'execute', execute), \
+                mock.patch.object(view_class,
+                                  'get_search_template') as get_template:
+            view = BookDocumentViewSet()
+            get_template.return_value = (
+                client,
+                view.index,
+                view.mapping,
+                view.search
+            )
+            _, content = self._export(view_class, {})
+        return client, content
+
+    def test_export_point_in_time(self):
+        """Test export using point-in-time."""
+        client, content = self._export_point_in_time(
+            PointInTimeExportBookDocumentViewSet
+        )
+
+        self.assertEqual(len(content.splitlines()), 5)
+        self.assertEqual(
+            [__search.get('search_after') for __search in self.searches],
+            [None, [2], [4]]
+        )
+        # Default ordering of the view already contains the tiebreaker
+        self.assertEqual(
+            self.searches[0]['sort'],
+            [
+                {'id': {'order': 'asc'}},
+                {'title.raw': {'order': 'asc'}},
+                {'price': {'order': 'asc'}},
+            ]
+        )
+        self.assertEqual(self.searches[1]['pit']['id'], 'pit-2')
+        client.close_point_in_time.assert_called_once_with(
+            body={'id': 'pit-2'}
+        )
+
+    def test_export_point_in_time_raw_source(self):
+        """Test export using point-in-time in raw source mode."""
+        _, content = self._export_point_in_time(
+            RawPointInTimeExportBookDocumentViewSet
+        )
+
+        self.assertEqual(
+            [json.loads(__line)['id'] for __line in content.splitlines()],
+            [1, 2, 3, 4, 5]
+        )
+        self.assertEqual(
+            [__search.get('search_after') for __search in self.searches],
+            [None, [2], [4]]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
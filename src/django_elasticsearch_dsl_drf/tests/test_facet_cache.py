@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+Test global facet cache.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import copy
+import unittest
+
+from django.core.cache import cache
+
+from elasticsearch import Elasticsearch
+
+import mock
+import pytest
+
+from rest_framework.test import APIRequestFactory
+
+from search_indexes.documents import BookDocument
+from search_indexes.viewsets import BookDocumentViewSet
+
+from ..cache import FacetCache, ResponseCache
+from ..pagination import PageNumberPagination
+from ..serializers import DocumentSerializer
+
+__title__ = 'django_elasticsearch_dsl_drf.tests.test_facet_cache'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = (
+    'TestFacetCache',
+)
+
+
+class FacetCacheBookDocumentViewSet(BookDocumentViewSet):
+    """Book document view caching the global facets."""
+
+    facet_cache_class = FacetCache
+
+
+class IdBookDocumentSerializer(DocumentSerializer):
+    """Book document serializer."""
+
+    class Meta(object):
+        """Meta options."""
+
+        document = BookDocument
+        fields = (
+            'id',
+        )
+
+
+class RawPageNumberPagination(PageNumberPagination):
+    """Page number pagination in the raw source mode."""
+
+    raw_source = True
+
+
+class RawFacetCacheBookDocumentViewSet(FacetCacheBookDocumentViewSet):
+    """Book document view caching the global facets in raw source mode."""
+
+    pagination_class = RawPageNumberPagination
+    serializer_class = IdBookDocumentSerializer
+
+
+def get_terms(key, doc_count):
+    """Get terms aggregation result.
+
+    :param key:
+    :param doc_count:
+    :return:
+    """
+    return {
+        'doc_count_error_upper_bound': 0,
+        'sum_other_doc_count': 0,
+        'buckets': [{'key': key, 'doc_count': doc_count}],
+    }
+
+
+@pytest.mark.django_db
+class TestFacetCache(unittest.TestCase):
+    """Test global facet cache."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.factory = APIRequestFactory()
+
+    def setUp(self):
+        cache.clear()
+        self.raw = {
+            'hits': {
+                'total': {'value': 0, 'relation': 'eq'},
+                'max_score': None,
+                'hits': [],
+            },
+            'aggregations': {
+                '_filter_publisher': {
+                    'doc_count': 100,
+                    'publisher': get_terms('Self', 100),
+                },
+                '_filter_state': {
+                    'doc_count': 5,
+                    'state': get_terms('published', 5),
+                },
+            },
+        }
+
+    def _list(self, params, view_class=FacetCacheBookDocumentViewSet):
+        view = view_class.as_view({'get': 'list'})
+        with mock.patch.object(Elasticsearch, 'search',
+                               return_value=copy.deepcopy(self.raw)) as search:
+            response = view(self.factory.get('/', params))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(search.call_count, 1)
+        body = search.call_args[1].get('body', search.call_args[1])
+        return response.data, body
+
+    def test_global_facets_cached(self):
+        """Global facets are requested once per index generation."""
+        data, body = self._list({'facet': 'state'})
+        self.assertEqual(sorted(body['aggs']),
+                         ['_filter_publisher', '_filter_state'])
+        self.assertEqual(sorted(data['facets']),
+                         ['_filter_publisher', '_filter_state'])
+
+        # Served from the cache, for any query
+        del self.raw['aggregations']['_filter_publisher']
+        data, body = self._list({'facet': 'state', 'search': 'python'})
+        self.assertEqual(list(body['aggs']), ['_filter_state'])
+        self.assertEqual(
+            data['facets']['_filter_publisher'],
+            {'doc_count': 100, 'publisher': get_terms('Self', 100)}
+        )
+        self.assertEqual(data['facets']['_filter_state']['doc_count'], 5)
+
+        # Index updates invalidate the cache
+        ResponseCache().bump_generation(BookDocument._index._name)
+        self.raw['aggregations']['_filter_publisher'] = {
+            'doc_count': 101,
+            'publisher': get_terms('Self', 101),
+        }
+        data, body = self._list({'facet': 'state'})
+        self.assertIn('_filter_publisher', body['aggs'])
+        self.assertEqual(data['facets']['_filter_publisher']['doc_count'],
+                         101)
+
+    def test_global_facets_only(self):
+        """Searches without other aggregations."""
+        self._list({})
+        self.raw.pop('aggregations')
+        data, body = self._list({'page': '1'})
+        self.assertNotIn('aggs', body)
+        self.assertEqual(list(data['facets']), ['_filter_publisher'])
+
+    def test_raw_source(self):
+        """Global facets are cached in the raw source mode."""
+        self.raw['hits']['total']['value'] = 1
+        self.raw['hits']['hits'].append(
+            {'_id': '1', '_score': None, '_source': {'id': 1}}
+        )
+        data, body = self._list({}, RawFacetCacheBookDocumentViewSet)
+        self.assertEqual(data['results'], [{'id': 1}])
+        del self.raw['aggregations']['_filter_publisher']
+        data, body = self._list({}, RawFacetCacheBookDocumentViewSet)
+        self.assertNotIn('_filter_publisher', body.get('aggs', {}))
+        self.assertEqual(data['results'], [{'id': 1}])
+        self.assertEqual(data['facets']['_filter_publisher']['doc_count'],
+                         100)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+Test facet values (paging through buckets of a facet).
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import unittest
+
+from elasticsearch import Elasticsearch
+
+import mock
+import pytest
+
+from rest_framework.test import APIRequestFactory
+
+from search_indexes.viewsets import BookDocumentViewSet
+
+from ..filter_backends import FacetedSearchFilterBackend
+from ..viewsets import FacetValuesMixin
+
+__title__ = 'django_elasticsearch_dsl_drf.tests.test_facet_values'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = (
+    'TestFacetValues',
+)
+
+
+class DisjunctiveFacetedSearchFilterBackend(FacetedSearchFilterBackend):
+    """Faceted search filter backend, filtering the facets."""
+
+    disjunctive = True
+
+
+class FacetValuesBookDocumentViewSet(FacetValuesMixin, BookDocumentViewSet):
+    """Book document view with facet values."""
+
+    facet_values_page_size = 2
+    filter_backends = [
+        DisjunctiveFacetedSearchFilterBackend
+        if __backend is FacetedSearchFilterBackend
+        else __backend
+        for __backend in BookDocumentViewSet.filter_backends
+    ]
+
+
+class TagsFacetedSearchFilterBackend(DisjunctiveFacetedSearchFilterBackend):
+    """Faceted search filter backend, adding the tags facet."""
+
+    @classmethod
+    def prepare_faceted_search_fields(cls, view):
+        faceted_search_fields = super(
+            TagsFacetedSearchFilterBackend,
+            cls
+        ).prepare_faceted_search_fields(view)
+        faceted_search_fields['tags'] = dict(
+            faceted_search_fields['state'],
+            field='tags.raw',
+            options={'size': 5, 'order': {'_key': 'desc'}}
+        )
+        return faceted_search_fields
+
+
+class TagsFacetValuesBookDocumentViewSet(FacetValuesBookDocumentViewSet):
+    """Book document view with the custom faceted search filter backend."""
+
+    filter_backends = [
+        TagsFacetedSearchFilterBackend
+        if __backend is DisjunctiveFacetedSearchFilterBackend
+        else __backend
+        for __backend in FacetValuesBookDocumentViewSet.filter_backends
+    ]
+
+
+@pytest.mark.django_db
+class TestFacetValues(unittest.TestCase):
+    """Test facet values."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.factory = APIRequestFactory()
+
+    def _get_raw(self, name, keys, after_key=None):
+        raw = {
+            'hits': {
+                'total': {'value': 0, 'relation': 'eq'},
+                'max_score': None,
+                'hits': [],
+            },
+            'aggregations': {
+                name: {
+                    'buckets': [
+                        {'key': {name: __key}, 'doc_count': 3}
+                        for __key in keys
+                    ],
+                },
+            },
+        }
+        if after_key is not None:
+            raw['aggregations'][name]['after_key'] = {name: after_key}
+        return raw
+
+    def _get(self, params, raw=None,
+             view_class=FacetValuesBookDocumentViewSet):
+        view = view_class.as_view({'get': 'facet_values'})
+        with mock.patch.object(Elasticsearch, 'search',
+                               return_value=raw) as search:
+            response = view(self.factory.get('/', params))
+        body = None
+        if search.called:
+            body = search.call_args[1].get('body', search.call_args[1])
+        return response, body
+
+    def test_first_page(self):
+        """Test first page of facet values."""
+        response, body = self._get(
+            {'facet': 'state', 'state': 'published', 'state_pf': 'rejected',
+             'publisher_pf': 'Self', 'ordering': 'price'},
+            self._get_raw('state', ['in_progress', 'published'],
+                          'published')
+        )
+        self.assertEqual(response.status_code, 200)
+
+        # Single composite aggregation, no hits
+        self.assertEqual(
+            body['aggs'],
+            {
+                'state': {
+                    'composite': {
+                        'sources': [
+                            {'state': {'terms': {'field': 'state.raw'}}},
+                        ],
+                        'size': 2,
+                    },
+                },
+            }
+        )
+        self.assertEqual(body['size'], 0)
+        self.assertFalse(body['_source'])
+        self.assertNotIn('sort', body)
+        self.assertNotIn('post_filter', body)
+
+        # Filters and post filters of other fields apply
+        query = str(body['query'])
+        self.assertIn("'state.raw': ['published']", query)
+        self.assertIn("'publisher.raw': ['Self']", query)
+        self.assertNotIn('rejected', query)
+
+        self.assertEqual(
+            [dict(__r) for __r in response.data['results']],
+            [
+                {'key': 'in_progress', 'doc_count': 3},
+                {'key': 'published', 'doc_count': 3},
+            ]
+        )
+        self.assertIn('cursor=', response.data['next'])
+
+    def test_next_page(self):
+        """Test next page of facet values."""
+        view = FacetValuesBookDocumentViewSet()
+        cursor = view.encode_facet_values_cursor({'state': 'published'})
+        response, body = self._get(
+            {'facet': 'state', 'cursor': cursor},
+            self._get_raw('state', ['rejected'], 'rejected')
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body['aggs']['state']['composite']['after'],
+                         {'state': 'published'})
+        self.assertEqual(len(response.data['results']), 1)
+        # Last page
+        self.assertIsNone(response.data['next'])
+
+    def test_global(self):
+        """Global facets ignore filters."""
+        response, body = self._get(
+            {'facet': 'publisher', 'state': 'published'},
+            self._get_raw('publisher', ['Self'])
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body.get('query', {'match_all': {}}),
+                         {'match_all': {}})
+
+    def test_faceted_search_backend(self):
+        """Facets and their options come from the backend of the view."""
+        response, body = self._get(
+            {'facet': 'tags'},
+            self._get_raw('tags', ['Python']),
+            TagsFacetValuesBookDocumentViewSet
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            body['aggs']['tags']['composite'],
+            {
+                'sources': [
+                    {'tags': {'terms': {'field': 'tags.raw',
+                                        'order': 'desc'}}},
+                ],
+                'size': 5,
+            }
+        )
+
+    def test_invalid(self):
+        """Test unknown facets and invalid cursors."""
+        response, body = self._get({'facet': 'price'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIsNone(body)
+
+        response, body = self._get({'facet': 'state', 'cursor': 'invalid'})
+        self.assertEqual(response.status_code, 404)
+        self.assertIsNone(body)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+Test disjunctive (multi-select) faceted search.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import unittest
+
+import pytest
+
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from search_indexes.viewsets import BookDocumentViewSet
+
+from ..filter_backends import (
+    FacetedSearchFilterBackend,
+    PostFilterFilteringFilterBackend,
+)
+
+__title__ = 'django_elasticsearch_dsl_drf.tests.' \
+            'test_faceted_search_disjunctive'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = (
+    'TestDisjunctiveFacetedSearch',
+)
+
+
+class DisjunctiveFacetedSearchFilterBackend(FacetedSearchFilterBackend):
+    """Faceted search filter backend, filtering the facets."""
+
+    disjunctive = True
+
+
+class DisjunctiveBookDocumentViewSet(BookDocumentViewSet):
+    """Book document view with post filters and facets only."""
+
+    filter_backends = [
+        PostFilterFilteringFilterBackend,
+        DisjunctiveFacetedSearchFilterBackend,
+    ]
+
+
+class ConjunctiveBookDocumentViewSet(DisjunctiveBookDocumentViewSet):
+    """Book document view with facets not filtered by the post filters."""
+
+    filter_backends = [
+        PostFilterFilteringFilterBackend,
+        FacetedSearchFilterBackend,
+    ]
+
+
+@pytest.mark.django_db
+class TestDisjunctiveFacetedSearch(unittest.TestCase):
+    """Test disjunctive (multi-select) faceted search."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.factory = APIRequestFactory()
+
+    def _get_body(self, view_class, params):
+        view = view_class()
+        view.request = Request(self.factory.get('/', params))
+        queryset = view.search.query()
+        for backend in view.filter_backends:
+            queryset = backend().filter_queryset(
+                view.request,
+                queryset,
+                view
+            )
+        return queryset.to_dict()
+
+    def test_facets_filtered_by_other_fields(self):
+        """Each facet is filtered by the post filters of other fields."""
+        body = self._get_body(
+            DisjunctiveBookDocumentViewSet,
+            {
+                'facet': ['state', 'publication_date'],
+                'state_pf': ['published', 'in_progress'],
+                'publisher_pf': 'Self',
+            }
+        )
+        state_terms = {'terms': {'state.raw': ['published', 'in_progress']}}
+        publisher_term = {'terms': {'publisher.raw': ['Self']}}
+
+        # Hits are filtered by all post filters
+        self.assertEqual(
+            body['post_filter'],
+            {'bool': {'must': [state_terms, publisher_term]}}
+        )
+
+        # The state facet is not filtered by the state post filter
+        self.assertEqual(
+            body['aggs']['_filter_state']['filter'],
+            {'bool': {'filter': [publisher_term]}}
+        )
+
+        # Other facets are filtered by all post filters
+        self.assertEqual(
+            body['aggs']['_filter_publication_date']['filter'],
+            {'bool': {'filter': [state_terms, publisher_term]}}
+        )
+
+        # Global facets are not filtered at all
+        self.assertEqual(
+            body['aggs']['_filter_publisher'],
+            {
+                'global': {},
+                'aggs': {
+                    'publisher': {
+                        'terms': {'field': 'publisher.raw'},
+                    },
+                },
+            }
+        )
+
+    def test_no_post_filters(self):
+        """Without post filters facets match all documents."""
+        body = self._get_body(DisjunctiveBookDocumentViewSet,
+                              {'facet': 'state'})
+        self.assertNotIn('post_filter', body)
+        self.assertEqual(body['aggs']['_filter_state']['filter'],
+                         {'match_all': {}})
+
+    def test_not_disjunctive(self):
+        """Facets are not filtered by default."""
+        body = self._get_body(
+            ConjunctiveBookDocumentViewSet,
+            {'facet': 'state', 'publisher_pf': 'Self'}
+        )
+        self.assertIn('post_filter', body)
+        self.assertEqual(body['aggs']['_filter_state']['filter'],
+                         {'match_all': {}})
+
+
+if __name__ == '__main__':
+    unittest.main()
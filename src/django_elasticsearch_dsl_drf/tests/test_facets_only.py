@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Test facets-only requests.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import unittest
+
+from elasticsearch import Elasticsearch
+
+import mock
+import pytest
+
+from rest_framework.test import APIRequestFactory
+
+from search_indexes.viewsets import BookDocumentViewSet
+
+from ..viewsets import FacetsMixin
+
+__title__ = 'django_elasticsearch_dsl_drf.tests.test_facets_only'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = (
+    'TestFacetsOnly',
+)
+
+
+class FacetsBookDocumentViewSet(FacetsMixin, BookDocumentViewSet):
+    """Book document view with facets-only requests."""
+
+
+@pytest.mark.django_db
+class TestFacetsOnly(unittest.TestCase):
+    """Test facets-only requests."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.factory = APIRequestFactory()
+
+    def test_facets(self):
+        """Only facets are fetched and returned."""
+        raw = {
+            'hits': {
+                'total': {'value': 0, 'relation': 'eq'},
+                'max_score': None,
+                'hits': [],
+            },
+            'aggregations': {
+                '_filter_publisher': {
+                    'doc_count': 12,
+                    'publisher': {
+                        'doc_count_error_upper_bound': 0,
+                        'sum_other_doc_count': 0,
+                        'buckets': [{'key': 'Self', 'doc_count': 12}],
+                    },
+                },
+                '_filter_state': {
+                    'doc_count': 5,
+                    'state': {
+                        'doc_count_error_upper_bound': 0,
+                        'sum_other_doc_count': 0,
+                        'buckets': [{'key': 'published', 'doc_count': 5}],
+                    },
+                },
+            },
+        }
+        view = FacetsBookDocumentViewSet.as_view({'get': 'facets'})
+        with mock.patch.object(Elasticsearch, 'search',
+                               return_value=raw) as search:
+            response = view(
+                self.factory.get('/', {'facet': 'state',
+                                       'search': 'python',
+                                       'publisher': 'Self'})
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(search.call_count, 1)
+        body = search.call_args[1].get('body', search.call_args[1])
+
+        self.assertEqual(body['size'], 0)
+        self.assertFalse(body['_source'])
+        self.assertFalse(body['track_total_hits'])
+        self.assertNotIn('sort', body)
+        self.assertNotIn('highlight', body)
+        self.assertIn('query', body)
+        self.assertEqual(sorted(body['aggs']),
+                         ['_filter_publisher', '_filter_state'])
+
+        self.assertEqual(dict(response.data),
+                         {'facets': raw['aggregations']})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,322 @@
+# -*- coding: utf-8 -*-
+"""
+Test the in-memory fake Elasticsearch.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import unittest
+
+from elasticsearch import Elasticsearch, NotFoundError
+from elasticsearch.helpers import bulk, scan
+from elasticsearch_dsl import MultiSearch, Q, Search
+from elasticsearch_dsl.connections import connections
+
+import pytest
+
+from rest_framework.test import APIRequestFactory
+
+from search_indexes.viewsets import BookDocumentViewSet
+
+from ..fake_elasticsearch import (
+    FakeConnection,
+    FakeDocumentStore,
+    register_fake_connection,
+)
+from ..viewsets import BaseDocumentViewSet
+
+__title__ = 'django_elasticsearch_dsl_drf.tests.test_fake_elasticsearch'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = (
+    'TestFakeElasticsearch',
+)
+
+INDEX = 'fake_book'
+
+MAPPINGS = {
+    'properties': {
+        'id': {'type': 'integer'},
+        'title': {
+            'type': 'text',
+            'fields': {
+                'raw': {'type': 'keyword'},
+                'suggest': {'type': 'completion'},
+            },
+        },
+        'state': {
+            'type': 'text',
+            'fields': {'raw': {'type': 'keyword'}},
+        },
+        'price': {'type': 'float'},
+        'publication_date': {'type': 'date'},
+        'location': {'type': 'geo_point'},
+        'chapters': {
+            'type': 'nested',
+            'properties': {
+                'title': {'type': 'text'},
+                'pages': {'type': 'integer'},
+            },
+        },
+    },
+}
+
+BOOKS = [
+    {
+        'id': 1,
+        'title': 'Alice in Wonderland',
+        'state': 'published',
+        'price': 10.0,
+        'publication_date': '2019-01-15',
+        'location': {'lat': 52.37, 'lon': 4.89},  # Amsterdam
+        'chapters': [
+            {'title': 'Down the Rabbit-Hole', 'pages': 12},
+            {'title': 'The Pool of Tears', 'pages': 10},
+        ],
+    },
+    {
+        'id': 2,
+        'title': 'Through the Looking-Glass',
+        'state': 'published',
+        'price': 25.5,
+        'publication_date': '2019-02-10',
+        'location': {'lat': 51.92, 'lon': 4.48},  # Rotterdam
+        'chapters': [
+            {'title': 'Looking-Glass House', 'pages': 15},
+        ],
+    },
+    {
+        'id': 3,
+        'title': 'The Hunting of the Snark',
+        'state': 'rejected',
+        'price': 40.0,
+        'publication_date': '2019-02-20',
+        'location': {'lat': 40.18, 'lon': 44.51},  # Yerevan
+        'chapters': [],
+    },
+]
+
+
+@pytest.mark.django_db
+class TestFakeElasticsearch(unittest.TestCase):
+    """Test the in-memory fake Elasticsearch."""
+
+    def setUp(self):
+        self.store = FakeDocumentStore()
+        self.client = Elasticsearch(
+            connection_class=FakeConnection,
+            store=self.store
+        )
+        self.client.indices.create(INDEX, body={'mappings': MAPPINGS})
+        bulk(
+            self.client,
+            (
+                dict(__book, _index=INDEX, _id=__book['id'])
+                for __book in BOOKS
+            ),
+            refresh=True
+        )
+
+    def search(self):
+        return Search(using=self.client, index=INDEX)
+
+    def get_ids(self, search):
+        return sorted(int(__hit.meta.id) for __hit in search.execute())
+
+    def test_queries(self):
+        """Queries emitted by the filter backends."""
+        search = self.search()
+        for query, ids in (
+            (Q('term', **{'state.raw': 'published'}), [1, 2]),
+            (Q('terms', **{'state.raw': ['rejected', 'new']}), [3]),
+            (Q('range', price={'gte': 20, 'lt': 40}), [2]),
+            (Q('range', publication_date={'gte': '2019-02-01'}), [2, 3]),
+            (Q('prefix', **{'title.raw': 'Through'}), [2]),
+            (Q('wildcard', **{'title.raw': '*Snark'}), [3]),
+            (Q('exists', field='chapters'), [1, 2]),
+            (Q('ids', values=['1', '3']), [1, 3]),
+            (Q('match', title='alice snark'), [1, 3]),
+            (Q('match', title={'query': 'alice snark',
+                               'operator': 'and'}), []),
+            (
+                Q(
+                    'nested',
+                    path='chapters',
+                    query=Q('match', **{'chapters.title': 'tears'})
+                    & Q('range', **{'chapters.pages': {'lte': 10}})
+                ),
+                [1]
+            ),
+            (
+                Q(
+                    'geo_distance',
+                    distance='100km',
+                    location={'lat': 52.09, 'lon': 5.12}  # Utrecht
+                ),
+                [1, 2]
+            ),
+            (
+                Q('bool',
+                  filter=[Q('term', **{'state.raw': 'published'})],
+                  must_not=[Q('ids', values=['1'])]),
+                [2]
+            ),
+        ):
+            self.assertEqual(self.get_ids(search.query(query)), ids, query)
+
+    def test_sort_and_pagination(self):
+        """Sorting, pagination and ``search_after``."""
+        search = self.search().sort('-price')
+        self.assertEqual(
+            [int(__hit.meta.id) for __hit in search[0:2].execute()],
+            [3, 2]
+        )
+        response = search.extra(search_after=[25.5]).execute()
+        self.assertEqual([int(__hit.meta.id) for __hit in response], [1])
+        self.assertEqual(search.execute().hits.total.value, 3)
+
+    def test_aggregations(self):
+        """Terms and date histogram aggregations."""
+        search = self.search()
+        search.aggs.bucket('states', 'terms', field='state.raw')
+        search.aggs.bucket('dates', 'terms', field='publication_date',
+                           order={'_key': 'asc'}, size=1)
+        search.aggs.bucket(
+            'months',
+            'date_histogram',
+            field='publication_date',
+            calendar_interval='month'
+        ).metric('avg_price', 'avg', field='price')
+        response = search[0:0].execute()
+        self.assertEqual(
+            [
+                (__bucket.key, __bucket.doc_count)
+                for __bucket in response.aggregations.states.buckets
+            ],
+            [('published', 2), ('rejected', 1)]
+        )
+        self.assertEqual(
+            [
+                __bucket.key_as_string
+                for __bucket in response.aggregations.dates.buckets
+            ],
+            ['2019-01-15T00:00:00.000Z']
+        )
+        self.assertNotIn('key_as_string',
+                         response.aggregations.states.buckets[0])
+        months = response.aggregations.months.buckets
+        self.assertEqual(
+            [(__bucket.key_as_string[:7], __bucket.doc_count)
+             for __bucket in months],
+            [('2019-01', 1), ('2019-02', 2)]
+        )
+        self.assertEqual(months[1].avg_price.value, 32.75)
+
+    def test_documents(self):
+        """Get, count, update and delete."""
+        self.assertEqual(
+            self.client.get(INDEX, '2')['_source']['title'],
+            'Through the Looking-Glass'
+        )
+        self.assertEqual(
+            self.client.count(
+                index=INDEX,
+                body={'query': {'term': {'state.raw': 'published'}}}
+            )['count'],
+            2
+        )
+        self.client.update(INDEX, '2', body={'doc': {'state': 'rejected'}})
+        self.client.delete(INDEX, '3')
+        with self.assertRaises(NotFoundError):
+            self.client.get(INDEX, '3')
+        self.assertEqual(
+            self.get_ids(
+                self.search().filter('term', **{'state.raw': 'rejected'})
+            ),
+            [2]
+        )
+
+    def test_msearch_and_scroll(self):
+        """Multi search and scroll."""
+        responses = MultiSearch(using=self.client, index=INDEX).add(
+            self.search().filter('term', **{'state.raw': 'published'})
+        ).add(
+            self.search().filter('term', **{'state.raw': 'rejected'})
+        ).execute()
+        self.assertEqual(
+            [__response.hits.total.value for __response in responses],
+            [2, 1]
+        )
+        self.assertEqual(
+            sorted(
+                __hit['_id'] for __hit in scan(self.client, index=INDEX,
+                                               size=1)
+            ),
+            ['1', '2', '3']
+        )
+        self.assertFalse(self.store.scrolls)
+
+    def test_suggest(self):
+        """Completion suggester."""
+        response = self.search().suggest(
+            'title_suggest',
+            'th',
+            completion={'field': 'title.suggest'}
+        ).execute()
+        self.assertEqual(
+            [
+                __option.text
+                for __option in response.suggest.title_suggest[0].options
+            ],
+            ['The Hunting of the Snark', 'Through the Looking-Glass']
+        )
+
+    def test_view(self):
+        """The views run against the registered fake connection."""
+        original = connections.get_connection()
+        client = register_fake_connection(store=FakeDocumentStore())
+        try:
+            bulk(
+                client,
+                (
+                    {
+                        '_index': 'test_book',
+                        '_id': __uid,
+                        'id': __uid,
+                        'title': 'Book {}'.format(__uid),
+                        'description': 'Description',
+                        'summary': 'Summary',
+                        'state': state,
+                        'publisher': 'Publisher',
+                        'publication_date': '2019-01-01',
+                        'price': 10.0,
+                        'pages': 100,
+                        'stock_count': 1,
+                        'isbn': '978-3-16-148410-0',
+                        'tags': [],
+                        'authors': [],
+                        'created': '2019-01-01T10:00:00',
+                        'null_field': None,
+                    }
+                    for __uid, state in enumerate(
+                        ['published', 'rejected', 'published'], 1
+                    )
+                )
+            )
+            view = BookDocumentViewSet.as_view({'get': 'list'})
+            response = view(
+                APIRequestFactory().get('/', {'state': 'published'})
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(
+                sorted(__item['id'] for __item in response.data['results']),
+                [1, 3]
+            )
+        finally:
+            connections.add_connection('default', original)
+            BaseDocumentViewSet._search_templates.clear()
+
+
+if __name__ == '__main__':
+    unittest.main()
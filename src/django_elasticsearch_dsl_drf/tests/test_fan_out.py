@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""
+Test fan-out of searches (``_msearch``).
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import unittest
+
+from elasticsearch import Elasticsearch
+from elasticsearch.exceptions import TransportError
+
+import mock
+import pytest
+
+from rest_framework.test import APIRequestFactory
+
+from search_indexes.documents import BookDocument
+from search_indexes.viewsets import BookDocumentViewSet
+
+from ..serializers import DocumentSerializer
+from ..utils import FanOutSearch
+
+__title__ = 'django_elasticsearch_dsl_drf.tests.test_fan_out'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = (
+    'TestFanOut',
+)
+
+
+class FanOutBookDocumentSerializer(DocumentSerializer):
+    """Book document serializer."""
+
+    class Meta(object):
+        """Meta options."""
+
+        document = BookDocument
+        fields = (
+            'id',
+            'title',
+            'state',
+        )
+
+
+class FanOutBookDocumentViewSet(BookDocumentViewSet):
+    """Book document view with fan-out of searches."""
+
+    serializer_class = FanOutBookDocumentSerializer
+    msearch_fan_out = True
+
+
+class SplitFanOutBookDocumentViewSet(FanOutBookDocumentViewSet):
+    """Book document view with aggregations split into sub-searches."""
+
+    msearch_split_aggregations = True
+
+
+def get_buckets(*keys):
+    """Get terms aggregation buckets.
+
+    :param keys:
+    :return:
+    """
+    return {
+        'doc_count_error_upper_bound': 0,
+        'sum_other_doc_count': 0,
+        'buckets': [{'key': __key, 'doc_count': 1} for __key in keys],
+    }
+
+
+@pytest.mark.django_db
+class TestFanOut(unittest.TestCase):
+    """Test fan-out of searches."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.factory = APIRequestFactory()
+
+    def setUp(self):
+        self.hits = {
+            'took': 3,
+            'timed_out': False,
+            'hits': {
+                'total': {'value': 2, 'relation': 'eq'},
+                'max_score': 1.0,
+                'hits': [
+                    {
+                        '_id': str(__i),
+                        '_score': 1.0,
+                        '_source': {
+                            'id': __i,
+                            'title': 'Book {}'.format(__i),
+                            'state': 'published',
+                        },
+                    }
+                    for __i in range(1, 3)
+                ],
+            },
+        }
+        self.aggregations = {
+            '_filter_publisher': {
+                'doc_count': 2,
+                'publisher': get_buckets('Self'),
+            },
+            '_filter_state': {
+                'doc_count': 2,
+                'state': get_buckets('published'),
+            },
+        }
+
+    def _msearch_response(self, split=False):
+        responses = [self.hits]
+        if split:
+            for name, agg in self.aggregations.items():
+                responses.append({'took': 10, 'aggregations': {name: agg}})
+        else:
+            responses.append({'took': 10,
+                              'aggregations': self.aggregations})
+        return {'responses': responses}
+
+    def _list(self, view_class, query_string, split=False):
+        view = view_class.as_view({'get': 'list'})
+        with mock.patch.object(
+            Elasticsearch,
+            'msearch',
+            return_value=self._msearch_response(split)
+        ) as msearch, mock.patch.object(Elasticsearch, 'search') as search:
+            response = view(self.factory.get('/' + query_string))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(search.called)
+        self.assertEqual(msearch.call_count, 1)
+        return response.data, msearch.call_args[1]['body']
+
+    def test_fan_out(self):
+        """Hits and aggregations are separate sub-searches."""
+        data, body = self._list(
+            FanOutBookDocumentViewSet,
+            '?facet=state&state_pf=published'
+        )
+        self.assertEqual(len(body), 4)
+        headers, (hits, aggs) = body[::2], body[1::2]
+        self.assertTrue(all(isinstance(__h, dict) for __h in headers))
+
+        # Hits: the post filter applies, no aggregations
+        self.assertNotIn('aggs', hits)
+        self.assertIn('post_filter', hits)
+        self.assertEqual(hits['size'], 100)
+
+        # Aggregations: no hits, no post filter
+        self.assertEqual(aggs['size'], 0)
+        self.assertNotIn('post_filter', aggs)
+        self.assertEqual(
+            sorted(aggs['aggs']),
+            ['_filter_publisher', '_filter_state']
+        )
+
+        # Responses are reassembled
+        self.assertEqual(data['count'], 2)
+        self.assertEqual(
+            [__hit['id'] for __hit in data['results']],
+            [1, 2]
+        )
+        self.assertEqual(
+            data['facets']['_filter_state']['state']['buckets'][0]['key'],
+            'published'
+        )
+        self.assertIn('_filter_publisher', data['facets'])
+
+    def test_split_aggregations(self):
+        """Each aggregation is a sub-search of its own."""
+        data, body = self._list(
+            SplitFanOutBookDocumentViewSet,
+            '?facet=state',
+            split=True
+        )
+        self.assertEqual(len(body), 6)
+        self.assertNotIn('aggs', body[1])
+        self.assertEqual(
+            sorted(list(__b['aggs']) for __b in body[3::2]),
+            [['_filter_publisher'], ['_filter_state']]
+        )
+        self.assertEqual(
+            sorted(data['facets']),
+            ['_filter_publisher', '_filter_state']
+        )
+
+    def test_nothing_to_split(self):
+        """Searches without aggregations are executed as usual."""
+        search = FanOutSearch.from_search(
+            FanOutBookDocumentViewSet().get_queryset()
+        )
+        self.assertIsInstance(search.filter('term', state='published'),
+                              FanOutSearch)
+        with mock.patch.object(Elasticsearch, 'msearch') as msearch, \
+                mock.patch.object(Elasticsearch, 'search',
+                                  return_value=self.hits) as search_:
+            response = search.execute()
+        self.assertFalse(msearch.called)
+        self.assertEqual(search_.call_count, 1)
+        self.assertEqual(len(response), 2)
+
+    def test_params(self):
+        """Search params are split between headers, request and body."""
+        search = FanOutBookDocumentViewSet().get_queryset().params(
+            routing='1',
+            preference='_local',
+            typed_keys=True,
+            track_total_hits=100,
+        )
+        search.aggs.bucket('state', 'terms', field='state.raw')
+        with mock.patch.object(Elasticsearch, 'msearch',
+                               return_value=self._msearch_response()) \
+                as msearch:
+            search.execute()
+        kwargs = msearch.call_args[1]
+        self.assertTrue(kwargs['typed_keys'])
+        body = kwargs['body']
+        self.assertEqual(
+            body[::2],
+            [{'routing': '1', 'preference': '_local'}] * 2
+        )
+        self.assertEqual(body[1]['track_total_hits'], 100)
+        self.assertFalse(body[3]['track_total_hits'])
+
+        # Params not supported by the ``_msearch``
+        search = search.params(filter_path='hits.hits')
+        with mock.patch.object(Elasticsearch, 'msearch') as msearch, \
+                mock.patch.object(Elasticsearch, 'search',
+                                  return_value=self.hits) as search_:
+            search.execute()
+        self.assertFalse(msearch.called)
+        self.assertEqual(search_.call_args[1]['filter_path'], 'hits.hits')
+
+    def test_error(self):
+        """Errors of the sub-searches are raised."""
+        search = FanOutBookDocumentViewSet().get_queryset()
+        search.aggs.bucket('state', 'terms', field='state.raw')
+        msearch_response = {
+            'responses': [
+                self.hits,
+                {'error': {'type': 'search_phase_execution_exception'},
+                 'status': 400},
+            ]
+        }
+        with mock.patch.object(Elasticsearch, 'msearch',
+                               return_value=msearch_response):
+            with self.assertRaises(TransportError):
+                search.execute()
+
+
+if __name__ == '__main__':
+    unittest.main()
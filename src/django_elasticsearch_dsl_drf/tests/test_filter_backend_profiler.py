@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+"""
+Test filter backend profiler.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import atexit
+import json
+import unittest
+
+from django.core.management import call_command
+
+from elasticsearch import Elasticsearch
+
+import mock
+import pytest
+
+from rest_framework.test import APIRequestFactory
+
+from six import StringIO
+
+from search_indexes.viewsets import BookDocumentViewSet
+
+from ..instrumentation import FilterBackendProfiler
+
+__title__ = 'django_elasticsearch_dsl_drf.tests.test_filter_backend_profiler'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = (
+    'TestFilterBackendProfiler',
+)
+
+
+class EagerProfiler(FilterBackendProfiler):
+    """Profiler flushing on each call."""
+
+    flush_interval = 0
+
+
+class LazyProfiler(FilterBackendProfiler):
+    """Profiler flushing at exit only."""
+
+    flush_interval = 3600
+
+
+class ProfiledBookDocumentViewSet(BookDocumentViewSet):
+    """Profiled book document view."""
+
+    filter_backend_profiler_class = EagerProfiler
+
+
+@pytest.mark.django_db
+class TestFilterBackendProfiler(unittest.TestCase):
+    """Test filter backend profiler."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.factory = APIRequestFactory()
+
+    def setUp(self):
+        EagerProfiler().reset()
+        LazyProfiler().reset()
+
+    def tearDown(self):
+        EagerProfiler().reset()
+        LazyProfiler().reset()
+
+    def _list(self, params):
+        raw = {
+            'hits': {
+                'total': {'value': 0, 'relation': 'eq'},
+                'max_score': None,
+                'hits': [],
+            },
+        }
+        view = ProfiledBookDocumentViewSet.as_view({'get': 'list'})
+        with mock.patch.object(Elasticsearch, 'search', return_value=raw):
+            response = view(self.factory.get('/', params))
+        self.assertEqual(response.status_code, 200)
+
+    def test_record(self):
+        """Each backend is timed, per view."""
+        self._list({'state': 'published'})
+        self._list({'search': 'python'})
+
+        stats = EagerProfiler().get_stats()
+        self.assertEqual(
+            sorted(__item['backend'].rsplit('.', 1)[-1] for __item in stats),
+            sorted(
+                __backend.__name__
+                for __backend in ProfiledBookDocumentViewSet.filter_backends
+            )
+        )
+        for item in stats:
+            self.assertEqual(item['view'].rsplit('.', 1)[-1],
+                             'ProfiledBookDocumentViewSet')
+            self.assertEqual(item['count'], 2)
+            self.assertEqual(sum(item['histogram'].values()), 2)
+            self.assertGreaterEqual(item['total'], 0)
+
+    def test_buckets(self):
+        """Durations fall into the histogram buckets."""
+        profiler = EagerProfiler()
+        self.assertEqual(profiler.get_bucket_label(0.01), '0.05')
+        self.assertEqual(profiler.get_bucket_label(1), '1')
+        self.assertEqual(profiler.get_bucket_label(3), '5')
+        self.assertEqual(profiler.get_bucket_label(1000), 'inf')
+
+    def test_command(self):
+        """Management command dumps and resets the counters."""
+        self._list({'state': 'published'})
+
+        out = StringIO()
+        call_command('elasticsearch_filter_backends_profile',
+                     profiler='django_elasticsearch_dsl_drf.tests.'
+                              'test_filter_backend_profiler.EagerProfiler',
+                     stdout=out)
+        self.assertIn('ProfiledBookDocumentViewSet', out.getvalue())
+        self.assertIn('FilteringFilterBackend: count=1', out.getvalue())
+
+        out = StringIO()
+        call_command('elasticsearch_filter_backends_profile',
+                     profiler='django_elasticsearch_dsl_drf.tests.'
+                              'test_filter_backend_profiler.EagerProfiler',
+                     json=True,
+                     reset=True,
+                     stdout=out)
+        self.assertTrue(json.loads(out.getvalue()))
+        self.assertEqual(EagerProfiler().get_stats(), [])
+
+    def test_registry(self):
+        """Pairs are registered once, without overwriting each other."""
+        profiler = EagerProfiler()
+        for view in ('a.View', 'b.View', 'a.View'):
+            profiler.flush({(view, 'a.Backend'): {'count': 1, 'total': 1.0}})
+        # Registration of another process is kept
+        EagerProfiler().register('c.View', 'a.Backend')
+        self.assertEqual(
+            profiler.get_registry(),
+            [('a.View', 'a.Backend'), ('b.View', 'a.Backend'),
+             ('c.View', 'a.Backend')]
+        )
+        self.assertEqual(
+            [(__item['view'], __item['count'])
+             for __item in sorted(profiler.get_stats(),
+                                  key=lambda __item: __item['view'])],
+            [('a.View', 2), ('b.View', 1)]
+        )
+
+    def test_flush_at_exit(self):
+        """Counters still in-process are flushed at exit."""
+        profiler = LazyProfiler()
+        with mock.patch.object(atexit, 'register') as register:
+            profiler.record(ProfiledBookDocumentViewSet, LazyProfiler, 1.0)
+            profiler.record(ProfiledBookDocumentViewSet, LazyProfiler, 1.0)
+        self.assertEqual(register.call_count, 1)
+        self.assertEqual(profiler.get_stats(), [])
+
+        register.call_args[0][0]()
+        self.assertEqual(
+            [__item['count'] for __item in profiler.get_stats()],
+            [2]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
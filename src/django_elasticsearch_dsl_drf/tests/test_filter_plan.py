@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Test compiled filter plans.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import unittest
+
+import pytest
+
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from search_indexes.viewsets import (
+    AddressDocumentViewSet,
+    BookDefaultFilterLookupDocumentViewSet,
+    BookDocumentViewSet,
+)
+
+from ..constants import LOOKUP_FILTER_TERM, LOOKUP_QUERY_GTE
+from ..filter_backends import (
+    FilteringFilterBackend,
+    NestedFilteringFilterBackend,
+)
+
+__title__ = 'django_elasticsearch_dsl_drf.tests.test_filter_plan'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = (
+    'TestFilterPlan',
+)
+
+
+@pytest.mark.django_db
+class TestFilterPlan(unittest.TestCase):
+    """Test compiled filter plans."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.factory = APIRequestFactory()
+
+    def _get_request(self, params):
+        return Request(self.factory.get('/', params))
+
+    def test_view_filter_fields_not_modified(self):
+        """Preparing filter fields does not modify the view."""
+        view = BookDocumentViewSet()
+        FilteringFilterBackend.compile_filter_plan(view)
+        self.assertEqual(BookDocumentViewSet.filter_fields['title'],
+                         'title.raw')
+
+    def test_filter_plan_is_cached(self):
+        """Filter plan is compiled once per view class."""
+        plan = FilteringFilterBackend.get_filter_plan(BookDocumentViewSet())
+        self.assertIs(
+            plan,
+            FilteringFilterBackend.get_filter_plan(BookDocumentViewSet())
+        )
+
+    def test_filter_plan_entries(self):
+        """Test filter plan entries."""
+        plan = FilteringFilterBackend.get_filter_plan(BookDocumentViewSet())
+        self.assertEqual(plan['title']['field'], 'title.raw')
+        self.assertIsNone(plan['title']['lookup'])
+        self.assertEqual(plan['id__gte']['lookup'], LOOKUP_QUERY_GTE)
+        # Lookups not listed in the ``lookups`` are not in the plan
+        self.assertNotIn('price__gte', plan)
+
+    def test_filter_plan_default_lookup(self):
+        """Default lookup is resolved at compile time."""
+        plan = FilteringFilterBackend.get_filter_plan(
+            BookDefaultFilterLookupDocumentViewSet()
+        )
+        self.assertEqual(plan['authors']['lookup'], LOOKUP_FILTER_TERM)
+
+    def test_nested_filter_plan_path(self):
+        """Nested filter plan entries contain the path."""
+        plan = NestedFilteringFilterBackend.get_filter_plan(
+            AddressDocumentViewSet()
+        )
+        self.assertEqual(
+            plan['continent_country__term']['path'],
+            'continent.country'
+        )
+
+    def test_get_filter_query_params(self):
+        """Test get filter query params."""
+        view = BookDocumentViewSet()
+        request = self._get_request({
+            'id__gte': '3',
+            'title': ['Python', ' '],
+            'price__gte': '10',
+            'non_filter_field': '1',
+        })
+        params = FilteringFilterBackend().get_filter_query_params(
+            request,
+            view
+        )
+        self.assertEqual(sorted(params.keys()), ['id__gte', 'title'])
+        self.assertEqual(params['title']['values'], ['Python'])
+        self.assertEqual(params['id__gte']['field'], 'id')
+
+        # Filter plan itself is never modified
+        plan = FilteringFilterBackend.get_filter_plan(view)
+        self.assertNotIn('values', plan['title'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+Test lookup dispatching of the filtering filter backend.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import unittest
+
+import pytest
+
+from elasticsearch_dsl import Search
+
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from search_indexes.viewsets import BookDocumentViewSet
+
+from ..constants import LOOKUP_FILTER_REGEXP, LOOKUP_QUERY_IN
+from ..filter_backends import FilteringFilterBackend
+from ..utils import ClauseCollector
+
+__title__ = 'django_elasticsearch_dsl_drf.tests.test_filtering_dispatch'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = (
+    'TestFilteringDispatch',
+)
+
+
+class RegexpFilteringFilterBackend(FilteringFilterBackend):
+    """Filtering filter backend with a custom `regexp` lookup."""
+
+    @classmethod
+    def apply_filter_regexp(cls, queryset, options, value):
+        return cls.apply_filter(
+            queryset=queryset,
+            options=options,
+            args=['regexp'],
+            kwargs={options['field']: value}
+        )
+
+
+RegexpFilteringFilterBackend.register_lookup_handler(
+    LOOKUP_FILTER_REGEXP,
+    'apply_filter_regexp'
+)
+
+
+class SearchFilteringFilterBackend(FilteringFilterBackend):
+    """Filtering filter backend, overriding ``apply_*`` with search methods.
+    """
+
+    @classmethod
+    def apply_filter_terms(cls, queryset, options, value):
+        queryset = queryset.query('terms', **{options['field']: value})
+        return queryset.extra(track_scores=True).sort('-id')
+
+
+class RegexpBookDocumentViewSet(BookDocumentViewSet):
+    """Book document view with `regexp` lookup enabled on `title`."""
+
+    filter_backends = [RegexpFilteringFilterBackend]
+    filter_fields = {
+        'title': {
+            'field': 'title.raw',
+            'lookups': [
+                LOOKUP_FILTER_REGEXP,
+                LOOKUP_QUERY_IN,
+            ],
+        },
+    }
+
+
+@pytest.mark.django_db
+class TestFilteringDispatch(unittest.TestCase):
+    """Test lookup dispatching of the filtering filter backend."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.factory = APIRequestFactory()
+
+    def _filter(self, backend, view, params):
+        request = Request(self.factory.get('/', params))
+        return backend().filter_queryset(request, view.get_queryset(), view)
+
+    def test_clause_collector(self):
+        """Collected clauses produce the same query as chained calls."""
+        view = BookDocumentViewSet()
+        search = view.get_queryset()
+        chained = search \
+            .filter('term', state='published') \
+            .query('wildcard', title='py*') \
+            .exclude('term', tags='java') \
+            .post_filter('term', publisher='Self')
+
+        clauses = ClauseCollector() \
+            .filter('term', state='published') \
+            .query('wildcard', title='py*') \
+            .exclude('term', tags='java') \
+            .post_filter('term', publisher='Self')
+
+        self.assertEqual(len(clauses), 4)
+        self.assertEqual(clauses.apply(search).to_dict(), chained.to_dict())
+
+    def test_empty_clause_collector(self):
+        """Search is returned untouched if nothing has been collected."""
+        search = BookDocumentViewSet().get_queryset()
+        self.assertIs(ClauseCollector().apply(search), search)
+
+    def test_search_methods(self):
+        """Overridden ``apply_*`` methods get a search-compatible object."""
+        search = self._filter(
+            SearchFilteringFilterBackend,
+            BookDocumentViewSet(),
+            {'id__gte': '3', 'state': 'published', 'id__lt': '7'}
+        )
+        self.assertIsInstance(search, Search)
+        body = search.to_dict()
+        self.assertTrue(body['track_scores'])
+        self.assertEqual(body['sort'], [{'id': {'order': 'desc'}}])
+        self.assertEqual(
+            body['query']['bool']['filter'],
+            [
+                {'range': {'id': {'gte': '3'}}},
+                {'range': {'id': {'lt': '7'}}},
+            ]
+        )
+        self.assertEqual(
+            body['query']['bool']['must'],
+            [{'terms': {'state.raw': ['published']}}]
+        )
+
+        # Not available without the search
+        with self.assertRaises(AttributeError):
+            ClauseCollector().extra(track_scores=True)
+
+    def test_multiple_params(self):
+        """Test multiple query params."""
+        search = self._filter(
+            FilteringFilterBackend,
+            BookDocumentViewSet(),
+            {'id__gte': '3', 'state__wildcard': 'pub*'}
+        )
+        query = search.to_dict()['query']['bool']
+        self.assertEqual(query['filter'], [{'range': {'id': {'gte': '3'}}}])
+        self.assertEqual(query['must'], [{'wildcard': {'state.raw': 'pub*'}}])
+
+    def test_custom_lookup_handler(self):
+        """Test custom lookup handler."""
+        search = self._filter(
+            RegexpFilteringFilterBackend,
+            RegexpBookDocumentViewSet(),
+            {'title__regexp': 'py.*'}
+        )
+        self.assertEqual(
+            search.to_dict()['query']['bool']['filter'],
+            [{'regexp': {'title.raw': 'py.*'}}]
+        )
+
+    def test_register_lookup_handler_isolation(self):
+        """Parent dispatch table is not modified on registration."""
+        self.assertIn(
+            LOOKUP_FILTER_REGEXP,
+            RegexpFilteringFilterBackend.lookup_handlers
+        )
+        self.assertNotIn(
+            LOOKUP_FILTER_REGEXP,
+            FilteringFilterBackend.lookup_handlers
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+Test instrumentation of the search requests.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import unittest
+
+from elasticsearch import Elasticsearch
+
+import mock
+import pytest
+
+from rest_framework.test import APIRequestFactory
+
+from search_indexes.viewsets import BookDocumentViewSet
+
+from ..instrumentation import get_query_fingerprint, normalize_query
+from ..viewsets import InstrumentationMixin
+
+__title__ = 'django_elasticsearch_dsl_drf.tests.test_instrumentation'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = (
+    'TestInstrumentation',
+)
+
+
+class InstrumentedBookDocumentViewSet(InstrumentationMixin,
+                                      BookDocumentViewSet):
+    """Instrumented book document view."""
+
+    slow_query_threshold = 0
+
+    def record_search_metrics(self, request, metrics):
+        self.__class__.recorded.append(metrics)
+
+
+@pytest.mark.django_db
+class TestInstrumentation(unittest.TestCase):
+    """Test instrumentation of the search requests."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.factory = APIRequestFactory()
+
+    def setUp(self):
+        InstrumentedBookDocumentViewSet.recorded = []
+
+    def test_normalize_query(self):
+        """Literal values are stripped, the shape is kept."""
+        self.assertEqual(
+            normalize_query({
+                'query': {
+                    'bool': {
+                        'filter': [
+                            {'terms': {'state.raw': ['published', 'new']}},
+                            {'range': {'price': {'gte': 10}}},
+                        ],
+                    },
+                },
+                'aggs': {'states': {'terms': {'field': 'state.raw'}}},
+                'sort': [{'price': {'order': 'desc'}}],
+                'from': 20,
+                'size': 10,
+            }),
+            {
+                'query': {
+                    'bool': {
+                        'filter': [
+                            {'terms': {'state.raw': ['?']}},
+                            {'range': {'price': {'gte': '?'}}},
+                        ],
+                    },
+                },
+                'aggs': {'states': {'terms': {'field': 'state.raw'}}},
+                'sort': [{'price': {'order': 'desc'}}],
+                'from': '?',
+                'size': '?',
+            }
+        )
+
+    def test_fingerprint(self):
+        """Queries of the same shape share the fingerprint."""
+        self.assertEqual(
+            get_query_fingerprint({'query': {'term': {'state': 'new'}}}),
+            get_query_fingerprint({'query': {'term': {'state': 'old'}}})
+        )
+        self.assertNotEqual(
+            get_query_fingerprint({'query': {'term': {'state': 'new'}}}),
+            get_query_fingerprint({'query': {'term': {'title': 'new'}}})
+        )
+
+    def test_list(self):
+        """Metrics are recorded, reported and logged."""
+        raw = {
+            'took': 7,
+            'timed_out': False,
+            'hits': {
+                'total': {'value': 42, 'relation': 'eq'},
+                'max_score': None,
+                'hits': [],
+            },
+        }
+        view = InstrumentedBookDocumentViewSet.as_view({'get': 'list'})
+        with mock.patch.object(Elasticsearch, 'search', return_value=raw), \
+                mock.patch(
+                    'django_elasticsearch_dsl_drf.viewsets.LOGGER'
+                ) as logger:
+            response = view(self.factory.get('/', {'state': 'published'}))
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(len(InstrumentedBookDocumentViewSet.recorded), 1)
+        metrics = InstrumentedBookDocumentViewSet.recorded[0]
+        self.assertEqual(metrics.took, 7)
+        self.assertEqual(metrics.hits, 42)
+        self.assertIsNotNone(metrics.filter_time)
+        self.assertIsNotNone(metrics.search_time)
+        self.assertIsNotNone(metrics.serialization_time)
+        self.assertNotIn('published', str(metrics.query))
+        self.assertEqual(len(metrics.fingerprint), 40)
+
+        server_timing = response['Server-Timing']
+        for name in ('filter', 'search', 'es', 'serialize'):
+            self.assertIn('{};dur='.format(name), server_timing)
+        self.assertIn('es;dur=7.000', server_timing)
+
+        self.assertEqual(logger.warning.call_count, 1)
+        self.assertIn(metrics.fingerprint, logger.warning.call_args[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+Test counting hits in pagination.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import unittest
+
+from elasticsearch_dsl import Search
+from elasticsearch_dsl.response import Response
+
+import mock
+import pytest
+
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from search_indexes.viewsets import BookDocumentViewSet
+
+from ..pagination import LimitOffsetPagination, PageNumberPagination
+
+__title__ = 'django_elasticsearch_dsl_drf.tests.test_pagination_count'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = (
+    'TestPaginationCount',
+)
+
+
+class CappedPageNumberPagination(PageNumberPagination):
+    """Page number pagination counting up to 1000 hits."""
+
+    page_size = 10
+    track_total_hits = 1000
+
+
+class CappedLimitOffsetPagination(LimitOffsetPagination):
+    """Limit/offset pagination counting up to 1000 hits."""
+
+    default_limit = 10
+    track_total_hits = 1000
+
+
+@pytest.mark.django_db
+class TestPaginationCount(unittest.TestCase):
+    """Test counting hits in pagination."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.factory = APIRequestFactory()
+
+    def setUp(self):
+        self.searches = []
+
+    def _execute(self, total):
+        """Fake ``Search.execute``."""
+        test = self
+
+        def execute(search, ignore_cache=False):
+            body = search.to_dict()
+            test.searches.append(body)
+            start = body.get('from', 0)
+            stop = min(start + body.get('size', 10), total)
+            cap = body.get('track_total_hits')
+            if isinstance(cap, bool) or cap is None or total <= cap:
+                hits_total = {'value': total, 'relation': 'eq'}
+            else:
+                hits_total = {'value': cap, 'relation': 'gte'}
+            return Response(search, {
+                'hits': {
+                    'total': hits_total,
+                    'hits': [
+                        {'_id': str(__i), '_source': {'id': __i}}
+                        for __i in range(start, stop)
+                    ],
+                },
+            })
+
+        return execute
+
+    def _paginate(self, paginator, params, total):
+        request = Request(self.factory.get('/search/books/', params))
+        view = BookDocumentViewSet(request=request, action='list')
+        with mock.patch.object(Search, 'execute', self._execute(total)), \
+                mock.patch.object(Search, 'count') as count:
+            data = paginator.paginate_queryset(
+                view.get_queryset(),
+                request,
+                view
+            )
+            response = paginator.get_paginated_response(data).data
+        self.assertFalse(count.called)
+        return data, response
+
+    def test_single_round_trip(self):
+        """Each page costs a single request."""
+        data, response = self._paginate(
+            CappedPageNumberPagination(),
+            {'page': '2'},
+            25
+        )
+        self.assertEqual(len(self.searches), 1)
+        self.assertEqual(self.searches[0]['from'], 10)
+        self.assertEqual(len(data), 10)
+        self.assertEqual(response['count'], 25)
+        self.assertIsNotNone(response['next'])
+
+    def test_page_out_of_range(self):
+        """Pages out of range are still not found."""
+        with self.assertRaises(NotFound):
+            self._paginate(CappedPageNumberPagination(), {'page': '4'}, 25)
+        with self.assertRaises(NotFound):
+            self._paginate(CappedPageNumberPagination(), {'page': 'x'}, 25)
+
+        # Empty first page is fine
+        data, response = self._paginate(CappedPageNumberPagination(), {}, 0)
+        self.assertEqual((data, response['count']), ([], 0))
+
+    def test_track_total_hits(self):
+        """Test ``track_total_hits``."""
+        self._paginate(CappedPageNumberPagination(), {}, 25)
+        self._paginate(CappedLimitOffsetPagination(), {}, 25)
+        self.assertEqual(
+            [__search['track_total_hits'] for __search in self.searches],
+            [1000, 1000]
+        )
+
+        self._paginate(PageNumberPagination(), {}, 25)
+        self.assertNotIn('track_total_hits', self.searches[-1])
+
+    def test_count_relation(self):
+        """``count_relation`` is shown if ``track_total_hits`` is set."""
+        for paginator in (CappedPageNumberPagination(),
+                          CappedLimitOffsetPagination()):
+            _, response = self._paginate(paginator, {}, 25)
+            self.assertEqual(
+                list(response.keys())[:2],
+                ['count', 'count_relation']
+            )
+            self.assertEqual(response['count_relation'], 'eq')
+
+            _, response = self._paginate(paginator, {}, 2000)
+            self.assertEqual(
+                (response['count'], response['count_relation']),
+                (1000, 'gte')
+            )
+
+        _, response = self._paginate(PageNumberPagination(), {}, 25)
+        self.assertNotIn('count_relation', response)
+
+    def test_past_count_lower_bound(self):
+        """Pages past the ``count`` exist if it's a lower bound."""
+        data, response = self._paginate(
+            CappedPageNumberPagination(),
+            {'page': '100'},
+            2000
+        )
+        self.assertEqual(len(data), 10)
+        self.assertIn('page=101', response['next'])
+
+        data, response = self._paginate(
+            CappedLimitOffsetPagination(),
+            {'offset': '995'},
+            2000
+        )
+        self.assertEqual(len(data), 10)
+        self.assertIn('offset=1005', response['next'])
+
+
+if __name__ == '__main__':
+    unittest.main()
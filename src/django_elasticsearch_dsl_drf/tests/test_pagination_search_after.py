@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Test search after pagination.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import unittest
+
+from elasticsearch_dsl import Search
+from elasticsearch_dsl.response import Response
+
+import mock
+import pytest
+
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from search_indexes.viewsets import BookDocumentViewSet
+
+from ..pagination import SearchAfterPagination
+
+__title__ = 'django_elasticsearch_dsl_drf.tests.test_pagination_search_after'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = (
+    'TestSearchAfterPagination',
+)
+
+
+class PointInTimePagination(SearchAfterPagination):
+    """Search after pagination with point-in-time."""
+
+    page_size = 2
+    use_point_in_time = True
+
+
+@pytest.mark.django_db
+class TestSearchAfterPagination(unittest.TestCase):
+    """Test search after pagination."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.factory = APIRequestFactory()
+
+    def setUp(self):
+        self.searches = []
+
+    def _execute(self, total, pit_id=None):
+        """Fake ``Search.execute``, returning ``size`` hits."""
+        test = self
+
+        def execute(search, ignore_cache=False):
+            test.searches.append(search.to_dict())
+            size = search.to_dict()['size']
+            raw = {
+                'hits': {
+                    'total': {'value': total, 'relation': 'eq'},
+                    'hits': [
+                        {
+                            '_id': str(__i),
+                            '_source': {'id': __i},
+                            'sort': [__i],
+                        }
+                        for __i in range(1, min(size, total) + 1)
+                    ],
+                },
+            }
+            if pit_id:
+                raw['pit_id'] = pit_id
+            return Response(search, raw)
+
+        return execute
+
+    def _paginate(self, paginator, params, total, pit_id=None):
+        request = Request(self.factory.get('/search/books/', params))
+        view = BookDocumentViewSet(request=request, action='list')
+        queryset = view.get_queryset().sort('-price')
+        with mock.patch.object(Search, 'execute', self._execute(total,
+                                                                pit_id)):
+            data = paginator.paginate_queryset(queryset, request, view)
+        return data, paginator.get_paginated_response(data).data
+
+    def test_first_page(self):
+        """Test first page."""
+        paginator = SearchAfterPagination()
+        paginator.page_size = 2
+        data, response = self._paginate(paginator, {}, 5)
+
+        self.assertEqual(len(data), 2)
+        self.assertEqual(response['count'], 5)
+        # Tiebreaker is added, one more hit is requested
+        self.assertEqual(
+            self.searches[0]['sort'],
+            [{'price': {'order': 'desc'}}, 'id']
+        )
+        self.assertEqual(self.searches[0]['size'], 3)
+        self.assertNotIn('search_after', self.searches[0])
+
+        cursor = paginator.encode_cursor({'search_after': [2]})
+        self.assertTrue(response['next'].endswith('?cursor=' + cursor))
+
+    def test_next_page(self):
+        """Test next page."""
+        paginator = SearchAfterPagination()
+        paginator.page_size = 2
+        cursor = paginator.encode_cursor({'search_after': [30.5, 2]})
+        data, response = self._paginate(paginator, {'cursor': cursor}, 1)
+
+        self.assertEqual(self.searches[0]['search_after'], [30.5, 2])
+        self.assertNotIn('from', self.searches[0])
+        self.assertEqual(len(data), 1)
+        # Last page
+        self.assertIsNone(response['next'])
+
+    def test_invalid_cursor(self):
+        """Test invalid cursor."""
+        for cursor in ('invalid', SearchAfterPagination().encode_cursor([])):
+            with self.assertRaises(NotFound):
+                self._paginate(SearchAfterPagination(), {'cursor': cursor}, 1)
+
+    def test_point_in_time(self):
+        """Test point-in-time."""
+        paginator = PointInTimePagination()
+        client = mock.Mock()
+        client.open_point_in_time.return_value = {'id': 'pit-1'}
+        with mock.patch('django_elasticsearch_dsl_drf.pagination.'
+                        'get_connection', return_value=client):
+            _, response = self._paginate(paginator, {}, 5, pit_id='pit-2')
+            self.assertEqual(
+                self.searches[0]['pit'],
+                {'id': 'pit-1', 'keep_alive': '1m'}
+            )
+            cursor = response['next'].split('cursor=')[1]
+            self.assertEqual(
+                paginator.decode_cursor(
+                    Request(self.factory.get('/', {'cursor': cursor}))
+                ),
+                {'search_after': [2], 'pit': 'pit-2'}
+            )
+
+            # Last page closes the point-in-time
+            paginator = PointInTimePagination()
+            self._paginate(paginator, {'cursor': cursor}, 1)
+            self.assertEqual(client.open_point_in_time.call_count, 1)
+            client.close_point_in_time.assert_called_once_with(
+                body={'id': 'pit-2'}
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+Test pass-through of the hits.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import contextlib
+import json
+import unittest
+import weakref
+
+from elasticsearch import VERSION as ELASTICSEARCH_CLIENT_VERSION
+from elasticsearch import ConnectionError, Transport
+from elasticsearch_dsl.connections import connections
+
+import mock
+import pytest
+
+from rest_framework.test import APIRequestFactory
+
+from search_indexes.viewsets import BookDocumentViewSet
+
+from ..pagination import LimitOffsetPagination, PageNumberPagination
+from ..utils import RawDeserializer
+from ..viewsets import PassThroughMixin
+
+__title__ = 'django_elasticsearch_dsl_drf.tests.test_passthrough'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = (
+    'TestPassThrough',
+)
+
+
+class PageNumberPagination10(PageNumberPagination):
+    """Page number pagination, 10 per page."""
+
+    page_size = 10
+
+
+class PassThroughBookDocumentViewSet(PassThroughMixin, BookDocumentViewSet):
+    """Pass-through book document view."""
+
+    pagination_class = PageNumberPagination10
+
+
+class LimitOffsetPassThroughBookDocumentViewSet(
+    PassThroughBookDocumentViewSet
+):
+    """Pass-through book document view with limit/offset pagination."""
+
+    pagination_class = LimitOffsetPagination
+
+
+@pytest.mark.django_db
+class TestPassThrough(unittest.TestCase):
+    """Test pass-through of the hits."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.factory = APIRequestFactory()
+
+    def setUp(self):
+        # Formatting of the hits shall be kept as is
+        self.hits = '[{"_source":{"id":1,  "title":"Python \\"hits\\":["}},' \
+                    '{"_source":{"id":2,"title":"Django ]"}}]'
+        self.raw = '{"hits":{"total":{"value":25,"relation":"eq"},' \
+                   '"hits":' + self.hits + '}}'
+
+    def _info(self, method, url):
+        """Response of the product check (``elasticsearch`` 7.14 or later).
+        """
+        if (method, url) != ('GET', '/'):
+            return None
+        return 200, {'X-Elastic-Product': 'Elasticsearch'}, json.dumps({
+            'version': {'number': '7.17.0', 'build_flavor': 'default'},
+            'tagline': 'You Know, for Search',
+        })
+
+    def _list(self, view_class, params, raw=None, count=25):
+        def perform_request(method, url, *args, **kwargs):
+            if url.endswith('/_count'):
+                return 200, {}, json.dumps({'count': count})
+            info = self._info(method, url)
+            if info is not None:
+                return info
+            return 200, {}, self.raw if raw is None else raw
+
+        connection = mock.Mock()
+        connection.perform_request.side_effect = perform_request
+        view = view_class.as_view({'get': 'list'})
+        with self._connection(connection):
+            response = view(self.factory.get('/search/books/', params))
+        return response, connection.perform_request
+
+    @contextlib.contextmanager
+    def _connection(self, connection):
+        """Use the connection given for all requests."""
+        transport = connections.get_connection().transport
+        with mock.patch.object(Transport, 'get_connection',
+                               return_value=connection), \
+                mock.patch.object(transport.connection_pool,
+                                  'connections',
+                                  [connection]), \
+                mock.patch.object(PassThroughMixin,
+                                  '_passthrough_verified_transports',
+                                  weakref.WeakSet()):
+            yield transport
+
+    def test_page_number(self):
+        """Test page number pagination."""
+        response, perform_request = self._list(
+            PassThroughBookDocumentViewSet,
+            {'page': 2, 'state': 'published', 'facet': 'publisher'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        content = response.content.decode('utf8')
+        self.assertTrue(content.endswith('"results":' + self.hits + '}'))
+
+        data = json.loads(content)
+        self.assertEqual(data['count'], 25)
+        self.assertIn('page=3', data['next'])
+        self.assertNotIn('page=', data['previous'])
+        self.assertEqual(
+            data['results'][0],
+            {'_source': {'id': 1, 'title': 'Python "hits":['}}
+        )
+
+        (method, url, params, body), _ = perform_request.call_args
+        self.assertEqual((method, url), ('POST', '/test_book/_search'))
+        self.assertEqual(
+            params['filter_path'],
+            'hits.total,hits.hits._source'
+        )
+        body = json.loads(body)
+        self.assertEqual((body['from'], body['size']), (10, 10))
+        self.assertIn('filter', body['query']['bool'])
+        self.assertNotIn('aggs', body)
+
+    def test_limit_offset(self):
+        """Test limit/offset pagination."""
+        response, perform_request = self._list(
+            LimitOffsetPassThroughBookDocumentViewSet,
+            {'limit': 2, 'offset': 22}
+        )
+        data = json.loads(response.content.decode('utf8'))
+        self.assertEqual(len(data['results']), 2)
+        self.assertEqual(data['count'], 25)
+        self.assertIn('offset=24', data['next'])
+        self.assertIn('offset=20', data['previous'])
+
+        body = json.loads(perform_request.call_args[0][3])
+        self.assertEqual((body['from'], body['size']), (22, 2))
+
+    def test_no_hits(self):
+        """Test no hits."""
+        response, _ = self._list(
+            PassThroughBookDocumentViewSet,
+            {},
+            raw='{"hits":{"total":{"value":0,"relation":"eq"}}}'
+        )
+        self.assertEqual(
+            json.loads(response.content.decode('utf8')),
+            {'count': 0, 'next': None, 'previous': None, 'results': []}
+        )
+
+    def test_hits_order(self):
+        """Hits, not being the last member, are encoded back."""
+        response, _ = self._list(
+            PassThroughBookDocumentViewSet,
+            {},
+            raw='{"hits":{"hits":' + self.hits + ','
+                '"total":{"value":25,"relation":"eq"}}}'
+        )
+        data = json.loads(response.content.decode('utf8'))
+        self.assertEqual(data['count'], 25)
+        self.assertEqual(data['results'], json.loads(self.hits))
+
+    def test_last_page(self):
+        """Test last page."""
+        response, perform_request = self._list(
+            PassThroughBookDocumentViewSet,
+            {'page': 'last'}
+        )
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content.decode('utf8'))
+        self.assertIsNone(data['next'])
+        self.assertIn('page=2', data['previous'])
+        (method, url, params, body), _ = perform_request.call_args
+        self.assertEqual(url, '/test_book/_search')
+        body = json.loads(body)
+        self.assertEqual((body['from'], body['size']), (20, 10))
+
+    def test_retries(self):
+        """Failed requests are retried on other connections."""
+        responses = [
+            ConnectionError('N/A', 'Unavailable', None),
+            (200, {}, self.raw),
+        ]
+
+        def perform_request(method, url, *args, **kwargs):
+            info = self._info(method, url)
+            if info is not None:
+                return info
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        connection = mock.Mock()
+        connection.perform_request.side_effect = perform_request
+        view = PassThroughBookDocumentViewSet.as_view({'get': 'list'})
+        with self._connection(connection) as transport, \
+                mock.patch.object(transport, 'mark_dead') as mark_dead:
+            response = view(self.factory.get('/search/books/'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(responses, [])
+        mark_dead.assert_called_once_with(connection)
+
+    def test_verified_once(self):
+        """Elasticsearch is verified with the public API, once."""
+        view = PassThroughBookDocumentViewSet()
+        with mock.patch.object(PassThroughMixin,
+                               '_passthrough_verified_transports',
+                               weakref.WeakSet()), \
+                mock.patch.object(view.client, 'info') as info:
+            for __i in range(2):
+                transport = view.get_passthrough_transport()
+                self.assertIsInstance(transport.deserializer, RawDeserializer)
+        self.assertIsNot(transport, view.client.transport)
+        self.assertEqual(
+            info.call_count,
+            1 if ELASTICSEARCH_CLIENT_VERSION >= (7, 14) else 0
+        )
+
+    def test_invalid_page(self):
+        """Test invalid page."""
+        for page in ('x', 4):
+            response, _ = self._list(
+                PassThroughBookDocumentViewSet,
+                {'page': page}
+            )
+            self.assertEqual(response.status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Test query builder mode.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import unittest
+
+import pytest
+
+from elasticsearch_dsl import Search
+
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from search_indexes.viewsets import (
+    AddressDocumentViewSet,
+    BookDocumentViewSet,
+)
+
+from ..utils import QueryBuilder
+
+__title__ = 'django_elasticsearch_dsl_drf.tests.test_query_builder'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = (
+    'TestQueryBuilder',
+)
+
+
+@pytest.mark.django_db
+class TestQueryBuilder(unittest.TestCase):
+    """Test query builder mode."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.factory = APIRequestFactory()
+
+    def _filter(self, view_class, params, query_builder):
+        view = view_class(
+            request=Request(self.factory.get('/', params)),
+            action='list',
+            format_kwarg=None,
+            query_builder=query_builder
+        )
+        queryset = view.get_queryset()
+        initial = queryset.to_dict()
+        search = view.filter_queryset(queryset)
+        if query_builder:
+            # Base queryset is not modified (``aggs`` included)
+            self.assertEqual(queryset.to_dict(), initial)
+        return search
+
+    def _test_same_query(self, view_class, params):
+        search = self._filter(view_class, params, False)
+        built = self._filter(view_class, params, True)
+        self.assertIs(built.__class__, Search)
+        self.assertEqual(built.to_dict(), search.to_dict())
+
+    def test_query_builder(self):
+        """Test query builder."""
+        search = BookDocumentViewSet().get_queryset()
+        initial = search.to_dict()
+        builder = QueryBuilder.from_search(search)
+        self.assertIs(builder.filter('term', state='published'), builder)
+        self.assertIs(builder.sort('id').highlight('title'), builder)
+        built = builder.build()
+        self.assertIs(built.__class__, Search)
+        self.assertEqual(
+            built.to_dict(),
+            search.filter('term', state='published')
+                  .sort('id')
+                  .highlight('title')
+                  .to_dict()
+        )
+        # Materialized search is immutable again
+        self.assertIsNot(built.filter('term', state='rejected'), built)
+        self.assertEqual(search.to_dict(), initial)
+
+    def test_same_query_book(self):
+        """Query builder mode produces the same query (book)."""
+        self._test_same_query(
+            BookDocumentViewSet,
+            {
+                'search': ['python', 'title:django'],
+                'title': 'Python',
+                'id__gte': '3',
+                'tags__in': 'education__economy',
+                'state__exclude': 'rejected',
+                'ids': '1__2__3',
+                'publisher_pf': 'Self',
+                'ordering': ['-id', 'price'],
+                'facet': 'publisher',
+                'highlight': 'title',
+            }
+        )
+
+    def test_same_query_address(self):
+        """Query builder mode produces the same query (address)."""
+        self._test_same_query(
+            AddressDocumentViewSet,
+            {
+                'search': 'Amsterdam',
+                'continent_country': 'Netherlands',
+                'location__geo_distance': '1km__52.37__4.89',
+                'city__prefix': 'Ams',
+                'ordering': 'location__52.37__4.89__km',
+            }
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
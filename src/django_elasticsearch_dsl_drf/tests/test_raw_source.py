@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+Test raw source mode.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import unittest
+
+from elasticsearch import Elasticsearch
+
+import mock
+import pytest
+
+from rest_framework.test import APIRequestFactory
+
+from search_indexes.documents import BookDocument
+from search_indexes.viewsets import BookDocumentViewSet
+
+from ..pagination import SearchAfterPagination
+from ..serializers import DocumentSerializer
+from ..utils import RawHits, RawResponse
+
+__title__ = 'django_elasticsearch_dsl_drf.tests.test_raw_source'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = (
+    'TestRawSource',
+)
+
+
+class RawBookDocumentSerializer(DocumentSerializer):
+    """Book document serializer."""
+
+    class Meta(object):
+        """Meta options."""
+
+        document = BookDocument
+        fields = (
+            'id',
+            'title',
+            'price',
+            'tags',
+        )
+
+
+class DefaultBookDocumentViewSet(BookDocumentViewSet):
+    """Book document view."""
+
+    serializer_class = RawBookDocumentSerializer
+
+
+class RawBookDocumentViewSet(DefaultBookDocumentViewSet):
+    """Book document view in the raw source mode."""
+
+    raw_source = True
+
+
+class PassThroughBookDocumentViewSet(RawBookDocumentViewSet):
+    """Book document view passing raw source to the renderer."""
+
+    serializer_class = None
+
+
+class RawSearchAfterPagination(SearchAfterPagination):
+    """Search after pagination in the raw source mode."""
+
+    page_size = 2
+    raw_source = True
+
+
+class RawSearchAfterBookDocumentViewSet(DefaultBookDocumentViewSet):
+    """Book document view with search after pagination."""
+
+    pagination_class = RawSearchAfterPagination
+
+
+@pytest.mark.django_db
+class TestRawSource(unittest.TestCase):
+    """Test raw source mode."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.factory = APIRequestFactory()
+
+    def setUp(self):
+        self.raw = {
+            'hits': {
+                'total': {'value': 3, 'relation': 'eq'},
+                'max_score': None,
+                'hits': [
+                    {
+                        '_id': str(__i),
+                        '_score': None,
+                        '_source': {
+                            'id': __i,
+                            'title': 'Book {}'.format(__i),
+                            'price': 10.5,
+                            'tags': ['Python', 'Django'],
+                        },
+                        'sort': [__i],
+                    }
+                    for __i in range(1, 4)
+                ],
+            },
+        }
+
+    def _list(self, view_class):
+        view = view_class.as_view({'get': 'list'})
+        with mock.patch.object(Elasticsearch, 'search',
+                               return_value=self.raw) as search:
+            response = view(self.factory.get('/'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(search.call_count, 1)
+        return response.data
+
+    def test_raw_response(self):
+        """Test ``RawResponse``."""
+        search = DefaultBookDocumentViewSet().get_queryset()
+        response = RawResponse(search, self.raw)
+        self.assertEqual(len(response), 3)
+        self.assertIsInstance(response.hits, RawHits)
+        self.assertIs(response[0], self.raw['hits']['hits'][0]['_source'])
+        self.assertEqual(
+            [__hit['id'] for __hit in response],
+            [1, 2, 3]
+        )
+        self.assertEqual(response.hits.total.value, 3)
+        self.assertEqual(response.hits.hits[2]['sort'], [3])
+
+    def test_same_data(self):
+        """Raw source mode gives the same output."""
+        data = self._list(RawBookDocumentViewSet)
+        self.assertEqual(data['count'], 3)
+        self.assertEqual(data, self._list(DefaultBookDocumentViewSet))
+
+    def test_pass_through(self):
+        """Without serializer, raw source is passed to the renderer."""
+        data = self._list(PassThroughBookDocumentViewSet)
+        self.assertEqual(
+            data['results'],
+            [__hit['_source'] for __hit in self.raw['hits']['hits']]
+        )
+
+    def test_search_after(self):
+        """Search after pagination in the raw source mode."""
+        data = self._list(RawSearchAfterBookDocumentViewSet)
+        self.assertEqual(len(data['results']), 2)
+        cursor = RawSearchAfterPagination().encode_cursor(
+            {'search_after': [2]}
+        )
+        self.assertTrue(data['next'].endswith('?cursor=' + cursor))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+"""
+Test renderers.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import datetime
+import decimal
+import json
+import sys
+import unittest
+import uuid
+from collections import OrderedDict
+
+from elasticsearch_dsl.response import Hit
+from elasticsearch_dsl.utils import AttrDict, AttrList
+
+import mock
+import pytest
+
+import six
+
+from rest_framework.renderers import JSONRenderer as DRFJSONRenderer
+
+from .. import compat
+from ..compat import orjson, ujson
+from ..renderers import JSONRenderer
+
+__title__ = 'django_elasticsearch_dsl_drf.tests.test_renderers'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = (
+    'TestRenderers',
+)
+
+
+@pytest.mark.django_db
+class TestRenderers(unittest.TestCase):
+    """Test renderers."""
+
+    def setUp(self):
+        self.data = OrderedDict([
+            ('count', 2),
+            ('next', 'http://testserver/search/books/?page=2'),
+            ('results', [
+                OrderedDict([
+                    ('id', 1),
+                    ('title', '\u00c6r\u00f8 \u2028 line separator'),
+                    ('price', decimal.Decimal('10.50')),
+                    ('rating', 4.25),
+                    ('uid', uuid.UUID('12345678-1234-5678-1234-567812345678')),
+                    ('created',
+                     datetime.datetime(2019, 1, 1, 10, 0, 0, 123456)),
+                    ('publication_date', datetime.date(2019, 1, 1)),
+                    ('tags', ['Python', 'Django']),
+                    ('null_field', None),
+                ]),
+            ]),
+        ])
+
+    def test_same_output(self):
+        """Output is the same as of the Django REST framework."""
+        self.assertEqual(
+            JSONRenderer().render(self.data),
+            DRFJSONRenderer().render(self.data)
+        )
+        self.assertIn(b'\\u2028', JSONRenderer().render(self.data))
+
+    def test_elasticsearch_dsl_containers(self):
+        """``AttrDict`` and ``AttrList`` are rendered."""
+        hit = Hit({'_id': '1', '_source': {'id': 1, 'tags': ['Python']}})
+        data = {
+            'facets': AttrDict({'publisher': {'buckets': []}}),
+            'tags': AttrList(['Python']),
+            'hit': hit,
+        }
+        self.assertEqual(
+            JSONRenderer().render(data),
+            DRFJSONRenderer().render({
+                'facets': {'publisher': {'buckets': []}},
+                'tags': ['Python'],
+                'hit': {'id': 1, 'tags': ['Python']},
+            })
+        )
+
+    def test_backends(self):
+        """Test backends."""
+        renderer = JSONRenderer()
+        if orjson is not None:
+            self.assertEqual(renderer.get_dumps(), renderer.dumps_orjson)
+
+        # Falls back to the standard library
+        with mock.patch.dict('django_elasticsearch_dsl_drf.renderers.'
+                             'BACKENDS', {'orjson': None, 'ujson': None}):
+            self.assertIsNone(renderer.get_dumps())
+            self.assertEqual(
+                renderer.render(self.data),
+                DRFJSONRenderer().render(self.data)
+            )
+
+    def test_non_string_keys(self):
+        """Non-string keys are rendered by all backends."""
+        data = {'facets': {1: 'a', 2.5: 'b', None: 'c'}}
+        renderer = JSONRenderer()
+        for backend, dumps in (('orjson', orjson), ('ujson', ujson)):
+            if dumps is None:
+                continue
+            with mock.patch.object(renderer, 'backends', (backend,)):
+                self.assertEqual(
+                    json.loads(renderer.render(data).decode('utf8')),
+                    json.loads(DRFJSONRenderer().render(data).decode('utf8'))
+                )
+
+    def test_old_ujson(self):
+        """``ujson`` older than 5.0 is not used."""
+        try:
+            for version, supported in (('1.35', False), ('5.1.0', True)):
+                with mock.patch.dict(
+                    sys.modules,
+                    {'ujson': mock.Mock(__version__=version)}
+                ):
+                    six.moves.reload_module(compat)
+                    self.assertEqual(compat.ujson is not None, supported)
+        finally:
+            six.moves.reload_module(compat)
+
+    def test_indent(self):
+        """Indented output is the same as of the Django REST framework."""
+        self.assertEqual(
+            JSONRenderer().render(self.data, 'application/json; indent=4'),
+            DRFJSONRenderer().render(self.data, 'application/json; indent=4')
+        )
+        self.assertEqual(JSONRenderer().render(None), b'')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+Test response cache.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import unittest
+
+from django.core.cache import cache
+from django.http import HttpResponse
+
+import mock
+import pytest
+
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+
+from search_indexes.documents import BookDocument
+from search_indexes.viewsets import BookDocumentViewSet
+
+from ..cache import IndexGenerationDocumentMixin, ResponseCache
+from ..pagination import SearchAfterPagination
+from ..viewsets import ResponseCacheMixin
+
+__title__ = 'django_elasticsearch_dsl_drf.tests.test_response_cache'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = (
+    'TestResponseCache',
+)
+
+
+class CachedBookDocumentViewSet(ResponseCacheMixin, BookDocumentViewSet):
+    """Cached book document view."""
+
+
+class CachedCursorBookDocumentViewSet(CachedBookDocumentViewSet):
+    """Cached book document view paginated with a cursor."""
+
+    pagination_class = SearchAfterPagination
+
+
+class GenerationBookDocument(IndexGenerationDocumentMixin, BookDocument):
+    """Book document bumping the index generation on updates."""
+
+
+@pytest.mark.django_db
+class TestResponseCache(unittest.TestCase):
+    """Test response cache."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.factory = APIRequestFactory()
+        cls.index = BookDocument._index._name
+
+    def setUp(self):
+        cache.clear()
+        self.calls = []
+
+    def _get_view(self, params, action='list',
+                  view_class=CachedBookDocumentViewSet, **kwargs):
+        request = Request(self.factory.get('/', params))
+        view = view_class(
+            request=request,
+            action=action,
+            format_kwarg=None,
+            kwargs=kwargs
+        )
+        return view, request
+
+    def _handler(self, request, *args, **kwargs):
+        self.calls.append(request)
+        return Response({'results': len(self.calls)})
+
+    def _call(self, params, action='list', **kwargs):
+        view, request = self._get_view(params, action=action, **kwargs)
+        view.get = self._handler
+        view.initial(request)
+        return view.get(request).data
+
+    def test_make_key_canonical(self):
+        """Order of the key parts does not matter."""
+        response_cache = ResponseCache()
+        self.assertEqual(
+            response_cache.make_key(self.index, {'a': 1, 'b': [1, 2]}),
+            response_cache.make_key(self.index, {'b': [1, 2], 'a': 1})
+        )
+        self.assertNotEqual(
+            response_cache.make_key(self.index, {'a': 1}),
+            response_cache.make_key(self.index, {'a': 2})
+        )
+
+    def test_bump_generation(self):
+        """Bumping the generation changes the keys."""
+        response_cache = ResponseCache()
+        key = response_cache.make_key(self.index, {'a': 1})
+        generation = response_cache.get_generation(self.index)
+        self.assertEqual(
+            response_cache.bump_generation(self.index),
+            generation + 1
+        )
+        self.assertNotEqual(
+            response_cache.make_key(self.index, {'a': 1}),
+            key
+        )
+
+    def test_cached_response(self):
+        """Repeated queries are served from the cache."""
+        self.assertEqual(self._call({'title': 'Python'}), {'results': 1})
+        self.assertEqual(self._call({'title': 'Python'}), {'results': 1})
+        self.assertEqual(len(self.calls), 1)
+
+        # Other search, page or action are not
+        self.assertEqual(self._call({'title': 'Django'}), {'results': 2})
+        self.assertEqual(
+            self._call({'title': 'Python', 'page': '2'}),
+            {'results': 3}
+        )
+        self.assertEqual(
+            self._call({'title': 'Python'}, action='retrieve', id='1'),
+            {'results': 4}
+        )
+        # Non-page, non-filter params are not part of the key
+        self.assertEqual(
+            self._call({'title': 'Python', 'unknown': '1'}),
+            {'results': 1}
+        )
+
+    def test_cursor_pages(self):
+        """Cursor pages are cached separately."""
+        kwargs = {'view_class': CachedCursorBookDocumentViewSet}
+        self.assertEqual(self._call({}, **kwargs), {'results': 1})
+        self.assertEqual(
+            self._call({'cursor': '1,a'}, **kwargs),
+            {'results': 2}
+        )
+        self.assertEqual(
+            self._call({'cursor': '1,a'}, **kwargs),
+            {'results': 2}
+        )
+        self.assertEqual(len(self.calls), 2)
+
+    def test_not_cached_action(self):
+        """Actions not listed in ``response_cache_actions``."""
+        self._call({}, action='functional_suggest')
+        self._call({}, action='functional_suggest')
+        self.assertEqual(len(self.calls), 2)
+
+    def test_index_update_invalidates(self):
+        """Index updates invalidate cached responses."""
+        self._call({'title': 'Python'})
+        with mock.patch.object(BookDocument, 'bulk') as bulk:
+            GenerationBookDocument().update([])
+        self.assertTrue(bulk.called)
+        self._call({'title': 'Python'})
+        self.assertEqual(len(self.calls), 2)
+
+    def test_index_update_refreshes_first(self):
+        """Index is refreshed before the generation is bumped."""
+        calls = []
+        with mock.patch.object(BookDocument, 'bulk'), \
+                mock.patch.object(
+                    BookDocument._index,
+                    'refresh',
+                    side_effect=lambda **kwargs: calls.append('refresh')
+                ), \
+                mock.patch.object(
+                    ResponseCache,
+                    'bump_generation',
+                    side_effect=lambda index: calls.append('bump')
+                ):
+            GenerationBookDocument().update([], refresh=False)
+            self.assertEqual(calls, ['refresh', 'bump'])
+
+            # Already refreshed by the update
+            del calls[:]
+            GenerationBookDocument().update([], refresh=True)
+            self.assertEqual(calls, ['bump'])
+
+    def test_document_response_cache_class(self):
+        """Response cache class of the document is used by default."""
+        class BookResponseCache(ResponseCache):
+            cache_alias = 'search'
+
+        view, request = self._get_view({})
+        self.assertIs(type(view.get_response_cache()), ResponseCache)
+
+        with mock.patch.object(CachedBookDocumentViewSet,
+                               'document',
+                               GenerationBookDocument), \
+                mock.patch.object(GenerationBookDocument,
+                                  'response_cache_class',
+                                  BookResponseCache):
+            view, request = self._get_view({})
+            self.assertIs(type(view.get_response_cache()), BookResponseCache)
+
+    def test_filtered_queryset(self):
+        """Queryset filtered for the cache key is re-used if the same."""
+        view, request = self._get_view({'title': 'Python'})
+        view.get_response_cache_key_parts(request)
+        queryset = view.filter_queryset(view.get_queryset())
+        self.assertIs(queryset, view._response_cache_queryset[1])
+
+        # Other querysets are filtered as usual
+        other = view.get_queryset().filter('term', state='published')
+        queryset = view.filter_queryset(other)
+        self.assertIsNot(queryset, view._response_cache_queryset[1])
+        self.assertIn('published', str(queryset.to_dict()))
+        self.assertIn('Python', str(queryset.to_dict()))
+
+    def test_response_without_data(self):
+        """Responses without data are cached as is."""
+        def handler(request, *args, **kwargs):
+            self.calls.append(request)
+            return HttpResponse(b'{"results":[]}',
+                                content_type='application/json')
+
+        for __i in range(2):
+            view, request = self._get_view({'title': 'Python'})
+            view.get = handler
+            view.initial(request)
+            response = view.get(request)
+            self.assertEqual(response.content, b'{"results":[]}')
+            self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(len(self.calls), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
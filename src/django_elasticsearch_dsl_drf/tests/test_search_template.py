@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Test search templates of the views.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import unittest
+
+import pytest
+
+from search_indexes.viewsets import (
+    AddressDocumentViewSet,
+    BookDocumentViewSet,
+)
+
+__title__ = 'django_elasticsearch_dsl_drf.tests.test_search_template'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = (
+    'TestSearchTemplate',
+)
+
+
+@pytest.mark.django_db
+class TestSearchTemplate(unittest.TestCase):
+    """Test search templates of the views."""
+
+    def test_shared_per_class(self):
+        """Search template is shared by instances of the view class."""
+        view_1 = BookDocumentViewSet()
+        view_2 = BookDocumentViewSet()
+        self.assertIs(view_1.search, view_2.search)
+        self.assertIs(view_1.client, view_2.client)
+        self.assertEqual(view_1.index, 'test_book')
+
+        address_view = AddressDocumentViewSet()
+        self.assertIsNot(address_view.search, view_1.search)
+        self.assertEqual(address_view.index, 'test_address')
+
+    def test_template_not_modified(self):
+        """Querysets are copies of the search template."""
+        view = BookDocumentViewSet()
+        initial = view.get_queryset().to_dict()
+        queryset = view.get_queryset()
+        self.assertIsNot(queryset, view.search)
+        queryset.query('match', title='Python')
+        self.assertEqual(
+            BookDocumentViewSet().get_queryset().to_dict(),
+            initial
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
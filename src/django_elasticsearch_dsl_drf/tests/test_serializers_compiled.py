@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+Test compiled serializers.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import unittest
+
+from django_elasticsearch_dsl import fields
+
+from elasticsearch_dsl.response import Hit
+
+import pytest
+
+from rest_framework import serializers
+
+from search_indexes.documents import BookDocument
+from search_indexes.serializers import BookDocumentSimpleSerializer
+
+from ..fields import DateField
+from ..serializers import DocumentSerializer
+
+__title__ = 'django_elasticsearch_dsl_drf.tests.test_serializers_compiled'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = (
+    'TestCompiledSerializers',
+)
+
+
+class CompiledBookDocumentSimpleSerializer(BookDocumentSimpleSerializer):
+    """Compiled version of the ``BookDocumentSimpleSerializer``."""
+
+    class Meta(object):
+        """Meta options."""
+
+        document = BookDocument
+        compiled = True
+        fields = BookDocumentSimpleSerializer.Meta.fields
+
+
+class CompiledBookDocumentSerializer(DocumentSerializer):
+    """Compiled book document serializer with declared fields."""
+
+    title = serializers.CharField(source='summary')
+    price = serializers.SerializerMethodField(method_name='get_price_eur')
+
+    class Meta(object):
+        """Meta options."""
+
+        document = BookDocument
+        compiled = True
+        fields = (
+            'id',
+            'title',
+            'price',
+            'tags',
+        )
+
+    def get_price_eur(self, obj):
+        return '{} EUR'.format(obj.price)
+
+
+class YearField(DateField):
+    """Date field, represented with the year only."""
+
+    def to_representation(self, value):
+        return int(value[:4])
+
+
+class YearBookDocumentSerializer(DocumentSerializer):
+    """Book document serializer with custom date field representation."""
+
+    _field_mapping = dict(DocumentSerializer._field_mapping)
+    _field_mapping[fields.DateField] = YearField
+
+    class Meta(object):
+        """Meta options."""
+
+        document = BookDocument
+        fields = (
+            'id',
+            'publication_date',
+            'tags',
+        )
+
+
+class CompiledYearBookDocumentSerializer(YearBookDocumentSerializer):
+    """Compiled version of the ``YearBookDocumentSerializer``."""
+
+    class Meta(object):
+        """Meta options."""
+
+        document = BookDocument
+        compiled = True
+        fields = YearBookDocumentSerializer.Meta.fields
+
+
+@pytest.mark.django_db
+class TestCompiledSerializers(unittest.TestCase):
+    """Test compiled serializers."""
+
+    def setUp(self):
+        self.hits = [
+            Hit({
+                '_id': str(__i),
+                '_score': 1.5,
+                '_source': {
+                    'id': __i,
+                    'title': 'Book {}'.format(__i),
+                    'description': 'Description',
+                    'summary': 'Summary',
+                    'authors': ['Author 1', 'Author 2'],
+                    'publisher': 'Self',
+                    'publication_date': '2019-01-01',
+                    'state': 'published',
+                    'isbn': '978-3-16-148410-{}'.format(__i),
+                    'price': 10.5,
+                    'pages': 200,
+                    'stock_count': 5,
+                    'tags': ['Python', 'Django'],
+                    'created': '2019-01-01T10:00:00',
+                    'null_field': None,
+                },
+                'highlight': {'title': ['<em>Book</em> {}'.format(__i)]},
+            })
+            for __i in range(3)
+        ]
+
+    def test_same_representation(self):
+        """Compiled serializer gives the same output."""
+        self.assertEqual(
+            CompiledBookDocumentSimpleSerializer(self.hits, many=True).data,
+            BookDocumentSimpleSerializer(self.hits, many=True).data
+        )
+
+    def test_field_representation(self):
+        """Document fields are converted with their fields."""
+        data = CompiledYearBookDocumentSerializer(self.hits, many=True).data
+        self.assertEqual(
+            data,
+            YearBookDocumentSerializer(self.hits, many=True).data
+        )
+        self.assertEqual(
+            dict(data[0]),
+            {'id': 0, 'publication_date': 2019, 'tags': ['Python', 'Django']}
+        )
+
+    def test_compiled_fields(self):
+        """Test compiled fields."""
+        serializer = CompiledBookDocumentSerializer()
+        compiled_fields = serializer.get_compiled_fields()
+        self.assertEqual(
+            compiled_fields,
+            (
+                ('id', 'source', None),
+                ('title', 'declared', None),
+                ('price', 'method', 'get_price_eur'),
+                ('tags', 'source', None),
+            )
+        )
+        # Compiled once per class
+        self.assertIs(
+            CompiledBookDocumentSerializer().get_compiled_fields(),
+            compiled_fields
+        )
+        self.assertNotIn(
+            BookDocumentSimpleSerializer,
+            DocumentSerializer._compiled_fields
+        )
+
+    def test_declared_fields(self):
+        """Test declared fields."""
+        data = CompiledBookDocumentSerializer(self.hits[0]).data
+        self.assertEqual(
+            dict(data),
+            {
+                'id': 0,
+                'title': 'Summary',
+                'price': '10.5 EUR',
+                'tags': ['Python', 'Django'],
+            }
+        )
+
+    def test_missing_field(self):
+        """Missing document fields are handled as without compiling."""
+        hit = Hit({'_id': '1', '_source': {'id': 1, 'title': 'Book'}})
+        with self.assertRaises(AttributeError):
+            BookDocumentSimpleSerializer(hit).data
+        with self.assertRaises(AttributeError):
+            CompiledBookDocumentSimpleSerializer(hit).data
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+Test field mapping cache of the serializers.
+"""
+
+from __future__ import absolute_import, unicode_literals
+
+import unittest
+
+import pytest
+
+from rest_framework import serializers
+
+from search_indexes.documents import BookDocument, PublisherDocument
+from search_indexes.serializers import BookDocumentSimpleSerializer
+
+from ..serializers import DocumentSerializer
+
+__title__ = 'django_elasticsearch_dsl_drf.tests.test_serializers_field_mapping'
+__author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
+__copyright__ = '2017-2019 Artur Barseghyan'
+__license__ = 'GPL 2.0/LGPL 2.1'
+__all__ = (
+    'TestSerializerFieldMapping',
+)
+
+
+class BookDocumentDeclaredSerializer(DocumentSerializer):
+    """Book document serializer with declared fields."""
+
+    title = serializers.CharField(source='summary')
+
+    class Meta(object):
+        """Meta options."""
+
+        document = BookDocument
+        fields = (
+            'id',
+            'title',
+            'price',
+        )
+
+
+@pytest.mark.django_db
+class TestSerializerFieldMapping(unittest.TestCase):
+    """Test field mapping cache of the serializers."""
+
+    def test_same_fields(self):
+        """Cached field mapping is the same as the built one."""
+        for serializer_class in (BookDocumentSimpleSerializer,
+                                 BookDocumentDeclaredSerializer):
+            serializer = serializer_class()
+            built = serializer.build_field_mapping()
+            serializer_class().fields
+            fields = serializer_class().get_fields()
+            self.assertEqual(list(fields.keys()), list(built.keys()))
+            self.assertEqual(
+                [__field.__class__ for __field in fields.values()],
+                [__field.__class__ for __field in built.values()]
+            )
+
+    def test_fields_per_instance(self):
+        """Each serializer instance has its own fields."""
+        serializer_1 = BookDocumentDeclaredSerializer()
+        serializer_2 = BookDocumentDeclaredSerializer()
+        for name in ('id', 'title', 'price'):
+            self.assertIsNot(
+                serializer_1.fields[name],
+                serializer_2.fields[name]
+            )
+            self.assertIs(serializer_1.fields[name].parent, serializer_1)
+            self.assertIs(serializer_2.fields[name].parent, serializer_2)
+        self.assertEqual(serializer_1.fields['title'].source, 'summary')
+
+    def test_cached_per_document(self):
+        """Field mapping is cached per serializer and document class."""
+        serializer = BookDocumentDeclaredSerializer()
+        serializer.fields
+        self.assertIn(
+            (BookDocumentDeclaredSerializer, BookDocument),
+            DocumentSerializer._field_mappings
+        )
+
+        # Another document, same serializer class
+        serializer.Meta = type(str('Meta'), (object,), {
+            'document': PublisherDocument,
+            'fields': ('id', 'name'),
+            'exclude': (),
+            'ignore_fields': (),
+        })
+        self.assertEqual(
+            list(serializer.get_fields().keys()),
+            ['id', 'name', 'title']
+        )
+        self.assertEqual(
+            list(BookDocumentDeclaredSerializer().fields.keys()),
+            ['id', 'title', 'price']
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
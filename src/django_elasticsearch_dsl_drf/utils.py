@@ -2,8 +2,19 @@
 Utils.
 """
 
+import copy
 import datetime
-from elasticsearch_dsl.search import AggsProxy
+import inspect
+import json
+import re
+
+from elasticsearch.exceptions import TransportError
+
+from elasticsearch_dsl.connections import get_connection
+from elasticsearch_dsl.query import Bool, Q
+from elasticsearch_dsl.response import Response
+from elasticsearch_dsl.search import AggsProxy, Search
+from elasticsearch_dsl.utils import AttrDict, _wrap
 
 
 __title__ = 'django_elasticsearch_dsl_drf.utils'
@@ -11,10 +22,22 @@ __author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
 __copyright__ = '2017-2019 Artur Barseghyan'
 __license__ = 'GPL 2.0/LGPL 2.1'
 __all__ = (
+    'ClauseCollector',
     'DictionaryProxy',
     'EmptySearch',
+    'FanOutSearch',
+    'QueryBuilder',
+    'RawDeserializer',
+    'RawHits',
+    'RawResponse',
+    'is_coroutine_function',
+    'set_base_response_class',
+    'split_hits_json',
 )
 
+_WHITESPACE_RE = re.compile(r'\s*')
+_HITS_END_RE = re.compile(r'\]\s*\}\s*\}\s*$')
+
 
 class EmptySearch(object):
     """Empty Search."""
@@ -43,6 +66,470 @@ class EmptySearch(object):
         return {}
 
 
+class ClauseCollector(object):
+    """Clause collector.
+
+    Collects clauses of the ``query``, ``filter``, ``exclude`` and
+    ``post_filter`` methods of the ``elasticsearch_dsl.Search``, so that it
+    can be passed to the ``apply_*`` methods of the filter backends instead
+    of the search. Collected clauses are applied to the search at once
+    (with a single clone of the search), in the order they have been added.
+
+    All other methods and attributes of the search (``extra``, ``sort``,
+    ``to_dict``, etc.) are taken from the search given, once the clauses
+    collected so far have been applied to it. Searches returned by these
+    methods replace the search and the collector itself is returned, thus
+    ``apply_*`` methods overridden to work with the search keep working.
+
+    :param search: Search to apply the clauses to.
+    :type search: elasticsearch_dsl.search.Search
+    """
+
+    def __init__(self, search=None):
+        self._search = search
+        self._query = []
+        self._post_filter = []
+
+    def __len__(self):
+        return len(self._query) + len(self._post_filter)
+
+    def __getattr__(self, name):
+        search = self.__dict__.get('_search')
+        if search is None or name.startswith('__'):
+            raise AttributeError(
+                "'{}' object has no attribute '{}'".format(
+                    self.__class__.__name__,
+                    name
+                )
+            )
+
+        self._search = search = self.build()
+        self._query = []
+        self._post_filter = []
+        attr = getattr(search, name)
+        if not callable(attr):
+            return attr
+
+        def method(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if isinstance(result, Search):
+                self._search = result
+                return self
+            return result
+
+        return method
+
+    def query(self, *args, **kwargs):
+        self._query.append(Q(*args, **kwargs))
+        return self
+
+    def filter(self, *args, **kwargs):
+        return self.query(Bool(filter=[Q(*args, **kwargs)]))
+
+    def exclude(self, *args, **kwargs):
+        return self.query(Bool(filter=[~Q(*args, **kwargs)]))
+
+    def post_filter(self, *args, **kwargs):
+        self._post_filter.append(Q(*args, **kwargs))
+        return self
+
+    def build(self):
+        """Apply collected clauses to the search of the collector.
+
+        :return: Updated search.
+        :rtype: elasticsearch_dsl.search.Search
+        """
+        return self.apply(self._search)
+
+    def apply(self, search):
+        """Apply collected clauses to the search given.
+
+        :param search: Search to apply the clauses to.
+        :type search: elasticsearch_dsl.search.Search
+        :return: Updated search.
+        :rtype: elasticsearch_dsl.search.Search
+        """
+        if not len(self):
+            return search
+
+        search = search._clone()
+        for attr_name, clauses in (('query', self._query),
+                                   ('post_filter', self._post_filter)):
+            proxy = getattr(search, attr_name)
+            for clause in clauses:
+                if proxy._proxied is None:
+                    proxy._proxied = clause
+                else:
+                    proxy._proxied &= clause
+        return search
+
+
+class QueryBuilder(Search):
+    """Query builder.
+
+    Mutable ``elasticsearch_dsl.Search``. All methods of the search, which
+    normally return a modified copy of it (``query``, ``filter``,
+    ``post_filter``, ``sort``, ``highlight``, ``source``, ``extra``, etc.),
+    modify the query builder in place and return it. Thus, the filter
+    backends contribute to a single accumulator instead of cloning the
+    search on each step. Once all the clauses have been added, the
+    ``build`` method turns the query builder back into a regular search.
+
+    Do not keep references to intermediate results: they are all the same
+    object.
+    """
+
+    def _clone(self):
+        return self
+
+    @classmethod
+    def from_search(cls, search):
+        """Make a query builder out of the search given.
+
+        The search given is cloned once and is not modified afterwards.
+
+        :param search: Search to start with.
+        :type search: elasticsearch_dsl.search.Search
+        :return: Query builder.
+        :rtype: django_elasticsearch_dsl_drf.utils.QueryBuilder
+        """
+        builder = search._clone()
+        builder._search_class = search.__class__
+        builder.__class__ = cls
+        return builder
+
+    def build(self):
+        """Materialize the search.
+
+        :return: Search of the same class as the one the query builder has
+            been made of.
+        :rtype: elasticsearch_dsl.search.Search
+        """
+        search_class = self.__dict__.pop('_search_class', Search)
+        self.__class__ = search_class
+        return self
+
+
+class FanOutSearch(Search):
+    """Fan-out search.
+
+    Splits the search into hits, aggregations and suggest sub-searches,
+    sends them in a single ``_msearch`` request (Elasticsearch runs them
+    concurrently) and reassembles the responses into a single one. Thus,
+    heavy aggregations do not block the hits. If ``split_aggregations`` is
+    set to True, each (top level) aggregation gets a sub-search of its own.
+
+    Searches with nothing to split are executed as usual. So are the
+    searches with params, which can not be passed to the ``_msearch``
+    (such as ``scroll`` or ``filter_path``). Other params go to the headers
+    of the sub-searches (``msearch_header_params``), the ``_msearch``
+    request itself (``msearch_request_params``) or the body of the hits
+    sub-search (``msearch_body_params``).
+    """
+
+    split_aggregations = False
+
+    msearch_header_params = (
+        'allow_no_indices',
+        'allow_partial_search_results',
+        'expand_wildcards',
+        'ignore_unavailable',
+        'preference',
+        'request_cache',
+        'routing',
+        'search_type',
+    )
+    msearch_request_params = (
+        'ccs_minimize_roundtrips',
+        'max_concurrent_shard_requests',
+        'pre_filter_shard_size',
+        'request_timeout',
+        'rest_total_hits_as_int',
+        'typed_keys',
+    )
+    msearch_body_params = (
+        'explain',
+        'seq_no_primary_term',
+        'stats',
+        'stored_fields',
+        'terminate_after',
+        'timeout',
+        'track_scores',
+        'track_total_hits',
+        'version',
+    )
+
+    def _clone(self):
+        search = super(FanOutSearch, self)._clone()
+        search.split_aggregations = self.split_aggregations
+        return search
+
+    @classmethod
+    def from_search(cls, search, split_aggregations=False):
+        """Make a fan-out search out of the search given.
+
+        :param search: Search.
+        :param split_aggregations: If set to True, each aggregation is
+            executed in a sub-search of its own.
+        :type search: elasticsearch_dsl.search.Search
+        :type split_aggregations: bool
+        :return: Fan-out search.
+        :rtype: django_elasticsearch_dsl_drf.utils.FanOutSearch
+        """
+        fan_out_search = search._clone()
+        fan_out_search.__class__ = cls
+        fan_out_search.split_aggregations = split_aggregations
+        return fan_out_search
+
+    def get_sub_searches(self):
+        """Get the bodies of the sub-searches.
+
+        :return: List of sub-search bodies. Hits come first.
+        :rtype: list
+        """
+        body = self.to_dict()
+        aggs = body.pop('aggs', None)
+        suggest = body.pop('suggest', None)
+        sub_searches = [body]
+        if aggs:
+            if self.split_aggregations:
+                aggs = [{__name: __agg} for __name, __agg in aggs.items()]
+            else:
+                aggs = [aggs]
+            for __aggs in aggs:
+                sub_search = {
+                    'aggs': __aggs,
+                    'size': 0,
+                    'track_total_hits': False,
+                }
+                if 'query' in body:
+                    sub_search['query'] = body['query']
+                sub_searches.append(sub_search)
+        if suggest:
+            sub_searches.append({
+                'suggest': suggest,
+                'size': 0,
+                'track_total_hits': False,
+            })
+        return sub_searches
+
+    def get_msearch_params(self):
+        """Split the search params for the ``_msearch`` request.
+
+        :return: Tuple of (header params, request params, body params) or
+            None if some of the params can not be passed to ``_msearch``.
+        :rtype: tuple
+        """
+        header, params, body = {}, {}, {}
+        for name, value in self._params.items():
+            if name in self.msearch_header_params:
+                header[name] = value
+            elif name in self.msearch_request_params:
+                params[name] = value
+            elif name in self.msearch_body_params:
+                body[name] = value
+            else:
+                return None
+        return header, params, body
+
+    def execute(self, ignore_cache=False):
+        """Execute the search.
+
+        :param ignore_cache: If set to True, consecutive calls will hit
+            Elasticsearch, while cached result will be ignored.
+        :type ignore_cache: bool
+        :return: Response (of the ``response_class`` of the search).
+        :rtype: elasticsearch_dsl.response.Response
+        """
+        if not ignore_cache and hasattr(self, '_response'):
+            return self._response
+
+        sub_searches = self.get_sub_searches()
+        msearch_params = self.get_msearch_params()
+        if msearch_params is None or len(sub_searches) == 1 or (
+            len(sub_searches) == 2 and not sub_searches[0].get('size', 1)
+        ):
+            # Nothing to split (hits are not needed or params are not
+            # supported by the ``_msearch``)
+            return super(FanOutSearch, self).execute(ignore_cache)
+
+        header, params, body_params = msearch_params
+        for name, value in body_params.items():
+            sub_searches[0].setdefault(name, value)
+        body = []
+        for sub_search in sub_searches:
+            body.extend((dict(header), sub_search))
+        responses = get_connection(self._using).msearch(
+            body=body,
+            index=self._index,
+            **params
+        )['responses']
+        for response in responses:
+            if 'error' in response:
+                raise TransportError(
+                    response.get('status', 'N/A'),
+                    response['error'].get('type', 'N/A')
+                    if isinstance(response['error'], dict)
+                    else response['error'],
+                    response
+                )
+
+        # Reassemble the responses
+        raw = responses[0]
+        for response in responses[1:]:
+            if 'aggregations' in response:
+                raw.setdefault('aggregations', {}).update(
+                    response['aggregations']
+                )
+            if 'suggest' in response:
+                raw['suggest'] = response['suggest']
+            raw['took'] = max(raw.get('took', 0), response.get('took', 0))
+            raw['timed_out'] = raw.get('timed_out', False) \
+                or response.get('timed_out', False)
+
+        self._response = self._response_class(self, raw)
+        return self._response
+
+
+class RawHits(list):
+    """Raw hits.
+
+    List of the ``_source`` dictionaries of the hits. As the ``hits`` of
+    the ``elasticsearch_dsl.response.Response``, has the ``total``,
+    ``max_score`` and ``hits`` (raw hits, including meta) attributes.
+    """
+
+
+class RawResponse(Response):
+    """Raw response.
+
+    Response, iterating over the ``_source`` dictionaries of the hits, as
+    returned by Elasticsearch. No ``Hit`` (``AttrDict``) objects are made.
+    Use it as a response class of the search:
+
+        search = search.response_class(RawResponse)
+    """
+
+    @property
+    def hits(self):
+        if not hasattr(self, '_hits'):
+            h = self._d_['hits']
+            hits = RawHits(__hit.get('_source', {}) for __hit in h['hits'])
+            # avoid assigning _hits into self._d_
+            super(AttrDict, self).__setattr__('_hits', hits)
+            for k in h:
+                setattr(self._hits, k, _wrap(h[k]))
+        return self._hits
+
+
+def is_coroutine_function(func):
+    """Check if the function is a coroutine function (``async def``).
+
+    Always False in Python 2.
+
+    :param func: Function (or method).
+    :return:
+    :rtype: bool
+    """
+    iscoroutinefunction = getattr(inspect, 'iscoroutinefunction', None)
+    return iscoroutinefunction is not None and iscoroutinefunction(func)
+
+
+def set_base_response_class(search, response_class):
+    """Set the base response class of the search.
+
+    Response class wrappers (such as the ``FacetCacheResponseClass`` and
+    the ``MetricsResponseClass``), holding the wrapped class in the
+    ``response_class`` attribute, are kept:
+
+        search = set_base_response_class(search, RawResponse)
+
+    :param search: Search.
+    :param response_class: Response class.
+    :type search: elasticsearch_dsl.search.Search
+    :type response_class: elasticsearch_dsl.response.Response
+    :return: Search.
+    :rtype: elasticsearch_dsl.search.Search
+    """
+    def rebuild(wrapper):
+        wrapped = getattr(wrapper, 'response_class', None)
+        if wrapped is None:
+            return response_class
+        # Wrappers are shared by the clones of the search
+        wrapper = copy.copy(wrapper)
+        wrapper.response_class = rebuild(wrapped)
+        return wrapper
+
+    return search.response_class(rebuild(search._response_class))
+
+
+class RawDeserializer(object):
+    """Deserializer, returning the response body as is.
+
+    Use it as a deserializer of a copy of the transport to get the raw
+    response of Elasticsearch:
+
+        transport = copy.copy(client.transport)
+        transport.deserializer = RawDeserializer()
+    """
+
+    def loads(self, s, mimetype=None):
+        return s
+
+
+def split_hits_json(raw):
+    """Split the JSON of the search response into the hits and the rest.
+
+    Made for the responses, filtered with ``filter_path`` to the
+    ``hits.total`` and fields of the ``hits.hits``, such as:
+
+        {"hits":{"total":{"value":2,"relation":"eq"},"hits":[...]}}
+
+    Members of the ``hits`` (other than the ``hits.hits``) are decoded. The
+    hits array is cut out as is, without being decoded. If it's not the last
+    member of the ``hits`` (Elasticsearch puts it last), the whole response
+    is decoded and the hits are encoded back.
+
+    :param raw: JSON of the search response.
+    :type raw: str
+    :return: Tuple of (``hits`` without the ``hits.hits``, JSON of the hits
+        array).
+    :rtype: tuple
+    """
+    decoder = json.JSONDecoder()
+
+    def skip(pos, char=None):
+        pos = _WHITESPACE_RE.match(raw, pos).end()
+        if char is not None:
+            if raw[pos:pos + 1] != char:
+                raise ValueError("Expected {!r} at {}".format(char, pos))
+            pos = _WHITESPACE_RE.match(raw, pos + 1).end()
+        return pos
+
+    try:
+        rest = {}
+        key, pos = decoder.raw_decode(raw, skip(0, '{'))
+        if key != 'hits':
+            raise ValueError("Unexpected key {!r}".format(key))
+        pos = skip(skip(pos, ':'), '{')
+        while raw[pos:pos + 1] != '}':
+            key, pos = decoder.raw_decode(raw, pos)
+            pos = skip(pos, ':')
+            if key == 'hits':
+                match = _HITS_END_RE.search(raw, pos)
+                if raw[pos:pos + 1] != '[' or match is None:
+                    raise ValueError("Hits are not the last member")
+                return rest, raw[pos:match.start() + 1]
+            rest[key], pos = decoder.raw_decode(raw, pos)
+            pos = skip(pos)
+            if raw[pos:pos + 1] == ',':
+                pos = skip(pos, ',')
+        return rest, '[]'
+    except ValueError:
+        hits = json.loads(raw).get('hits', {})
+        return hits, json.dumps(hits.pop('hits', []), separators=(',', ':'))
+
+
 class DictionaryProxy(object):
     """Dictionary proxy."""
 
@@ -5,23 +5,54 @@ Base ViewSets.
 """
 from __future__ import absolute_import, unicode_literals
 
+import base64
 import copy
+import csv
+import itertools
+import json
+import threading
+import timeit
+import weakref
+from collections import OrderedDict
 
-from django.http import Http404
+from django.core import paginator as django_paginator
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.http.response import HttpResponseBase
 from django.core.exceptions import ImproperlyConfigured
 
+from elasticsearch import VERSION as ELASTICSEARCH_CLIENT_VERSION
+from elasticsearch.client.utils import _make_path
+
 from elasticsearch_dsl import Search
 from elasticsearch_dsl.connections import connections
-from elasticsearch_dsl.query import MoreLikeThis
+from elasticsearch_dsl import TermsFacet
+from elasticsearch_dsl.query import Bool, MoreLikeThis
+from elasticsearch_dsl.search import AggsProxy
 
 from rest_framework import status
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.viewsets import ReadOnlyModelViewSet
 
+import six
+
+from .cache import ResponseCache
+from .filter_backends import FacetedSearchFilterBackend
+from .instrumentation import LOGGER, MetricsResponseClass, SearchMetrics
 from .pagination import PageNumberPagination
-from .utils import DictionaryProxy
+from .utils import (
+    DictionaryProxy,
+    FanOutSearch,
+    QueryBuilder,
+    RawDeserializer,
+    RawResponse,
+    is_coroutine_function,
+    split_hits_json,
+)
 from .versions import ELASTICSEARCH_GTE_7_0
 
 __title__ = 'django_elasticsearch_dsl_drf.viewsets'
@@ -29,10 +60,17 @@ __author__ = 'Artur Barseghyan <artur.barseghyan@gmail.com>'
 __copyright__ = '2017-2019 Artur Barseghyan'
 __license__ = 'GPL 2.0/LGPL 2.1'
 __all__ = (
+    'AggregateMixin',
     'BaseDocumentViewSet',
     'DocumentViewSet',
+    'ExportMixin',
+    'FacetValuesMixin',
+    'FacetsMixin',
     'FunctionalSuggestMixin',
+    'InstrumentationMixin',
     'MoreLikeThisMixin',
+    'PassThroughMixin',
+    'ResponseCacheMixin',
     'SuggestMixin',
 )
 
@@ -95,44 +133,10 @@ class MoreLikeThisMixin(object):
         :return:
         """
         if 'view' in request.parser_context:
-            view = request.parser_context['view']
-            kwargs = copy.copy(getattr(view, 'more_like_this_options', {}))
-            id_ = pk if pk else id
-
-            # Use current queryset
-            queryset = self.filter_queryset(self.get_queryset())
-            # We do not try to get fields from current serializer. On the
-            # Elasticsearch side if no ``fields`` value is given, ``_all`` is
-            # used, and although some serializers could contain less fields
-            # than available, this seems like the best approach. If you want to
-            # fall back to ``_all`` of Elasticsearch, leave it empty.
-            fields = kwargs.pop('fields', [])
-            # if not fields:
-            #     serializer_class = self.get_serializer_class()
-            #     fields = serializer_class.Meta.fields[:]
-            if fields:
-                queryset = queryset.query(
-                    MoreLikeThis(
-                        fields=fields,
-                        like={
-                            '_id': "{}".format(id_),
-                            '_index': "{}".format(self.index),
-                            '_type': "{}".format(self.mapping)
-                        },
-                        **kwargs
-                    )
-                ).sort('_score')
-            else:
-                queryset = queryset.query(
-                    MoreLikeThis(
-                        like={
-                            '_id': "{}".format(id_),
-                            '_index': "{}".format(self.index),
-                            '_type': "{}".format(self.mapping)
-                        },
-                        **kwargs
-                    )
-                ).sort('_score')
+            queryset = self.get_more_like_this_queryset(
+                request,
+                pk if pk else id
+            )
 
             # Standard list-view implementation
             page = self.paginate_queryset(queryset)
@@ -143,6 +147,1170 @@ class MoreLikeThisMixin(object):
             serializer = self.get_serializer(queryset, many=True)
             return Response(serializer.data)
 
+    def get_more_like_this_queryset(self, request, id_):
+        """Get more-like-this queryset.
+
+        :param request:
+        :param id_: ID of the document.
+        :return:
+        """
+        view = request.parser_context['view']
+        kwargs = copy.copy(getattr(view, 'more_like_this_options', {}))
+
+        # Use current queryset
+        queryset = self.filter_queryset(self.get_queryset())
+        # We do not try to get fields from current serializer. On the
+        # Elasticsearch side if no ``fields`` value is given, ``_all`` is
+        # used, and although some serializers could contain less fields
+        # than available, this seems like the best approach. If you want to
+        # fall back to ``_all`` of Elasticsearch, leave it empty.
+        fields = kwargs.pop('fields', [])
+        # if not fields:
+        #     serializer_class = self.get_serializer_class()
+        #     fields = serializer_class.Meta.fields[:]
+        if fields:
+            return queryset.query(
+                MoreLikeThis(
+                    fields=fields,
+                    like={
+                        '_id': "{}".format(id_),
+                        '_index': "{}".format(self.index),
+                        '_type': "{}".format(self.mapping)
+                    },
+                    **kwargs
+                )
+            ).sort('_score')
+
+        return queryset.query(
+            MoreLikeThis(
+                like={
+                    '_id': "{}".format(id_),
+                    '_index': "{}".format(self.index),
+                    '_type': "{}".format(self.mapping)
+                },
+                **kwargs
+            )
+        ).sort('_score')
+
+
+class AggregateMixin(object):
+    """Aggregate mixin.
+
+    Aggregation-only requests: hits are neither fetched nor scored
+    (``size`` set to 0), only the aggregations made by the filter backends
+    (``BucketAggregationsFilterBackend``, ``MetricsAggregationsFilterBackend``,
+    ``PipelineAggregationsFilterBackend``, ``FacetedSearchFilterBackend``)
+    are returned, along with the number of matching documents.
+
+    Example:
+
+        http://api.example.org/books/aggregate/?aggregate=states
+    """
+
+    @action(detail=False)
+    def aggregate(self, request):
+        """Aggregate functionality.
+
+        :param request:
+        :return:
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        queryset = self.clean_aggregate_queryset(queryset)
+        response = queryset.execute()
+        total = response.hits.total
+        return Response(OrderedDict([
+            ('count', total.value if hasattr(total, 'value') else total),
+            ('aggregations', response.to_dict().get('aggregations', {})),
+        ]))
+
+    def clean_aggregate_queryset(self, queryset):
+        """Clean the queryset.
+
+        - No hits (``size`` set to 0).
+        - No ``_source``.
+        - Remove sort and highlight.
+
+        :param queryset:
+        :return:
+        """
+        queryset = queryset.extra(size=0).source(False)
+        queryset._sort = []
+        queryset._highlight = {}
+        queryset._highlight_opts = {}
+        return queryset
+
+
+class ExportMixin(object):
+    """Export mixin.
+
+    Streams all the documents matching the filtered search (same filter
+    backends as in the list view) as NDJSON or CSV. Documents are fetched
+    (with ``scan`` or point-in-time and ``search_after``) and serialized in
+    chunks of ``export_chunk_size``, thus memory used does not depend on
+    the number of documents exported.
+
+    Example:
+
+        http://api.example.org/books/export/
+        http://api.example.org/books/export/?export_format=csv&state=published
+    """
+
+    export_format_query_param = 'export_format'
+    export_formats = {
+        'ndjson': 'application/x-ndjson',
+        'csv': 'text/csv',
+    }
+    export_chunk_size = 1000
+    export_keep_alive = '5m'
+    # If set to True, point-in-time and ``search_after`` are used instead
+    # of scroll (Elasticsearch 7.10 or later).
+    export_use_point_in_time = False
+
+    @action(detail=False)
+    def export(self, request):
+        """Export functionality.
+
+        :param request:
+        :return:
+        """
+        export_format = request.query_params.get(
+            self.export_format_query_param,
+            'ndjson'
+        )
+        if export_format not in self.export_formats:
+            return Response(
+                {
+                    self.export_format_query_param: [
+                        "Supported formats are: {}.".format(
+                            ', '.join(sorted(self.export_formats))
+                        )
+                    ]
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        queryset = self.filter_queryset(self.get_queryset())
+        render = getattr(self, 'render_export_{}'.format(export_format))
+        response = StreamingHttpResponse(
+            render(self.iter_export_chunks(queryset)),
+            content_type=self.export_formats[export_format]
+        )
+        response['Content-Disposition'] = \
+            'attachment; filename="{}.{}"'.format(self.index, export_format)
+        return response
+
+    def clean_export_queryset(self, queryset):
+        """Clean the queryset.
+
+        - Remove aggregations.
+        - Remove highlight.
+
+        :param queryset:
+        :return:
+        """
+        queryset = queryset._clone()
+        queryset.aggs = AggsProxy(queryset)
+        queryset._highlight = {}
+        return queryset
+
+    def iter_export_hits(self, queryset):
+        """Iterate over all the hits of the queryset.
+
+        :param queryset:
+        :return: Iterator of hits.
+        """
+        queryset = self.clean_export_queryset(queryset)
+        if self.export_use_point_in_time:
+            return self.iter_export_hits_point_in_time(queryset)
+
+        return queryset.params(
+            size=self.export_chunk_size,
+            scroll=self.export_keep_alive
+        ).scan()
+
+    def iter_export_hits_point_in_time(self, queryset):
+        """Iterate over all the hits using point-in-time and search after.
+
+        :param queryset:
+        :return: Iterator of hits.
+        """
+        sort = list(queryset._sort) or ['_doc']
+        field_names = [
+            __field
+            if isinstance(__field, six.string_types)
+            else list(__field.keys())[0]
+            for __field
+            in sort
+        ]
+        if self.document_uid_field not in field_names:
+            sort.append(self.document_uid_field)
+
+        pit_id = self.client.open_point_in_time(
+            index=self.index,
+            keep_alive=self.export_keep_alive
+        )['id']
+        queryset = queryset.index().sort(*sort).extra(
+            size=self.export_chunk_size
+        )
+        try:
+            search_after = None
+            while True:
+                search = queryset.extra(
+                    pit={'id': pit_id, 'keep_alive': self.export_keep_alive}
+                )
+                if search_after is not None:
+                    search = search.extra(search_after=search_after)
+                resp = search.execute()
+                for hit in resp:
+                    yield hit
+                if len(resp) < self.export_chunk_size:
+                    break
+                # Taken from the response data, since hits of the raw
+                # responses (see ``raw_source``) hold the source only
+                search_after = list(resp.to_dict()['hits']['hits'][-1]['sort'])
+                pit_id = getattr(resp, 'pit_id', pit_id)
+        finally:
+            self.client.close_point_in_time(body={'id': pit_id})
+
+    def iter_export_chunks(self, queryset):
+        """Iterate over the serialized chunks of the queryset.
+
+        :param queryset:
+        :return: Iterator of lists of serialized documents.
+        """
+        hits = iter(self.iter_export_hits(queryset))
+        while True:
+            chunk = list(itertools.islice(hits, self.export_chunk_size))
+            if not chunk:
+                break
+            yield self.get_serializer(chunk, many=True).data
+
+    def render_export_ndjson(self, chunks):
+        """Render chunks as NDJSON.
+
+        :param chunks: Iterator of lists of serialized documents.
+        :return: Iterator of strings.
+        """
+        for chunk in chunks:
+            yield ''.join(
+                json.dumps(__item, cls=JSONEncoder) + '\n'
+                for __item in chunk
+            )
+
+    def render_export_csv(self, chunks):
+        """Render chunks as CSV.
+
+        Header is made of the fields of the first document. Nested values
+        (lists, dicts) are JSON encoded.
+
+        :param chunks: Iterator of lists of serialized documents.
+        :return: Iterator of strings.
+        """
+        field_names = None
+        for chunk in chunks:
+            buffer = six.StringIO()
+            writer = csv.writer(buffer)
+            if field_names is None:
+                field_names = list(chunk[0].keys())
+                writer.writerow(field_names)
+            for __item in chunk:
+                writer.writerow([
+                    json.dumps(__value, cls=JSONEncoder)
+                    if isinstance(__value, (dict, list))
+                    else __value
+                    for __value
+                    in (__item.get(__name) for __name in field_names)
+                ])
+            yield buffer.getvalue()
+
+
+class FacetsMixin(object):
+    """Facets mixin.
+
+    Facets-only requests: same as the list view, but hits are neither
+    fetched nor counted (``size`` set to 0, no ``_source``, highlight or
+    sort), only the facets (aggregations) are returned.
+
+    Example:
+
+        http://api.example.org/books/facets/?facet=state&publisher=Self
+    """
+
+    @action(detail=False)
+    def facets(self, request):
+        """Facets functionality.
+
+        :param request:
+        :return:
+        """
+        queryset = self.clean_facets_queryset(
+            self.filter_queryset(self.get_queryset())
+        )
+        response = queryset.execute()
+        return Response(OrderedDict([
+            ('facets', response.to_dict().get('aggregations', {})),
+        ]))
+
+    def clean_facets_queryset(self, queryset):
+        """Clean the queryset.
+
+        - No hits (``size`` set to 0), hits are not counted.
+        - No ``_source``.
+        - Remove sort, highlight and suggest.
+
+        :param queryset:
+        :return:
+        """
+        queryset = queryset.extra(size=0).source(False)
+        if ELASTICSEARCH_GTE_7_0:
+            queryset = queryset.extra(track_total_hits=False)
+        queryset._sort = []
+        queryset._highlight = {}
+        queryset._highlight_opts = {}
+        queryset._suggest = {}
+        return queryset
+
+
+class FacetValuesMixin(object):
+    """Facet values mixin.
+
+    Pages through all the values (buckets) of a single (terms) facet of the
+    ``faceted_search_fields`` with a ``composite`` aggregation. Filter
+    backends of the view apply, as in the list view. Both Elasticsearch and
+    the view handle a single page of buckets at a time, no matter how many
+    values the field has.
+
+    Example:
+
+        http://api.example.org/books/facet_values/?facet=tags
+        http://api.example.org/books/facet_values/?facet=tags&cursor=eyJ0YWdzIjoiYSJ9
+    """
+
+    facet_values_facet_query_param = 'facet'
+    facet_values_cursor_query_param = 'cursor'
+    facet_values_page_size_query_param = 'page_size'
+    facet_values_page_size = 100
+    facet_values_max_page_size = 1000
+    invalid_facet_values_cursor_message = 'Invalid cursor'
+
+    @action(detail=False)
+    def facet_values(self, request):
+        """Facet values functionality.
+
+        :param request:
+        :return:
+        """
+        facets = {}
+        if getattr(self, 'faceted_search_fields', None):
+            faceted_search_backend = self.get_faceted_search_backend()
+            facets = faceted_search_backend.prepare_faceted_search_fields(
+                self
+            )
+        facets = {
+            __name: __options
+            for __name, __options in facets.items()
+            if issubclass(__options['facet'], TermsFacet)
+        }
+        name = request.query_params.get(self.facet_values_facet_query_param)
+        if name not in facets:
+            return Response(
+                {
+                    self.facet_values_facet_query_param: [
+                        "Supported facets are: {}.".format(
+                            ', '.join(sorted(facets))
+                        )
+                    ]
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        after = self.decode_facet_values_cursor(request, name)
+        page_size = self.get_facet_values_page_size(request, facets[name])
+        queryset = self.get_facet_values_queryset(
+            request,
+            name,
+            facets[name],
+            page_size,
+            after
+        )
+        resp = queryset.execute()
+        agg = resp.to_dict().get('aggregations', {}).get(name, {})
+        results = [
+            OrderedDict([
+                ('key', __bucket['key'][name]),
+                ('doc_count', __bucket['doc_count']),
+            ])
+            for __bucket in agg.get('buckets', [])
+        ]
+
+        next_url = None
+        if agg.get('after_key') and len(results) >= page_size:
+            next_url = replace_query_param(
+                request.build_absolute_uri(),
+                self.facet_values_cursor_query_param,
+                self.encode_facet_values_cursor(agg['after_key'])
+            )
+        return Response(OrderedDict([
+            ('next', next_url),
+            ('results', results),
+        ]))
+
+    def get_faceted_search_backend(self):
+        """Get the faceted search filter backend of the view.
+
+        :return: Instance of the ``FacetedSearchFilterBackend`` (or its
+            descendant) listed in the ``filter_backends``.
+        :rtype: django_elasticsearch_dsl_drf.filter_backends.
+            FacetedSearchFilterBackend
+        """
+        return next(
+            (
+                __backend
+                for __backend in self.filter_backends
+                if isinstance(__backend, type) and issubclass(
+                    __backend,
+                    FacetedSearchFilterBackend
+                )
+            ),
+            FacetedSearchFilterBackend
+        )()
+
+    def get_facet_values_page_size(self, request, options=None):
+        """Get number of facet values per page.
+
+        Defaults to the ``size`` of the facet (if given) or the
+        ``facet_values_page_size``.
+
+        :param request:
+        :param options: Prepared options of the facet.
+        :return:
+        :rtype: int
+        """
+        default = ((options or {}).get('options') or {}).get(
+            'size',
+            self.facet_values_page_size
+        )
+        try:
+            page_size = int(request.query_params[
+                self.facet_values_page_size_query_param
+            ])
+        except (KeyError, ValueError):
+            page_size = default
+
+        if page_size <= 0:
+            page_size = default
+        return min(page_size, self.facet_values_max_page_size)
+
+    def get_facet_values_source(self, options):
+        """Get the terms source of the composite aggregation.
+
+        The ``order`` by key and the ``missing_bucket`` options of the facet
+        are kept. Composite aggregation can't be ordered by count, thus the
+        ``order`` by ``_count`` is ignored.
+
+        :param options: Prepared options of the facet.
+        :return:
+        :rtype: dict
+        """
+        source = {'field': options['field']}
+        facet_options = options.get('options') or {}
+        order = facet_options.get('order')
+        if isinstance(order, dict) and list(order) == ['_key']:
+            order = order['_key']
+        if order in ('asc', 'desc'):
+            source['order'] = order
+        if 'missing_bucket' in facet_options:
+            source['missing_bucket'] = facet_options['missing_bucket']
+        return source
+
+    def encode_facet_values_cursor(self, after_key):
+        """Encode cursor.
+
+        :param after_key: The ``after_key`` of the composite aggregation.
+        :type after_key: dict
+        :return:
+        :rtype: str
+        """
+        return base64.urlsafe_b64encode(
+            json.dumps(after_key, separators=(',', ':')).encode('utf8')
+        ).decode('ascii').rstrip('=')
+
+    def decode_facet_values_cursor(self, request, name):
+        """Decode cursor given in the request.
+
+        :param request:
+        :param name: Name of the facet.
+        :return: The ``after`` of the composite aggregation or None if not
+            given.
+        :rtype: dict
+        """
+        encoded = request.query_params.get(
+            self.facet_values_cursor_query_param
+        )
+        if not encoded:
+            return None
+
+        try:
+            after = json.loads(
+                base64.urlsafe_b64decode(
+                    encoded + '=' * (-len(encoded) % 4)
+                ).decode('utf8')
+            )
+            assert isinstance(after, dict)
+            assert list(after) == [name]
+        except (AssertionError, TypeError, ValueError):
+            raise NotFound(self.invalid_facet_values_cursor_message)
+
+        return after
+
+    def get_facet_values_queryset(self, request, name, options, page_size,
+                                  after=None):
+        """Get queryset for a page of facet values.
+
+        Global facets ignore the query and filters. Otherwise, post filters
+        apply as they do for the facets in the list view (see the
+        ``FacetedSearchFilterBackend``), but are moved to the query, since
+        the composite aggregation shall be a top level one.
+
+        :param request:
+        :param name: Name of the facet.
+        :param options: Prepared options of the facet.
+        :param page_size: Number of facet values.
+        :param after: The ``after`` of the composite aggregation.
+        :return:
+        """
+        if options['global']:
+            queryset = self.get_queryset()
+        else:
+            queryset = self.filter_queryset(self.get_queryset())
+
+        queryset = queryset.extra(size=0).source(False)
+        if ELASTICSEARCH_GTE_7_0:
+            queryset = queryset.extra(track_total_hits=False)
+        queryset.aggs = AggsProxy(queryset)
+        queryset._post_filter_proxy._proxied = None
+        queryset._sort = []
+        queryset._highlight = {}
+        queryset._highlight_opts = {}
+
+        if not options['global']:
+            post_filter_clauses = [
+                __clause
+                for __field, __clauses
+                in self.get_faceted_search_backend().get_post_filter_clauses(
+                    request,
+                    self
+                ).items()
+                if __field != options['field']
+                for __clause in __clauses
+            ]
+            if post_filter_clauses:
+                queryset = queryset.query(Bool(filter=post_filter_clauses))
+
+        source = self.get_facet_values_source(options)
+        params = {
+            'sources': [{name: {'terms': source}}],
+            'size': page_size,
+        }
+        if after:
+            params['after'] = after
+        queryset.aggs.bucket(name, 'composite', **params)
+        return queryset
+
+
+class PassThroughMixin(object):
+    """Pass-through of the hits, as returned by Elasticsearch.
+
+    The ``list`` action requests hits with the ``filter_path`` (only
+    ``passthrough_hit_fields`` of each hit) and splices the JSON of the hits
+    array, as returned by Elasticsearch, into the response body. Hits are
+    neither decoded, nor serialized, nor encoded again. Only the tiny rest
+    of the Elasticsearch response (``hits.total``) is decoded.
+
+    Supports page number and limit/offset pagination. Facets (aggregations)
+    are not returned.
+
+    Example response:
+
+        {
+            "count": 2,
+            "next": null,
+            "previous": null,
+            "results": [
+                {"_source": {"id": 1, "title": "Python"}},
+                {"_source": {"id": 2, "title": "Django"}}
+            ]
+        }
+    """
+
+    # Fields of each hit to return, see ``filter_path``
+    passthrough_hit_fields = ('_source',)
+    # Transports Elasticsearch has been verified with, see
+    # ``get_passthrough_transport``
+    _passthrough_verified_transports = weakref.WeakSet()
+
+    def list(self, request, *args, **kwargs):
+        """List.
+
+        :param request:
+        :param args:
+        :param kwargs:
+        :return:
+        """
+        queryset = self.clean_passthrough_queryset(
+            self.filter_queryset(self.get_queryset())
+        )
+        paginator = self.paginator
+        if paginator is None:
+            total, hits = self.perform_passthrough_search(queryset)
+            return self.get_passthrough_response([], hits)
+
+        if hasattr(paginator, 'apply_track_total_hits'):
+            queryset = paginator.apply_track_total_hits(queryset)
+        if hasattr(paginator, 'get_limit'):
+            return self.list_passthrough_limit_offset(
+                queryset,
+                request,
+                paginator
+            )
+        if hasattr(paginator, 'page_query_param'):
+            return self.list_passthrough_page_number(
+                queryset,
+                request,
+                paginator
+            )
+        raise ImproperlyConfigured(
+            "Pass-through supports page number and limit/offset pagination "
+            "only."
+        )
+
+    def list_passthrough_page_number(self, queryset, request, paginator):
+        """List, paginated by page number.
+
+        :param queryset:
+        :param request:
+        :param paginator:
+        :return:
+        """
+        page_size = paginator.get_page_size(request)
+        page_number = request.query_params.get(paginator.page_query_param, 1)
+        # Page number is validated by the paginator, same as in the ``list``
+        es_paginator = paginator.django_paginator_class(queryset, page_size)
+        try:
+            if page_number in paginator.last_page_strings:
+                page_number = es_paginator.num_pages
+            number, bottom, top = es_paginator.get_page_bounds(page_number)
+        except django_paginator.InvalidPage as exc:
+            raise NotFound(
+                paginator.invalid_page_message.format(
+                    page_number=page_number,
+                    message=six.text_type(exc)
+                )
+            )
+
+        total, hits = self.perform_passthrough_search(queryset[bottom:top])
+        count, count_relation = self.get_passthrough_count(total)
+
+        try:
+            # Page over a range, used to make the links
+            page = django_paginator.Paginator(
+                six.moves.range(count),
+                page_size
+            ).page(number)
+        except django_paginator.InvalidPage as exc:
+            if count_relation != 'gte':
+                raise NotFound(
+                    paginator.invalid_page_message.format(
+                        page_number=page_number,
+                        message=six.text_type(exc)
+                    )
+                )
+            page = None
+
+        paginator.request = request
+        paginator.page = page
+        return self.get_passthrough_response(
+            [
+                ('count', count),
+                ('next',
+                 paginator.get_next_link() if page is not None else None),
+                ('previous',
+                 paginator.get_previous_link() if page is not None else None),
+            ],
+            hits,
+            count_relation=count_relation
+        )
+
+    def list_passthrough_limit_offset(self, queryset, request, paginator):
+        """List, paginated by limit and offset.
+
+        :param queryset:
+        :param request:
+        :param paginator:
+        :return:
+        """
+        paginator.request = request
+        paginator.limit = paginator.get_limit(request)
+        paginator.offset = paginator.get_offset(request)
+        total, hits = self.perform_passthrough_search(
+            queryset[paginator.offset:paginator.offset + paginator.limit]
+        )
+        paginator.count, paginator.count_relation = \
+            self.get_passthrough_count(total)
+        # Number of hits is not known, full page is assumed
+        paginator.has_next = True
+        return self.get_passthrough_response(
+            [
+                ('count', paginator.count),
+                ('next', paginator.get_next_link()),
+                ('previous', paginator.get_previous_link()),
+            ],
+            hits,
+            count_relation=paginator.count_relation
+        )
+
+    def clean_passthrough_queryset(self, queryset):
+        """Clean the queryset.
+
+        - Remove aggregations.
+
+        :param queryset:
+        :return:
+        """
+        queryset = queryset._clone()
+        queryset.aggs = AggsProxy(queryset)
+        return queryset
+
+    def get_passthrough_filter_path(self):
+        """Get ``filter_path``.
+
+        :return:
+        :rtype: str
+        """
+        return ','.join(
+            ['hits.total'] + [
+                'hits.hits.{}'.format(__field)
+                for __field
+                in self.passthrough_hit_fields
+            ]
+        )
+
+    def get_passthrough_transport(self):
+        """Get the transport, returning the response body as is.
+
+        Copy of the transport of the client, sharing the connection pool, so
+        that retries and dead connections are handled as usual.
+
+        :return:
+        :rtype: elasticsearch.Transport
+        """
+        transport = self.client.transport
+        if ELASTICSEARCH_CLIENT_VERSION >= (7, 14) \
+                and transport not in self._passthrough_verified_transports:
+            # Elasticsearch is verified with the first request made through
+            # the transport (``elasticsearch`` 7.14 or later), the response
+            # of which shall be decoded as usual.
+            self.client.info()
+            self._passthrough_verified_transports.add(transport)
+        transport = copy.copy(transport)
+        transport.deserializer = RawDeserializer()
+        return transport
+
+    def perform_passthrough_search(self, queryset):
+        """Perform the search.
+
+        :param queryset:
+        :return: Tuple of (``hits.total``, JSON of the hits array).
+        :rtype: tuple
+        """
+        params = dict(queryset._params)
+        params['filter_path'] = self.get_passthrough_filter_path()
+        raw = self.get_passthrough_transport().perform_request(
+            'POST',
+            _make_path(queryset._index, '_search'),
+            params=params,
+            body=queryset.to_dict()
+        )
+        if isinstance(raw, six.binary_type):
+            raw = raw.decode('utf8')
+
+        rest, hits = split_hits_json(raw or '{}')
+        return rest.get('total'), hits
+
+    def get_passthrough_count(self, total):
+        """Get count and count relation out of the ``hits.total``.
+
+        :param total:
+        :return: Tuple of (count, count relation).
+        :rtype: tuple
+        """
+        if isinstance(total, dict):
+            return total['value'], total.get('relation', 'eq')
+        return total or 0, 'eq'
+
+    def get_passthrough_response(self, context, hits, count_relation=None):
+        """Get response.
+
+        :param context: Response data (list of pairs), without results.
+        :param hits: JSON of the hits array.
+        :param count_relation:
+        :return:
+        :rtype: django.http.HttpResponse
+        """
+        if not context:
+            return HttpResponse(hits, content_type='application/json')
+
+        if getattr(self.paginator, 'track_total_hits', None) is not None:
+            context.insert(1, ('count_relation', count_relation))
+        body = json.dumps(
+            OrderedDict(context),
+            cls=JSONEncoder,
+            separators=(',', ':')
+        )
+        return HttpResponse(
+            body[:-1] + ',"results":' + hits + '}',
+            content_type='application/json'
+        )
+
+
+class ResponseCacheMixin(object):
+    """Response cache mixin.
+
+    Caches the response data of the ``response_cache_actions``. Cache keys
+    are made of the view, action, URL kwargs, filtered search and the page
+    params. Cached responses are invalidated by the index generation
+    counter (see ``IndexGenerationDocumentMixin``).
+
+    Unless ``response_cache_class`` is set on the view, the
+    ``response_cache_class`` of the document is used, so that the view
+    reads the same index generations the document bumps.
+
+    Shall be put before the ``BaseDocumentViewSet`` (or its descendants).
+
+    Example:
+
+        >>> class BookDocumentViewSet(ResponseCacheMixin, DocumentViewSet):
+        >>>
+        >>>     document = BookDocument  # Has ``response_cache_class``
+        >>>     # ...
+    """
+
+    response_cache_class = None
+    response_cache_actions = (
+        'list',
+        'retrieve',
+        'suggest',
+        'more_like_this',
+        'facets',
+    )
+    # Tuple of (queryset, filtered queryset), see ``filter_queryset``
+    _response_cache_queryset = None
+
+    def get_response_cache(self):
+        """Get response cache.
+
+        :return:
+        :rtype: django_elasticsearch_dsl_drf.cache.ResponseCache
+        """
+        response_cache_class = self.response_cache_class
+        if response_cache_class is None:
+            response_cache_class = getattr(
+                self.document,
+                'response_cache_class',
+                ResponseCache
+            )
+        return response_cache_class()
+
+    def get_page_params(self, request):
+        """Get page params of the request.
+
+        :param request: Django REST framework request.
+        :type request: rest_framework.request.Request
+        :return:
+        :rtype: dict
+        """
+        page_params = {}
+        # Any ``*_query_param`` of the paginator (page, page size, limit,
+        # offset, cursor, ...) selects a different page.
+        for attr_name in dir(self.paginator):
+            if not attr_name.endswith('_query_param'):
+                continue
+            param = getattr(self.paginator, attr_name, None)
+            if isinstance(param, six.string_types) \
+                    and param in request.query_params:
+                page_params[param] = request.query_params.getlist(param)
+        return page_params
+
+    def get_response_cache_key_parts(self, request):
+        """Get response cache key parts.
+
+        :param request: Django REST framework request.
+        :type request: rest_framework.request.Request
+        :return:
+        :rtype: dict
+        """
+        queryset = self.get_queryset()
+        filtered_queryset = self.filter_queryset(queryset)
+        self._response_cache_queryset = (queryset, filtered_queryset)
+        return {
+            'view': '{}.{}'.format(self.__class__.__module__,
+                                   self.__class__.__name__),
+            'action': self.action,
+            'kwargs': self.kwargs,
+            'search': filtered_queryset.to_dict(),
+            'page': self.get_page_params(request),
+        }
+
+    def filter_queryset(self, queryset):
+        """Filter the queryset.
+
+        Queryset filtered for the cache key is re-used by the action (if
+        the given queryset is the same), so that filter backends are not
+        applied twice. Other querysets (such as of the ``facet_values``
+        action) are filtered as usual.
+        """
+        if self._response_cache_queryset is not None:
+            base_queryset, filtered_queryset = self._response_cache_queryset
+            if queryset == base_queryset:
+                return filtered_queryset
+        return super(ResponseCacheMixin, self).filter_queryset(queryset)
+
+    def initial(self, request, *args, **kwargs):
+        """Replace the handler with a cached one.
+
+        Done after the permission checks, so that cached responses are not
+        served to the users not allowed to see them.
+        """
+        super(ResponseCacheMixin, self).initial(request, *args, **kwargs)
+        if request.method in ('GET', 'HEAD') \
+                and self.action in self.response_cache_actions:
+            handler = getattr(self, request.method.lower())
+            setattr(
+                self,
+                request.method.lower(),
+                self.get_cached_handler(handler)
+            )
+
+    def get_cached_response(self, request):
+        """Get the cached response.
+
+        :param request: Django REST framework request.
+        :type request: rest_framework.request.Request
+        :return: Tuple of (response cache, cache key, cached response or
+            None if not cached).
+        :rtype: tuple
+        """
+        response_cache = self.get_response_cache()
+        key = response_cache.make_key(
+            self.index,
+            self.get_response_cache_key_parts(request)
+        )
+        data = response_cache.get(key)
+        if data is None or isinstance(data, HttpResponseBase):
+            return response_cache, key, data
+        return response_cache, key, Response(data)
+
+    def cache_response(self, response_cache, key, response):
+        """Cache the response (if successful and not streaming).
+
+        :param response_cache: Response cache.
+        :param key: Cache key.
+        :param response: Response.
+        :type response_cache: django_elasticsearch_dsl_drf.cache.ResponseCache
+        :type key: str
+        :type response: django.http.response.HttpResponseBase
+        """
+        if response.status_code == status.HTTP_200_OK \
+                and not response.streaming:
+            # Responses without data (such as of the
+            # ``PassThroughMixin``) are cached as is.
+            response_cache.set(key, getattr(response, 'data', response))
+
+    def get_cached_handler(self, handler):
+        """Wrap the handler with the response cache.
+
+        Coroutine function handlers (asyncio views) are not supported, see
+        the ``AsyncResponseCacheMixin`` for them.
+
+        :param handler: Action handler.
+        :return: Wrapped handler.
+        """
+        if is_coroutine_function(handler):
+            raise ImproperlyConfigured(
+                "`ResponseCacheMixin` does not support coroutine function "
+                "handlers. Use the `AsyncResponseCacheMixin` (see "
+                "`django_elasticsearch_dsl_drf.aio.viewsets`) instead."
+            )
+
+        def cached_handler(request, *args, **kwargs):
+            response_cache, key, response = self.get_cached_response(request)
+            if response is not None:
+                return response
+
+            response = handler(request, *args, **kwargs)
+            self.cache_response(response_cache, key, response)
+            return response
+
+        return cached_handler
+
+
+class InstrumentationMixin(object):
+    """Instrumentation mixin.
+
+    Records metrics of the search requests (see ``SearchMetrics``):
+    normalized query fingerprint, time spent in the filter backends,
+    search (transport) time, time Elasticsearch took, serialization time
+    and the number of hits.
+
+    Metrics are reported in the ``Server-Timing`` header of the response
+    (if ``server_timing`` is set to True), passed to the
+    ``record_search_metrics`` hook and logged as warnings if search time
+    exceeds the ``slow_query_threshold`` (in milliseconds).
+
+    Shall be put before the ``BaseDocumentViewSet`` (or its descendants).
+
+    Example:
+
+        >>> class BookDocumentViewSet(InstrumentationMixin, DocumentViewSet):
+        >>>
+        >>>     document = BookDocument
+        >>>     slow_query_threshold = 500
+        >>>     # ...
+        >>>
+        >>>     def record_search_metrics(self, request, metrics):
+        >>>         statsd.timing(metrics.fingerprint, metrics.search_time)
+    """
+
+    search_metrics_class = SearchMetrics
+    server_timing = True
+    slow_query_threshold = None
+    search_metrics = None
+    _search_metrics_serialization_start = None
+
+    def initial(self, request, *args, **kwargs):
+        """Create the search metrics of the request."""
+        self.search_metrics = self.search_metrics_class()
+        super(InstrumentationMixin, self).initial(request, *args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        """Filter the queryset, recording the time spent in backends.
+
+        :param queryset: Base queryset.
+        :type queryset: elasticsearch_dsl.search.Search
+        :return: Updated queryset.
+        :rtype: elasticsearch_dsl.search.Search
+        """
+        start = timeit.default_timer()
+        queryset = super(InstrumentationMixin, self).filter_queryset(
+            queryset
+        )
+        metrics = self.search_metrics
+        if metrics is None or not isinstance(queryset, Search):
+            return queryset
+
+        metrics.filter_time = (metrics.filter_time or 0.0) + (
+            timeit.default_timer() - start
+        ) * 1000
+        model = getattr(queryset, 'model', None)
+        queryset = queryset.response_class(
+            MetricsResponseClass(queryset._response_class, metrics)
+        )
+        if model is not None:
+            queryset.model = model
+        metrics.set_search(queryset)
+        return queryset
+
+    def paginate_queryset(self, queryset):
+        """Paginate the queryset, recording the search time.
+
+        :param queryset:
+        :return:
+        """
+        start = timeit.default_timer()
+        page = super(InstrumentationMixin, self).paginate_queryset(queryset)
+        end = timeit.default_timer()
+        if self.search_metrics is not None:
+            self.search_metrics.search_time = (end - start) * 1000
+            self._search_metrics_serialization_start = end
+        return page
+
+    def get_paginated_response(self, data):
+        """Get paginated response, recording the serialization time.
+
+        :param data:
+        :return:
+        """
+        start = self._search_metrics_serialization_start
+        if self.search_metrics is not None and start is not None:
+            self.search_metrics.serialization_time = (
+                timeit.default_timer() - start
+            ) * 1000
+        return super(InstrumentationMixin, self).get_paginated_response(data)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        """Report the search metrics.
+
+        Nothing is reported unless a search has been made.
+        """
+        response = super(InstrumentationMixin, self).finalize_response(
+            request,
+            response,
+            *args,
+            **kwargs
+        )
+        metrics = self.search_metrics
+        if metrics is None or metrics.search is None:
+            return response
+
+        metrics.finalize()
+        if self.server_timing:
+            server_timing = metrics.get_server_timing()
+            if server_timing:
+                response['Server-Timing'] = server_timing
+        self.log_slow_query(request, metrics)
+        self.record_search_metrics(request, metrics)
+        return response
+
+    def log_slow_query(self, request, metrics):
+        """Log the search, if slower than the ``slow_query_threshold``.
+
+        :param request: Django REST framework request.
+        :param metrics: Search metrics.
+        :type request: rest_framework.request.Request
+        :type metrics: django_elasticsearch_dsl_drf.instrumentation.\
+            SearchMetrics
+        """
+        if self.slow_query_threshold is None:
+            return
+
+        search_time = metrics.search_time
+        if search_time is None:
+            search_time = metrics.took
+        if search_time is None or search_time < self.slow_query_threshold:
+            return
+
+        LOGGER.warning(
+            "Slow search (%.3f ms) %s %s, fingerprint %s: %s",
+            search_time,
+            request.method,
+            request.get_full_path(),
+            metrics.fingerprint,
+            json.dumps(metrics.to_dict(), cls=JSONEncoder),
+            extra={'search_metrics': metrics}
+        )
+
+    def record_search_metrics(self, request, metrics):
+        """Hook for recording the search metrics (statsd, Prometheus, etc).
+
+        Does nothing by default.
+
+        :param request: Django REST framework request.
+        :param metrics: Search metrics.
+        :type request: rest_framework.request.Request
+        :type metrics: django_elasticsearch_dsl_drf.instrumentation.\
+            SearchMetrics
+        """
+
 
 class BaseDocumentViewSet(ReadOnlyModelViewSet):
     """Base document ViewSet."""
@@ -152,25 +1320,83 @@ class BaseDocumentViewSet(ReadOnlyModelViewSet):
     pagination_class = PageNumberPagination
     # permission_classes = (AllowAny,)
     ignore = []
+    # If set to True, filter backends modify a single ``QueryBuilder``
+    # instead of cloning the search on each step.
+    query_builder = False
+    # If set to True, ``_source`` of the hits is passed to the serializer
+    # as is, no ``Hit`` objects are made. If there's no serializer class,
+    # ``_source`` of the hits is passed to the renderer.
+    raw_source = False
+    # If set to True, hits, aggregations and suggest are executed as
+    # separate sub-searches of a single ``_msearch`` request. If
+    # ``msearch_split_aggregations`` is set to True as well, each (top
+    # level) aggregation is executed in a sub-search of its own.
+    msearch_fan_out = False
+    msearch_split_aggregations = False
+    # If set (for instance, to ``FilterBackendProfiler``), time spent in
+    # each filter backend is recorded.
+    filter_backend_profiler_class = None
+
+    # Search templates, resolved once per view class
+    _search_templates = {}
+    _search_templates_lock = threading.Lock()
 
     def __init__(self, *args, **kwargs):
         assert self.document is not None
 
-        self.client = connections.get_connection(
-            self.document._get_using()
-        )
-        self.index = self.document._index._name
-        self.mapping = self.document._doc_type.mapping.properties.name
-        self.search = Search(
-            using=self.client,
-            index=self.index,
-            doc_type=self.document._doc_type.name
-        )
+        (
+            self.client,
+            self.index,
+            self.mapping,
+            self.search
+        ) = self.get_search_template()
         super(BaseDocumentViewSet, self).__init__(*args, **kwargs)
 
+    @classmethod
+    def get_search_template(cls):
+        """Get search template of the view class.
+
+        Client, index name, mapping name and the base search are resolved
+        on first call only and are shared by all instances of the view
+        class (in all threads). The base search shall not be modified, use
+        ``get_queryset`` to get a copy of it.
+
+        :return: Tuple of (client, index, mapping, search).
+        :rtype: tuple
+        """
+        try:
+            return cls._search_templates[cls]
+        except KeyError:
+            pass
+
+        with cls._search_templates_lock:
+            if cls not in cls._search_templates:
+                client = connections.get_connection(
+                    cls.document._get_using()
+                )
+                index = cls.document._index._name
+                cls._search_templates[cls] = (
+                    client,
+                    index,
+                    cls.document._doc_type.mapping.properties.name,
+                    Search(
+                        using=client,
+                        index=index,
+                        doc_type=cls.document._doc_type.name
+                    )
+                )
+        return cls._search_templates[cls]
+
     def get_queryset(self):
         """Get queryset."""
         queryset = self.search.query()
+        if self.raw_source:
+            queryset = queryset.response_class(RawResponse)
+        if self.msearch_fan_out:
+            queryset = FanOutSearch.from_search(
+                queryset,
+                split_aggregations=self.msearch_split_aggregations
+            )
         # Model- and object-permissions of the Django REST framework (
         # at the moment of writing they are ``DjangoModelPermissions``,
         # ``DjangoModelPermissionsOrAnonReadOnly`` and
@@ -192,6 +1418,71 @@ class BaseDocumentViewSet(ReadOnlyModelViewSet):
         queryset.model = self.document.Django.model
         return queryset
 
+    def list(self, request, *args, **kwargs):
+        """List.
+
+        In the raw source mode (``raw_source`` set to True) with no
+        ``serializer_class`` set, ``_source`` of the hits is returned
+        without serialization.
+
+        :param request:
+        :param args:
+        :param kwargs:
+        :return:
+        """
+        if not self.raw_source or self.serializer_class is not None:
+            return super(BaseDocumentViewSet, self).list(
+                request,
+                *args,
+                **kwargs
+            )
+
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(list(queryset))
+
+    def filter_queryset(self, queryset):
+        """Filter the queryset.
+
+        In the query builder mode (``query_builder`` set to True) all
+        filter backends contribute to a single ``QueryBuilder``, which
+        is materialized into a search once all backends have been applied.
+
+        If ``filter_backend_profiler_class`` is set, time spent in each
+        filter backend is recorded.
+
+        :param queryset: Base queryset.
+        :type queryset: elasticsearch_dsl.search.Search
+        :return: Updated queryset.
+        :rtype: elasticsearch_dsl.search.Search
+        """
+        query_builder = self.query_builder and isinstance(queryset, Search)
+        if query_builder:
+            queryset = QueryBuilder.from_search(queryset)
+
+        if self.filter_backend_profiler_class is None:
+            queryset = super(BaseDocumentViewSet, self).filter_queryset(
+                queryset
+            )
+        else:
+            profiler = self.filter_backend_profiler_class()
+            for backend in list(self.filter_backends):
+                queryset = profiler.time(
+                    self.__class__,
+                    backend,
+                    backend().filter_queryset,
+                    self.request,
+                    queryset,
+                    self
+                )
+
+        # Some backends (functional suggester) return serialized data
+        if query_builder and isinstance(queryset, QueryBuilder):
+            return queryset.build()
+        return queryset
+
     def get_object(self):
         """Get object."""
         queryset = self.get_queryset()